@@ -0,0 +1,22 @@
+"""add page_classes column to catalog_import_files
+
+Revision ID: 3f7a9c1d2e4b
+Revises: 999999999999
+Create Date: 2025-07-15 00:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '3f7a9c1d2e4b'
+down_revision: Union[str, None] = '999999999999'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('catalog_import_files', sa.Column('page_classes', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('catalog_import_files', 'page_classes')
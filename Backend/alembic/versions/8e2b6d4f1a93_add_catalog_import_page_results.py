@@ -0,0 +1,35 @@
+"""add catalog_import_page_results table
+
+Revision ID: 8e2b6d4f1a93
+Revises: 3f7a9c1d2e4b
+Create Date: 2025-07-15 00:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '8e2b6d4f1a93'
+down_revision: Union[str, None] = '3f7a9c1d2e4b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'catalog_import_page_results',
+        sa.Column('id', sa.Integer(), primary_key=True, index=True),
+        sa.Column(
+            'catalog_file_id',
+            sa.Integer(),
+            sa.ForeignKey('catalog_import_files.id', ondelete='CASCADE'),
+            nullable=False,
+        ),
+        sa.Column('page_number', sa.Integer(), nullable=False),
+        sa.Column('products', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.UniqueConstraint('catalog_file_id', 'page_number', name='uq_catalog_import_page'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('catalog_import_page_results')
@@ -0,0 +1,91 @@
+"""add full-text search structures for produtos
+
+PostgreSQL: unaccent/pg_trgm, the portuguese_unaccent text search
+configuration, a generated busca_tsv column with a GIN index and trigram
+indexes on nome_base, sku and ean. SQLite: an FTS5 table kept in sync by
+triggers.
+
+Revision ID: a9b8c7d6e5f4
+Revises: e3a4b5c6d7f8
+Create Date: 2025-07-20 00:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = 'a9b8c7d6e5f4'
+down_revision: Union[str, None] = 'e3a4b5c6d7f8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUNAS = "nome_base, nome_chat_api, descricao_original, descricao_chat_api, sku, ean, marca, modelo"
+NEW = ", ".join(f"new.{c.strip()}" for c in COLUNAS.split(","))
+OLD = ", ".join(f"old.{c.strip()}" for c in COLUNAS.split(","))
+
+SQLITE_UPGRADE = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS produtos_fts USING fts5({COLUNAS}, "
+    "content='produtos', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS produtos_fts_ai AFTER INSERT ON produtos BEGIN "
+    f"INSERT INTO produtos_fts(rowid, {COLUNAS}) VALUES (new.id, {NEW}); END",
+    f"CREATE TRIGGER IF NOT EXISTS produtos_fts_ad AFTER DELETE ON produtos BEGIN "
+    f"INSERT INTO produtos_fts(produtos_fts, rowid, {COLUNAS}) VALUES ('delete', old.id, {OLD}); END",
+    f"CREATE TRIGGER IF NOT EXISTS produtos_fts_au AFTER UPDATE ON produtos BEGIN "
+    f"INSERT INTO produtos_fts(produtos_fts, rowid, {COLUNAS}) VALUES ('delete', old.id, {OLD}); "
+    f"INSERT INTO produtos_fts(rowid, {COLUNAS}) VALUES (new.id, {NEW}); END",
+    "INSERT INTO produtos_fts(produtos_fts) VALUES ('rebuild')",
+]
+
+POSTGRESQL_UPGRADE = [
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'portuguese_unaccent') THEN
+            CREATE TEXT SEARCH CONFIGURATION portuguese_unaccent (COPY = portuguese);
+            ALTER TEXT SEARCH CONFIGURATION portuguese_unaccent
+                ALTER MAPPING FOR hword, hword_part, word WITH unaccent, portuguese_stem;
+        END IF;
+    END
+    $$
+    """,
+    """
+    ALTER TABLE produtos ADD COLUMN IF NOT EXISTS busca_tsv tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('portuguese_unaccent',
+            coalesce(nome_base, '') || ' ' || coalesce(nome_chat_api, '')), 'A') ||
+        setweight(to_tsvector('portuguese_unaccent',
+            coalesce(sku, '') || ' ' || coalesce(ean, '') || ' ' ||
+            coalesce(marca, '') || ' ' || coalesce(modelo, '')), 'B') ||
+        setweight(to_tsvector('portuguese_unaccent',
+            coalesce(descricao_original, '') || ' ' || coalesce(descricao_chat_api, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_produtos_busca_tsv ON produtos USING gin (busca_tsv)",
+    "CREATE INDEX IF NOT EXISTS ix_produtos_nome_base_trgm ON produtos USING gin (nome_base gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_produtos_sku_trgm ON produtos USING gin (sku gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_produtos_ean_trgm ON produtos USING gin (ean gin_trgm_ops)",
+]
+
+
+def upgrade() -> None:
+    dialeto = op.get_bind().dialect.name
+    if dialeto == 'postgresql':
+        for stmt in POSTGRESQL_UPGRADE:
+            op.execute(stmt)
+    elif dialeto == 'sqlite':
+        for stmt in SQLITE_UPGRADE:
+            op.execute(stmt)
+
+
+def downgrade() -> None:
+    dialeto = op.get_bind().dialect.name
+    if dialeto == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_produtos_ean_trgm")
+        op.execute("DROP INDEX IF EXISTS ix_produtos_sku_trgm")
+        op.execute("DROP INDEX IF EXISTS ix_produtos_nome_base_trgm")
+        op.execute("DROP INDEX IF EXISTS ix_produtos_busca_tsv")
+        op.execute("ALTER TABLE produtos DROP COLUMN IF EXISTS busca_tsv")
+        op.execute("DROP TEXT SEARCH CONFIGURATION IF EXISTS portuguese_unaccent")
+    elif dialeto == 'sqlite':
+        for trigger in ("produtos_fts_ai", "produtos_fts_ad", "produtos_fts_au"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS produtos_fts")
@@ -0,0 +1,104 @@
+"""add catalog_import_result_items table
+
+Imports finished before this revision kept every created/updated/error item
+in catalog_import_files.result_summary. Those items are copied into the new
+table and result_summary is reduced to the counts, as new imports store it.
+
+Revision ID: b41c7e9a5d20
+Revises: 8e2b6d4f1a93
+Create Date: 2025-07-16 00:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = 'b41c7e9a5d20'
+down_revision: Union[str, None] = '8e2b6d4f1a93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+RESULT_KINDS = ('created', 'updated', 'errors')
+
+
+def upgrade() -> None:
+    op.create_table(
+        'catalog_import_result_items',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column(
+            'catalog_file_id',
+            sa.Integer(),
+            sa.ForeignKey('catalog_import_files.id', ondelete='CASCADE'),
+            nullable=False,
+        ),
+        sa.Column('kind', sa.String(), nullable=False),
+        sa.Column('data', sa.JSON(), nullable=False),
+    )
+    op.create_index(
+        'ix_catalog_import_result_items_file_kind',
+        'catalog_import_result_items',
+        ['catalog_file_id', 'kind', 'id'],
+    )
+
+    arquivos = sa.table(
+        'catalog_import_files',
+        sa.column('id', sa.Integer()),
+        sa.column('result_summary', sa.JSON()),
+    )
+    itens = sa.table(
+        'catalog_import_result_items',
+        sa.column('catalog_file_id', sa.Integer()),
+        sa.column('kind', sa.String()),
+        sa.column('data', sa.JSON()),
+    )
+    conn = op.get_bind()
+    for file_id, resumo in conn.execute(sa.select(arquivos.c.id, arquivos.c.result_summary)).all():
+        if not isinstance(resumo, dict) or not any(
+            isinstance(resumo.get(kind), list) for kind in RESULT_KINDS
+        ):
+            continue
+        linhas = [
+            {'catalog_file_id': file_id, 'kind': kind, 'data': item}
+            for kind in RESULT_KINDS
+            for item in resumo.get(kind) or []
+        ]
+        if linhas:
+            conn.execute(sa.insert(itens), linhas)
+        conn.execute(
+            sa.update(arquivos)
+            .where(arquivos.c.id == file_id)
+            .values(result_summary={
+                'counts': {kind: len(resumo.get(kind) or []) for kind in RESULT_KINDS}
+            })
+        )
+
+
+def downgrade() -> None:
+    # Devolve os itens ao result_summary, no formato anterior.
+    conn = op.get_bind()
+    arquivos = sa.table(
+        'catalog_import_files',
+        sa.column('id', sa.Integer()),
+        sa.column('result_summary', sa.JSON()),
+    )
+    itens = sa.table(
+        'catalog_import_result_items',
+        sa.column('id', sa.Integer()),
+        sa.column('catalog_file_id', sa.Integer()),
+        sa.column('kind', sa.String()),
+        sa.column('data', sa.JSON()),
+    )
+    resultados = {}
+    for file_id, kind, data in conn.execute(
+        sa.select(itens.c.catalog_file_id, itens.c.kind, itens.c.data).order_by(itens.c.id)
+    ).all():
+        resultados.setdefault(file_id, {k: [] for k in RESULT_KINDS})[kind].append(data)
+    for file_id, resultado in resultados.items():
+        conn.execute(
+            sa.update(arquivos).where(arquivos.c.id == file_id).values(result_summary=resultado)
+        )
+
+    op.drop_index(
+        'ix_catalog_import_result_items_file_kind',
+        table_name='catalog_import_result_items',
+    )
+    op.drop_table('catalog_import_result_items')
@@ -0,0 +1,44 @@
+"""add composite indexes for the produtos list filters and sorts
+
+One (user_id, <equality filter>, id) index per filter of the product list
+(fornecedor_id, product_type_id and the three status columns) plus
+(user_id, id) for the default ORDER BY id. They are the indexes
+services/query_shapes proposes for the list's filter and sort
+combinations; with id in the key the matching COUNT queries are
+index-only.
+
+On PostgreSQL the indexes are built with CREATE INDEX CONCURRENTLY, outside
+the migration transaction, so the produtos table stays writable.
+
+Revision ID: b7c8d9e0f1a2
+Revises: a9b8c7d6e5f4
+Create Date: 2025-07-22 00:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = 'b7c8d9e0f1a2'
+down_revision: Union[str, None] = 'a9b8c7d6e5f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDICES = {
+    'ix_produtos_user_id_id': ['user_id', 'id'],
+    'ix_produtos_user_id_fornecedor_id_id': ['user_id', 'fornecedor_id', 'id'],
+    'ix_produtos_user_id_product_type_id_id': ['user_id', 'product_type_id', 'id'],
+    'ix_produtos_user_id_status_enriquecimento_web_id': ['user_id', 'status_enriquecimento_web', 'id'],
+    'ix_produtos_user_id_status_titulo_ia_id': ['user_id', 'status_titulo_ia', 'id'],
+    'ix_produtos_user_id_status_descricao_ia_id': ['user_id', 'status_descricao_ia', 'id'],
+}
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for nome, colunas in INDICES.items():
+            op.create_index(nome, 'produtos', colunas, unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for nome in reversed(list(INDICES)):
+            op.drop_index(nome, table_name='produtos', postgresql_concurrently=True)
@@ -0,0 +1,24 @@
+"""add job concurrency limit and queue weight to planos
+
+Revision ID: d8e1f2a3b4c5
+Revises: c7d3e5f90a12
+Create Date: 2025-07-18 00:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = 'd8e1f2a3b4c5'
+down_revision: Union[str, None] = 'c7d3e5f90a12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('planos', sa.Column('limite_jobs_simultaneos', sa.Integer(), nullable=True))
+    op.add_column('planos', sa.Column('peso_fila', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('planos', 'peso_fila')
+    op.drop_column('planos', 'limite_jobs_simultaneos')
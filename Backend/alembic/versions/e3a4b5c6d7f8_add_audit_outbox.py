@@ -0,0 +1,27 @@
+"""add audit_outbox table
+
+Revision ID: e3a4b5c6d7f8
+Revises: d8e1f2a3b4c5
+Create Date: 2025-07-19 00:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = 'e3a4b5c6d7f8'
+down_revision: Union[str, None] = 'd8e1f2a3b4c5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'audit_outbox',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('audit_outbox')
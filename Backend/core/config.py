@@ -58,6 +58,22 @@ class Settings(BaseSettings):
     DEFAULT_LIMIT_ENRIQUECIMENTO_SEM_PLANO: int = int(os.getenv("DEFAULT_LIMIT_ENRIQUECIMENTO_SEM_PLANO", 10))
     DEFAULT_LIMIT_GERACAO_IA_SEM_PLANO: int = int(os.getenv("DEFAULT_LIMIT_GERACAO_IA_SEM_PLANO", 20))
 
+    # Importação em lote de produtos: upsert nativo (ON CONFLICT) em lotes
+    PRODUTOS_BULK_UPSERT: bool = os.getenv("PRODUTOS_BULK_UPSERT", "True").lower() in ("true", "1", "t", "yes")
+    PRODUTOS_UPSERT_BATCH_SIZE: int = int(os.getenv("PRODUTOS_UPSERT_BATCH_SIZE", 500))
+    # Total da listagem de produtos: exact, cached, estimated ou window (por requisição: total_mode)
+    PRODUTOS_COUNT_MODE: str = os.getenv("PRODUTOS_COUNT_MODE", "exact")
+    PRODUTOS_COUNT_CACHE_TTL: float = float(os.getenv("PRODUTOS_COUNT_CACHE_TTL", 60))
+    # Registro das formas de consulta da listagem de produtos (filtros/ordenação) para sugerir índices
+    PRODUTOS_QUERY_SHAPES_ENABLED: bool = os.getenv("PRODUTOS_QUERY_SHAPES_ENABLED", "True").lower() in ("true", "1", "t", "yes")
+    # Registros de histórico/uso de IA acumulados e gravados em lote
+    AUDIT_BUFFER_BATCH_SIZE: int = int(os.getenv("AUDIT_BUFFER_BATCH_SIZE", 500))
+    AUDIT_BUFFER_FLUSH_INTERVAL: float = float(os.getenv("AUDIT_BUFFER_FLUSH_INTERVAL", 5.0))
+    # Histórico das requisições gravado por uma thread de fundo (e outbox opcional)
+    AUDIT_LOG_ASYNC: bool = os.getenv("AUDIT_LOG_ASYNC", "True").lower() in ("true", "1", "t", "yes")
+    AUDIT_LOG_FLUSH_INTERVAL: float = float(os.getenv("AUDIT_LOG_FLUSH_INTERVAL", 1.0))
+    AUDIT_OUTBOX_ENABLED: bool = os.getenv("AUDIT_OUTBOX_ENABLED", "False").lower() in ("true", "1", "t", "yes")
+
     MAIL_USERNAME: Optional[str] = os.getenv("MAIL_USERNAME")
     MAIL_PASSWORD: Optional[str] = os.getenv("MAIL_PASSWORD")
     MAIL_FROM: Optional[str] = os.getenv("MAIL_FROM")
@@ -87,6 +103,34 @@ class Settings(BaseSettings):
     UPLOAD_DIRECTORY: str = os.getenv("UPLOAD_DIRECTORY", "static/uploads")
     PREVIEW_DIRECTORY: str = os.getenv("PREVIEW_DIRECTORY", "static/previews")
     POPPLER_PATH: Optional[str] = os.getenv("POPPLER_PATH")
+    # Cache em disco das páginas de PDF rasterizadas (previews)
+    RENDER_CACHE_DIRECTORY: str = os.getenv("RENDER_CACHE_DIRECTORY", "cache/renders")
+    RENDER_CACHE_MAX_MB: int = int(os.getenv("RENDER_CACHE_MAX_MB", 512))
+    # Limite das miniaturas de preview em PREVIEW_DIRECTORY/thumbs (LRU)
+    PREVIEW_THUMBNAIL_MAX_MB: int = int(os.getenv("PREVIEW_THUMBNAIL_MAX_MB", 512))
+    # OCR de páginas escaneadas: pool de processos, DPI adaptativo e cache por página
+    OCR_WORKERS: int = int(os.getenv("OCR_WORKERS", 2))
+    OCR_LOW_DPI: int = int(os.getenv("OCR_LOW_DPI", 150))
+    OCR_HIGH_DPI: int = int(os.getenv("OCR_HIGH_DPI", 300))
+    OCR_MIN_CONFIDENCE: float = float(os.getenv("OCR_MIN_CONFIDENCE", 70))
+    OCR_LANGUAGE: str = os.getenv("OCR_LANGUAGE", "eng")  # idiomas do Tesseract, ex.: "por+eng"
+    OCR_CACHE_DIRECTORY: str = os.getenv("OCR_CACHE_DIRECTORY", "cache/ocr")
+    OCR_CACHE_MAX_MB: int = int(os.getenv("OCR_CACHE_MAX_MB", 64))
+    # Fila de tarefas de fundo (importações, geração IA, enriquecimento web)
+    JOB_QUEUE_BACKEND: str = os.getenv("JOB_QUEUE_BACKEND", "database")
+    JOB_QUEUES: str = os.getenv("JOB_QUEUES", "ia,imports,default")
+    JOB_WORKER_CONCURRENCY: int = int(os.getenv("JOB_WORKER_CONCURRENCY", 2))
+    JOB_POLL_INTERVAL_SECONDS: float = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", 1.0))
+    JOB_VISIBILITY_TIMEOUT_SECONDS: int = int(os.getenv("JOB_VISIBILITY_TIMEOUT_SECONDS", 600))
+    JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", 3))
+    JOB_RETRY_BACKOFF_SECONDS: float = float(os.getenv("JOB_RETRY_BACKOFF_SECONDS", 30))
+    JOB_RETRY_BACKOFF_MAX_SECONDS: float = float(os.getenv("JOB_RETRY_BACKOFF_MAX_SECONDS", 3600))
+    # Escalonamento justo entre usuários (limites e pesos padrão quando o plano não define)
+    JOB_FAIR_SCHEDULING: bool = os.getenv("JOB_FAIR_SCHEDULING", "True").lower() in ("true", "1", "t", "yes")
+    JOB_TENANT_MAX_CONCURRENT: int = int(os.getenv("JOB_TENANT_MAX_CONCURRENT", 2))
+    JOB_TENANT_MAX_CONCURRENT_PRIORITARIO: int = int(os.getenv("JOB_TENANT_MAX_CONCURRENT_PRIORITARIO", 4))
+    JOB_TENANT_WEIGHT_PRIORITARIO: int = int(os.getenv("JOB_TENANT_WEIGHT_PRIORITARIO", 2))
+    JOB_METRICS_WINDOW_SECONDS: int = int(os.getenv("JOB_METRICS_WINDOW_SECONDS", 3600))
 
     OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY")
     GOOGLE_GEMINI_API_KEY: Optional[str] = os.getenv("GOOGLE_GEMINI_API_KEY")
@@ -35,6 +35,7 @@ from .crud_produtos import (
     create_produtos_bulk,
     get_produto,
     get_produtos_by_user,
+    get_produtos_by_user_cursor,
     count_produtos_by_user,
     update_produto,
     delete_produto,
@@ -59,6 +60,7 @@ from .crud_product_types import (
 from .crud_registros_uso_ia import (
     create_registro_uso_ia,
     get_registros_uso_ia,
+    get_registros_uso_ia_cursor,
     count_registros_uso_ia,
     get_usos_ia_by_produto,
     count_usos_ia_by_user_and_type_no_mes_corrente,
@@ -68,6 +70,7 @@ from .crud_registros_uso_ia import (
 from .crud_historico import (
     create_registro_historico,
     get_registros_historico,
+    get_registros_historico_cursor,
     count_registros_historico,
 )
 
@@ -0,0 +1,420 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, func, or_, select, text
+from sqlalchemy.orm import Session, aliased
+
+from Backend import models
+
+logger = logging.getLogger(__name__)
+
+Job = models.BackgroundJob
+StatusJob = models.StatusJobEnum
+
+# Quantos candidatos são lidos por tentativa de reserva; se outro worker
+# reservar o primeiro, o próximo da lista é tentado sem nova consulta.
+CLAIM_CANDIDATES = 10
+
+# Primeira chave dos advisory locks por usuário tomados na reserva (PostgreSQL),
+# para não colidir com outros usos de ``pg_advisory_xact_lock``.
+TENANT_LOCK_NAMESPACE = 7301
+
+
+def _agora() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _visiveis(now: datetime):
+    """Jobs que podem ser reservados: na fila e vencidos, ou com reserva expirada."""
+    return or_(
+        and_(Job.status == StatusJob.QUEUED.value, Job.run_after <= now),
+        and_(
+            Job.status == StatusJob.RUNNING.value,
+            Job.locked_until < now,
+            Job.attempts < Job.max_attempts,
+        ),
+    )
+
+
+def create_job(
+    db: Session,
+    task: str,
+    payload: Optional[Dict[str, Any]] = None,
+    *,
+    queue: str = "default",
+    priority: int = 0,
+    max_attempts: int = 3,
+    user_id: Optional[int] = None,
+    delay_seconds: float = 0,
+) -> models.BackgroundJob:
+    job = Job(
+        task=task,
+        payload=payload or {},
+        queue=queue,
+        priority=priority,
+        max_attempts=max_attempts,
+        user_id=user_id,
+        status=StatusJob.QUEUED.value,
+        run_after=_agora() + timedelta(seconds=delay_seconds),
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def get_job(db: Session, job_id: int) -> Optional[models.BackgroundJob]:
+    return db.query(Job).filter(Job.id == job_id).first()
+
+
+def get_jobs_by_user(
+    db: Session,
+    user_id: int,
+    status: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+) -> Tuple[List[models.BackgroundJob], int]:
+    query = db.query(Job).filter(Job.user_id == user_id)
+    if status:
+        query = query.filter(Job.status == status)
+    total = query.count()
+    items = query.order_by(Job.id.desc()).offset(skip).limit(limit).all()
+    return items, total
+
+
+def _executando(now: datetime):
+    return and_(Job.status == StatusJob.RUNNING.value, Job.locked_until >= now)
+
+
+def get_tenant_states(
+    db: Session, queues: Sequence[str], now: Optional[datetime] = None
+) -> List[Dict[str, Any]]:
+    """Estado de cada usuário com jobs prontos nas filas informadas.
+
+    ``executando`` conta os jobs reservados do usuário em *todas* as filas,
+    já que o limite de concorrência é por usuário.
+    """
+    now = now or _agora()
+    prontos = (
+        db.query(Job.user_id, func.count(Job.id), func.min(Job.run_after))
+        .filter(Job.queue.in_(queues), _visiveis(now))
+        .group_by(Job.user_id)
+        .all()
+    )
+    if not prontos:
+        return []
+    user_ids = [user_id for user_id, _, _ in prontos if user_id is not None]
+    executando = dict(
+        db.query(Job.user_id, func.count(Job.id))
+        .filter(_executando(now), Job.user_id.in_(user_ids))
+        .group_by(Job.user_id)
+        .all()
+    ) if user_ids else {}
+    planos = {
+        user_id: (bool(prioritario), limite, peso)
+        for user_id, prioritario, limite, peso in db.query(
+            models.User.id,
+            models.Plano.suporte_prioritario,
+            models.Plano.limite_jobs_simultaneos,
+            models.Plano.peso_fila,
+        )
+        .outerjoin(models.Plano, models.User.plano_id == models.Plano.id)
+        .filter(models.User.id.in_(user_ids))
+        .all()
+    } if user_ids else {}
+
+    estados = []
+    for user_id, quantidade, espera_desde in prontos:
+        prioritario, limite, peso = planos.get(user_id, (False, None, None))
+        estados.append(
+            {
+                "user_id": user_id,
+                "executando": executando.get(user_id, 0),
+                "prontos": quantidade,
+                "espera_desde": espera_desde,
+                "suporte_prioritario": prioritario,
+                "limite_plano": limite,
+                "peso_plano": peso,
+            }
+        )
+    return estados
+
+
+def _falhar_reservas_esgotadas(db: Session, queues: Sequence[str], now: datetime) -> None:
+    """Marca como FAILED os jobs cuja reserva expirou sem tentativas restantes."""
+    expirados = (
+        db.query(Job)
+        .filter(
+            Job.queue.in_(queues),
+            Job.status == StatusJob.RUNNING.value,
+            Job.locked_until < now,
+            Job.attempts >= Job.max_attempts,
+        )
+        .update(
+            {
+                Job.status: StatusJob.FAILED.value,
+                Job.locked_until: None,
+                Job.locked_by: None,
+                Job.finished_at: now,
+                Job.last_error: "Timeout de visibilidade expirou na última tentativa",
+            },
+            synchronize_session=False,
+        )
+    )
+    if expirados:
+        logger.warning("%s job(s) abandonado(s) marcados como FAILED", expirados)
+        db.commit()
+
+
+def _travar_tenant(db: Session, user_id: Optional[int]) -> bool:
+    """Serializa as reservas de um usuário até o fim da transação.
+
+    No PostgreSQL em READ COMMITTED, dois workers podem contar os jobs em
+    execução do usuário ao mesmo tempo e ambos passarem do limite. Um advisory
+    lock por usuário impede isso; com ``pg_try_advisory_xact_lock`` o worker
+    que não consegue o lock pula o usuário em vez de esperar, o que também
+    evita deadlock entre workers que percorrem os usuários em ordens
+    diferentes. No SQLite as escritas já são serializadas pelo banco.
+    """
+    if user_id is None or db.get_bind().dialect.name != "postgresql":
+        return True
+    return bool(
+        db.execute(
+            text("SELECT pg_try_advisory_xact_lock(:namespace, :user_id)"),
+            {"namespace": TENANT_LOCK_NAMESPACE, "user_id": user_id},
+        ).scalar()
+    )
+
+
+def claim_job(
+    db: Session,
+    queues: Sequence[str],
+    worker_id: str,
+    visibility_timeout: float,
+    tenants: Optional[Sequence[Tuple[Optional[int], Optional[int]]]] = None,
+) -> Optional[models.BackgroundJob]:
+    """Reserva o próximo job visível das filas informadas.
+
+    Os candidatos são ordenados por prioridade (maior primeiro) e depois por
+    ``run_after``. A reserva é um ``UPDATE`` condicional ao job ainda estar
+    visível, de modo que dois workers nunca recebem o mesmo job; no
+    PostgreSQL a leitura usa ``FOR UPDATE SKIP LOCKED`` para que os workers
+    não disputem a mesma linha.
+
+    Com ``tenants`` (pares ``(user_id, limite)`` na ordem de atendimento, ver
+    ``services/job_scheduler``), os usuários são tentados nessa ordem e o
+    ``UPDATE`` só reserva o job se o usuário ainda estiver abaixo do limite.
+    No PostgreSQL a contagem e a reserva de um usuário com limite acontecem
+    sob um advisory lock desse usuário (ver :func:`_travar_tenant`).
+    """
+    now = _agora()
+    _falhar_reservas_esgotadas(db, queues, now)
+
+    por_tenant = tenants is not None
+    for user_id, limite in tenants if por_tenant else [(None, None)]:
+        if limite is not None and not _travar_tenant(db, user_id):
+            continue
+        query = db.query(Job.id).filter(Job.queue.in_(queues), _visiveis(now))
+        if por_tenant:
+            query = query.filter(Job.user_id.is_(None) if user_id is None else Job.user_id == user_id)
+        query = query.order_by(Job.priority.desc(), Job.run_after, Job.id).limit(CLAIM_CANDIDATES)
+        if db.get_bind().dialect.name == "postgresql":
+            query = query.with_for_update(skip_locked=True)
+
+        condicoes = [_visiveis(now)]
+        if limite is not None:
+            outro = aliased(Job)
+            em_execucao = (
+                select(func.count(outro.id))
+                .where(
+                    outro.user_id == user_id,
+                    outro.status == StatusJob.RUNNING.value,
+                    outro.locked_until >= now,
+                )
+                .scalar_subquery()
+            )
+            condicoes.append(em_execucao < limite)
+
+        for (job_id,) in query.all():
+            reservados = (
+                db.query(Job)
+                .filter(Job.id == job_id, *condicoes)
+                .update(
+                    {
+                        Job.status: StatusJob.RUNNING.value,
+                        Job.attempts: Job.attempts + 1,
+                        Job.locked_by: worker_id,
+                        Job.locked_until: now + timedelta(seconds=visibility_timeout),
+                        Job.started_at: now,
+                    },
+                    synchronize_session=False,
+                )
+            )
+            if reservados:
+                db.commit()
+                return get_job(db, job_id)
+    db.rollback()
+    return None
+
+
+def extend_job_lock(
+    db: Session, job_id: int, worker_id: str, visibility_timeout: float
+) -> bool:
+    """Renova a reserva de um job em execução; ``False`` se ela foi perdida."""
+    renovados = (
+        db.query(Job)
+        .filter(
+            Job.id == job_id,
+            Job.locked_by == worker_id,
+            Job.status == StatusJob.RUNNING.value,
+        )
+        .update(
+            {Job.locked_until: _agora() + timedelta(seconds=visibility_timeout)},
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    return bool(renovados)
+
+
+def complete_job(
+    db: Session, job_id: int, worker_id: str, result: Optional[Dict[str, Any]] = None
+) -> bool:
+    concluidos = (
+        db.query(Job)
+        .filter(
+            Job.id == job_id,
+            Job.locked_by == worker_id,
+            Job.status == StatusJob.RUNNING.value,
+        )
+        .update(
+            {
+                Job.status: StatusJob.SUCCEEDED.value,
+                Job.result: result,
+                Job.last_error: None,
+                Job.locked_until: None,
+                Job.finished_at: _agora(),
+            },
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    return bool(concluidos)
+
+
+def fail_job(
+    db: Session,
+    job_id: int,
+    worker_id: str,
+    error: str,
+    backoff_seconds: float,
+    backoff_max_seconds: float,
+    retry: bool = True,
+) -> Optional[models.BackgroundJob]:
+    """Registra a falha de uma tentativa.
+
+    Enquanto houver tentativas, o job volta para a fila com ``run_after``
+    adiado por ``backoff_seconds * 2 ** (tentativa - 1)`` (limitado a
+    ``backoff_max_seconds``); depois disso, ou com ``retry=False``, fica
+    FAILED. Retorna ``None`` se o worker não tinha mais a reserva do job.
+    """
+    job = (
+        db.query(Job)
+        .filter(
+            Job.id == job_id,
+            Job.locked_by == worker_id,
+            Job.status == StatusJob.RUNNING.value,
+        )
+        .first()
+    )
+    if not job:
+        db.rollback()
+        return None
+
+    now = _agora()
+    job.last_error = error
+    job.locked_until = None
+    if retry and job.attempts < job.max_attempts:
+        atraso = min(backoff_seconds * 2 ** (job.attempts - 1), backoff_max_seconds)
+        job.status = StatusJob.QUEUED.value
+        job.run_after = now + timedelta(seconds=atraso)
+    else:
+        job.status = StatusJob.FAILED.value
+        job.finished_at = now
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def _utc(valor: Optional[datetime]) -> Optional[datetime]:
+    if valor is not None and valor.tzinfo is None:
+        return valor.replace(tzinfo=timezone.utc)
+    return valor
+
+
+def get_queue_metrics(
+    db: Session, user_id: Optional[int] = None, window_seconds: float = 3600
+) -> List[Dict[str, Any]]:
+    """Profundidade da fila e tempo de espera por usuário.
+
+    ``queued`` conta os jobs na fila (incluindo os em backoff), ``ready`` os
+    que já podem ser reservados e ``running`` os reservados. A espera média é
+    ``started_at - created_at`` dos jobs iniciados nos últimos
+    ``window_seconds``; ``oldest_wait_seconds`` é a idade do job pronto mais
+    antigo.
+    """
+    now = _agora()
+    filtro = [] if user_id is None else [Job.user_id == user_id]
+    metricas: Dict[Optional[int], Dict[str, Any]] = {}
+
+    def _tenant(uid):
+        return metricas.setdefault(
+            uid,
+            {
+                "user_id": uid,
+                "queued": 0,
+                "ready": 0,
+                "running": 0,
+                "oldest_wait_seconds": 0.0,
+                "avg_wait_seconds": None,
+                "started_in_window": 0,
+            },
+        )
+
+    for uid, quantidade in (
+        db.query(Job.user_id, func.count(Job.id))
+        .filter(Job.status == StatusJob.QUEUED.value, *filtro)
+        .group_by(Job.user_id)
+    ):
+        _tenant(uid)["queued"] = quantidade
+    for uid, quantidade, mais_antigo in (
+        db.query(Job.user_id, func.count(Job.id), func.min(Job.created_at))
+        .filter(Job.status == StatusJob.QUEUED.value, Job.run_after <= now, *filtro)
+        .group_by(Job.user_id)
+    ):
+        tenant = _tenant(uid)
+        tenant["ready"] = quantidade
+        if mais_antigo is not None:
+            tenant["oldest_wait_seconds"] = max((now - _utc(mais_antigo)).total_seconds(), 0.0)
+    for uid, quantidade in (
+        db.query(Job.user_id, func.count(Job.id))
+        .filter(_executando(now), *filtro)
+        .group_by(Job.user_id)
+    ):
+        _tenant(uid)["running"] = quantidade
+
+    esperas: Dict[Optional[int], List[float]] = {}
+    for uid, criado, iniciado in db.query(Job.user_id, Job.created_at, Job.started_at).filter(
+        Job.started_at >= now - timedelta(seconds=window_seconds), *filtro
+    ):
+        if criado is not None:
+            esperas.setdefault(uid, []).append(
+                max((_utc(iniciado) - _utc(criado)).total_seconds(), 0.0)
+            )
+    for uid, valores in esperas.items():
+        tenant = _tenant(uid)
+        tenant["avg_wait_seconds"] = sum(valores) / len(valores)
+        tenant["started_in_window"] = len(valores)
+
+    return sorted(metricas.values(), key=lambda m: (m["user_id"] is None, m["user_id"] or 0))
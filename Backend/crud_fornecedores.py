@@ -1,19 +1,23 @@
 # Caminho: Backend/crud_fornecedores.py
 import os
 import logging
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Set, Tuple
 
-from sqlalchemy import func, or_
+from sqlalchemy import func, insert, or_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from Backend.models import Fornecedor, CatalogImportFile # Adicionado CatalogImportFile
+from Backend.models import Fornecedor, CatalogImportFile, CatalogImportPageResult, CatalogImportResultItem # Adicionado CatalogImportFile
 from Backend import schemas
 
 
 logger = logging.getLogger(__name__)
 
 # --- Fornecedor CRUD ---
-def create_fornecedor(db: Session, fornecedor: schemas.FornecedorCreate, user_id: int) -> Fornecedor:
+def create_fornecedor(
+    db: Session, fornecedor: schemas.FornecedorCreate, user_id: int, commit: bool = True
+) -> Fornecedor:
+    """Cria o fornecedor; com ``commit=False`` só faz o ``flush`` e o commit fica com quem chama."""
     fornecedor_data = fornecedor.model_dump()
     if fornecedor_data.get("site_url"):
         fornecedor_data["site_url"] = str(fornecedor_data["site_url"])
@@ -22,6 +26,9 @@ def create_fornecedor(db: Session, fornecedor: schemas.FornecedorCreate, user_id
 
     db_fornecedor = Fornecedor(**fornecedor_data, user_id=user_id)
     db.add(db_fornecedor)
+    if not commit:
+        db.flush()
+        return db_fornecedor
     db.commit()
     db.refresh(db_fornecedor)
     return db_fornecedor
@@ -110,4 +117,156 @@ def create_catalog_import_file(db: Session, user_id: int, fornecedor_id: int, fi
     db.add(db_import_file)
     db.commit()
     db.refresh(db_import_file)
-    return db_import_file
\ No newline at end of file
+    return db_import_file
+
+
+def get_catalog_import_checkpoints(db: Session, catalog_file_id: int) -> Set[int]:
+    """Páginas da importação que já têm resultado gravado."""
+    rows = (
+        db.query(CatalogImportPageResult.page_number)
+        .filter(CatalogImportPageResult.catalog_file_id == catalog_file_id)
+        .all()
+    )
+    return {page_number for (page_number,) in rows}
+
+
+def save_catalog_import_page(
+    db: Session,
+    catalog_file: CatalogImportFile,
+    page_number: int,
+    products: List[Dict[str, Any]],
+) -> bool:
+    """
+    Grava o resultado de uma página e o progresso do job na mesma transação.
+    Retorna ``False`` se a página já havia sido gravada (por outra execução).
+    """
+    db.add(
+        CatalogImportPageResult(
+            catalog_file_id=catalog_file.id,
+            page_number=page_number,
+            products=products,
+        )
+    )
+    catalog_file.pages_processed = (catalog_file.pages_processed or 0) + 1
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return False
+    return True
+
+
+def get_catalog_import_products(
+    db: Session, catalog_file_id: int, skip: int = 0, limit: int = 100
+) -> Tuple[List[Dict[str, Any]], int]:
+    """Uma página dos produtos extraídos, na ordem das páginas do PDF, e o total.
+
+    Só o tamanho de cada checkpoint é lido para todas as páginas; os produtos
+    são carregados apenas das páginas que cobrem ``skip:skip + limit``.
+    """
+    filtro = CatalogImportPageResult.catalog_file_id == catalog_file_id
+    tamanhos = (
+        db.query(
+            CatalogImportPageResult.page_number,
+            func.json_array_length(CatalogImportPageResult.products),
+        )
+        .filter(filtro)
+        .order_by(CatalogImportPageResult.page_number)
+        .all()
+    )
+    total = sum(n or 0 for _, n in tamanhos)
+    paginas: List[int] = []
+    deslocamento = 0
+    inicio = 0
+    for page_number, n in tamanhos:
+        fim = inicio + (n or 0)
+        if fim > skip and inicio < skip + limit:
+            if not paginas:
+                deslocamento = skip - inicio
+            paginas.append(page_number)
+        inicio = fim
+    if not paginas:
+        return [], total
+    rows = (
+        db.query(CatalogImportPageResult.products)
+        .filter(filtro, CatalogImportPageResult.page_number.in_(paginas))
+        .order_by(CatalogImportPageResult.page_number)
+        .all()
+    )
+    produtos = [produto for (products,) in rows for produto in products]
+    return produtos[deslocamento : deslocamento + limit], total
+
+
+CATALOG_IMPORT_RESULT_KINDS = ("created", "updated", "errors")
+
+
+def clear_catalog_import_results(db: Session, catalog_file_id: int) -> None:
+    """Remove os itens de resultado de uma importação anterior do mesmo arquivo."""
+    db.query(CatalogImportResultItem).filter(
+        CatalogImportResultItem.catalog_file_id == catalog_file_id
+    ).delete(synchronize_session=False)
+
+
+def append_catalog_import_results(
+    db: Session, catalog_file_id: int, kind: str, items: List[Dict[str, Any]]
+) -> None:
+    """Acrescenta itens ao resultado da importação (sem commit)."""
+    if not items:
+        return
+    db.execute(
+        insert(CatalogImportResultItem),
+        [{"catalog_file_id": catalog_file_id, "kind": kind, "data": item} for item in items],
+    )
+
+
+def _resultado_legado(db: Session, catalog_file_id: int) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+    """Resultado completo guardado em ``result_summary`` (importações antigas).
+
+    Antes de ``catalog_import_result_items`` os itens ficavam no próprio JSON;
+    a migração ``b41c7e9a5d20`` os copia para a tabela, mas bancos criados
+    por ``create_all`` ainda podem ter o formato antigo.
+    """
+    record = db.get(CatalogImportFile, catalog_file_id)
+    resumo = (record.result_summary if record else None) or {}
+    if not any(isinstance(resumo.get(kind), list) for kind in CATALOG_IMPORT_RESULT_KINDS):
+        return None
+    return {kind: list(resumo.get(kind) or []) for kind in CATALOG_IMPORT_RESULT_KINDS}
+
+
+def get_catalog_import_results(
+    db: Session, catalog_file_id: int, kind: str, skip: int = 0, limit: int = 100
+) -> Tuple[List[Dict[str, Any]], int]:
+    """Uma página dos itens de resultado de ``kind`` e o total de itens."""
+    query = db.query(CatalogImportResultItem).filter(
+        CatalogImportResultItem.catalog_file_id == catalog_file_id,
+        CatalogImportResultItem.kind == kind,
+    )
+    total = query.count()
+    if not total:
+        legado = _resultado_legado(db, catalog_file_id)
+        if legado is not None:
+            return legado[kind][skip : skip + limit], len(legado[kind])
+    rows = (
+        query.with_entities(CatalogImportResultItem.data)
+        .order_by(CatalogImportResultItem.id)
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+    return [data for (data,) in rows], total
+
+
+def list_catalog_import_results(db: Session, catalog_file_id: int) -> Dict[str, List[Dict[str, Any]]]:
+    """Resultado completo da importação, no formato de ``CatalogImportResult``."""
+    result: Dict[str, List[Dict[str, Any]]] = {kind: [] for kind in CATALOG_IMPORT_RESULT_KINDS}
+    rows = (
+        db.query(CatalogImportResultItem.kind, CatalogImportResultItem.data)
+        .filter(CatalogImportResultItem.catalog_file_id == catalog_file_id)
+        .order_by(CatalogImportResultItem.id)
+        .all()
+    )
+    if not rows:
+        return _resultado_legado(db, catalog_file_id) or result
+    for kind, data in rows:
+        result[kind].append(data)
+    return result
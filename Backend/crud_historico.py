@@ -1,8 +1,9 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from Backend import models, schemas
+from Backend.services import keyset_pagination
 
 
 def create_registro_historico(db: Session, registro_in: schemas.RegistroHistoricoCreate) -> models.RegistroHistorico:
@@ -36,6 +37,33 @@ def get_registros_historico(
     )
 
 
+def get_registros_historico_cursor(
+    db: Session,
+    user_id: Optional[int] = None,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    entidade: Optional[str] = None,
+    acao: Optional[models.TipoAcaoSistemaEnum] = None,
+) -> Tuple[List[models.RegistroHistorico], Optional[str]]:
+    """Como ``get_registros_historico``, paginado por cursor sobre ``(created_at, id)``."""
+    query = db.query(models.RegistroHistorico)
+    if user_id is not None:
+        query = query.filter(models.RegistroHistorico.user_id == user_id)
+    if entidade:
+        query = query.filter(models.RegistroHistorico.entidade == entidade)
+    if acao:
+        query = query.filter(models.RegistroHistorico.acao == acao)
+    return keyset_pagination.paginar(
+        query,
+        models.RegistroHistorico.id,
+        limit,
+        cursor=cursor,
+        chave=models.RegistroHistorico.created_at,
+        descendente=True,
+        ordenacao="created_at:desc",
+    )
+
+
 def count_registros_historico(
     db: Session,
     user_id: Optional[int] = None,
@@ -11,7 +11,8 @@ from Backend import schemas
 logger = logging.getLogger(__name__)
 
 # --- ProductType CRUD ---
-def create_product_type(db: Session, product_type_create: schemas.ProductTypeCreate, user_id: Optional[int] = None) -> ProductType:
+def create_product_type(db: Session, product_type_create: schemas.ProductTypeCreate, user_id: Optional[int] = None, commit: bool = True) -> ProductType:
+    """Cria o tipo e seus atributos; com ``commit=False`` só faz o ``flush`` e o commit fica com quem chama."""
     logger.debug(f"CRUD (create_product_type): Recebido para user_id: {user_id}, key_name: {product_type_create.key_name}")
     
     # Verifica se já existe um tipo de produto com o mesmo key_name (global ou do usuário)
@@ -50,7 +51,10 @@ def create_product_type(db: Session, product_type_create: schemas.ProductTypeCre
                 product_type_id=db_product_type.id
             )
             db.add(db_attr_template)
-    
+
+    if not commit:
+        db.flush()
+        return db_product_type
     db.commit()
     db.refresh(db_product_type)
     # Para carregar os attribute_templates recém-criados na resposta
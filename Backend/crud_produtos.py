@@ -4,8 +4,12 @@ import uuid
 from pathlib import Path
 from typing import List, Optional, Dict, Any, Tuple, Set
 
-from sqlalchemy import func, or_, desc, asc
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import func, or_, desc, asc, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session, load_only, selectinload
+from sqlalchemy.sql.expression import ClauseElement, Executable
 
 from Backend.core.config import settings
 from Backend.models import (
@@ -17,14 +21,16 @@ from Backend.models import (
 )
 from fastapi import UploadFile
 from Backend import schemas
+from Backend.services import keyset_pagination, product_search, query_shapes
 
 logger = logging.getLogger(__name__)
 
 
 # --- Produto CRUD ---
 def create_produto(
-    db: Session, produto: schemas.ProdutoCreate, user_id: int
+    db: Session, produto: schemas.ProdutoCreate, user_id: int, commit: bool = True
 ) -> Produto:
+    """Cria o produto; com ``commit=False`` só faz o ``flush`` e o commit fica com quem chama."""
     produto_data = produto.model_dump(exclude_unset=True)
 
     # Assegura que campos JSON estejam como dicts
@@ -60,55 +66,65 @@ def create_produto(
 
     db_produto = Produto(**produto_data, user_id=user_id)
     db.add(db_produto)
+    if not commit:
+        db.flush()
+        return db_produto
     db.commit()
     db.refresh(db_produto)
     return db_produto
 
 
+_UPSERT_INSERTS = {"postgresql": postgresql_insert, "sqlite": sqlite_insert}
+
+
 def create_produtos_bulk(
-    db: Session, produtos: List[schemas.ProdutoCreate], user_id: int
+    db: Session,
+    produtos: List[schemas.ProdutoCreate],
+    user_id: int,
+    batch_size: Optional[int] = None,
 ) -> Tuple[List[Produto], List[Produto], List[Dict[str, Any]]]:
     """Cria ou atualiza múltiplos produtos em uma única transação.
 
     Produtos com SKU ou EAN já existentes para o mesmo usuário são atualizados
     e retornados na lista ``updated``. Linhas duplicadas na mesma importação são
     descartadas e registradas em ``errors``.
+
+    Em PostgreSQL e SQLite (com ``PRODUTOS_BULK_UPSERT`` ligado) as linhas são
+    gravadas em lotes de ``batch_size`` (padrão ``PRODUTOS_UPSERT_BATCH_SIZE``)
+    com ``INSERT ... ON CONFLICT ... RETURNING`` multi-linha e ``UPDATE`` por
+    chave primária; os produtos retornados são carregados depois com uma
+    consulta por lote, em vez de um ``refresh`` por produto. Outros bancos usam
+    o caminho ORM linha a linha.
     """
-    created_produtos: List[Produto] = []
-    updated_produtos: List[Produto] = []
+    batch_size = max(1, batch_size or settings.PRODUTOS_UPSERT_BATCH_SIZE)
+    dialeto = db.get_bind().dialect.name
+    if settings.PRODUTOS_BULK_UPSERT and dialeto in _UPSERT_INSERTS:
+        return _upsert_produtos_bulk(db, produtos, user_id, batch_size)
+    return _create_produtos_bulk_orm(db, produtos, user_id, batch_size)
+
+
+def _planejar_lote(
+    produtos: List[schemas.ProdutoCreate],
+    sku_map: Dict[str, Any],
+    ean_map: Dict[str, Any],
+    vistos_skus: Set[str],
+    vistos_eans: Set[str],
+) -> Tuple[List[Dict[str, Any]], List[Tuple[Any, Dict[str, Any]]], List[Dict[str, Any]]]:
+    """Separa o lote em novos, atualizações ``(existente, dados)`` e duplicados.
+
+    ``sku_map``/``ean_map`` apontam SKU e EAN para o produto existente (ou o
+    seu id); ``vistos_*`` acumulam as chaves já usadas na importação.
+    """
+    novos: List[Dict[str, Any]] = []
+    atualizacoes: List[Tuple[Any, Dict[str, Any]]] = []
     erros: List[Dict[str, Any]] = []
 
-    skus = [p.sku for p in produtos if p.sku]
-    eans = [p.ean for p in produtos if p.ean]
-    existing_skus: Set[str] = set()
-    existing_eans: Set[str] = set()
-    sku_map: Dict[str, Produto] = {}
-    ean_map: Dict[str, Produto] = {}
-
-    if skus or eans:
-        existing = (
-            db.query(Produto)
-            .filter(Produto.user_id == user_id)
-            .filter(or_(Produto.sku.in_(skus), Produto.ean.in_(eans)))
-            .all()
-        )
-        for p in existing:
-            if p.sku:
-                existing_skus.add(p.sku)
-                sku_map[p.sku] = p
-            if p.ean:
-                existing_eans.add(p.ean)
-                ean_map[p.ean] = p
-
-    new_skus: Set[str] = set()
-    new_eans: Set[str] = set()
-
     for produto_schema in produtos:
         data = produto_schema.model_dump(exclude_unset=True)
         sku = data.get("sku")
         ean = data.get("ean")
 
-        if sku and sku in new_skus or ean and ean in new_eans:
+        if sku and sku in vistos_skus or ean and ean in vistos_eans:
             erros.append(
                 {
                     "motivo_descarte": "Produto duplicado por SKU ou EAN",
@@ -118,34 +134,207 @@ def create_produtos_bulk(
             )
             continue
 
-        existing_prod = None
+        existente = None
         if sku and sku in sku_map:
-            existing_prod = sku_map[sku]
+            existente = sku_map[sku]
         elif ean and ean in ean_map:
-            existing_prod = ean_map[ean]
-
-        if existing_prod:
-            for key, value in data.items():
-                setattr(existing_prod, key, value)
-            updated_produtos.append(existing_prod)
-            if sku:
-                new_skus.add(sku)
-            if ean:
-                new_eans.add(ean)
+            existente = ean_map[ean]
+
+        if existente is not None:
+            atualizacoes.append((existente, data))
         else:
-            db_produto = Produto(**data, user_id=user_id)
-            db.add(db_produto)
-            created_produtos.append(db_produto)
-            if sku:
-                new_skus.add(sku)
-            if ean:
-                new_eans.add(ean)
+            novos.append(data)
+        if sku:
+            vistos_skus.add(sku)
+        if ean:
+            vistos_eans.add(ean)
+
+    return novos, atualizacoes, erros
+
+
+def _filtro_chaves(produtos: List[schemas.ProdutoCreate], user_id: int):
+    skus = [p.sku for p in produtos if p.sku]
+    eans = [p.ean for p in produtos if p.ean]
+    if not skus and not eans:
+        return None
+    return (Produto.user_id == user_id) & or_(Produto.sku.in_(skus), Produto.ean.in_(eans))
+
+
+def _create_produtos_bulk_orm(
+    db: Session, produtos: List[schemas.ProdutoCreate], user_id: int, batch_size: int
+) -> Tuple[List[Produto], List[Produto], List[Dict[str, Any]]]:
+    sku_map: Dict[str, Produto] = {}
+    ean_map: Dict[str, Produto] = {}
+    filtro = _filtro_chaves(produtos, user_id)
+    if filtro is not None:
+        for p in db.query(Produto).filter(filtro).all():
+            if p.sku:
+                sku_map[p.sku] = p
+            if p.ean:
+                ean_map[p.ean] = p
+
+    novos, atualizacoes, erros = _planejar_lote(produtos, sku_map, ean_map, set(), set())
+
+    updated_produtos: List[Produto] = []
+    for existing_prod, data in atualizacoes:
+        for key, value in data.items():
+            setattr(existing_prod, key, value)
+        updated_produtos.append(existing_prod)
+    created_produtos = [Produto(**data, user_id=user_id) for data in novos]
+    db.add_all(created_produtos)
+    db.flush()
+
+    created_ids = [p.id for p in created_produtos]
+    updated_ids = [p.id for p in updated_produtos]
+    db.commit()
+    return (
+        _carregar_produtos(db, created_ids, batch_size),
+        _carregar_produtos(db, updated_ids, batch_size),
+        erros,
+    )
+
+
+def _upsert_produtos_bulk(
+    db: Session, produtos: List[schemas.ProdutoCreate], user_id: int, batch_size: int
+) -> Tuple[List[Produto], List[Produto], List[Dict[str, Any]]]:
+    insert = _UPSERT_INSERTS[db.get_bind().dialect.name]
+    created_ids: List[int] = []
+    updated_ids: List[int] = []
+    erros: List[Dict[str, Any]] = []
+    vistos_skus: Set[str] = set()
+    vistos_eans: Set[str] = set()
+
+    for inicio in range(0, len(produtos), batch_size):
+        lote = produtos[inicio : inicio + batch_size]
+
+        sku_map: Dict[str, int] = {}
+        ean_map: Dict[str, int] = {}
+        filtro = _filtro_chaves(lote, user_id)
+        if filtro is not None:
+            for pid, sku, ean in db.query(Produto.id, Produto.sku, Produto.ean).filter(filtro):
+                if sku:
+                    sku_map[sku] = pid
+                if ean:
+                    ean_map[ean] = pid
+
+        novos, atualizacoes, erros_lote = _planejar_lote(
+            lote, sku_map, ean_map, vistos_skus, vistos_eans
+        )
+        erros.extend(erros_lote)
+
+        if atualizacoes:
+            # UPDATE por chave primária em executemany, agrupado por colunas.
+            db.execute(update(Produto), [{**data, "id": pid} for pid, data in atualizacoes])
+            updated_ids.extend(pid for pid, _ in atualizacoes)
+
+        # Um INSERT multi-linha por alvo de conflito e conjunto de colunas. O
+        # ON CONFLICT só dispara se outra transação gravou a mesma chave depois
+        # da consulta acima; nesse caso a linha vira uma atualização em vez de
+        # abortar o lote inteiro.
+        grupos: Dict[Tuple[Optional[str], Tuple[str, ...]], List[Dict[str, Any]]] = {}
+        for data in novos:
+            alvo = "sku" if data.get("sku") else "ean" if data.get("ean") else None
+            grupos.setdefault((alvo, tuple(sorted(data))), []).append(data)
+
+        for (alvo, colunas), linhas in grupos.items():
+            stmt = insert(Produto)
+            if alvo:
+                set_ = {c: stmt.excluded[c] for c in colunas if c != alvo}
+                set_["updated_at"] = func.now()
+                stmt = stmt.on_conflict_do_update(index_elements=["user_id", alvo], set_=set_)
+            # Com uma lista de parâmetros o SQLAlchemy monta o VALUES
+            # multi-linha ("insertmanyvalues") a partir de um statement
+            # compilado uma única vez e cacheado.
+            resultado = db.execute(
+                stmt.returning(Produto.id),
+                [{**data, "user_id": user_id} for data in linhas],
+                execution_options={"insertmanyvalues_page_size": batch_size},
+            )
+            created_ids.extend(resultado.scalars().all())
 
     db.commit()
-    for p in created_produtos + updated_produtos:
-        db.refresh(p)
+    return (
+        _carregar_produtos(db, created_ids, batch_size),
+        _carregar_produtos(db, updated_ids, batch_size),
+        erros,
+    )
+
+
+def _carregar_produtos(db: Session, ids: List[int], batch_size: int) -> List[Produto]:
+    """Carrega os produtos ``ids`` (na mesma ordem) com os relacionamentos da resposta."""
+    encontrados: Dict[int, Produto] = {}
+    for inicio in range(0, len(ids), batch_size):
+        consulta = (
+            db.query(Produto)
+            .options(
+                selectinload(Produto.fornecedor),
+                selectinload(Produto.product_type).selectinload(
+                    ProductType.attribute_templates
+                ),
+            )
+            .filter(Produto.id.in_(ids[inicio : inicio + batch_size]))
+        )
+        encontrados.update((p.id, p) for p in consulta)
+    return [encontrados[i] for i in ids if i in encontrados]
+
+
+def merge_produtos_duplicados(
+    db: Session, linhas: List[Dict[str, Any]], user_id: int
+) -> List[Optional[Dict[str, Any]]]:
+    """Aplica linhas duplicadas de uma importação aos produtos já existentes.
+
+    Cada linha atualiza o produto do usuário com o mesmo SKU (ou, sem SKU, o
+    mesmo EAN). Os produtos são buscados numa única consulta, as alterações
+    gravadas num único ``flush`` (o commit fica com quem chama) e o
+    ``before``/``after`` de cada linha é calculado em memória, no formato de
+    ``ProdutoResponse``. Retorna, na ordem de ``linhas``, ``{"before",
+    "after"}`` ou ``None`` quando não há produto para a linha.
+    """
+    skus = {linha["sku"] for linha in linhas if linha.get("sku")}
+    eans = {linha["ean"] for linha in linhas if not linha.get("sku") and linha.get("ean")}
+    if not skus and not eans:
+        return [None] * len(linhas)
+
+    sku_map: Dict[str, Produto] = {}
+    ean_map: Dict[str, Produto] = {}
+    consulta = (
+        db.query(Produto)
+        .options(
+            selectinload(Produto.fornecedor),
+            selectinload(Produto.product_type).selectinload(
+                ProductType.attribute_templates
+            ),
+        )
+        .filter(Produto.user_id == user_id)
+        .filter(or_(Produto.sku.in_(skus), Produto.ean.in_(eans)))
+    )
+    for p in consulta:
+        if p.sku in skus:
+            sku_map[p.sku] = p
+        if p.ean in eans:
+            ean_map[p.ean] = p
+
+    # Estado atual (JSON) de cada produto tocado: a segunda linha para o mesmo
+    # produto parte do ``after`` da primeira.
+    estados: Dict[int, Dict[str, Any]] = {}
+    resultados: List[Optional[Dict[str, Any]]] = []
+    for linha in linhas:
+        produto = sku_map.get(linha["sku"]) if linha.get("sku") else ean_map.get(linha.get("ean"))
+        if produto is None:
+            resultados.append(None)
+            continue
+        before = estados.get(produto.id)
+        if before is None:
+            before = schemas.ProdutoResponse.model_validate(produto).model_dump(mode="json")
+        update_schema = schemas.ProdutoUpdate(**linha)
+        for key, value in update_schema.model_dump(exclude_unset=True).items():
+            setattr(produto, key, value)
+        after = {**before, **update_schema.model_dump(mode="json", exclude_unset=True)}
+        estados[produto.id] = after
+        resultados.append({"before": before, "after": after})
 
-    return created_produtos, updated_produtos, erros
+    db.flush()
+    return resultados
 
 
 def get_produto(db: Session, produto_id: int) -> Optional[Produto]:
@@ -163,53 +352,16 @@ def get_produto(db: Session, produto_id: int) -> Optional[Produto]:
     )
 
 
-def get_produtos_by_user(
-    db: Session,
-    user_id: Optional[
-        int
-    ],  # Se None e is_admin=True, busca todos. Se user_id e is_admin=False, busca do usuário.
-    is_admin: bool,
-    skip: int = 0,
-    limit: int = 10,
-    sort_by: Optional[str] = None,
-    sort_order: Optional[str] = "asc",
-    search: Optional[str] = None,
+def _filtrar_produtos(
+    query,
     fornecedor_id: Optional[int] = None,
     product_type_id: Optional[int] = None,
-    categoria: Optional[str] = None,  # Adicionado
-    status_enriquecimento_web: Optional[StatusEnriquecimentoEnum] = None,  # Adicionado
-    status_titulo_ia: Optional[StatusGeracaoIAEnum] = None,  # Adicionado
-    status_descricao_ia: Optional[StatusGeracaoIAEnum] = None,  # Adicionado
-) -> List[Produto]:
-    query = db.query(Produto).options(
-        selectinload(Produto.fornecedor),
-        selectinload(
-            Produto.product_type
-        ),  # Carrega product_type, mas não seus atributos aqui para a lista
-    )
-
-    if not is_admin:
-        if (
-            user_id is None
-        ):  # Não deveria acontecer se não for admin e não tiver user_id
-            return []
-        query = query.filter(Produto.user_id == user_id)
-
-    if search:
-        search_term = f"%{search.lower()}%"
-        query = query.filter(
-            or_(
-                func.lower(Produto.nome_base).ilike(search_term),
-                func.lower(Produto.nome_chat_api).ilike(search_term),
-                func.lower(Produto.descricao_original).ilike(search_term),
-                func.lower(Produto.descricao_chat_api).ilike(search_term),
-                func.lower(Produto.sku).ilike(search_term),
-                func.lower(Produto.ean).ilike(search_term),
-                func.lower(Produto.marca).ilike(search_term),
-                func.lower(Produto.modelo).ilike(search_term),
-            )
-        )
-
+    categoria: Optional[str] = None,
+    status_enriquecimento_web: Optional[StatusEnriquecimentoEnum] = None,
+    status_titulo_ia: Optional[StatusGeracaoIAEnum] = None,
+    status_descricao_ia: Optional[StatusGeracaoIAEnum] = None,
+):
+    """Filtros da listagem de produtos além do usuário e da busca."""
     if fornecedor_id is not None:
         query = query.filter(Produto.fornecedor_id == fornecedor_id)
     if product_type_id is not None:
@@ -226,6 +378,73 @@ def get_produtos_by_user(
         query = query.filter(Produto.status_titulo_ia == status_titulo_ia)
     if status_descricao_ia:
         query = query.filter(Produto.status_descricao_ia == status_descricao_ia)
+    return query
+
+
+def _opcoes_listagem(resumo: bool) -> list:
+    """Carregamento da listagem: completa ou só as colunas de ``ProdutoResumoResponse``.
+
+    No resumo, descrições, JSONs (``dados_brutos_web``, logs,
+    ``dynamic_attributes``) e relacionamentos ficam fora do ``SELECT``.
+    """
+    if resumo:
+        return [load_only(*(getattr(Produto, campo) for campo in schemas.ProdutoResumoResponse.model_fields))]
+    return [selectinload(Produto.fornecedor), selectinload(Produto.product_type)]
+
+
+def _query_listagem_produtos(
+    db: Session,
+    user_id: Optional[int],
+    is_admin: bool,
+    sort_by: Optional[str] = None,
+    sort_order: Optional[str] = "asc",
+    search: Optional[str] = None,
+    fornecedor_id: Optional[int] = None,
+    product_type_id: Optional[int] = None,
+    categoria: Optional[str] = None,
+    status_enriquecimento_web: Optional[StatusEnriquecimentoEnum] = None,
+    status_titulo_ia: Optional[StatusGeracaoIAEnum] = None,
+    status_descricao_ia: Optional[StatusGeracaoIAEnum] = None,
+    resumo: bool = False,
+):
+    """Consulta filtrada e ordenada da listagem; ``None`` se não há o que listar."""
+    query_shapes.query_shapes.registrar(
+        query_shapes.forma_listagem(
+            not is_admin,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            search=search,
+            categoria=categoria,
+            fornecedor_id=fornecedor_id,
+            product_type_id=product_type_id,
+            status_enriquecimento_web=status_enriquecimento_web,
+            status_titulo_ia=status_titulo_ia,
+            status_descricao_ia=status_descricao_ia,
+        )
+    )
+    # Carrega product_type, mas não seus atributos aqui para a lista
+    query = db.query(Produto).options(*_opcoes_listagem(resumo))
+
+    if not is_admin:
+        if (
+            user_id is None
+        ):  # Não deveria acontecer se não for admin e não tiver user_id
+            return None
+        query = query.filter(Produto.user_id == user_id)
+
+    if search:
+        # Sem ordenação explícita, os mais relevantes vêm primeiro.
+        query = product_search.aplicar_busca(query, db, search, ordenar=not sort_by)
+
+    query = _filtrar_produtos(
+        query,
+        fornecedor_id=fornecedor_id,
+        product_type_id=product_type_id,
+        categoria=categoria,
+        status_enriquecimento_web=status_enriquecimento_web,
+        status_titulo_ia=status_titulo_ia,
+        status_descricao_ia=status_descricao_ia,
+    )
 
     if sort_by:
         column_to_sort = getattr(Produto, sort_by, None)
@@ -239,13 +458,83 @@ def get_produtos_by_user(
     else:
         query = query.order_by(Produto.id)  # Ordenação padrão
 
+    return query
+
+
+def get_produtos_by_user(
+    db: Session,
+    user_id: Optional[
+        int
+    ],  # Se None e is_admin=True, busca todos. Se user_id e is_admin=False, busca do usuário.
+    is_admin: bool,
+    skip: int = 0,
+    limit: int = 10,
+    sort_by: Optional[str] = None,
+    sort_order: Optional[str] = "asc",
+    search: Optional[str] = None,
+    fornecedor_id: Optional[int] = None,
+    product_type_id: Optional[int] = None,
+    categoria: Optional[str] = None,  # Adicionado
+    status_enriquecimento_web: Optional[StatusEnriquecimentoEnum] = None,  # Adicionado
+    status_titulo_ia: Optional[StatusGeracaoIAEnum] = None,  # Adicionado
+    status_descricao_ia: Optional[StatusGeracaoIAEnum] = None,  # Adicionado
+    resumo: bool = False,  # Só as colunas de ProdutoResumoResponse
+) -> List[Produto]:
+    query = _query_listagem_produtos(
+        db,
+        user_id=user_id,
+        is_admin=is_admin,
+        sort_by=sort_by,
+        sort_order=sort_order,
+        search=search,
+        fornecedor_id=fornecedor_id,
+        product_type_id=product_type_id,
+        categoria=categoria,
+        status_enriquecimento_web=status_enriquecimento_web,
+        status_titulo_ia=status_titulo_ia,
+        status_descricao_ia=status_descricao_ia,
+        resumo=resumo,
+    )
+    if query is None:
+        return []
     return query.offset(skip).limit(limit).all()
 
 
-def count_produtos_by_user(
+def get_produtos_by_user_com_total(
     db: Session,
     user_id: Optional[int],
     is_admin: bool,
+    skip: int = 0,
+    limit: int = 10,
+    **filtros: Any,
+) -> Tuple[List[Produto], Optional[int]]:
+    """Como ``get_produtos_by_user``, com o total no mesmo ``SELECT``.
+
+    O total vem de ``count(*) OVER ()``, calculado antes do ``LIMIT``. Se a
+    página vier vazia (``skip`` além do fim) o total é ``None``.
+    """
+    query = _query_listagem_produtos(db, user_id=user_id, is_admin=is_admin, **filtros)
+    if query is None:
+        return [], 0
+    linhas = (
+        query.add_columns(func.count(Produto.id).over().label("total_items"))
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+    if not linhas:
+        return [], None
+    return [linha[0] for linha in linhas], linhas[0][1]
+
+
+def get_produtos_by_user_cursor(
+    db: Session,
+    user_id: Optional[int],
+    is_admin: bool,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    sort_by: Optional[str] = None,
+    sort_order: Optional[str] = "asc",
     search: Optional[str] = None,
     fornecedor_id: Optional[int] = None,
     product_type_id: Optional[int] = None,
@@ -253,49 +542,174 @@ def count_produtos_by_user(
     status_enriquecimento_web: Optional[StatusEnriquecimentoEnum] = None,
     status_titulo_ia: Optional[StatusGeracaoIAEnum] = None,
     status_descricao_ia: Optional[StatusGeracaoIAEnum] = None,
-) -> int:
-    query = db.query(func.count(Produto.id))
+    resumo: bool = False,
+) -> Tuple[List[Produto], Optional[str]]:
+    """Página de ``get_produtos_by_user`` por cursor (keyset) em vez de offset.
+
+    Mesmos filtros e ordenações, com ``id`` como desempate. Retorna os produtos
+    e o cursor da próxima página (``None`` na última). Levanta
+    ``keyset_pagination.CursorInvalidoError`` para cursores inválidos.
+    """
+    query_shapes.query_shapes.registrar(
+        query_shapes.forma_listagem(
+            not is_admin,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            search=search,
+            categoria=categoria,
+            fornecedor_id=fornecedor_id,
+            product_type_id=product_type_id,
+            status_enriquecimento_web=status_enriquecimento_web,
+            status_titulo_ia=status_titulo_ia,
+            status_descricao_ia=status_descricao_ia,
+        )
+    )
+    query = db.query(Produto).options(*_opcoes_listagem(resumo))
 
     if not is_admin:
         if user_id is None:
-            return 0
+            return [], None
         query = query.filter(Produto.user_id == user_id)
 
+    chave = None
+    descendente = False
+    ordenacao = "id"
     if search:
-        search_term = f"%{search.lower()}%"
-        query = query.filter(
-            or_(
-                func.lower(Produto.nome_base).ilike(search_term),
-                func.lower(Produto.nome_chat_api).ilike(search_term),
-                func.lower(Produto.descricao_original).ilike(search_term),
-                func.lower(Produto.descricao_chat_api).ilike(search_term),
-                func.lower(Produto.sku).ilike(search_term),
-                func.lower(Produto.ean).ilike(search_term),
-                func.lower(Produto.marca).ilike(search_term),
-                func.lower(Produto.modelo).ilike(search_term),
-            )
-        )
-    if fornecedor_id is not None:
-        query = query.filter(Produto.fornecedor_id == fornecedor_id)
-    if product_type_id is not None:
-        query = query.filter(Produto.product_type_id == product_type_id)
-    if categoria:
-        query = query.filter(
-            func.lower(Produto.categoria_original).ilike(f"%{categoria.lower()}%")
-        )
-    if status_enriquecimento_web:
-        query = query.filter(
-            Produto.status_enriquecimento_web == status_enriquecimento_web
-        )
-    if status_titulo_ia:
-        query = query.filter(Produto.status_titulo_ia == status_titulo_ia)
-    if status_descricao_ia:
-        query = query.filter(Produto.status_descricao_ia == status_descricao_ia)
+        if sort_by:
+            query = query.filter(product_search.filtro_busca(db, search))
+        else:
+            # Sem ordenação explícita, os mais relevantes vêm primeiro.
+            query, chave = product_search.aplicar_busca_ranqueada(query, db, search)
+            if chave is not None:
+                descendente = True
+                ordenacao = "relevancia"
+
+    query = _filtrar_produtos(
+        query,
+        fornecedor_id=fornecedor_id,
+        product_type_id=product_type_id,
+        categoria=categoria,
+        status_enriquecimento_web=status_enriquecimento_web,
+        status_titulo_ia=status_titulo_ia,
+        status_descricao_ia=status_descricao_ia,
+    )
+
+    if sort_by and sort_by in Produto.__mapper__.columns:
+        descendente = (sort_order or "asc").lower() == "desc"
+        ordenacao = f"{sort_by}:{'desc' if descendente else 'asc'}"
+        if sort_by != "id":
+            chave = getattr(Produto, sort_by)
+
+    return keyset_pagination.paginar(
+        query,
+        Produto.id,
+        limit,
+        cursor=cursor,
+        chave=chave,
+        descendente=descendente,
+        ordenacao=ordenacao,
+        nulos=False if ordenacao == "relevancia" else None,
+        # Empates de relevância seguem o id crescente, como no modo offset.
+        id_descendente=False if ordenacao == "relevancia" else None,
+    )
 
-    count = query.scalar()
+
+def _query_contagem_produtos(
+    db: Session,
+    user_id: Optional[int],
+    is_admin: bool,
+    search: Optional[str] = None,
+    fornecedor_id: Optional[int] = None,
+    product_type_id: Optional[int] = None,
+    categoria: Optional[str] = None,
+    status_enriquecimento_web: Optional[StatusEnriquecimentoEnum] = None,
+    status_titulo_ia: Optional[StatusGeracaoIAEnum] = None,
+    status_descricao_ia: Optional[StatusGeracaoIAEnum] = None,
+):
+    """``SELECT produtos.id`` com os filtros da listagem; ``None`` se não há o que contar."""
+    query = db.query(Produto.id)
+
+    if not is_admin:
+        if user_id is None:
+            return None
+        query = query.filter(Produto.user_id == user_id)
+
+    if search:
+        query = query.filter(product_search.filtro_busca(db, search))
+    return _filtrar_produtos(
+        query,
+        fornecedor_id=fornecedor_id,
+        product_type_id=product_type_id,
+        categoria=categoria,
+        status_enriquecimento_web=status_enriquecimento_web,
+        status_titulo_ia=status_titulo_ia,
+        status_descricao_ia=status_descricao_ia,
+    )
+
+
+def count_produtos_by_user(
+    db: Session,
+    user_id: Optional[int],
+    is_admin: bool,
+    search: Optional[str] = None,
+    fornecedor_id: Optional[int] = None,
+    product_type_id: Optional[int] = None,
+    categoria: Optional[str] = None,
+    status_enriquecimento_web: Optional[StatusEnriquecimentoEnum] = None,
+    status_titulo_ia: Optional[StatusGeracaoIAEnum] = None,
+    status_descricao_ia: Optional[StatusGeracaoIAEnum] = None,
+) -> int:
+    query = _query_contagem_produtos(
+        db,
+        user_id=user_id,
+        is_admin=is_admin,
+        search=search,
+        fornecedor_id=fornecedor_id,
+        product_type_id=product_type_id,
+        categoria=categoria,
+        status_enriquecimento_web=status_enriquecimento_web,
+        status_titulo_ia=status_titulo_ia,
+        status_descricao_ia=status_descricao_ia,
+    )
+    if query is None:
+        return 0
+    count = query.with_entities(func.count(Produto.id)).scalar()
     return count if count is not None else 0
 
 
+class _ExplainJson(Executable, ClauseElement):
+    """``EXPLAIN (FORMAT JSON) <select>`` com os parâmetros do próprio select."""
+
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(_ExplainJson, "postgresql")
+def _compilar_explain_json(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def estimate_produtos_by_user(db: Session, user_id: Optional[int], is_admin: bool, **filtros: Any) -> Optional[int]:
+    """Total estimado pelo planejador do PostgreSQL (``EXPLAIN``), sem contar.
+
+    Retorna ``None`` em outros bancos ou se o plano não trouxer a estimativa.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return None
+    query = _query_contagem_produtos(db, user_id=user_id, is_admin=is_admin, **filtros)
+    if query is None:
+        return 0
+    plano = db.execute(_ExplainJson(query.statement)).scalar()
+    if isinstance(plano, str):
+        plano = json.loads(plano)
+    try:
+        return int(plano[0]["Plan"]["Plan Rows"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
 def update_produto(
     db: Session, db_produto: Produto, produto_update: schemas.ProdutoUpdate
 ) -> Produto:
@@ -1,10 +1,11 @@
 from datetime import datetime
-from typing import List, Optional, Union
+from typing import List, Optional, Tuple, Union
 
 from sqlalchemy import func, cast, String
 from sqlalchemy.orm import Session
 
 from Backend import models, schemas
+from Backend.services import keyset_pagination
 
 
 def create_registro_uso_ia(db: Session, registro_uso: schemas.RegistroUsoIACreate) -> models.RegistroUsoIA:
@@ -45,6 +46,40 @@ def get_registros_uso_ia(
     )
 
 
+def get_registros_uso_ia_cursor(
+    db: Session,
+    user_id: int,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    tipo_acao: Optional[models.TipoAcaoEnum] = None,
+    data_inicio: Optional[datetime] = None,
+    data_fim: Optional[datetime] = None,
+) -> Tuple[List[models.RegistroUsoIA], Optional[str]]:
+    """Como ``get_registros_uso_ia``, paginado por cursor sobre ``(created_at, id)``."""
+    if isinstance(tipo_acao, str):
+        try:
+            tipo_acao = models.TipoAcaoEnum(tipo_acao)
+        except ValueError as exc:
+            raise ValueError(f"tipo_acao inválido: {tipo_acao}") from exc
+
+    query = db.query(models.RegistroUsoIA).filter(models.RegistroUsoIA.user_id == user_id)
+    if tipo_acao:
+        query = query.filter(models.RegistroUsoIA.tipo_acao == tipo_acao)
+    if data_inicio:
+        query = query.filter(models.RegistroUsoIA.created_at >= data_inicio)
+    if data_fim:
+        query = query.filter(models.RegistroUsoIA.created_at <= data_fim)
+    return keyset_pagination.paginar(
+        query,
+        models.RegistroUsoIA.id,
+        limit,
+        cursor=cursor,
+        chave=models.RegistroUsoIA.created_at,
+        descendente=True,
+        ordenacao="created_at:desc",
+    )
+
+
 def count_registros_uso_ia(
     db: Session,
     user_id: int,
@@ -19,6 +19,7 @@ from Backend import crud_produtos
 from Backend.auth import router as auth_router_direct
 from Backend.database import SessionLocal, engine, get_db
 from Backend.core.config import settings
+from Backend.services import audit_log, file_processing_service
 
 # Importa os routers da subpasta 'routers'
 from Backend.routers.produtos import router as produtos_router
@@ -32,6 +33,7 @@ from Backend.routers.password_recovery import router as password_recovery_router
 from Backend.routers.admin_analytics import router as admin_analytics_router
 from Backend.routers.social_auth import router as social_auth_router
 from Backend.routers.search import router as search_router
+from Backend.routers.jobs import router as jobs_router
 
 logger = get_logger(__name__)
 
@@ -95,6 +97,28 @@ static_files_path = Path(__file__).parent / "static"
 if not static_files_path.exists():
     static_files_path.mkdir(parents=True, exist_ok=True)
 
+
+
+class ImmutableStaticFiles(StaticFiles):
+    """Arquivos cujo nome deriva do conteúdo: o navegador pode guardá-los sem revalidar."""
+
+    async def get_response(self, path, scope):
+        response = await super().get_response(path, scope)
+        if response.status_code == 200:
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+
+# Miniaturas de preview de PDF (ver file_processing_service.THUMBNAIL_URL_PREFIX).
+# Precisa ser montado antes de "/static" para ter prioridade.
+# O diretório segue PREVIEW_DIRECTORY, o mesmo usado para gravar as miniaturas.
+thumbnails_path = file_processing_service.diretorio_miniaturas()
+thumbnails_path.mkdir(parents=True, exist_ok=True)
+app.mount(
+    file_processing_service.THUMBNAIL_URL_PREFIX,
+    ImmutableStaticFiles(directory=thumbnails_path),
+    name="preview_thumbnails",
+)
 app.mount("/static", StaticFiles(directory=static_files_path), name="static")
 
 
@@ -302,6 +326,21 @@ async def startup_event_create_defaults():
     logger.info("Evento de startup para defaults concluído.")
 
 
+@app.on_event("startup")
+async def startup_event_recuperar_outbox_historico():
+    # Histórico que ficou no outbox numa queda anterior do processo.
+    if settings.AUDIT_LOG_ASYNC and settings.AUDIT_OUTBOX_ENABLED:
+        movidos = audit_log.pipeline.recuperar_outbox(engine)
+        if movidos:
+            logger.info("Histórico: %s registros recuperados do outbox.", movidos)
+
+
+@app.on_event("shutdown")
+def shutdown_event_gravar_historico():
+    # Grava o histórico ainda na fila antes de o processo encerrar.
+    audit_log.pipeline.shutdown()
+
+
 @app.post("/api/v1/users/", response_model=schemas.UserResponse, status_code=status.HTTP_201_CREATED, tags=["Usuários"])
 def create_new_user(
     user_in: schemas.UserCreate,
@@ -352,6 +391,7 @@ app.include_router(product_types_router, prefix=settings.API_V1_STR, tags=["Tipo
 app.include_router(search_router, prefix=settings.API_V1_STR, tags=["Busca"])
 app.include_router(uso_ia_router, prefix=settings.API_V1_STR, tags=["Registro de Uso de IA"])
 app.include_router(historico_router, prefix=settings.API_V1_STR, tags=["Historico"])
+app.include_router(jobs_router, prefix=settings.API_V1_STR, tags=["Tarefas de Fundo"])
 app.include_router(password_recovery_router, prefix=settings.API_V1_STR, tags=["Recuperação de Senha"])
 app.include_router(admin_analytics_router, prefix=settings.API_V1_STR + "/admin/analytics", tags=["Analytics (Admin)"])
 
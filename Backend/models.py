@@ -13,6 +13,8 @@ from sqlalchemy import (
     JSON,
     Index,
     UniqueConstraint,
+    DDL,
+    event,
     func,
 )
 from sqlalchemy.orm import relationship, backref
@@ -183,6 +185,10 @@ class Plano(Base):
         Boolean, default=False
     )  # Se o plano permite acesso via API
     suporte_prioritario = Column(Boolean, default=False)
+    # Fila de tarefas: jobs simultâneos e peso no escalonamento justo
+    # (nulos usam os padrões JOB_TENANT_* da configuração)
+    limite_jobs_simultaneos = Column(Integer, nullable=True)
+    peso_fila = Column(Integer, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
@@ -439,11 +445,92 @@ class Produto(Base):
         Index("ix_produtos_user_id_nome_base", "user_id", "nome_base"),
         Index("ix_produtos_user_id_sku", "user_id", "sku", unique=False),
         Index("ix_produtos_user_id_ean", "user_id", "ean", unique=False),
+        # Filtros e ordenações da listagem (ver services/query_shapes.py): a
+        # chave termina em id para o ORDER BY padrão, o desempate e o cursor.
+        Index("ix_produtos_user_id_id", "user_id", "id"),
+        Index("ix_produtos_user_id_fornecedor_id_id", "user_id", "fornecedor_id", "id"),
+        Index("ix_produtos_user_id_product_type_id_id", "user_id", "product_type_id", "id"),
+        Index(
+            "ix_produtos_user_id_status_enriquecimento_web_id",
+            "user_id",
+            "status_enriquecimento_web",
+            "id",
+        ),
+        Index("ix_produtos_user_id_status_titulo_ia_id", "user_id", "status_titulo_ia", "id"),
+        Index("ix_produtos_user_id_status_descricao_ia_id", "user_id", "status_descricao_ia", "id"),
         UniqueConstraint("user_id", "sku", name="uq_produtos_user_sku"),
         UniqueConstraint("user_id", "ean", name="uq_produtos_user_ean"),
     )
 
 
+# Busca textual de produtos (ver Backend/services/product_search.py). As
+# migrações criam as mesmas estruturas em bancos existentes.
+_PRODUTOS_FTS_COLUNAS = (
+    "nome_base, nome_chat_api, descricao_original, descricao_chat_api, sku, ean, marca, modelo"
+)
+_PRODUTOS_FTS_NEW = ", ".join(f"new.{c.strip()}" for c in _PRODUTOS_FTS_COLUNAS.split(","))
+_PRODUTOS_FTS_OLD = ", ".join(f"old.{c.strip()}" for c in _PRODUTOS_FTS_COLUNAS.split(","))
+
+PRODUTOS_BUSCA_DDL_SQLITE = [
+    # FTS5 com conteúdo externo (a própria tabela produtos), sem acentos.
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS produtos_fts USING fts5({_PRODUTOS_FTS_COLUNAS}, "
+    "content='produtos', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS produtos_fts_ai AFTER INSERT ON produtos BEGIN "
+    f"INSERT INTO produtos_fts(rowid, {_PRODUTOS_FTS_COLUNAS}) VALUES (new.id, {_PRODUTOS_FTS_NEW}); END",
+    f"CREATE TRIGGER IF NOT EXISTS produtos_fts_ad AFTER DELETE ON produtos BEGIN "
+    f"INSERT INTO produtos_fts(produtos_fts, rowid, {_PRODUTOS_FTS_COLUNAS}) "
+    f"VALUES ('delete', old.id, {_PRODUTOS_FTS_OLD}); END",
+    f"CREATE TRIGGER IF NOT EXISTS produtos_fts_au AFTER UPDATE ON produtos BEGIN "
+    f"INSERT INTO produtos_fts(produtos_fts, rowid, {_PRODUTOS_FTS_COLUNAS}) "
+    f"VALUES ('delete', old.id, {_PRODUTOS_FTS_OLD}); "
+    f"INSERT INTO produtos_fts(rowid, {_PRODUTOS_FTS_COLUNAS}) VALUES (new.id, {_PRODUTOS_FTS_NEW}); END",
+]
+
+PRODUTOS_BUSCA_DDL_POSTGRESQL = [
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'portuguese_unaccent') THEN
+            CREATE TEXT SEARCH CONFIGURATION portuguese_unaccent (COPY = portuguese);
+            ALTER TEXT SEARCH CONFIGURATION portuguese_unaccent
+                ALTER MAPPING FOR hword, hword_part, word WITH unaccent, portuguese_stem;
+        END IF;
+    END
+    $$
+    """,
+    # Nomes pesam mais que códigos/marca, que pesam mais que descrições.
+    """
+    ALTER TABLE produtos ADD COLUMN IF NOT EXISTS busca_tsv tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('portuguese_unaccent',
+            coalesce(nome_base, '') || ' ' || coalesce(nome_chat_api, '')), 'A') ||
+        setweight(to_tsvector('portuguese_unaccent',
+            coalesce(sku, '') || ' ' || coalesce(ean, '') || ' ' ||
+            coalesce(marca, '') || ' ' || coalesce(modelo, '')), 'B') ||
+        setweight(to_tsvector('portuguese_unaccent',
+            coalesce(descricao_original, '') || ' ' || coalesce(descricao_chat_api, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_produtos_busca_tsv ON produtos USING gin (busca_tsv)",
+    # Trechos no meio do nome e códigos parciais (ILIKE '%x%').
+    "CREATE INDEX IF NOT EXISTS ix_produtos_nome_base_trgm ON produtos USING gin (nome_base gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_produtos_sku_trgm ON produtos USING gin (sku gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_produtos_ean_trgm ON produtos USING gin (ean gin_trgm_ops)",
+]
+
+for _ddl in PRODUTOS_BUSCA_DDL_SQLITE:
+    event.listen(Produto.__table__, "after_create", DDL(_ddl).execute_if(dialect="sqlite"))
+for _ddl in PRODUTOS_BUSCA_DDL_POSTGRESQL:
+    event.listen(Produto.__table__, "after_create", DDL(_ddl).execute_if(dialect="postgresql"))
+# O índice FTS5 não é removido junto com a tabela de conteúdo.
+event.listen(
+    Produto.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS produtos_fts").execute_if(dialect="sqlite"),
+)
+
+
 # Modelo para Registro de Uso de IA
 class RegistroUsoIA(Base):
     __tablename__ = "registros_uso_ia"
@@ -498,6 +585,22 @@ class RegistroHistorico(Base):
     usuario = relationship("User", back_populates="historicos")
 
 
+class AuditOutbox(Base):
+    """Registro de histórico ainda não gravado em ``registros_historico``.
+
+    Usado quando ``AUDIT_OUTBOX_ENABLED`` está ligado: a requisição grava aqui
+    o ``RegistroHistoricoCreate`` serializado em ``payload`` e o flusher de
+    :mod:`Backend.services.audit_log` o move em lote para o histórico, inclusive
+    na subida seguinte caso o processo tenha caído antes.
+    """
+
+    __tablename__ = "audit_outbox"
+
+    id = Column(Integer, primary_key=True)
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
 class CatalogImportFile(Base):
     __tablename__ = "catalog_import_files"
 
@@ -511,9 +614,119 @@ class CatalogImportFile(Base):
     pages_processed = Column(Integer, nullable=False, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     result_summary = Column(MutableDict.as_mutable(JSON), nullable=True)
+    # Flags por página (texto, linhas de tabela, só imagem) usadas para
+    # escolher o extrator de cada página.
+    page_classes = Column(JSON, nullable=True)
+    # Job da fila que processa (ou processou por último) este arquivo.
+    background_job_id = Column(
+        Integer, ForeignKey("background_jobs.id", ondelete="SET NULL"), nullable=True
+    )
 
     user = relationship("User")
     fornecedor = relationship("Fornecedor")
+    background_job = relationship("BackgroundJob")
+    page_results = relationship(
+        "CatalogImportPageResult",
+        back_populates="catalog_file",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+    result_items = relationship(
+        "CatalogImportResultItem",
+        back_populates="catalog_file",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
+
+class CatalogImportPageResult(Base):
+    """Checkpoint do resultado de uma página de uma importação de catálogo.
+
+    Cada página extraída é gravada na mesma transação que atualiza
+    ``pages_processed``; ao retomar o job, as páginas já gravadas são puladas.
+    """
+
+    __tablename__ = "catalog_import_page_results"
+    __table_args__ = (
+        UniqueConstraint("catalog_file_id", "page_number", name="uq_catalog_import_page"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    catalog_file_id = Column(
+        Integer, ForeignKey("catalog_import_files.id", ondelete="CASCADE"), nullable=False
+    )
+    page_number = Column(Integer, nullable=False)
+    products = Column(JSON, nullable=False, default=list)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    catalog_file = relationship("CatalogImportFile", back_populates="page_results")
+
+
+class CatalogImportResultItem(Base):
+    """Item do resultado de uma importação de catálogo (append-only).
+
+    Cada produto criado/atualizado e cada linha com erro vira uma linha desta
+    tabela, gravada junto com o lote que a produziu, em vez de um único JSON
+    em ``CatalogImportFile.result_summary``. ``kind`` é ``created``,
+    ``updated`` ou ``errors``; a ordem de inserção (``id``) é a ordem da
+    importação.
+    """
+
+    __tablename__ = "catalog_import_result_items"
+    __table_args__ = (
+        Index("ix_catalog_import_result_items_file_kind", "catalog_file_id", "kind", "id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    catalog_file_id = Column(
+        Integer, ForeignKey("catalog_import_files.id", ondelete="CASCADE"), nullable=False
+    )
+    kind = Column(String, nullable=False)
+    data = Column(JSON, nullable=False)
+
+    catalog_file = relationship("CatalogImportFile", back_populates="result_items")
+
+
+class StatusJobEnum(str, enum.Enum):
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+
+
+class BackgroundJob(Base):
+    """Tarefa de fundo persistida na fila do banco (ver ``services/job_queue``).
+
+    Um worker reserva o job gravando ``locked_until`` (timeout de
+    visibilidade); se o worker morrer, o job volta a ficar visível quando o
+    prazo expira. Falhas são reagendadas em ``run_after`` com backoff
+    exponencial até ``max_attempts``.
+    """
+
+    __tablename__ = "background_jobs"
+    __table_args__ = (
+        Index("ix_background_jobs_claim", "queue", "status", "priority", "run_after"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    queue = Column(String, nullable=False, default="default")
+    task = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False, default=dict)
+    priority = Column(Integer, nullable=False, default=0, server_default="0")
+    status = Column(String, nullable=False, default=StatusJobEnum.QUEUED.value)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    max_attempts = Column(Integer, nullable=False, default=3, server_default="3")
+    run_after = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+    locked_by = Column(String, nullable=True)
+    last_error = Column(Text, nullable=True)
+    result = Column(JSON, nullable=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    user = relationship("User")
 
 
 class FornecedorImportJob(Base):
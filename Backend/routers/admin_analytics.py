@@ -13,6 +13,7 @@ from Backend import schemas
 from Backend.database import get_db
 from Backend.auth import get_current_active_user  # Importa a dependência correta
 from Backend.core.logging_config import get_logger
+from Backend.services.query_shapes import query_shapes
 
 router = APIRouter()
 
@@ -165,6 +166,40 @@ async def get_recent_activities(db: Session = Depends(get_db), limit: int = Quer
     return activities
 
 
+@router.get("/product-query-shapes", response_model=schemas.ProductQueryShapes,
+            dependencies=[Depends(get_current_active_admin_user)])
+async def get_product_query_shapes(min_fracao: float = Query(0.01, ge=0, le=1)):
+    """Formas de consulta da listagem de produtos vistas neste processo e os índices sugeridos."""
+    formas = query_shapes.formas()
+    indices = query_shapes.propor_indices(formas, min_fracao=min_fracao)
+    return schemas.ProductQueryShapes(
+        formas=[
+            schemas.ProductQueryShape(
+                por_usuario=forma.por_usuario,
+                filtros=dict(forma.igualdades),
+                busca=forma.busca,
+                categoria=forma.categoria,
+                ordenacao=forma.ordenacao,
+                descendente=forma.descendente,
+                total=total,
+            )
+            for forma, total in formas
+        ],
+        indices=[
+            schemas.ProductIndexProposal(
+                nome=indice.nome,
+                colunas=list(indice.colunas),
+                where=indice.where,
+                total_consultas=indice.total_consultas,
+                fracao=indice.fracao,
+                existente=indice.existente,
+                ddl=indice.ddl,
+            )
+            for indice in indices
+        ],
+    )
+
+
 @router.get("/recent-historico", response_model=List[schemas.RegistroHistoricoResponse],
             dependencies=[Depends(get_current_active_admin_user)])
 async def get_recent_historico(
@@ -10,9 +10,8 @@ from fastapi import (
     status,
     UploadFile,
     File,
-    BackgroundTasks,
 )
-from fastapi import APIRouter, Depends, HTTPException, Query, status, UploadFile, File, BackgroundTasks, Body
+from fastapi import APIRouter, Depends, HTTPException, Query, status, UploadFile, File, Body
 from sqlalchemy.orm import Session
 from pathlib import Path
 import logging
@@ -26,13 +25,12 @@ from Backend import crud_produtos
 from Backend import crud_fornecedor_import_jobs
 from Backend import models
 from Backend import schemas
-from Backend import crud_historico
 from Backend import database
-from Backend.services import file_processing_service
+from Backend.services import audit_log, file_processing_service, job_queue
 from . import auth_utils  # Para obter o usuário
 from Backend.core.config import settings
 from . import auth_utils  # Para obter o usuário
-from Backend.routers.produtos import _tarefa_processar_catalogo
+from Backend.routers.produtos import _enfileirar_processamento_catalogo
 from pathlib import Path
 from . import auth_utils # Para obter o usuário 
 
@@ -71,9 +69,9 @@ def create_user_fornecedor(
 
     try:
         db_forn = crud_fornecedores.create_fornecedor(
-            db=db, fornecedor=fornecedor, user_id=current_user.id
+            db=db, fornecedor=fornecedor, user_id=current_user.id, commit=False
         )
-        crud_historico.create_registro_historico(
+        audit_log.registrar(
             db,
             schemas.RegistroHistoricoCreate(
                 user_id=current_user.id,
@@ -82,6 +80,8 @@ def create_user_fornecedor(
                 entity_id=db_forn.id,
             ),
         )
+        db.commit()
+        db.refresh(db_forn)
         return db_forn
     except HTTPException as e:  # Repassa HTTPExceptions do CRUD (ex: nome duplicado)
         logger.warning(f"HTTPException ao criar fornecedor: {e.detail}")
@@ -197,19 +197,18 @@ def update_fornecedor_endpoint(
             )
 
     try:
-        updated = crud_fornecedores.update_fornecedor(
-            db=db, db_fornecedor=db_fornecedor, fornecedor_update=fornecedor_update
-        )
-        crud_historico.create_registro_historico(
+        audit_log.registrar(
             db,
             schemas.RegistroHistoricoCreate(
                 user_id=current_user.id,
                 entidade="Fornecedor",
                 acao=models.TipoAcaoSistemaEnum.ATUALIZACAO,
-                entity_id=updated.id,
+                entity_id=db_fornecedor.id,
             ),
         )
-        return updated
+        return crud_fornecedores.update_fornecedor(
+            db=db, db_fornecedor=db_fornecedor, fornecedor_update=fornecedor_update
+        )
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -347,7 +346,11 @@ def get_import_progress(
     db: Session = Depends(database.get_db),
     current_user: models.User = Depends(auth_utils.get_current_active_user),
 ):
-    """Retorna o status e o progresso da importação de catálogo."""
+    """Retorna o status e o progresso da importação de catálogo.
+
+    ``background_job`` traz o estado do job da fila (tentativas, último erro);
+    o detalhe completo está em ``GET /jobs/{id}``.
+    """
     record = (
         db.query(models.CatalogImportFile)
         .filter_by(id=job_id, user_id=current_user.id)
@@ -356,14 +359,55 @@ def get_import_progress(
     if not record:
         raise HTTPException(status_code=404, detail="Importação não encontrada")
 
+    background_job = record.background_job
     return {
         "status": record.status,
         "progress": record.pages_processed,
         "total_pages": record.total_pages or 0,
+        "background_job": (
+            {
+                "id": background_job.id,
+                "status": background_job.status,
+                "attempts": background_job.attempts,
+                "last_error": background_job.last_error,
+            }
+            if background_job
+            else None
+        ),
+    }
+@router.get("/import/products/{job_id}", response_model=schemas.CatalogImportProductPage)
+def get_import_products(
+    job_id: int,
+    skip: int = Query(0, ge=0, description="Número de produtos para pular"),
+    limit: int = Query(100, ge=1, le=1000, description="Número máximo de produtos por página"),
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(auth_utils.get_current_active_user),
+):
+    """Produtos extraídos pela importação de PDF, paginados.
+
+    Lidos dos checkpoints por página, então as páginas já processadas aparecem
+    também durante a importação.
+    """
+    record = (
+        db.query(models.CatalogImportFile)
+        .filter_by(id=job_id, user_id=current_user.id)
+        .first()
+    )
+    if not record:
+        raise HTTPException(status_code=404, detail="Importação não encontrada")
+    items, total_items = crud_fornecedores.get_catalog_import_products(
+        db, record.id, skip=skip, limit=limit
+    )
+    return {
+        "items": items,
+        "total_items": total_items,
+        "page": skip // limit + 1,
+        "limit": limit,
     }
+
+
 @router.post("/import/process-full-catalog", status_code=status.HTTP_202_ACCEPTED)
 async def process_full_catalog(
-    background_tasks: BackgroundTasks,
     file_id: int = Body(..., embed=True),
     fornecedor_id: int = Body(..., embed=True),
     tipo_produto_id: int = Body(..., embed=True),
@@ -415,14 +459,9 @@ async def process_full_catalog(
     db.commit()
     db.refresh(job)
 
-    from sqlalchemy.orm import sessionmaker
-
-    db_session_factory = sessionmaker(bind=db.get_bind())
-
-    background_tasks.add_task(
-        _tarefa_processar_catalogo,
-        db_session_factory=db_session_factory,
-        file_id=job.id,
+    background_job = _enfileirar_processamento_catalogo(
+        db,
+        job,
         user_id=current_user.id,
         product_type_id=tipo_produto_id,
         fornecedor_id=fornecedor_id,
@@ -430,7 +469,93 @@ async def process_full_catalog(
         pages=pages,
     )
 
-    return {"job_id": job.id, "status": "PROCESSING"}
+    return {"job_id": job.id, "status": "PROCESSING", "background_job_id": background_job.id}
+
+
+@job_queue.task("fornecedores.processar_pdf")
+async def _tarefa_processar_pdf(
+    db_session_factory,
+    job_id: int,
+    pdf_path: str,
+    start_page: int = 1,
+    mapping: Optional[dict] = None,
+):
+    """Executa :func:`process_pdf_job` pela fila.
+
+    Uma falha é propagada para que o job seja tentado de novo com backoff; a
+    nova tentativa pula as páginas já gravadas.
+    """
+    await file_processing_service.process_pdf_job(
+        job_id, pdf_path, start_page=start_page, mapping=mapping, reraise=True
+    )
+
+
+@router.post("/import/resume/{job_id}", status_code=status.HTTP_202_ACCEPTED)
+async def resume_import_job(
+    job_id: int,
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(auth_utils.get_current_active_user),
+):
+    """Retoma uma importação de PDF interrompida a partir da última página gravada.
+
+    As páginas que já têm resultado gravado não são processadas de novo; chamar
+    o endpoint para um job já concluído não tem efeito. Enquanto o job de fundo
+    da importação está na fila ou executando, responde ``409``.
+    """
+    record = (
+        db.query(models.CatalogImportFile)
+        .filter_by(id=job_id, user_id=current_user.id)
+        .first()
+    )
+    if not record:
+        raise HTTPException(status_code=404, detail="Importação não encontrada")
+    if record.status in ("PENDING_REVIEW", "IMPORTED"):
+        return {"job_id": record.id, "status": record.status, "resume_from": None}
+    ativo = record.background_job
+    if ativo is not None and ativo.status in (
+        models.StatusJobEnum.QUEUED.value,
+        models.StatusJobEnum.RUNNING.value,
+    ):
+        # Um segundo worker no mesmo arquivo disputaria os checkpoints e o resultado final.
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Importação já está em andamento (job de fundo {ativo.id}).",
+        )
+
+    file_path = Path(settings.UPLOAD_DIRECTORY) / "catalogs" / record.stored_filename
+    if not file_path.is_absolute():
+        file_path = Path(__file__).resolve().parent.parent / file_path
+    if not file_path.exists():
+        raise HTTPException(status_code=404, detail="Arquivo não encontrado")
+
+    params = record.result_summary or {}
+    start_page = params.get("start_page") or 1
+    concluidas = crud_fornecedores.get_catalog_import_checkpoints(db, record.id)
+    resume_from = start_page
+    while resume_from in concluidas:
+        resume_from += 1
+
+    background_job = job_queue.enqueue(
+        db,
+        "fornecedores.processar_pdf",
+        {
+            "job_id": record.id,
+            "pdf_path": str(file_path),
+            "start_page": start_page,
+            "mapping": params.get("mapping"),
+        },
+        queue="imports",
+        user_id=current_user.id,
+    )
+    record.background_job_id = background_job.id
+    db.commit()
+
+    return {
+        "job_id": record.id,
+        "status": "PROCESSING",
+        "resume_from": resume_from,
+        "background_job_id": background_job.id,
+    }
 
 
 @router.get("/import/extract-page-data", response_model=schemas.CatalogPreview)
@@ -486,19 +611,18 @@ def delete_fornecedor_endpoint(
         )
 
     try:
-        deleted = crud_fornecedores.delete_fornecedor(
-            db=db, db_fornecedor=db_fornecedor
-        )
-        crud_historico.create_registro_historico(
+        audit_log.registrar(
             db,
             schemas.RegistroHistoricoCreate(
                 user_id=current_user.id,
                 entidade="Fornecedor",
                 acao=models.TipoAcaoSistemaEnum.DELECAO,
-                entity_id=deleted.id,
+                entity_id=db_fornecedor.id,
             ),
         )
-        return deleted
+        return crud_fornecedores.delete_fornecedor(
+            db=db, db_fornecedor=db_fornecedor
+        )
     except HTTPException as e:  # Se o CRUD levantar HTTP 409 por produtos associados
         raise e
     except Exception as e:
@@ -508,6 +632,7 @@ def delete_fornecedor_endpoint(
         )
 
 
+@job_queue.task("fornecedores.commit_importacao")
 async def _commit_import_job_task(db_session_factory, job_id: int, user_id: int):
     db = db_session_factory()
     try:
@@ -540,7 +665,6 @@ def review_import_job(
 
 @router.post("/import/commit/{job_id}", status_code=status.HTTP_202_ACCEPTED)
 def commit_import_job(
-    background_tasks: BackgroundTasks,
     job_id: int,
     db: Session = Depends(database.get_db),
     current_user: models.User = Depends(auth_utils.get_current_active_user),
@@ -549,13 +673,11 @@ def commit_import_job(
     if not job or job.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="Job não encontrado")
 
-    from sqlalchemy.orm import sessionmaker
-
-    db_session_factory = sessionmaker(bind=db.get_bind())
-    background_tasks.add_task(
-        _commit_import_job_task,
-        db_session_factory=db_session_factory,
-        job_id=job_id,
+    background_job = job_queue.enqueue(
+        db,
+        "fornecedores.commit_importacao",
+        {"job_id": job_id, "user_id": current_user.id},
+        queue="imports",
         user_id=current_user.id,
     )
-    return {"status": "PROCESSING", "job_id": job_id}
+    return {"status": "PROCESSING", "job_id": job_id, "background_job_id": background_job.id}
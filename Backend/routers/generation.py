@@ -1,6 +1,6 @@
 # Backend/routers/generation.py
 
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any, Optional
 from datetime import datetime
@@ -11,8 +11,8 @@ from Backend import crud_users
 from Backend import crud_produtos
 from Backend import models
 from Backend import schemas
-from Backend.database import get_db, SessionLocal
-from Backend.services import ia_generation_service, limit_service
+from Backend.database import get_db
+from Backend.services import ia_generation_service, job_queue, limit_service
 from .auth_utils import get_current_active_user
 
 # Configuração do logger para este módulo
@@ -36,6 +36,9 @@ async def _tarefa_processar_geracao_e_registrar_uso(
     """
     Tarefa de fundo para executar a geração de conteúdo com IA,
     atualizar o produto e registrar o uso da IA no banco de dados.
+
+    Depois de gravar o status FALHA no produto a exceção é propagada, para
+    que o job da fila seja tentado de novo com backoff.
     """
     db: Optional[Session] = None
     db_produto: Optional[models.Produto] = None
@@ -123,6 +126,7 @@ async def _tarefa_processar_geracao_e_registrar_uso(
                 "log_processamento": log_erro_obj
             }
             crud_produtos.update_produto(db, db_produto=db_produto, produto_update=schemas.ProdutoUpdate(**update_data_falha_http))
+        raise
     except Exception as e:
         import traceback
         logger.error(f"Tarefa Background {log_entry_prefix}: Erro inesperado para produto {produto_id}: {traceback.format_exc()}")
@@ -134,6 +138,7 @@ async def _tarefa_processar_geracao_e_registrar_uso(
                 "log_processamento": log_erro_inesperado_obj
             }
             crud_produtos.update_produto(db, db_produto=db_produto, produto_update=schemas.ProdutoUpdate(**update_data_falha_critica))
+        raise
     finally:
         logger.info(
             f"Tarefa Background {log_entry_prefix}: Finalizando para produto ID: {produto_id}"
@@ -141,12 +146,60 @@ async def _tarefa_processar_geracao_e_registrar_uso(
         if db:
             db.close()
 
+# Função de ia_generation_service usada por (tipo de geração, provedor). O job
+# guarda só os nomes, já que o payload da fila precisa ser serializável.
+_FUNCOES_GERACAO = {
+    ("titulo", "openai"): "gerar_titulos_com_openai",
+    ("descricao", "openai"): "gerar_descricao_com_openai",
+    ("titulo", "gemini"): "gerar_titulos_com_gemini",
+    ("descricao", "gemini"): "gerar_descricao_com_gemini",
+}
+
+
+@job_queue.task("geracao.conteudo_ia")
+async def _job_geracao_conteudo_ia(
+    db_session_factory,
+    user_id: int,
+    produto_id: int,
+    tipo_geracao_principal: str,
+    provedor: str,
+    **kwargs_para_funcao_servico
+):
+    funcao = getattr(ia_generation_service, _FUNCOES_GERACAO[(tipo_geracao_principal, provedor)])
+    await _tarefa_processar_geracao_e_registrar_uso(
+        db_session_factory,
+        user_id=user_id,
+        produto_id=produto_id,
+        tipo_geracao_principal=tipo_geracao_principal,
+        funcao_geracao_ia_no_servico=funcao,
+        **kwargs_para_funcao_servico
+    )
+
+
+def _enfileirar_geracao(
+    db: Session, user_id: int, produto_id: int, tipo: str, provedor: str, **kwargs
+) -> models.BackgroundJob:
+    return job_queue.enqueue(
+        db,
+        "geracao.conteudo_ia",
+        {
+            "user_id": user_id,
+            "produto_id": produto_id,
+            "tipo_geracao_principal": tipo,
+            "provedor": provedor,
+            **kwargs,
+        },
+        queue="ia",
+        priority=job_queue.PRIORIDADE_ALTA,
+        user_id=user_id,
+    )
+
+
 # --- Endpoints Legados (OpenAI) ---
 
-@router.post("/titulos/openai/{produto_id}", response_model=schemas.Msg, status_code=status.HTTP_202_ACCEPTED, deprecated=True)
+@router.post("/titulos/openai/{produto_id}", response_model=schemas.JobEnqueuedMsg, status_code=status.HTTP_202_ACCEPTED, deprecated=True)
 async def agendar_geracao_novos_titulos_openai(
     produto_id: int,
-    background_tasks: BackgroundTasks,
     num_titulos: int = Query(3, ge=1, le=10),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(auth_utils.get_current_active_user)
@@ -158,21 +211,14 @@ async def agendar_geracao_novos_titulos_openai(
     if db_produto_check.user_id != current_user.id and not current_user.is_superuser:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Não autorizado")
     
-    background_tasks.add_task(
-        _tarefa_processar_geracao_e_registrar_uso,
-        db_session_factory=SessionLocal,
-        user_id=current_user.id,
-        produto_id=produto_id,
-        tipo_geracao_principal="titulo",
-        funcao_geracao_ia_no_servico=ia_generation_service.gerar_titulos_com_openai,
-        num_titulos=num_titulos
+    job = _enfileirar_geracao(
+        db, current_user.id, produto_id, "titulo", "openai", num_titulos=num_titulos
     )
-    return {"msg": f"Geração de títulos (OpenAI) para o produto ID {produto_id} agendada."}
+    return {"msg": f"Geração de títulos (OpenAI) para o produto ID {produto_id} agendada.", "background_job_id": job.id}
 
-@router.post("/descricao/openai/{produto_id}", response_model=schemas.Msg, status_code=status.HTTP_202_ACCEPTED, deprecated=True)
+@router.post("/descricao/openai/{produto_id}", response_model=schemas.JobEnqueuedMsg, status_code=status.HTTP_202_ACCEPTED, deprecated=True)
 async def agendar_geracao_nova_descricao_openai(
     produto_id: int,
-    background_tasks: BackgroundTasks,
     tamanho_palavras: int = Query(150, ge=50, le=500),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(auth_utils.get_current_active_user)
@@ -184,24 +230,17 @@ async def agendar_geracao_nova_descricao_openai(
     if db_produto_check.user_id != current_user.id and not current_user.is_superuser:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Não autorizado")
         
-    background_tasks.add_task(
-        _tarefa_processar_geracao_e_registrar_uso,
-        db_session_factory=SessionLocal,
-        user_id=current_user.id,
-        produto_id=produto_id,
-        tipo_geracao_principal="descricao",
-        funcao_geracao_ia_no_servico=ia_generation_service.gerar_descricao_com_openai,
-        tamanho_palavras=tamanho_palavras
+    job = _enfileirar_geracao(
+        db, current_user.id, produto_id, "descricao", "openai", tamanho_palavras=tamanho_palavras
     )
-    return {"msg": f"Geração de descrição (OpenAI) para o produto ID {produto_id} agendada."}
+    return {"msg": f"Geração de descrição (OpenAI) para o produto ID {produto_id} agendada.", "background_job_id": job.id}
 
 
 # --- NOVOS Endpoints para Gemini ---
 
-@router.post("/titulos/gemini/{produto_id}", response_model=schemas.Msg, status_code=status.HTTP_202_ACCEPTED)
+@router.post("/titulos/gemini/{produto_id}", response_model=schemas.JobEnqueuedMsg, status_code=status.HTTP_202_ACCEPTED)
 async def agendar_geracao_novos_titulos_gemini(
     produto_id: int,
-    background_tasks: BackgroundTasks,
     num_titulos: int = Query(3, ge=1, le=10),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(auth_utils.get_current_active_user)
@@ -218,21 +257,14 @@ async def agendar_geracao_novos_titulos_gemini(
     update_data_pendente = {"status_titulo_ia": models.StatusGeracaoIAEnum.PENDENTE}
     crud_produtos.update_produto(db, db_produto=db_produto_check, produto_update=schemas.ProdutoUpdate(**update_data_pendente))
     
-    background_tasks.add_task(
-        _tarefa_processar_geracao_e_registrar_uso,
-        db_session_factory=SessionLocal,
-        user_id=current_user.id,
-        produto_id=produto_id,
-        tipo_geracao_principal="titulo",
-        funcao_geracao_ia_no_servico=ia_generation_service.gerar_titulos_com_gemini,
-        num_titulos=num_titulos
+    job = _enfileirar_geracao(
+        db, current_user.id, produto_id, "titulo", "gemini", num_titulos=num_titulos
     )
-    return {"msg": f"Geração de títulos com Gemini para o produto ID {produto_id} foi agendada."}
+    return {"msg": f"Geração de títulos com Gemini para o produto ID {produto_id} foi agendada.", "background_job_id": job.id}
 
-@router.post("/descricao/gemini/{produto_id}", response_model=schemas.Msg, status_code=status.HTTP_202_ACCEPTED)
+@router.post("/descricao/gemini/{produto_id}", response_model=schemas.JobEnqueuedMsg, status_code=status.HTTP_202_ACCEPTED)
 async def agendar_geracao_nova_descricao_gemini(
     produto_id: int,
-    background_tasks: BackgroundTasks,
     tamanho_palavras: int = Query(150, ge=50, le=500),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(auth_utils.get_current_active_user)
@@ -249,16 +281,10 @@ async def agendar_geracao_nova_descricao_gemini(
     update_data_pendente = {"status_descricao_ia": models.StatusGeracaoIAEnum.PENDENTE}
     crud_produtos.update_produto(db, db_produto=db_produto_check, produto_update=schemas.ProdutoUpdate(**update_data_pendente))
 
-    background_tasks.add_task(
-        _tarefa_processar_geracao_e_registrar_uso,
-        db_session_factory=SessionLocal,
-        user_id=current_user.id,
-        produto_id=produto_id,
-        tipo_geracao_principal="descricao",
-        funcao_geracao_ia_no_servico=ia_generation_service.gerar_descricao_com_gemini,
-        tamanho_palavras=tamanho_palavras
+    job = _enfileirar_geracao(
+        db, current_user.id, produto_id, "descricao", "gemini", tamanho_palavras=tamanho_palavras
     )
-    return {"msg": f"Geração de descrição com Gemini para o produto ID {produto_id} foi agendada."}
+    return {"msg": f"Geração de descrição com Gemini para o produto ID {produto_id} foi agendada.", "background_job_id": job.id}
 
 # --- Endpoint Síncrono para Sugestões de Atributos com Gemini ---
 @router.post("/sugerir-atributos-gemini/{produto_id}", response_model=schemas.SugestoesAtributosResponse)
@@ -1,10 +1,11 @@
-from typing import List
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
 from Backend import crud_historico
 from Backend import database, models, schemas
+from Backend.services import keyset_pagination
 from . import auth_utils
 
 router = APIRouter(
@@ -19,9 +20,26 @@ def list_historico(
     db: Session = Depends(database.get_db),
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
+    pagination: Literal["offset", "cursor"] = Query("offset"),
+    cursor: Optional[str] = Query(None, description="next_cursor da página anterior"),
     current_user: models.User = Depends(auth_utils.get_current_active_user),
 ):
     user_id_filter = None if current_user.is_superuser else current_user.id
+    if pagination == "cursor" or cursor:
+        try:
+            items, next_cursor = crud_historico.get_registros_historico_cursor(
+                db, user_id=user_id_filter, limit=limit, cursor=cursor
+            )
+        except keyset_pagination.CursorInvalidoError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        total = crud_historico.count_registros_historico(db, user_id=user_id_filter)
+        return {
+            "items": items,
+            "total_items": total,
+            "page": None,
+            "limit": limit,
+            "next_cursor": next_cursor,
+        }
     items = crud_historico.get_registros_historico(
         db, user_id=user_id_filter, skip=skip, limit=limit
     )
@@ -0,0 +1,63 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from Backend import crud_background_jobs
+from Backend import database, models, schemas
+from Backend.core.config import settings
+from . import auth_utils
+
+router = APIRouter(
+    prefix="/jobs",
+    tags=["jobs"],
+    dependencies=[Depends(auth_utils.get_current_active_user)],
+)
+
+
+@router.get("/", response_model=schemas.BackgroundJobPage)
+def list_jobs(
+    status: Optional[models.StatusJobEnum] = Query(None),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(auth_utils.get_current_active_user),
+):
+    """Lista as tarefas de fundo do usuário, das mais recentes para as mais antigas."""
+    items, total = crud_background_jobs.get_jobs_by_user(
+        db,
+        current_user.id,
+        status=status.value if status else None,
+        skip=skip,
+        limit=limit,
+    )
+    page = skip // limit + 1
+    return {"items": items, "total_items": total, "page": page, "limit": limit}
+
+
+@router.get("/metrics", response_model=List[schemas.JobTenantMetrics])
+def get_job_metrics(
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(auth_utils.get_current_active_user),
+):
+    """Profundidade da fila e tempo de espera por usuário.
+
+    Superusuários veem todos os usuários; os demais, apenas os próprios jobs.
+    """
+    user_id_filter = None if current_user.is_superuser else current_user.id
+    return crud_background_jobs.get_queue_metrics(
+        db, user_id=user_id_filter, window_seconds=settings.JOB_METRICS_WINDOW_SECONDS
+    )
+
+
+@router.get("/{job_id}", response_model=schemas.BackgroundJobResponse)
+def get_job(
+    job_id: int,
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(auth_utils.get_current_active_user),
+):
+    """Status de uma tarefa de fundo (fila, tentativas, último erro e resultado)."""
+    job = crud_background_jobs.get_job(db, job_id)
+    if not job or (job.user_id != current_user.id and not current_user.is_superuser):
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    return job
@@ -8,7 +8,7 @@ from Backend import crud_product_types
 from Backend import models
 from Backend import schemas
 from Backend import database
-from Backend import crud_historico
+from Backend.services import audit_log
 from . import auth_utils
 from Backend.core.logging_config import get_logger
 
@@ -67,8 +67,8 @@ def create_product_type_endpoint(
         product_type_in.key_name,
         user_id_for_type,
     )
-    created = crud_product_types.create_product_type(db=db, product_type_create=product_type_in, user_id=user_id_for_type)
-    crud_historico.create_registro_historico(
+    created = crud_product_types.create_product_type(db=db, product_type_create=product_type_in, user_id=user_id_for_type, commit=False)
+    audit_log.registrar(
         db,
         schemas.RegistroHistoricoCreate(
             user_id=current_user.id,
@@ -77,6 +77,8 @@ def create_product_type_endpoint(
             entity_id=created.id,
         ),
     )
+    db.commit()
+    db.refresh(created)
     return created
 
 
@@ -246,16 +248,16 @@ def update_product_type_endpoint(
     if not db_product_type:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tipo de produto não encontrado.")
 
-    updated_type = crud_product_types.update_product_type(db=db, db_product_type=db_product_type, product_type_update=product_type_in)
-    crud_historico.create_registro_historico(
+    audit_log.registrar(
         db,
         schemas.RegistroHistoricoCreate(
             user_id=current_user.id,
             entidade="ProductType",
             acao=models.TipoAcaoSistemaEnum.ATUALIZACAO,
-            entity_id=updated_type.id,
+            entity_id=db_product_type.id,
         ),
     )
+    updated_type = crud_product_types.update_product_type(db=db, db_product_type=db_product_type, product_type_update=product_type_in)
 
     logger.info("ROUTER (update_product_type): Tipo de produto ID %s atualizado com sucesso.", type_id)
 
@@ -286,16 +288,16 @@ def delete_product_type_endpoint(
     if not db_product_type:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tipo de Produto não encontrado para deleção.")
 
-    deleted_type = crud_product_types.delete_product_type(db=db, db_product_type=db_product_type)
-    crud_historico.create_registro_historico(
+    audit_log.registrar(
         db,
         schemas.RegistroHistoricoCreate(
             user_id=current_user.id,
             entidade="ProductType",
             acao=models.TipoAcaoSistemaEnum.DELECAO,
-            entity_id=deleted_type.id,
+            entity_id=db_product_type.id,
         ),
     )
+    deleted_type = crud_product_types.delete_product_type(db=db, db_product_type=db_product_type)
 
     logger.info("ROUTER (delete_product_type): Tipo de produto ID %s deletado com sucesso.", type_id)
 
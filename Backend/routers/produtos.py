@@ -1,13 +1,12 @@
 # Backend/routers/produtos.py
 
-from typing import List, Optional, Union, Dict, Any
+from typing import List, Optional, Union, Dict, Any, Literal
 
 from fastapi import (
     APIRouter,
     Depends,
     HTTPException,
     Query,
-    BackgroundTasks,
     status,
     UploadFile,
     File,
@@ -26,14 +25,20 @@ from Backend import crud_produtos
 from Backend import crud_fornecedores
 from Backend import crud_product_types
 from Backend import crud
-from Backend import crud_historico
 from Backend import models
 from Backend import schemas  # schemas é importado
 from Backend import database
 from Backend.database import SessionLocal
 import logging
 import time
-from Backend.services import file_processing_service
+from Backend.services import (
+    audit_log,
+    audit_writer,
+    file_processing_service,
+    job_queue,
+    keyset_pagination,
+    product_count,
+)
 from . import auth_utils  # Para obter o usuário logado
 from Backend.core import (
     config,
@@ -49,6 +54,122 @@ router = APIRouter(
 logger = logging.getLogger(__name__)
 
 
+def _persistir_produtos_importados(
+    db: Session,
+    produtos_data: List[Dict[str, Any]],
+    catalog_file: models.CatalogImportFile,
+    user_id: int,
+    product_type_id: int,
+    contagem: Dict[str, int],
+) -> None:
+    """Grava um lote de produtos extraídos de um catálogo.
+
+    Os produtos criados/atualizados e as linhas descartadas ou duplicadas do
+    lote são acrescentados ao resultado da importação
+    (``catalog_import_result_items``) no mesmo commit do lote; ``contagem``
+    acumula o total de cada tipo.
+    """
+    erros: List[Dict[str, Any]] = []
+    created: List[models.Produto] = []
+    updated: List[Any] = []
+    _gravar_lote_importado(
+        db, produtos_data, catalog_file, user_id, product_type_id,
+        erros, created, updated,
+    )
+    resultado = {
+        "created": [
+            schemas.ProdutoResponse.model_validate(p).model_dump(mode="json")
+            for p in created
+        ],
+        "updated": [
+            p if isinstance(p, dict)
+            else schemas.ProdutoResponse.model_validate(p).model_dump(mode="json")
+            for p in updated
+        ],
+        "errors": erros,
+    }
+    for kind, items in resultado.items():
+        crud_fornecedores.append_catalog_import_results(db, catalog_file.id, kind, items)
+        contagem[kind] = contagem.get(kind, 0) + len(items)
+
+
+def _gravar_lote_importado(
+    db: Session,
+    produtos_data: List[Dict[str, Any]],
+    catalog_file: models.CatalogImportFile,
+    user_id: int,
+    product_type_id: int,
+    erros: List[Dict[str, Any]],
+    created: List[models.Produto],
+    updated: List[Any],
+) -> None:
+    produtos_create: List[schemas.ProdutoCreate] = []
+    for prod in produtos_data:
+        if isinstance(prod, dict) and (
+            prod.get("motivo_descarte")
+            or any(key.startswith("erro_processamento") for key in prod.keys())
+        ):
+            erros.append(prod)
+            continue
+        try:
+            produto_schema = schemas.ProdutoCreate(
+                nome_base=prod.get("nome_base")
+                or prod.get("sku_original")
+                or "Produto Importado",
+                sku=prod.get("sku_original"),
+                ean=prod.get("ean_original"),
+                descricao_original=prod.get("descricao_original"),
+                marca=prod.get("marca"),
+                categoria_original=prod.get("categoria_original"),
+                fornecedor_id=catalog_file.fornecedor_id,
+                product_type_id=product_type_id,
+            )
+            produtos_create.append(produto_schema)
+        except Exception as e:
+            erros.append({"motivo_descarte": f"Erro ao converter linha: {str(e)}", "linha_original": prod})
+
+    if not produtos_create:
+        return
+
+    page_created, page_updated, dup_errors = crud_produtos.create_produtos_bulk(
+        db, produtos_create, user_id=user_id
+    )
+    created.extend(page_created)
+    updated.extend(page_updated)
+    # Duplicados da página viram atualizações dos produtos existentes, com
+    # uma busca e um flush para a página inteira.
+    duplicados = [err for err in dup_errors if err.get("duplicado")]
+    mesclados = crud_produtos.merge_produtos_duplicados(
+        db, [err.get("linha_original", {}) for err in duplicados], user_id
+    )
+    diffs = iter(mesclados)
+    for err in dup_errors:
+        diff = next(diffs) if err.get("duplicado") else None
+        if diff is not None:
+            updated.append(diff)
+        else:
+            erros.append(err)
+    # Histórico e uso dos produtos criados vão num INSERT em lote por página.
+    with audit_writer.BufferedAuditWriter(db) as audit:
+        for db_produto in page_created:
+            audit.registrar_uso_ia(
+                schemas.RegistroUsoIACreate(
+                    user_id=user_id,
+                    produto_id=db_produto.id,
+                    tipo_acao=models.TipoAcaoEnum.CRIACAO_PRODUTO,
+                    creditos_consumidos=0,
+                )
+            )
+            audit.registrar_historico(
+                schemas.RegistroHistoricoCreate(
+                    user_id=user_id,
+                    entidade="Produto",
+                    acao=models.TipoAcaoSistemaEnum.CRIACAO,
+                    entity_id=db_produto.id,
+                )
+            )
+
+
 async def _tarefa_processar_catalogo(
     db_session_factory,
     file_id: int,
@@ -57,8 +178,13 @@ async def _tarefa_processar_catalogo(
     fornecedor_id: int,
     mapping: Optional[Dict[str, str]] = None,
     pages: Optional[List[int]] = None,
+    reraise: bool = False,
 ):
-    """Processa o arquivo salvo em background e cria os produtos."""
+    """Processa o arquivo salvo em background e cria os produtos.
+
+    Com ``reraise`` a exceção é propagada depois de marcar o arquivo como
+    ``FAILED``.
+    """
     db: Optional[Session] = None
     try:
         db = db_session_factory()
@@ -77,224 +203,94 @@ async def _tarefa_processar_catalogo(
             catalog_file.status = "FAILED"
             db.commit()
             return
-        content = file_path.read_bytes()
         ext = file_path.suffix.lower()
-        erros: List[Dict[str, Any]] = []
-        produtos_create: List[schemas.ProdutoCreate] = []
-        created: List[models.Produto] = []
-        updated: List[models.Produto] = []
+        # O resultado é gravado em ``catalog_import_result_items`` lote a lote;
+        # ``result_summary`` guarda apenas as contagens.
+        crud_fornecedores.clear_catalog_import_results(db, catalog_file.id)
+        contagem: Dict[str, int] = {kind: 0 for kind in crud_fornecedores.CATALOG_IMPORT_RESULT_KINDS}
         if ext == ".pdf":
-            import pdfplumber, io
-            with pdfplumber.open(io.BytesIO(content)) as pdf:
-                total = len(pages) if pages else len(pdf.pages)
-            catalog_file.total_pages = total
-            catalog_file.pages_processed = 0
-            db.commit()
-            page_list = pages or list(range(1, total + 1))
-            for page in page_list:
-                produtos_data = await file_processing_service.processar_arquivo_pdf(
-                    content,
+            # O PDF é parseado uma única vez e reaproveitado em todas as páginas.
+            # Com PDF_EXTRACTION_WORKERS > 0 as páginas são extraídas em
+            # processos separados e entregues aqui, em ordem, conforme ficam prontas.
+            with file_processing_service.PdfDocumentSession(str(file_path)) as pdf_session:
+                num_pages = pdf_session.num_pages
+                if pages:
+                    page_list = sorted(p for p in set(pages) if 1 <= p <= num_pages)
+                else:
+                    page_list = list(range(1, num_pages + 1))
+                catalog_file.total_pages = len(page_list)
+                catalog_file.pages_processed = 0
+                # Classificação rápida das páginas: as escaneadas não passam
+                # pelo pdfplumber e as sem linhas não passam pela busca de tabelas.
+                catalog_file.page_classes = await file_processing_service.executar_em_parser(
+                    file_processing_service.classificar_paginas_pdf, str(file_path), page_list
+                )
+                db.commit()
+                engine = file_processing_service.PdfPageExtractionEngine()
+                async for resultado in engine.iter_pages(
+                    str(file_path),
+                    page_list,
+                    session=pdf_session,
                     mapeamento_colunas_usuario=mapping,
                     product_type_id=product_type_id,
-                    pages=[page],
-                )
-
-                for prod in produtos_data:
-                    if isinstance(prod, dict) and (
-                        prod.get("motivo_descarte")
-                        or any(key.startswith("erro_processamento") for key in prod.keys())
-                    ):
-                        erros.append(prod)
-                        continue
-                    try:
-                        produto_schema = schemas.ProdutoCreate(
-                            nome_base=prod.get("nome_base")
-                            or prod.get("sku_original")
-                            or "Produto Importado",
-                            sku=prod.get("sku_original"),
-                            ean=prod.get("ean_original"),
-                            descricao_original=prod.get("descricao_original"),
-                            marca=prod.get("marca"),
-                            categoria_original=prod.get("categoria_original"),
-                            fornecedor_id=catalog_file.fornecedor_id,
-                            product_type_id=product_type_id,
-                        )
-                        produtos_create.append(produto_schema)
-                    except Exception as e:
-                        erros.append({"motivo_descarte": f"Erro ao converter linha: {str(e)}", "linha_original": prod})
-
-                if produtos_create:
-                    page_created, page_updated, dup_errors = crud_produtos.create_produtos_bulk(
-                        db, produtos_create, user_id=user_id
-                    )
-                    erros.extend(dup_errors)
-                    created.extend(page_created)
-                    updated.extend(page_updated)
-                    for err in dup_errors:
-                        if err.get("duplicado"):
-                            linha = err.get("linha_original", {})
-                            sku = linha.get("sku")
-                            ean = linha.get("ean")
-                            query = db.query(models.Produto).filter(models.Produto.user_id == user_id)
-                            if sku:
-                                query = query.filter(models.Produto.sku == sku)
-                            elif ean:
-                                query = query.filter(models.Produto.ean == ean)
-                            existing = query.first()
-                            if existing:
-                                before = schemas.ProdutoResponse.model_validate(existing).model_dump()
-                                update_schema = schemas.ProdutoUpdate(**linha)
-                                updated_prod = crud_produtos.update_produto(db, existing, update_schema)
-                                after = schemas.ProdutoResponse.model_validate(updated_prod).model_dump()
-                                updated.append({"before": before, "after": after})
-                                continue
-                        erros.append(err)
-                for db_produto in page_created:
-                    crud.create_registro_uso_ia(
-                        db,
-                        schemas.RegistroUsoIACreate(
-                            user_id=user_id,
-                            produto_id=db_produto.id,
-                            tipo_acao=models.TipoAcaoEnum.CRIACAO_PRODUTO,
-                            creditos_consumidos=0,
-                        ),
+                    classes_paginas={c["page"]: c for c in catalog_file.page_classes},
+                ):
+                    produtos_data = await file_processing_service.montar_produtos_pdf(
+                        [resultado], product_type_id=product_type_id
                     )
-                    crud_historico.create_registro_historico(
-                        db,
-                        schemas.RegistroHistoricoCreate(
-                            user_id=user_id,
-                            entidade="Produto",
-                            acao=models.TipoAcaoSistemaEnum.CRIACAO,
-                            entity_id=db_produto.id,
-                        ),
+                    _persistir_produtos_importados(
+                        db, produtos_data, catalog_file, user_id, product_type_id, contagem
                     )
-                    produtos_create = []
-                catalog_file.pages_processed += 1
-                db.commit()
-        else:
+                    catalog_file.pages_processed += 1
+                    db.commit()
+        elif ext in [".csv", ".xlsx", ".xls"]:
+            # CSVs e planilhas são lidos em streaming direto do disco e gravados
+            # em lotes, sem carregar o arquivo inteiro na memória.
             catalog_file.total_pages = 1
             catalog_file.pages_processed = 0
             db.commit()
-            if ext in [".xlsx", ".xls"]:
-                produtos_data = await file_processing_service.processar_arquivo_excel(
-                    content,
+            if ext == ".csv":
+                tipo_arquivo = "CSV"
+                lotes = file_processing_service.iterar_lotes_csv(
+                    file_path,
                     mapeamento_colunas_usuario=mapping,
                     product_type_id=product_type_id,
                 )
-            elif ext == ".csv":
-                produtos_data = await file_processing_service.processar_arquivo_csv(
-                    content,
+            else:
+                tipo_arquivo = "Excel"
+                lotes = file_processing_service.iterar_lotes_excel(
+                    file_path,
                     mapeamento_colunas_usuario=mapping,
                     product_type_id=product_type_id,
                 )
-            else:
-                catalog_file.status = "FAILED"
-                db.commit()
-                return
-            for prod in produtos_data:
-                if isinstance(prod, dict) and (
-                    prod.get("motivo_descarte")
-                    or any(key.startswith("erro_processamento") for key in prod.keys())
-                ):
-                    erros.append(prod)
-                    continue
-                try:
-                    produto_schema = schemas.ProdutoCreate(
-                        nome_base=prod.get("nome_base")
-                        or prod.get("sku_original")
-                        or "Produto Importado",
-                        sku=prod.get("sku_original"),
-                        ean=prod.get("ean_original"),
-                        descricao_original=prod.get("descricao_original"),
-                        marca=prod.get("marca"),
-                        categoria_original=prod.get("categoria_original"),
-                        fornecedor_id=catalog_file.fornecedor_id,
-                        product_type_id=product_type_id,
+            try:
+                async for produtos_data in file_processing_service.iterar_em_parser(lotes):
+                    _persistir_produtos_importados(
+                        db, produtos_data, catalog_file, user_id, product_type_id, contagem
                     )
-                    produtos_create.append(produto_schema)
-                except Exception as e:
-                    erros.append({"motivo_descarte": f"Erro ao converter linha: {str(e)}", "linha_original": prod})
-            if produtos_create:
-                created_page, updated_page, dup_errors = crud_produtos.create_produtos_bulk(
-                    db, produtos_create, user_id=user_id
+                    db.commit()
+            except Exception as e:
+                logger.error("Erro ao processar arquivo %s: %s", tipo_arquivo, e)
+                crud_fornecedores.append_catalog_import_results(
+                    db,
+                    catalog_file.id,
+                    "errors",
+                    [
+                        {
+                            f"erro_processamento_{tipo_arquivo.lower()}": f"Falha ao ler arquivo {tipo_arquivo}: {str(e)}"
+                        }
+                    ],
                 )
-                erros.extend(dup_errors)
-                created.extend(created_page)
-                updated.extend(updated_page)
-                for err in dup_errors:
-                        if err.get("duplicado"):
-                            linha = err.get("linha_original", {})
-                            sku = linha.get("sku")
-                            ean = linha.get("ean")
-                            query = db.query(models.Produto).filter(models.Produto.user_id == user_id)
-                            if sku:
-                                query = query.filter(models.Produto.sku == sku)
-                            elif ean:
-                                query = query.filter(models.Produto.ean == ean)
-                            existing = query.first()
-                            if existing:
-                                before = schemas.ProdutoResponse.model_validate(existing).model_dump()
-                                update_schema = schemas.ProdutoUpdate(**linha)
-                                updated_prod = crud_produtos.update_produto(db, existing, update_schema)
-                                after = schemas.ProdutoResponse.model_validate(updated_prod).model_dump()
-                                updated.append({"before": before, "after": after})
-                                continue
-                        erros.append(err)
-                for db_produto in page_created:
-                    if err.get("duplicado"):
-                        linha = err.get("linha_original", {})
-                        sku = linha.get("sku")
-                        ean = linha.get("ean")
-                        query = db.query(models.Produto).filter(models.Produto.user_id == user_id)
-                        if sku:
-                            query = query.filter(models.Produto.sku == sku)
-                        elif ean:
-                            query = query.filter(models.Produto.ean == ean)
-                        existing = query.first()
-                        if existing:
-                            before = schemas.ProdutoResponse.model_validate(existing).model_dump()
-                            update_schema = schemas.ProdutoUpdate(**linha)
-                            updated_prod = crud_produtos.update_produto(db, existing, update_schema)
-                            after = schemas.ProdutoResponse.model_validate(updated_prod).model_dump()
-                            updated.append({"before": before, "after": after})
-                            continue
-                    erros.append(err)
-                for db_produto in created_page:
-                    crud.create_registro_uso_ia(
-                        db,
-                        schemas.RegistroUsoIACreate(
-                            user_id=user_id,
-                            produto_id=db_produto.id,
-                            tipo_acao=models.TipoAcaoEnum.CRIACAO_PRODUTO,
-                            creditos_consumidos=0,
-                        ),
-                    )
-                    crud_historico.create_registro_historico(
-                        db,
-                        schemas.RegistroHistoricoCreate(
-                            user_id=user_id,
-                            entidade="Produto",
-                            acao=models.TipoAcaoSistemaEnum.CRIACAO,
-                            entity_id=db_produto.id,
-                        ),
-                    )
-                catalog_file.pages_processed = catalog_file.total_pages
+                contagem["errors"] += 1
+            catalog_file.pages_processed = catalog_file.total_pages
             db.commit()
-
-        result_summary = {
-            "created": [
-                schemas.ProdutoResponse.model_validate(p).model_dump(mode="json")
-                for p in created
-            ],
-            "updated": [
-                schemas.ProdutoResponse.model_validate(p).model_dump(mode="json")
-                for p in updated
-            ],
-            "errors": erros,
-        }
+        else:
+            catalog_file.status = "FAILED"
+            db.commit()
+            return
 
         catalog_file.status = "IMPORTED"
-        catalog_file.result_summary = result_summary
+        catalog_file.result_summary = {"counts": contagem}
         db.add(catalog_file)
         db.commit()
     except Exception:
@@ -304,11 +300,51 @@ async def _tarefa_processar_catalogo(
             if catalog_file:
                 catalog_file.status = "FAILED"
                 db.commit()
+        if reraise:
+            raise
     finally:
         if db:
             db.close()
 
 
+@job_queue.task("catalogo.processar")
+async def _job_processar_catalogo(db_session_factory, **payload):
+    """Executa :func:`_tarefa_processar_catalogo` pela fila.
+
+    Uma falha é propagada para que o job seja tentado de novo com backoff.
+    """
+    await _tarefa_processar_catalogo(db_session_factory, reraise=True, **payload)
+
+
+def _enfileirar_processamento_catalogo(
+    db: Session,
+    catalog_file: models.CatalogImportFile,
+    user_id: int,
+    product_type_id: int,
+    fornecedor_id: int,
+    mapping: Optional[Dict[str, str]] = None,
+    pages: Optional[List[int]] = None,
+) -> models.BackgroundJob:
+    """Enfileira ``_tarefa_processar_catalogo`` e associa o job ao arquivo."""
+    job = job_queue.enqueue(
+        db,
+        "catalogo.processar",
+        {
+            "file_id": catalog_file.id,
+            "user_id": user_id,
+            "product_type_id": product_type_id,
+            "fornecedor_id": fornecedor_id,
+            "mapping": mapping,
+            "pages": pages,
+        },
+        queue="imports",
+        user_id=user_id,
+    )
+    catalog_file.background_job_id = job.id
+    db.commit()
+    return job
+
+
 @router.post(
     "/", response_model=schemas.ProdutoResponse, status_code=status.HTTP_201_CREATED
 )  # CORRIGIDO AQUI
@@ -348,8 +384,19 @@ def create_produto(  # Nome da função mantido como no arquivo do usuário
 
     # A função crud_produtos.create_produto (ou create_user_produto) lida com a lógica de criação
     # usando nome_base e nome_chat_api como definido nos schemas.
+    # O produto, o uso e o histórico são gravados no commit de
+    # create_registro_uso_ia, numa única transação.
     db_produto = crud_produtos.create_produto(
-        db=db, produto=produto, user_id=current_user.id
+        db=db, produto=produto, user_id=current_user.id, commit=False
+    )
+    audit_log.registrar(
+        db,
+        schemas.RegistroHistoricoCreate(
+            user_id=current_user.id,
+            entidade="Produto",
+            acao=models.TipoAcaoSistemaEnum.CRIACAO,
+            entity_id=db_produto.id,
+        ),
     )
     crud.create_registro_uso_ia(
         db,
@@ -360,15 +407,7 @@ def create_produto(  # Nome da função mantido como no arquivo do usuário
             creditos_consumidos=0,
         ),
     )
-    crud_historico.create_registro_historico(
-        db,
-        schemas.RegistroHistoricoCreate(
-            user_id=current_user.id,
-            entidade="Produto",
-            acao=models.TipoAcaoSistemaEnum.CRIACAO,
-            entity_id=db_produto.id,
-        ),
-    )
+    db.refresh(db_produto)
     return db_produto
 
 
@@ -422,7 +461,6 @@ def delete_catalog_import_file(
     status_code=status.HTTP_202_ACCEPTED,
 )
 async def reprocess_catalog_import_file(
-    background_tasks: BackgroundTasks,
     file_id: int,
     product_type_id: int = Body(..., embed=True),
     fornecedor_id: int = Body(..., embed=True),
@@ -449,22 +487,16 @@ async def reprocess_catalog_import_file(
         if fornecedor and fornecedor.default_column_mapping:
             mapping = fornecedor.default_column_mapping
 
-    from sqlalchemy.orm import sessionmaker
-
-    db_session_factory = sessionmaker(bind=db.get_bind())
-
-    background_tasks.add_task(
-        _tarefa_processar_catalogo,
-        db_session_factory=db_session_factory,
-        file_id=file_id,
+    job = _enfileirar_processamento_catalogo(
+        db,
+        catalog_file,
         user_id=current_user.id,
         product_type_id=product_type_id,
         fornecedor_id=fornecedor_id,
         mapping=mapping,
-        pages=pages,
     )
 
-    return {"status": "PROCESSING", "file_id": file_id}
+    return {"status": "PROCESSING", "file_id": file_id, "background_job_id": job.id}
 
 
 
@@ -504,7 +536,7 @@ router.add_api_route(
 )
 
 
-@router.get("/", response_model=schemas.ProdutoPage)  # Este já estava correto
+@router.get("/", response_model=schemas.ProdutoListagemPage)
 def read_produtos(  # Nome da função mantido como no arquivo do usuário
     db: Session = Depends(database.get_db),
     skip: int = Query(0, ge=0, description="Número de itens para pular"),
@@ -539,45 +571,116 @@ def read_produtos(  # Nome da função mantido como no arquivo do usuário
     product_type_id: Optional[int] = Query(
         None, description="ID do Tipo de Produto para filtrar produtos"
     ),
+    pagination: Literal["offset", "cursor"] = Query(
+        "offset",
+        description="offset (skip/limit) ou cursor (keyset, usa next_cursor)",
+    ),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor da página anterior; implica pagination=cursor"
+    ),
+    total_mode: Optional[Literal["exact", "cached", "estimated", "window"]] = Query(
+        None,
+        description="Cálculo de total_items (padrão PRODUTOS_COUNT_MODE): exact, cached, "
+        "estimated (planejador do PostgreSQL) ou window (na mesma consulta da página)",
+    ),
+    view: Literal["full", "summary"] = Query(
+        "full",
+        description="full (ProdutoResponse) ou summary (só as colunas da grade, "
+        "sem descrições, JSONs e relacionamentos)",
+    ),
     current_user: models.User = Depends(auth_utils.get_current_active_user),
 ):
     user_id_filter = None if current_user.is_superuser else current_user.id
-
-    # Usando get_produtos_by_user do crud, que foi ajustado para receber user_id opcional ou is_admin
-    produtos_db = crud_produtos.get_produtos_by_user(  # Nome da função no CRUD
-        db,
-        user_id=user_id_filter,
-        skip=skip,
-        limit=limit,
-        sort_by=sort_by,
-        sort_order=sort_order,
+    filtros = dict(
         search=search,
         fornecedor_id=fornecedor_id,
-        categoria=categoria,  # Passando categoria para o CRUD
+        categoria=categoria,
         status_enriquecimento_web=status_enriquecimento_web,
         status_titulo_ia=status_titulo_ia,
         status_descricao_ia=status_descricao_ia,
         product_type_id=product_type_id,
-        is_admin=current_user.is_superuser,  # Passando is_admin para o CRUD
-    )
-    total_items = crud_produtos.count_produtos_by_user(  # Nome da função no CRUD
-        db,
-        user_id=user_id_filter,
-        search=search,
-        fornecedor_id=fornecedor_id,
-        categoria=categoria,  # Passando categoria para o CRUD
-        status_enriquecimento_web=status_enriquecimento_web,
-        status_titulo_ia=status_titulo_ia,
-        status_descricao_ia=status_descricao_ia,
-        product_type_id=product_type_id,
-        is_admin=current_user.is_superuser,  # Passando is_admin para o CRUD
     )
+    modo_total = total_mode or settings.PRODUTOS_COUNT_MODE
+    if modo_total not in product_count.MODOS:
+        modo_total = "exact"
+
+    if pagination == "cursor" or cursor:
+        try:
+            produtos_db, next_cursor = crud_produtos.get_produtos_by_user_cursor(
+                db,
+                user_id=user_id_filter,
+                is_admin=current_user.is_superuser,
+                limit=limit,
+                cursor=cursor,
+                sort_by=sort_by,
+                sort_order=sort_order,
+                resumo=view == "summary",
+                **filtros,
+            )
+        except keyset_pagination.CursorInvalidoError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        # A página por cursor não vê as linhas anteriores: window vira cached.
+        total_items, estimado = product_count.total_produtos(
+            db,
+            user_id=user_id_filter,
+            is_admin=current_user.is_superuser,
+            modo=modo_total,
+            **filtros,
+        )
+        return {
+            "items": produtos_db,
+            "total_items": total_items,
+            "page": None,
+            "limit": limit,
+            "next_cursor": next_cursor,
+            "total_estimated": estimado,
+            "view": view,
+        }
+
     page = skip // limit + 1
+    total_items = None
+    if modo_total == "window":
+        produtos_db, total_items = crud_produtos.get_produtos_by_user_com_total(
+            db,
+            user_id=user_id_filter,
+            is_admin=current_user.is_superuser,
+            skip=skip,
+            limit=limit,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            resumo=view == "summary",
+            **filtros,
+        )
+    else:
+        # Usando get_produtos_by_user do crud, que foi ajustado para receber user_id opcional ou is_admin
+        produtos_db = crud_produtos.get_produtos_by_user(  # Nome da função no CRUD
+            db,
+            user_id=user_id_filter,
+            skip=skip,
+            limit=limit,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            is_admin=current_user.is_superuser,  # Passando is_admin para o CRUD
+            resumo=view == "summary",
+            **filtros,
+        )
+    estimado = False
+    if total_items is None:
+        # Com window, só quando a página veio vazia (skip além do fim).
+        total_items, estimado = product_count.total_produtos(
+            db,
+            user_id=user_id_filter,
+            is_admin=current_user.is_superuser,
+            modo=modo_total,
+            **filtros,
+        )
     return {
         "items": produtos_db,
         "total_items": total_items,
         "page": page,
         "limit": limit,
+        "total_estimated": estimado,
+        "view": view,
     }
 
 
@@ -625,19 +728,18 @@ def update_produto(  # Nome da função mantido como no arquivo do usuário
             )
 
     # A função crud_produtos.update_produto espera o objeto db_produto
-    updated = crud_produtos.update_produto(
-        db=db, db_produto=db_produto, produto_update=produto
-    )
-    crud_historico.create_registro_historico(
+    audit_log.registrar(
         db,
         schemas.RegistroHistoricoCreate(
             user_id=current_user.id,
             entidade="Produto",
             acao=models.TipoAcaoSistemaEnum.ATUALIZACAO,
-            entity_id=updated.id,
+            entity_id=db_produto.id,
         ),
     )
-    return updated
+    return crud_produtos.update_produto(
+        db=db, db_produto=db_produto, produto_update=produto
+    )
 
 
 @router.delete(
@@ -657,17 +759,16 @@ def delete_produto(  # Nome da função mantido como no arquivo do usuário
         )
 
     # A função crud_produtos.delete_produto espera o objeto db_produto
-    deleted = crud_produtos.delete_produto(db=db, db_produto=db_produto)
-    crud_historico.create_registro_historico(
+    audit_log.registrar(
         db,
         schemas.RegistroHistoricoCreate(
             user_id=current_user.id,
             entidade="Produto",
             acao=models.TipoAcaoSistemaEnum.DELECAO,
-            entity_id=deleted.id,
+            entity_id=db_produto.id,
         ),
     )
-    return deleted
+    return crud_produtos.delete_produto(db=db, db_produto=db_produto)
 
 
 # Expondo rotas com barra final para operações de atualização e deleção.
@@ -712,8 +813,7 @@ def batch_delete_produtos(
             not_authorized_ids.append(produto_id_val)
             continue
 
-        crud_produtos.delete_produto(db=db, db_produto=db_produto)  # Passa o objeto
-        crud_historico.create_registro_historico(
+        audit_log.registrar(
             db,
             schemas.RegistroHistoricoCreate(
                 user_id=current_user.id,
@@ -722,6 +822,7 @@ def batch_delete_produtos(
                 entity_id=db_produto.id,
             ),
         )
+        crud_produtos.delete_produto(db=db, db_produto=db_produto)  # Passa o objeto
         deleted_produtos.append(
             db_produto
         )  # Adiciona o objeto que foi deletado (já é um objeto do modelo)
@@ -810,10 +911,17 @@ async def importar_catalogo_preview(
     start_page: int = Form(1),
     page_count: int = Form(0),
     dpi: int = Form(72),
+    image_mode: str = Form("inline"),
     db: Session = Depends(database.get_db),
     current_user: models.User = Depends(auth_utils.get_current_active_user),
 ):
-    """Gera preview de um catálogo enviado e salva o arquivo para posterior processamento."""
+    """Gera preview de um catálogo enviado e salva o arquivo para posterior processamento.
+
+    Com ``image_mode="url"`` as miniaturas do PDF são devolvidas como URLs de
+    arquivos estáticos (``preview_images[].url``) em vez de data URIs base64.
+    """
+    if image_mode not in ("inline", "url"):
+        raise HTTPException(status_code=400, detail="image_mode deve ser 'inline' ou 'url'")
 
     # Lê o conteúdo para gerar o preview
     content = await file.read()
@@ -833,7 +941,7 @@ async def importar_catalogo_preview(
     try:
         if ext == ".pdf":
             preview = await file_processing_service.preview_arquivo_pdf(
-                content, ext, start_page, page_count, dpi
+                content, ext, start_page, page_count, dpi, image_mode=image_mode
             )
         else:
             preview = await file_processing_service.gerar_preview(content, ext)
@@ -935,25 +1043,25 @@ async def importar_catalogo_fornecedor(
             db, produtos_create, user_id=current_user.id
         )
         erros.extend(dup_errors)
-        for db_produto in created:
-            crud.create_registro_uso_ia(
-                db,
-                schemas.RegistroUsoIACreate(
-                    user_id=current_user.id,
-                    produto_id=db_produto.id,
-                    tipo_acao=models.TipoAcaoEnum.CRIACAO_PRODUTO,
-                    creditos_consumidos=0,
-                ),
-            )
-            crud_historico.create_registro_historico(
-                db,
-                schemas.RegistroHistoricoCreate(
-                    user_id=current_user.id,
-                    entidade="Produto",
-                    acao=models.TipoAcaoSistemaEnum.CRIACAO,
-                    entity_id=db_produto.id,
-                ),
-            )
+        with audit_writer.BufferedAuditWriter(db) as audit:
+            for db_produto in created:
+                audit.registrar_uso_ia(
+                    schemas.RegistroUsoIACreate(
+                        user_id=current_user.id,
+                        produto_id=db_produto.id,
+                        tipo_acao=models.TipoAcaoEnum.CRIACAO_PRODUTO,
+                        creditos_consumidos=0,
+                    )
+                )
+                audit.registrar_historico(
+                    schemas.RegistroHistoricoCreate(
+                        user_id=current_user.id,
+                        entidade="Produto",
+                        acao=models.TipoAcaoSistemaEnum.CRIACAO,
+                        entity_id=db_produto.id,
+                    )
+                )
+        db.commit()
     return {"produtos_criados": created, "produtos_atualizados": updated, "erros": erros}
 
 
@@ -962,7 +1070,6 @@ async def importar_catalogo_fornecedor(
     status_code=status.HTTP_202_ACCEPTED,
 )
 async def importar_catalogo_finalizar(
-    background_tasks: BackgroundTasks,
     file_id: int,
     product_type_id: int = Body(..., embed=True),
     fornecedor_id: int = Body(..., embed=True),
@@ -984,9 +1091,6 @@ async def importar_catalogo_finalizar(
     catalog_file.fornecedor_id = fornecedor_id
     db.commit()
 
-    from sqlalchemy.orm import sessionmaker
-
-    db_session_factory = sessionmaker(bind=db.get_bind())
     # Sempre reprocessa o arquivo completo para evitar importar apenas as linhas de preview
     file_path = Path(settings.UPLOAD_DIRECTORY) / "catalogs" / catalog_file.stored_filename
     if not file_path.is_absolute():
@@ -999,10 +1103,9 @@ async def importar_catalogo_finalizar(
         if fornecedor and fornecedor.default_column_mapping:
             mapping = fornecedor.default_column_mapping
 
-    background_tasks.add_task(
-        _tarefa_processar_catalogo,
-        db_session_factory=db_session_factory,
-        file_id=file_id,
+    job = _enfileirar_processamento_catalogo(
+        db,
+        catalog_file,
         user_id=current_user.id,
         product_type_id=product_type_id,
         fornecedor_id=fornecedor_id,
@@ -1010,7 +1113,7 @@ async def importar_catalogo_finalizar(
         pages=pages,
     )
 
-    return {"status": "PROCESSING", "file_id": file_id}
+    return {"status": "PROCESSING", "file_id": file_id, "background_job_id": job.id}
 
 
 @router.get(
@@ -1077,7 +1180,45 @@ def importar_catalogo_result(
         raise HTTPException(status_code=404, detail="Arquivo não encontrado")
     if record.status != "IMPORTED" or not record.result_summary:
         raise HTTPException(status_code=400, detail="Resultados ainda nao disponiveis")
-    return record.result_summary
+    return crud_fornecedores.list_catalog_import_results(db, record.id)
+
+
+@router.get(
+    "/importar-catalogo-result/{file_id}/itens/",
+    response_model=schemas.CatalogImportResultPage,
+)
+def importar_catalogo_result_paginado(
+    file_id: int,
+    kind: Literal["created", "updated", "errors"] = Query(
+        "created", description="Tipo de item do resultado"
+    ),
+    skip: int = Query(0, ge=0, description="Número de itens para pular"),
+    limit: int = Query(100, ge=1, le=1000, description="Número máximo de itens por página"),
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(auth_utils.get_current_active_user),
+):
+    """Resultado de uma importação, paginado por tipo de item.
+
+    Disponível também durante o processamento: os itens de cada lote já
+    gravado aparecem assim que o lote é confirmado.
+    """
+    record = (
+        db.query(models.CatalogImportFile)
+        .filter_by(id=file_id, user_id=current_user.id)
+        .first()
+    )
+    if not record:
+        raise HTTPException(status_code=404, detail="Arquivo não encontrado")
+    items, total_items = crud_fornecedores.get_catalog_import_results(
+        db, record.id, kind, skip=skip, limit=limit
+    )
+    return {
+        "kind": kind,
+        "items": items,
+        "total_items": total_items,
+        "page": skip // limit + 1,
+        "limit": limit,
+    }
 
 
 @router.post("/importar-catalogo-finalizar/", response_model=schemas.CatalogImportResult)
@@ -1133,7 +1274,7 @@ async def importar_catalogo_finalizar_todas_paginas(
     )
 
     db.refresh(record)
-    return record.result_summary
+    return crud_fornecedores.list_catalog_import_results(db, record.id)
 
 
 
@@ -1,5 +1,5 @@
 # Backend/routers/uso_ia.py
-from typing import List, Optional
+from typing import List, Literal, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from datetime import datetime # Necessário para filtros de data
@@ -9,6 +9,7 @@ from Backend import crud_produtos
 from Backend import models
 from Backend import schemas  # schemas é importado
 from Backend import database
+from Backend.services import keyset_pagination
 from . import auth_utils # Para obter o usuário logado
 from Backend.core.logging_config import get_logger
 
@@ -49,7 +50,9 @@ def read_usos_ia_usuario_logado(
     limit: int = Query(100, ge=1, le=200, description="Número máximo de itens por página"), 
     tipo_geracao: Optional[str] = Query(None, description="Filtrar por tipo de geração (ex: 'titulo_produto')"),
     data_inicio: Optional[datetime] = Query(None, description="Filtrar por data de início (YYYY-MM-DDTHH:MM:SS)"),
-    data_fim: Optional[datetime] = Query(None, description="Filtrar por data de fim (YYYY-MM-DDTHH:MM:SS)")
+    data_fim: Optional[datetime] = Query(None, description="Filtrar por data de fim (YYYY-MM-DDTHH:MM:SS)"),
+    pagination: Literal["offset", "cursor"] = Query("offset", description="offset (skip/limit) ou cursor (keyset, usa next_cursor)"),
+    cursor: Optional[str] = Query(None, description="next_cursor da página anterior; implica pagination=cursor"),
 ):
     """
     Lista os registros de uso de IA para o usuário autenticado, com filtros e paginação.
@@ -60,6 +63,34 @@ def read_usos_ia_usuario_logado(
     except ValueError:
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="tipo_geracao inválido")
 
+    if pagination == "cursor" or cursor:
+        try:
+            registros, next_cursor = crud.get_registros_uso_ia_cursor(
+                db,
+                user_id=current_user.id,
+                limit=limit,
+                cursor=cursor,
+                tipo_acao=tipo_enum,
+                data_inicio=data_inicio,
+                data_fim=data_fim
+            )
+        except keyset_pagination.CursorInvalidoError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        total_items = crud.count_registros_uso_ia(
+            db,
+            user_id=current_user.id,
+            tipo_acao=tipo_enum,
+            data_inicio=data_inicio,
+            data_fim=data_fim
+        )
+        return {
+            "items": registros,
+            "total_items": total_items,
+            "page": None,
+            "limit": limit,
+            "next_cursor": next_cursor,
+        }
+
     registros = crud.get_registros_uso_ia(
         db,
         user_id=current_user.id,
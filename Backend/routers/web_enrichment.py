@@ -1,5 +1,5 @@
 # catalogai_project/Backend/routers/web_enrichment.py
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError # Para capturar exceções do SQLAlchemy
 from typing import List, Dict, Any, Optional
@@ -15,6 +15,7 @@ from Backend.database import get_db, SessionLocal
 
 from .auth_utils import get_current_active_user
 
+from Backend.services import job_queue
 from Backend.services import web_data_extractor_service as web_extractor
 from Backend.core.config import settings
 from Backend.core.logging_config import get_logger
@@ -27,6 +28,7 @@ router = APIRouter(
 
 logger = get_logger(__name__)
 
+@job_queue.task("enriquecimento_web.produto")
 async def _tarefa_enriquecer_produto_web(
     db_session_factory,
     produto_id: int,
@@ -287,7 +289,10 @@ async def _tarefa_enriquecer_produto_web(
             produto_id,
             error_full,
         )
-    
+        # Propaga para que a fila tente de novo com backoff; o finally ainda
+        # grava o status FALHOU no produto.
+        raise
+
     finally:
         if db_produto_obj:
             try:
@@ -333,10 +338,9 @@ async def _tarefa_enriquecer_produto_web(
         if db:
             db.close()
 
-@router.post("/produto/{produto_id}", status_code=status.HTTP_202_ACCEPTED, response_model=schemas.Msg)
+@router.post("/produto/{produto_id}", status_code=status.HTTP_202_ACCEPTED, response_model=schemas.JobEnqueuedMsg)
 async def iniciar_enriquecimento_produto_web_endpoint(
     produto_id: int,
-    background_tasks: BackgroundTasks,
     current_user: models.User = Depends(get_current_active_user),
     termos_busca_override: Optional[str] = Query(None, description="Opcional: Termos de busca específicos para o Google Search."),
 ):
@@ -350,14 +354,22 @@ async def iniciar_enriquecimento_produto_web_endpoint(
         
         if db_produto_check.status_enriquecimento_web == models.StatusEnriquecimentoEnum.EM_PROGRESSO:
              raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Processo de enriquecimento já está em andamento para este produto.")
+
+        job = job_queue.enqueue(
+            db_temp,
+            "enriquecimento_web.produto",
+            {
+                "produto_id": produto_id,
+                "user_id": current_user.id,
+                "termos_busca_override": termos_busca_override,
+            },
+            queue="ia",
+            user_id=current_user.id,
+        )
     finally:
         db_temp.close()
 
-    background_tasks.add_task(
-        _tarefa_enriquecer_produto_web,
-        db_session_factory=SessionLocal,
-        produto_id=produto_id,
-        user_id=current_user.id,
-        termos_busca_override=termos_busca_override
-    )
-    return {"message": f"Processo de enriquecimento web para o produto ID {produto_id} iniciado em segundo plano."}
+    return {
+        "msg": f"Processo de enriquecimento web para o produto ID {produto_id} iniciado em segundo plano.",
+        "background_job_id": job.id,
+    }
@@ -1,6 +1,6 @@
 # Caminho: Backend/schemas.py
 
-from typing import List, Optional, Dict, Any, Union, Literal
+from typing import Annotated, List, Optional, Dict, Any, Union, Literal
 from pydantic import (
     BaseModel,
     EmailStr,
@@ -153,6 +153,8 @@ class PlanoBase(BaseModel):
     limite_geracao_ia: int = Field(..., ge=0)
     permite_api_externa: bool = False
     suporte_prioritario: bool = False
+    limite_jobs_simultaneos: Optional[int] = Field(None, ge=1)
+    peso_fila: Optional[int] = Field(None, ge=1)
 
 
 class PlanoCreate(PlanoBase):
@@ -430,6 +432,33 @@ class ProdutoResponse(ProdutoBase):
         from_attributes = True
 
 
+class ProdutoResumoResponse(BaseModel):
+    """Colunas da grade de produtos, sem descrições, JSONs e relacionamentos."""
+
+    id: int
+    user_id: int
+    nome_base: str
+    nome_chat_api: Optional[str] = None
+    sku: Optional[str] = None
+    ean: Optional[str] = None
+    marca: Optional[str] = None
+    modelo: Optional[str] = None
+    preco_venda: Optional[float] = None
+    estoque_disponivel: Optional[int] = None
+    fornecedor_id: Optional[int] = None
+    product_type_id: Optional[int] = None
+    categoria_original: Optional[str] = None
+    imagem_principal_url: Optional[str] = None
+    status_enriquecimento_web: Optional[StatusEnriquecimentoEnum] = None
+    status_titulo_ia: Optional[StatusGeracaoIAEnum] = None
+    status_descricao_ia: Optional[StatusGeracaoIAEnum] = None
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
 class ProdutoBatchDeleteRequest(BaseModel):
     produto_ids: List[int]
 
@@ -461,6 +490,25 @@ class CatalogImportResult(BaseModel):
     errors: List[Dict[str, Any]]
 
 
+class CatalogImportResultPage(BaseModel):
+    """Página de itens do resultado de uma importação de catálogo."""
+
+    kind: Literal["created", "updated", "errors"]
+    items: List[Dict[str, Any]]
+    total_items: int
+    page: int
+    limit: int
+
+
+class CatalogImportProductPage(BaseModel):
+    """Página dos produtos extraídos por uma importação de PDF."""
+
+    items: List[Dict[str, Any]]
+    total_items: int
+    page: int
+    limit: int
+
+
 class RegionExtractionResponse(BaseModel):
     produtos: List[Dict[str, Any]]
     log: Optional[List[str]] = None
@@ -475,8 +523,25 @@ class SinglePageExtractionResponse(BaseModel):
 class ProdutoPage(BaseModel):
     items: List[ProdutoResponse]
     total_items: int
-    page: int
+    page: Optional[int] = None  # None na paginação por cursor
     limit: int
+    next_cursor: Optional[str] = None
+    total_estimated: bool = False  # total_items veio do planejador (total_mode=estimated)
+    view: Literal["full"] = "full"
+
+
+class ProdutoResumoPage(BaseModel):
+    items: List[ProdutoResumoResponse]
+    total_items: int
+    page: Optional[int] = None
+    limit: int
+    next_cursor: Optional[str] = None
+    total_estimated: bool = False
+    view: Literal["summary"] = "summary"
+
+
+# Resposta de GET /produtos/ conforme o parâmetro view.
+ProdutoListagemPage = Annotated[Union[ProdutoPage, ProdutoResumoPage], Field(discriminator="view")]
 
 
 # Schemas para RegistroUsoIA
@@ -511,8 +576,9 @@ class RegistroUsoIAResponse(RegistroUsoIABase):
 class UsoIAPage(BaseModel):
     items: List[RegistroUsoIAResponse]
     total_items: int
-    page: int
+    page: Optional[int] = None  # None na paginação por cursor
     limit: int
+    next_cursor: Optional[str] = None
 
 
 # Schemas para RegistroHistorico
@@ -539,8 +605,9 @@ class RegistroHistoricoResponse(RegistroHistoricoBase):
 class HistoricoPage(BaseModel):
     items: List[RegistroHistoricoResponse]
     total_items: int
-    page: int
+    page: Optional[int] = None  # None na paginação por cursor
     limit: int
+    next_cursor: Optional[str] = None
 
 
 class CatalogImportFileBase(BaseModel):
@@ -550,6 +617,7 @@ class CatalogImportFileBase(BaseModel):
     total_pages: Optional[int] = None
     pages_processed: Optional[int] = None
     result_summary: Optional[Dict[str, Any]] = None
+    page_classes: Optional[List[Dict[str, Any]]] = None
 
 
 class CatalogImportFileCreate(CatalogImportFileBase):
@@ -561,6 +629,7 @@ class CatalogImportFileResponse(CatalogImportFileBase):
     id: int
     user_id: int
     fornecedor_id: Optional[int] = None
+    background_job_id: Optional[int] = None
     created_at: datetime
 
     class Config:
@@ -661,6 +730,35 @@ class RecentActivity(BaseModel):
         from_attributes = True
 
 
+class ProductQueryShape(BaseModel):
+    por_usuario: bool
+    filtros: Dict[str, Optional[str]] = Field(
+        default_factory=dict, description="Filtros de igualdade; valor só nos status."
+    )
+    busca: bool
+    categoria: bool
+    ordenacao: str
+    descendente: bool
+    total: int
+
+
+class ProductIndexProposal(BaseModel):
+    nome: str
+    colunas: List[str]
+    where: Optional[str] = None
+    total_consultas: int
+    fracao: float
+    existente: Optional[str] = Field(
+        None, description="Índice já existente que atende as mesmas consultas."
+    )
+    ddl: str
+
+
+class ProductQueryShapes(BaseModel):
+    formas: List[ProductQueryShape]
+    indices: List[ProductIndexProposal]
+
+
 # ----- NOVOS SCHEMAS PARA SUGESTÃO DE ATRIBUTOS GEMINI -----
 class SugestaoAtributoItem(BaseModel):
     chave_atributo: str = Field(
@@ -700,6 +798,50 @@ class Msg(BaseModel):
     msg: str
 
 
+class JobEnqueuedMsg(Msg):
+    """Resposta dos endpoints que enfileiram uma tarefa de fundo."""
+
+    background_job_id: int
+
+
+class BackgroundJobResponse(BaseModel):
+    id: int
+    queue: str
+    task: str
+    status: str
+    priority: int
+    attempts: int
+    max_attempts: int
+    last_error: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    run_after: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class BackgroundJobPage(BaseModel):
+    items: List[BackgroundJobResponse]
+    total_items: int
+    page: int
+    limit: int
+
+
+class JobTenantMetrics(BaseModel):
+    """Profundidade da fila e espera das tarefas de fundo de um usuário."""
+
+    user_id: Optional[int] = None
+    queued: int
+    ready: int
+    running: int
+    oldest_wait_seconds: float
+    avg_wait_seconds: Optional[float] = None
+    started_in_window: int
+
+
 class FileProcessResponse(BaseModel):
     filename: str
     original_filename: Optional[str] = None
@@ -0,0 +1,238 @@
+# catalogai_project/Backend/services/audit_log.py
+"""Gravação assíncrona do histórico (``RegistroHistorico``) das requisições.
+
+As rotas chamam :func:`registrar` em vez de
+``crud_historico.create_registro_historico``: o registro entra numa fila em
+memória e uma thread de fundo o grava em lote (via
+:class:`~Backend.services.audit_writer.BufferedAuditWriter`) a cada
+``AUDIT_LOG_FLUSH_INTERVAL`` segundos ou ``AUDIT_BUFFER_BATCH_SIZE``
+registros, de modo que a latência da requisição não inclui o commit do
+histórico. Cada registro é gravado no mesmo banco da sessão que o gerou.
+
+:func:`registrar` deve ser chamado antes do commit da escrita auditada. Com
+``AUDIT_OUTBOX_ENABLED`` o registro entra na tabela ``audit_outbox`` na mesma
+transação da escrita (sem commit próprio) e a thread o move para o
+histórico; o que sobrar de uma queda do processo é movido na próxima subida
+(:meth:`AuditLogPipeline.recuperar_outbox`). Sem o outbox, o registro só vai
+para a fila em memória depois do commit da sessão (fica em ``Session.info``
+até lá e é descartado num rollback). Com ``AUDIT_LOG_ASYNC=false`` o
+histórico volta a ser gravado na própria transação da requisição.
+
+:meth:`AuditLogPipeline.shutdown`, chamado no shutdown da aplicação e no
+``atexit``, grava tudo o que estiver pendente antes de encerrar a thread.
+"""
+import atexit
+import queue
+import threading
+import time
+from typing import List, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from Backend import models, schemas
+from Backend.core.config import settings
+from Backend.core.logging_config import get_logger
+from Backend.services.audit_writer import BufferedAuditWriter
+
+logger = get_logger(__name__)
+
+_PARAR = object()
+_MAX_TENTATIVAS = 3
+
+# (banco, registro, tentativas já feitas)
+_Item = Tuple[Engine, schemas.RegistroHistoricoCreate, int]
+
+# Chave em ``Session.info`` dos registros que aguardam o commit da sessão.
+_INFO_PENDENTES = "audit_log_pendentes"
+
+
+class AuditLogPipeline:
+    """Fila em memória do histórico com uma thread de gravação em lote.
+
+    Parameters
+    ----------
+    batch_size: Optional[int]
+        Registros gravados por lote (padrão ``AUDIT_BUFFER_BATCH_SIZE``).
+    flush_interval: Optional[float]
+        Segundos máximos que um registro espera na fila
+        (padrão ``AUDIT_LOG_FLUSH_INTERVAL``).
+    """
+
+    def __init__(self, batch_size: Optional[int] = None, flush_interval: Optional[float] = None):
+        self.batch_size = max(1, batch_size or settings.AUDIT_BUFFER_BATCH_SIZE)
+        self.flush_interval = (
+            settings.AUDIT_LOG_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        )
+        self._fila: "queue.Queue" = queue.Queue()
+        self._binds_outbox: Set[Engine] = set()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pendentes = 0
+
+    def registrar(self, db: Session, registro: schemas.RegistroHistoricoCreate) -> None:
+        """Agenda a gravação de ``registro`` no banco da sessão ``db``.
+
+        Nada é commitado aqui: o registro acompanha o próximo commit de ``db``
+        e é descartado se a transação for desfeita.
+        """
+        if not settings.AUDIT_LOG_ASYNC:
+            db.add(models.RegistroHistorico(**registro.model_dump(exclude_unset=True)))
+            return
+        bind = db.get_bind()
+        if settings.AUDIT_OUTBOX_ENABLED:
+            db.add(models.AuditOutbox(payload=registro.model_dump(mode="json", exclude_unset=True)))
+            with self._lock:
+                self._binds_outbox.add(bind)
+            self._garantir_thread()
+        else:
+            # Inicia a transação (se ainda não há uma) para que um rollback logo
+            # em seguida também descarte o registro.
+            db.connection()
+            db.info.setdefault(_INFO_PENDENTES, []).append((self, bind, registro))
+
+    def _enfileirar(self, bind: Engine, registro: schemas.RegistroHistoricoCreate) -> None:
+        with self._lock:
+            self._pendentes += 1
+        self._fila.put((bind, registro, 0))
+        self._garantir_thread()
+
+    def recuperar_outbox(self, bind: Engine) -> int:
+        """Move para o histórico o que ficou em ``audit_outbox`` e passa a vigiar ``bind``."""
+        with self._lock:
+            self._binds_outbox.add(bind)
+        return self._mover_outbox(bind)
+
+    def pendentes(self) -> int:
+        """Registros da fila em memória ainda não gravados."""
+        with self._lock:
+            return self._pendentes
+
+    def shutdown(self, timeout: Optional[float] = None) -> None:
+        """Grava os registros pendentes e encerra a thread.
+
+        A thread é recriada na próxima chamada de :meth:`registrar`.
+        """
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is None:
+            return
+        self._fila.put(_PARAR)
+        thread.join(timeout)
+        if thread.is_alive():
+            logger.warning("Histórico: thread de gravação não terminou em %ss", timeout)
+
+    def _garantir_thread(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._executar, name="audit-log-flusher", daemon=True
+                )
+                self._thread.start()
+
+    def _executar(self) -> None:
+        parar = False
+        while not parar:
+            lote, parar = self._coletar()
+            self._gravar(lote)
+            with self._lock:
+                binds = list(self._binds_outbox)
+            for bind in binds:
+                self._mover_outbox(bind)
+        # Drena o que ainda estiver na fila (registros feitos durante o shutdown).
+        while True:
+            lote, _ = self._coletar(espera=0)
+            if not lote:
+                break
+            self._gravar(lote)
+
+    def _coletar(self, espera: Optional[float] = None) -> Tuple[List[_Item], bool]:
+        """Espera até ``espera`` segundos por até ``batch_size`` registros."""
+        prazo = time.monotonic() + (self.flush_interval if espera is None else espera)
+        lote: List[_Item] = []
+        while len(lote) < self.batch_size:
+            restante = prazo - time.monotonic()
+            try:
+                item = self._fila.get(timeout=restante) if restante > 0 else self._fila.get_nowait()
+            except queue.Empty:
+                break
+            if item is _PARAR:
+                return lote, True
+            lote.append(item)
+        return lote, False
+
+    def _gravar(self, lote: List[_Item]) -> None:
+        por_bind = {}
+        for item in lote:
+            por_bind.setdefault(item[0], []).append(item)
+        for bind, itens in por_bind.items():
+            try:
+                with Session(bind=bind) as db:
+                    writer = BufferedAuditWriter(db, batch_size=len(itens), flush_interval=0)
+                    for _, registro, _ in itens:
+                        writer.registrar_historico(registro)
+                    writer.flush()
+                    db.commit()
+                concluidos = len(itens)
+            except Exception:
+                logger.exception("Histórico: falha ao gravar %s registros", len(itens))
+                concluidos = 0
+                for bind_item, registro, tentativas in itens:
+                    if tentativas + 1 < _MAX_TENTATIVAS:
+                        self._fila.put((bind_item, registro, tentativas + 1))
+                    else:
+                        concluidos += 1
+                        logger.error("Histórico: registro descartado: %s", registro.model_dump(mode="json"))
+            with self._lock:
+                self._pendentes -= concluidos
+
+    def _mover_outbox(self, bind: Engine) -> int:
+        movidos = 0
+        while True:
+            try:
+                with Session(bind=bind) as db:
+                    linhas = (
+                        db.query(models.AuditOutbox)
+                        .order_by(models.AuditOutbox.id)
+                        .limit(self.batch_size)
+                        .with_for_update(skip_locked=True)
+                        .all()
+                    )
+                    if not linhas:
+                        return movidos
+                    writer = BufferedAuditWriter(db, batch_size=len(linhas), flush_interval=0)
+                    for linha in linhas:
+                        writer.registrar_historico(schemas.RegistroHistoricoCreate(**linha.payload))
+                    writer.flush()
+                    db.query(models.AuditOutbox).filter(
+                        models.AuditOutbox.id.in_([linha.id for linha in linhas])
+                    ).delete(synchronize_session=False)
+                    db.commit()
+                    movidos += len(linhas)
+            except Exception:
+                logger.exception("Histórico: falha ao mover registros do outbox")
+                return movidos
+
+
+@event.listens_for(Session, "after_commit")
+def _apos_commit(session: Session) -> None:
+    # Só agora os registros vão para a fila: a escrita auditada foi gravada.
+    for destino, bind, registro in session.info.pop(_INFO_PENDENTES, ()):
+        destino._enfileirar(bind, registro)
+
+
+@event.listens_for(Session, "after_rollback")
+@event.listens_for(Session, "after_soft_rollback")
+def _apos_rollback(session: Session, *args) -> None:
+    session.info.pop(_INFO_PENDENTES, None)
+
+
+pipeline = AuditLogPipeline()
+atexit.register(pipeline.shutdown)
+
+
+def registrar(db: Session, registro: schemas.RegistroHistoricoCreate) -> None:
+    """Atalho para ``pipeline.registrar``."""
+    pipeline.registrar(db, registro)
@@ -0,0 +1,99 @@
+# catalogai_project/Backend/services/audit_writer.py
+"""Gravação em lote de registros de histórico e de uso de IA.
+
+``crud_historico.create_registro_historico`` e ``create_registro_uso_ia``
+fazem ``add`` + ``commit`` + ``refresh`` por registro, o que domina o tempo de
+importações grandes. ``BufferedAuditWriter`` acumula os registros em memória e
+os grava com um ``INSERT`` multi-linha por tabela quando o buffer atinge
+``AUDIT_BUFFER_BATCH_SIZE`` registros, quando passam
+``AUDIT_BUFFER_FLUSH_INTERVAL`` segundos desde a última gravação ou quando
+``flush()`` é chamado (ex.: no fim de cada página da importação).
+
+O writer grava na transação da sessão recebida; o commit fica com quem chama.
+"""
+import time
+from typing import Any, Dict, List, Optional, Type
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from Backend import models, schemas
+from Backend.core.config import settings
+
+
+class BufferedAuditWriter:
+    """Buffer de ``RegistroHistorico``/``RegistroUsoIA`` gravado em lotes.
+
+    Parameters
+    ----------
+    db: Session
+        Sessão usada nas gravações.
+    batch_size: Optional[int]
+        Registros acumulados antes de uma gravação automática
+        (padrão ``AUDIT_BUFFER_BATCH_SIZE``).
+    flush_interval: Optional[float]
+        Segundos máximos entre gravações automáticas; ``0`` desativa o limite
+        de tempo (padrão ``AUDIT_BUFFER_FLUSH_INTERVAL``).
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+    ):
+        self.db = db
+        self.batch_size = max(1, batch_size or settings.AUDIT_BUFFER_BATCH_SIZE)
+        self.flush_interval = (
+            settings.AUDIT_BUFFER_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        )
+        self._pendentes: Dict[Type[Any], List[Dict[str, Any]]] = {
+            models.RegistroHistorico: [],
+            models.RegistroUsoIA: [],
+        }
+        self._ultimo_flush = time.monotonic()
+
+    def __len__(self) -> int:
+        return sum(len(linhas) for linhas in self._pendentes.values())
+
+    def __enter__(self) -> "BufferedAuditWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.flush()
+
+    def registrar_historico(self, registro_in: schemas.RegistroHistoricoCreate) -> None:
+        """Enfileira um ``RegistroHistorico``."""
+        self._adicionar(models.RegistroHistorico, registro_in.model_dump(exclude_unset=True))
+
+    def registrar_uso_ia(self, registro_uso: schemas.RegistroUsoIACreate) -> None:
+        """Enfileira um ``RegistroUsoIA``."""
+        self._adicionar(models.RegistroUsoIA, registro_uso.model_dump(exclude_unset=True))
+
+    def _adicionar(self, modelo: Type[Any], dados: Dict[str, Any]) -> None:
+        self._pendentes[modelo].append(dados)
+        if len(self) >= self.batch_size or (
+            self.flush_interval > 0
+            and time.monotonic() - self._ultimo_flush >= self.flush_interval
+        ):
+            self.flush()
+
+    def flush(self) -> int:
+        """Grava os registros pendentes e retorna quantos foram gravados."""
+        total = 0
+        for modelo, linhas in self._pendentes.items():
+            if not linhas:
+                continue
+            # Agrupa por conjunto de colunas para que cada grupo vire um único
+            # INSERT multi-linha.
+            grupos: Dict[tuple, List[Dict[str, Any]]] = {}
+            for dados in linhas:
+                grupos.setdefault(tuple(sorted(dados)), []).append(dados)
+            for grupo in grupos.values():
+                self.db.execute(insert(modelo), grupo)
+            total += len(linhas)
+            linhas.clear()
+        self._ultimo_flush = time.monotonic()
+        return total
+
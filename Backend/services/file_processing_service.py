@@ -1,4 +1,5 @@
 # catalogai_project/Backend/services/file_processing_service.py
+import numpy as np
 import pandas as pd
 from pdfplumber import open as pdf_open
 import csv
@@ -7,11 +8,17 @@ import chardet
 import base64
 import os
 import asyncio
+import functools
+import itertools
+import weakref
 from sqlalchemy.orm import Session
-from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import multiprocessing
 from pdf2image import convert_from_bytes, convert_from_path
 import time
-from typing import List, Dict, Any, Union, Optional
+from contextlib import contextmanager
+from typing import List, Dict, Any, Union, Optional, Iterator, AsyncIterator, Callable, BinaryIO, Sequence
 from pathlib import Path
 from uuid import uuid4
 from fastapi import UploadFile, HTTPException
@@ -21,19 +28,83 @@ import pdfplumber
 from Backend.core.logging_config import get_logger
 from Backend.core.config import settings
 from Backend import models, crud_fornecedores, schemas
-from Backend.services import web_data_extractor_service
+from Backend.database import SessionLocal
+from Backend.services import ocr_service, web_data_extractor_service
+from Backend.services.render_cache import PageRenderCache, hash_conteudo, render_cache
 
 logger = get_logger(__name__)
 
-# Maximum number of worker threads used when processing PDF pages
+# Processos usados para gerar o preview de PDFs. Cada processo recebe um
+# intervalo contíguo de páginas e abre o documento uma única vez. ``0`` gera o
+# preview no próprio processo da API, em um único lote.
 MAX_PREVIEW_WORKERS = int(os.getenv("PDF_PREVIEW_WORKERS", "0"))
-_preview_executor = (
-    ThreadPoolExecutor(max_workers=MAX_PREVIEW_WORKERS)
-    if MAX_PREVIEW_WORKERS > 0
-    else None
+
+# Processos usados para extrair páginas de catálogos PDF completos. ``0`` mantém
+# a extração sequencial no próprio processo da API.
+MAX_EXTRACTION_WORKERS = int(os.getenv("PDF_EXTRACTION_WORKERS", "0"))
+# Quantidade de páginas enviadas de uma vez para cada processo.
+EXTRACTION_CHUNK_SIZE = int(os.getenv("PDF_EXTRACTION_CHUNK_SIZE", "25"))
+_extraction_executors: Dict[int, ProcessPoolExecutor] = {}
+
+# Bytes do início do CSV usados para detectar encoding e delimitador.
+CSV_DETECTION_BYTES = int(os.getenv("CSV_DETECTION_BYTES", str(64 * 1024)))
+# Produtos gravados por lote durante a importação de CSVs.
+CSV_BATCH_SIZE = int(os.getenv("CSV_BATCH_SIZE", "1000"))
+# Linhas lidas por bloco ao percorrer planilhas Excel.
+EXCEL_CHUNK_ROWS = int(os.getenv("EXCEL_CHUNK_ROWS", "5000"))
+
+# Threads usadas para o parsing (pandas, pdfplumber, chardet) fora do event loop.
+MAX_PARSER_WORKERS = int(os.getenv("PARSER_WORKERS", "4"))
+# Quantidade máxima de arquivos sendo processados ao mesmo tempo; os demais
+# aguardam (sem bloquear o event loop) até que uma vaga seja liberada.
+MAX_PARSER_JOBS = int(os.getenv("PARSER_MAX_CONCURRENT_JOBS", "0")) or MAX_PARSER_WORKERS
+_parser_executor = ThreadPoolExecutor(
+    max_workers=max(1, MAX_PARSER_WORKERS), thread_name_prefix="catalog-parser"
+)
+_parser_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
 )
 
 
+def _get_parser_slots() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    slots = _parser_slots.get(loop)
+    if slots is None:
+        slots = asyncio.Semaphore(max(1, MAX_PARSER_JOBS))
+        _parser_slots[loop] = slots
+    return slots
+
+
+async def executar_em_parser(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Executa ``func`` no executor de parsing, respeitando o limite de admissão.
+
+    Mantém o event loop livre para atender outras requisições enquanto um
+    catálogo grande é lido.
+    """
+    async with _get_parser_slots():
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _parser_executor, functools.partial(func, *args, **kwargs)
+        )
+
+
+_FIM_ITERACAO = object()
+
+
+async def iterar_em_parser(iterador: Iterator[Any]) -> AsyncIterator[Any]:
+    """Consome um iterador síncrono no executor de parsing, item a item."""
+    try:
+        while True:
+            item = await executar_em_parser(next, iterador, _FIM_ITERACAO)
+            if item is _FIM_ITERACAO:
+                return
+            yield item
+    finally:
+        close = getattr(iterador, "close", None)
+        if close:
+            await executar_em_parser(close)
+
+
 async def save_uploaded_catalog(
     file: UploadFile, fornecedor_id: Optional[int] = None
 ) -> models.CatalogImportFile:
@@ -81,6 +152,59 @@ def delete_catalog_file(stored_filename: str) -> None:
         logger.exception("Erro ao remover arquivo %s", stored_filename)
 
 
+# Mapeamento padrão (de nomes de coluna comuns em arquivos para nossos campos internos)
+# Chaves devem ser em minúsculo e sem espaços extra para matching.
+MAPEAMENTO_COLUNAS_PADRAO: Dict[str, str] = {
+    "nome": "nome_base",
+    "produto": "nome_base",
+    "item": "nome_base",
+    "title": "nome_base",
+    "título": "nome_base",
+    "titulo": "nome_base",
+    "sku": "sku_original",
+    "código": "sku_original",
+    "codigo": "sku_original",
+    "ref": "sku_original",
+    "referência": "sku_original",
+    "referencia": "sku_original",
+    "marca": "marca",
+    "fabricante": "marca",
+    "brand": "marca",
+    "categoria": "categoria_original",
+    "category": "categoria_original",
+    "descrição": "descricao_original",
+    "descricao": "descricao_original",
+    "description": "descricao_original",
+    "ean": "ean_original",
+    "gtin": "ean_original",
+    "upc": "ean_original",
+    "preço": "preco_original",
+    "preco": "preco_original",
+    "price": "preco_original",
+    "valor": "preco_original",
+    "url_imagem": "imagem_url_original",
+    "imagem": "imagem_url_original",
+    "image_url": "imagem_url_original",
+    # Adicionar mais mapeamentos comuns conforme necessário
+}
+
+# Valores considerados nulos após ``strip`` (comparação em minúsculo)
+VALORES_NULOS = frozenset(["", "nan", "none", "#n/a", "na", "<na>"])
+
+
+def _montar_mapeamento_colunas(
+    mapeamento_colunas_usuario: Optional[Dict[str, str]] = None,
+) -> Dict[str, str]:
+    """Combina o mapeamento padrão com o do usuário (que tem prioridade)."""
+    mapeamento_final = dict(MAPEAMENTO_COLUNAS_PADRAO)
+    if mapeamento_colunas_usuario:
+        # Normalizar chaves do mapeamento do usuário também
+        mapeamento_final.update(
+            {str(k).lower().strip(): v for k, v in mapeamento_colunas_usuario.items()}
+        )
+    return mapeamento_final
+
+
 def _limpar_valor_extraido(valor: Any) -> Optional[str]:
     """Helper para limpar strings ou converter outros tipos para string, retornando None se vazio."""
     if valor is None:
@@ -88,20 +212,129 @@ def _limpar_valor_extraido(valor: Any) -> Optional[str]:
     try:
         s = str(valor).strip()
         # Considerar 'nan', 'None' (string), '' como nulos após strip
-        if s.lower() in [
-            "",
-            "nan",
-            "none",
-            "#n/a",
-            "na",
-            "<na>",
-        ]:  # Adicionado #N/A, NA, <NA> comuns em planilhas
+        if s.lower() in VALORES_NULOS:  # Inclui #N/A, NA, <NA> comuns em planilhas
             return None
         return s
     except:
         return None
 
 
+def _limpar_valor_rapido(valor: Any) -> Optional[str]:
+    """Equivalente a :func:`_limpar_valor_extraido`, com atalho para strings."""
+    if valor is None:
+        return None
+    if type(valor) is str:
+        texto = valor.strip()
+        # Os marcadores de nulo têm no máximo 5 caracteres
+        if not texto or (len(texto) <= 5 and texto.lower() in VALORES_NULOS):
+            return None
+        return texto
+    return _limpar_valor_extraido(valor)
+
+
+class PlanoMapeamento:
+    """Mapeamento de colunas compilado uma vez para um conjunto de cabeçalhos.
+
+    Resolve, para cada posição de coluna, o campo de destino do Produto (ou a
+    chave em ``dados_brutos_adicionais``), de modo que as linhas do arquivo
+    possam ser padronizadas como tuplas, sem normalizar cabeçalhos nem montar
+    o mapeamento a cada linha.
+
+    Parameters
+    ----------
+    cabecalhos: Sequence[Any]
+        Nomes das colunas, na ordem em que os valores aparecem nas linhas.
+    mapeamento_colunas_usuario: Optional[Dict[str, str]]
+        Mapeamento informado pelo usuário; tem prioridade sobre o padrão.
+    """
+
+    __slots__ = ("cabecalhos", "_colunas")
+
+    def __init__(
+        self,
+        cabecalhos: Sequence[Any],
+        mapeamento_colunas_usuario: Optional[Dict[str, str]] = None,
+    ):
+        mapeamento_final = _montar_mapeamento_colunas(mapeamento_colunas_usuario)
+        self.cabecalhos = tuple(cabecalhos)
+        # (chave, mapeado?) para cada coluna, na ordem original
+        self._colunas = tuple(
+            (destino, True)
+            if (destino := mapeamento_final.get(str(nome).lower().strip()))
+            else (str(nome).strip(), False)
+            for nome in self.cabecalhos
+        )
+
+    def aplicar(
+        self,
+        valores: Sequence[Any],
+        linha_original: Optional[Dict[Any, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Padroniza uma linha cujos valores seguem a ordem de ``cabecalhos``.
+
+        ``linha_original`` só é usada (ou montada) quando a linha é descartada.
+        """
+        produto: Dict[str, Any] = {}
+        brutos: Dict[str, Any] = {}
+        for valor, (chave, mapeado) in zip(valores, self._colunas):
+            # Limpeza de _limpar_valor_rapido em linha (é o laço mais quente da importação)
+            if type(valor) is str:
+                valor = valor.strip()
+                if not valor or (len(valor) <= 5 and valor.lower() in VALORES_NULOS):
+                    continue
+            elif valor is None:
+                continue
+            else:
+                valor = _limpar_valor_extraido(valor)
+                if valor is None:  # Ignora células completamente vazias/nulas
+                    continue
+            if mapeado:
+                # Várias colunas para o mesmo campo: vale a primeira preenchida
+                if chave not in produto:
+                    produto[chave] = valor
+            else:
+                brutos[chave] = valor
+
+        # Garante que 'nome_base' ou 'sku_original' exista, senão a linha é pouco útil
+        if "nome_base" not in produto and "sku_original" not in produto:
+            if not brutos:
+                if linha_original is None:
+                    linha_original = dict(zip(self.cabecalhos, valores))
+                return {
+                    "motivo_descarte": "Faltam nome_base e sku_original",
+                    "linha_original": linha_original,
+                }
+            produto["nome_base"] = next(iter(brutos.values()))
+
+        # Adiciona os campos não mapeados ao dicionário principal
+        if brutos:
+            produto["dados_brutos_adicionais"] = brutos
+        return produto
+
+
+@functools.lru_cache(maxsize=128)
+def _plano_em_cache(
+    cabecalhos: tuple, mapeamento_usuario: Optional[tuple]
+) -> PlanoMapeamento:
+    return PlanoMapeamento(cabecalhos, dict(mapeamento_usuario) if mapeamento_usuario else None)
+
+
+def compilar_plano_mapeamento(
+    cabecalhos: Sequence[Any],
+    mapeamento_colunas_usuario: Optional[Dict[str, str]] = None,
+) -> PlanoMapeamento:
+    """Retorna o :class:`PlanoMapeamento` dos cabeçalhos, reaproveitando planos já compilados."""
+    try:
+        mapeamento = (
+            tuple(sorted(mapeamento_colunas_usuario.items(), key=lambda kv: str(kv[0])))
+            if mapeamento_colunas_usuario
+            else None
+        )
+        return _plano_em_cache(tuple(cabecalhos), mapeamento)
+    except TypeError:  # cabeçalhos ou mapeamento não "hasheáveis"
+        return PlanoMapeamento(cabecalhos, mapeamento_colunas_usuario)
+
+
 def _processar_linha_padronizada(
     linha_original: Dict[str, Any],
     mapeamento_colunas_usuario: Optional[Dict[str, str]] = None,
@@ -112,103 +345,278 @@ def _processar_linha_padronizada(
     para campos do Produto (ex: {"Nome do Item no Arquivo": "nome_base"}).
     Retorna um dicionário com chaves padronizadas ('nome_base', 'marca', etc.) e
     um campo 'dados_brutos_originais' com todos os campos não mapeados ou não reconhecidos.
-    """
-    produto_dados_padronizados: Dict[str, Any] = {}
-    dados_brutos_nao_mapeados: Dict[str, Any] = {}
-
-    # Mapeamento padrão (de nomes de coluna comuns em arquivos para nossos campos internos)
-    # Chaves devem ser em minúsculo e sem espaços extra para matching.
-    mapeamento_default = {
-        "nome": "nome_base",
-        "produto": "nome_base",
-        "item": "nome_base",
-        "title": "nome_base",
-        "título": "nome_base",
-        "titulo": "nome_base",
-        "sku": "sku_original",
-        "código": "sku_original",
-        "codigo": "sku_original",
-        "ref": "sku_original",
-        "referência": "sku_original",
-        "referencia": "sku_original",
-        "marca": "marca",
-        "fabricante": "marca",
-        "brand": "marca",
-        "categoria": "categoria_original",
-        "category": "categoria_original",
-        "descrição": "descricao_original",
-        "descricao": "descricao_original",
-        "description": "descricao_original",
-        "ean": "ean_original",
-        "gtin": "ean_original",
-        "upc": "ean_original",
-        "preço": "preco_original",
-        "preco": "preco_original",
-        "price": "preco_original",
-        "valor": "preco_original",
-        "url_imagem": "imagem_url_original",
-        "imagem": "imagem_url_original",
-        "image_url": "imagem_url_original",
-        # Adicionar mais mapeamentos comuns conforme necessário
-    }
-
-    # Se o usuário fornecer um mapeamento, ele tem prioridade
-    mapeamento_final = mapeamento_default.copy()
-    if mapeamento_colunas_usuario:
-        # Normalizar chaves do mapeamento do usuário também
-        mapeamento_usuario_norm = {
-            str(k).lower().strip(): v for k, v in mapeamento_colunas_usuario.items()
-        }
-        mapeamento_final.update(mapeamento_usuario_norm)
-
-    for nome_coluna_original, valor_original in linha_original.items():
-        valor_limpo = _limpar_valor_extraido(valor_original)
-        if valor_limpo is None:  # Ignora células completamente vazias/nulas
-            continue
 
-        nome_coluna_norm = str(nome_coluna_original).lower().strip()
-        campo_produto_destino = mapeamento_final.get(nome_coluna_norm)
+    Para arquivos com muitas linhas prefira :func:`compilar_plano_mapeamento`
+    e :meth:`PlanoMapeamento.aplicar`, que evitam o trabalho por linha com os
+    cabeçalhos.
+    """
+    plano = compilar_plano_mapeamento(list(linha_original.keys()), mapeamento_colunas_usuario)
+    return plano.aplicar(list(linha_original.values()), linha_original)
+
+
+def _limpar_coluna(coluna: pd.Series) -> pd.Series:
+    """Versão vetorizada de :func:`_limpar_valor_extraido` para uma coluna inteira."""
+    nulos = coluna.isna().to_numpy()
+    if nulos.all():
+        return pd.Series([None] * len(coluna), index=coluna.index, dtype=object)
+    if pd.api.types.is_datetime64_any_dtype(coluna.dtype):
+        # ``astype(str)`` omite a hora quando todas as datas são meia-noite;
+        # a linha a linha usa ``str(Timestamp)``, que sempre a inclui.
+        texto = coluna.map(str)
+    else:
+        texto = coluna.astype(str)
+    if not (
+        pd.api.types.is_numeric_dtype(coluna.dtype)
+        or pd.api.types.is_datetime64_any_dtype(coluna.dtype)
+    ):
+        # Números e datas não têm espaços nem marcadores de nulo textuais
+        texto = texto.str.strip()
+        nulos |= texto.str.lower().isin(VALORES_NULOS).to_numpy()
+    return texto.astype(object).where(~nulos, None)
+
+
+def _combinar_colunas(principal: pd.Series, alternativa: pd.Series) -> pd.Series:
+    """Mantém o valor de ``principal`` e usa ``alternativa`` onde ele é nulo."""
+    return principal.where(principal.notna(), alternativa)
+
+
+def normalizar_dataframe(
+    df: pd.DataFrame,
+    mapeamento_colunas_usuario: Optional[Dict[str, str]] = None,
+    product_type_id: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Padroniza todas as linhas de um DataFrame com operações por coluna.
 
-        if campo_produto_destino:
-            # Se o campo destino já existe e tem valor, não sobrescreve com um valor "menos específico"
-            # (ex: se "nome_base" já foi pego de "produto", não sobrescrever com "item" se "item" for menos completo)
-            # Esta lógica de prioridade pode ser complexa; por ora, simples atribuição se não preenchido.
-            if campo_produto_destino not in produto_dados_padronizados:
-                produto_dados_padronizados[campo_produto_destino] = valor_limpo
-            # Ou uma lógica para concatenar/escolher o melhor valor se múltiplos mapearem para o mesmo campo
+    Produz o mesmo resultado de aplicar :func:`_processar_linha_padronizada`
+    linha a linha, mas o mapeamento é resolvido uma vez por DataFrame e a
+    limpeza (valores nulos, ``strip``, conversão para texto) é feita sobre
+    colunas inteiras. Os dicionários por linha só são montados no final.
+    """
+    if df.empty:
+        return []
+
+    mapeamento_final = _montar_mapeamento_colunas(mapeamento_colunas_usuario)
+    campos: Dict[str, pd.Series] = {}
+    extras: List[tuple] = []
+    for idx, nome_coluna in enumerate(df.columns):
+        coluna = _limpar_coluna(df.iloc[:, idx])
+        destino = mapeamento_final.get(str(nome_coluna).lower().strip())
+        if destino:
+            # Várias colunas para o mesmo campo: vale a primeira não nula
+            campos[destino] = (
+                _combinar_colunas(campos[destino], coluna) if destino in campos else coluna
+            )
         else:
-            # Guarda campos não mapeados diretamente em dados_brutos_originais
-            dados_brutos_nao_mapeados[str(nome_coluna_original).strip()] = valor_limpo
-
-    # Garante que 'nome_base' ou 'sku_original' exista, senão a linha é pouco útil
-    if not produto_dados_padronizados.get(
-        "nome_base"
-    ) and not produto_dados_padronizados.get("sku_original"):
-        # Se não tem nome_base nem sku, mas tem outros dados, tenta pegar o primeiro valor não nulo como nome_base
-        if dados_brutos_nao_mapeados:
-            primeiro_valor_util = next(
-                (v for v in dados_brutos_nao_mapeados.values() if v), None
+            extras.append((str(nome_coluna).strip(), coluna))
+
+    identificador = campos.get("nome_base")
+    if "sku_original" in campos:
+        identificador = (
+            campos["sku_original"]
+            if identificador is None
+            else _combinar_colunas(identificador, campos["sku_original"])
+        )
+    sem_identificador = (
+        np.ones(len(df), dtype=bool)
+        if identificador is None
+        else identificador.isna().to_numpy()
+    )
+    nome_alternativo: Optional[pd.Series] = None
+    if sem_identificador.any():
+        for _, coluna in extras:
+            nome_alternativo = (
+                coluna if nome_alternativo is None else _combinar_colunas(nome_alternativo, coluna)
             )
-            if primeiro_valor_util:
-                produto_dados_padronizados["nome_base"] = primeiro_valor_util
-            else:  # Se realmente não há nada que possa ser um nome/identificador
-                return {
+
+    nomes_campos = list(campos)
+    nomes_extras = [nome for nome, _ in extras]
+    linhas_campos = zip(*(campos[c].to_numpy() for c in nomes_campos)) if campos else itertools.repeat(())
+    linhas_extras = zip(*(coluna.to_numpy() for _, coluna in extras)) if extras else itertools.repeat(())
+    alternativos = (
+        nome_alternativo.to_numpy()
+        if nome_alternativo is not None
+        else itertools.repeat(None)
+    )
+
+    produtos: List[Dict[str, Any]] = []
+    for i, valores, valores_extras, alternativo in zip(
+        range(len(df)), linhas_campos, linhas_extras, alternativos
+    ):
+        produto = {
+            campo: valor for campo, valor in zip(nomes_campos, valores) if valor is not None
+        }
+        if sem_identificador[i]:
+            if alternativo is None:
+                linha_original = {
+                    col: val if pd.notna(val) else None
+                    for col, val in df.iloc[i].to_dict().items()
+                }
+                produto = {
                     "motivo_descarte": "Faltam nome_base e sku_original",
                     "linha_original": linha_original,
                 }
+                if product_type_id is not None:
+                    produto["product_type_id"] = product_type_id
+                produtos.append(produto)
+                continue
+            produto["nome_base"] = alternativo
+        adicionais = {
+            nome: valor for nome, valor in zip(nomes_extras, valores_extras) if valor is not None
+        }
+        if adicionais:
+            produto["dados_brutos_adicionais"] = adicionais
+        if product_type_id is not None:
+            produto["product_type_id"] = product_type_id
+        produtos.append(produto)
+    return produtos
+
+
+class PdfDocumentSession:
+    """Mantém um PDF aberto para extração página a página.
+
+    O documento é parseado uma única vez na abertura da sessão e reutilizado
+    em todas as chamadas seguintes. Os objetos de layout de cada página
+    (caracteres, linhas, tabelas) são descartados ao sair de
+    :meth:`open_page`, de modo que o consumo de memória não cresce com o
+    número de páginas já processadas.
+
+    Parameters
+    ----------
+    source: Union[bytes, str, Path]
+        Conteúdo do PDF em memória ou caminho do arquivo em disco.
+    """
+
+    def __init__(self, source: Union[bytes, str, Path]):
+        self.source = source
+        if isinstance(source, (bytes, bytearray)):
+            self._pdf = pdfplumber.open(io.BytesIO(source))
         else:
-            return {
-                "motivo_descarte": "Faltam nome_base e sku_original",
-                "linha_original": linha_original,
-            }
+            self._pdf = pdfplumber.open(source)
 
-    # Adiciona os campos não mapeados ao dicionário principal
-    if dados_brutos_nao_mapeados:
-        produto_dados_padronizados["dados_brutos_adicionais"] = (
-            dados_brutos_nao_mapeados
-        )
+    @property
+    def num_pages(self) -> int:
+        return len(self._pdf.pages)
+
+    def page(self, page_number: int):
+        """Retorna a página ``page_number`` (1-indexada) do documento."""
+        if not (1 <= page_number <= self.num_pages):
+            raise ValueError(
+                f"Número de página inválido: {page_number}. PDF tem {self.num_pages} páginas."
+            )
+        return self._pdf.pages[page_number - 1]
+
+    @contextmanager
+    def open_page(self, page_number: int) -> Iterator[Any]:
+        """Fornece a página e libera seus objetos de layout ao final do uso."""
+        page = self.page(page_number)
+        try:
+            yield page
+        finally:
+            page.flush_cache()
+
+    def close(self) -> None:
+        self._pdf.close()
+
+    def __enter__(self) -> "PdfDocumentSession":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class PdfPageRenderer:
+    """Rasteriza páginas de um PDF com PyMuPDF a partir de um único documento.
+
+    O PDF é aberto e parseado uma vez; cada página pedida depois é apenas
+    renderizada, sem iniciar processos externos nem reler o arquivo inteiro.
+
+    Parameters
+    ----------
+    source: Union[bytes, str, Path]
+        Conteúdo do PDF em memória ou caminho do arquivo em disco.
+    """
+
+    def __init__(self, source: Union[bytes, str, Path]):
+        import fitz  # PyMuPDF
+
+        if isinstance(source, (bytes, bytearray)):
+            self._doc = fitz.open(stream=bytes(source), filetype="pdf")
+        else:
+            self._doc = fitz.open(str(source))
+
+    @property
+    def num_pages(self) -> int:
+        return self._doc.page_count
+
+    def render(self, page_number: int, dpi: int):
+        """Retorna a página ``page_number`` (1-indexada) como imagem RGB do Pillow."""
+        from PIL import Image
+
+        if not (1 <= page_number <= self.num_pages):
+            raise ValueError(
+                f"Número de página inválido: {page_number}. PDF tem {self.num_pages} páginas."
+            )
+        pix = self._doc.load_page(page_number - 1).get_pixmap(dpi=dpi, alpha=False)
+        return Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+
+    def close(self) -> None:
+        self._doc.close()
+
+    def __enter__(self) -> "PdfPageRenderer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def classificar_paginas_pdf(
+    source: Union[bytes, str, Path], page_numbers: Optional[Sequence[int]] = None
+) -> List[Dict[str, Any]]:
+    """Classifica rapidamente as páginas de um PDF antes da extração.
 
-    return produto_dados_padronizados
+    Usa PyMuPDF, sem montar o layout completo do pdfplumber, para marcar em
+    cada página:
+
+    * ``has_text_layer``: a página tem texto extraível;
+    * ``has_ruling_lines``: há linhas ou retângulos desenhados, necessários
+      para a estratégia ``lines`` de extração de tabelas;
+    * ``image_only``: sem texto e com imagens (página escaneada).
+
+    Parameters
+    ----------
+    source: Union[bytes, str, Path]
+        Conteúdo do PDF em memória ou caminho do arquivo em disco.
+    page_numbers: Optional[Sequence[int]]
+        Páginas (1-indexadas) a classificar. Padrão: todas.
+    """
+    import fitz  # PyMuPDF
+
+    if isinstance(source, (bytes, bytearray)):
+        doc = fitz.open(stream=bytes(source), filetype="pdf")
+    else:
+        doc = fitz.open(str(source))
+    classes: List[Dict[str, Any]] = []
+    with doc:
+        if page_numbers is None:
+            page_numbers = range(1, doc.page_count + 1)
+        for page_number in page_numbers:
+            page = doc.load_page(page_number - 1)
+            has_text = bool(page.get_text("text").strip())
+            # Páginas sem texto nunca geram tabelas; não vale varrer os desenhos
+            has_lines = has_text and any(
+                item[0] in ("l", "re")
+                for drawing in page.get_drawings()
+                for item in drawing["items"]
+            )
+            classes.append(
+                {
+                    "page": page_number,
+                    "has_text_layer": has_text,
+                    "has_ruling_lines": has_lines,
+                    "image_only": not has_text and bool(page.get_images()),
+                }
+            )
+    return classes
 
 
 async def processar_arquivo_excel(
@@ -217,210 +625,614 @@ async def processar_arquivo_excel(
     sheet_name: Optional[str] = None,
     product_type_id: Optional[int] = None,
 ) -> List[Dict[str, Any]]:
-    produtos_extraidos: List[Dict[str, Any]] = []
-    try:
-        xls = pd.ExcelFile(io.BytesIO(conteudo_arquivo))
-        abas_processar = [sheet_name] if sheet_name else xls.sheet_names
+    return await executar_em_parser(
+        _processar_arquivo_excel_sync,
+        conteudo_arquivo,
+        mapeamento_colunas_usuario,
+        sheet_name,
+        product_type_id,
+    )
 
-        for aba in abas_processar:
-            df = pd.read_excel(xls, sheet_name=aba)
-            df.dropna(how="all", inplace=True)
 
-            for _, linha_pandas in df.iterrows():
-                linha_dict_raw = {
-                    col: val if pd.notna(val) else None
-                    for col, val in linha_pandas.to_dict().items()
-                }
-                produto_padronizado = _processar_linha_padronizada(
-                    linha_dict_raw, mapeamento_colunas_usuario
-                )
-                if produto_padronizado:
-                    if product_type_id is not None:
-                        produto_padronizado["product_type_id"] = product_type_id
-                    produtos_extraidos.append(produto_padronizado)
+def _processar_arquivo_excel_sync(
+    conteudo_arquivo: Union[bytes, str, Path],
+    mapeamento_colunas_usuario: Optional[Dict[str, str]] = None,
+    sheet_name: Optional[str] = None,
+    product_type_id: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    produtos_extraidos: List[Dict[str, Any]] = []
+    try:
+        for lote in iterar_lotes_excel(
+            conteudo_arquivo, mapeamento_colunas_usuario, product_type_id, sheet_name
+        ):
+            produtos_extraidos.extend(lote)
         return produtos_extraidos
     except Exception as e:
         logger.error("Erro ao processar arquivo Excel: %s", e)
         return [{"erro_processamento_excel": f"Falha ao ler arquivo Excel: {str(e)}"}]
 
 
+def _eh_xlsx(fonte: Union[bytes, str, Path]) -> bool:
+    """Arquivos .xlsx são pacotes zip; .xls (formato binário antigo) não."""
+    if isinstance(fonte, (bytes, bytearray)):
+        return bytes(fonte[:4]) == b"PK\x03\x04"
+    with open(fonte, "rb") as f:
+        return f.read(4) == b"PK\x03\x04"
+
+
+def _cabecalhos_excel(linha: tuple) -> List[str]:
+    """Gera nomes de coluna como o ``pd.read_excel`` (vazios e duplicados)."""
+    cabecalhos: List[str] = []
+    vistos: Dict[str, int] = {}
+    for idx, valor in enumerate(linha):
+        nome = f"Unnamed: {idx}" if valor is None or str(valor).strip() == "" else valor
+        chave = str(nome)
+        if chave in vistos:
+            vistos[chave] += 1
+            nome = f"{chave}.{vistos[chave]}"
+        else:
+            vistos[chave] = 0
+        cabecalhos.append(nome)
+    return cabecalhos
+
+
+def iterar_dataframes_excel(
+    fonte: Union[bytes, str, Path],
+    sheet_name: Optional[Union[str, int]] = None,
+    tamanho_lote: Optional[int] = None,
+    max_linhas: Optional[int] = None,
+) -> Iterator[pd.DataFrame]:
+    """Lê uma planilha em blocos de ``EXCEL_CHUNK_ROWS`` linhas.
+
+    Arquivos .xlsx são lidos com o modo ``read_only`` do openpyxl, que percorre
+    as linhas sem carregar a planilha inteira na memória. Arquivos .xls são
+    lidos pelo pandas (sem streaming) e divididos nos mesmos blocos.
+
+    Parameters
+    ----------
+    sheet_name: Optional[Union[str, int]]
+        Nome ou índice da aba a ser lida. ``None`` percorre todas as abas.
+    max_linhas: Optional[int]
+        Interrompe a leitura após esse número de linhas de dados por aba.
+    """
+    tamanho_lote = tamanho_lote or EXCEL_CHUNK_ROWS
+    if max_linhas is not None:
+        tamanho_lote = min(tamanho_lote, max(1, max_linhas))
+
+    if not _eh_xlsx(fonte):
+        origem = io.BytesIO(fonte) if isinstance(fonte, (bytes, bytearray)) else fonte
+        xls = pd.ExcelFile(origem)
+        for aba in [sheet_name] if sheet_name is not None else xls.sheet_names:
+            df = pd.read_excel(xls, sheet_name=aba, nrows=max_linhas)
+            for inicio in range(0, len(df), tamanho_lote):
+                yield df.iloc[inicio : inicio + tamanho_lote]
+        return
+
+    import openpyxl
+
+    origem = io.BytesIO(fonte) if isinstance(fonte, (bytes, bytearray)) else fonte
+    workbook = openpyxl.load_workbook(origem, read_only=True, data_only=True)
+    try:
+        if sheet_name is None:
+            abas = workbook.worksheets
+        elif isinstance(sheet_name, int):
+            abas = [workbook.worksheets[sheet_name]]
+        else:
+            abas = [workbook[sheet_name]]
+        for aba in abas:
+            linhas = aba.iter_rows(values_only=True)
+            # Linhas vazias antes do cabeçalho são ignoradas, como no pandas
+            cabecalho = next(
+                (linha for linha in linhas if any(v is not None for v in linha)), None
+            )
+            if cabecalho is None:
+                continue
+            colunas = _cabecalhos_excel(cabecalho)
+            lidas = 0
+            while max_linhas is None or lidas < max_linhas:
+                limite = (
+                    tamanho_lote if max_linhas is None else min(tamanho_lote, max_linhas - lidas)
+                )
+                bloco = [
+                    tuple(linha[: len(colunas)]) + (None,) * (len(colunas) - len(linha))
+                    for linha in itertools.islice(linhas, limite)
+                ]
+                if not bloco:
+                    break
+                lidas += len(bloco)
+                yield pd.DataFrame.from_records(bloco, columns=colunas)
+    finally:
+        workbook.close()
+
+
+def iterar_lotes_excel(
+    fonte: Union[bytes, str, Path],
+    mapeamento_colunas_usuario: Optional[Dict[str, str]] = None,
+    product_type_id: Optional[int] = None,
+    sheet_name: Optional[str] = None,
+    tamanho_lote: Optional[int] = None,
+) -> Iterator[List[Dict[str, Any]]]:
+    """Gera os produtos padronizados de uma planilha, um bloco por vez."""
+    for df in iterar_dataframes_excel(fonte, sheet_name, tamanho_lote):
+        df = df.dropna(how="all")
+        if not df.empty:
+            yield normalizar_dataframe(df, mapeamento_colunas_usuario, product_type_id)
+
+
 async def processar_arquivo_csv(
     conteudo_arquivo: bytes,
     mapeamento_colunas_usuario: Optional[Dict[str, str]] = None,
     product_type_id: Optional[int] = None,
 ) -> List[Dict[str, Any]]:
-    produtos_extraidos: List[Dict[str, Any]] = []
+    return await executar_em_parser(
+        _processar_arquivo_csv_sync,
+        conteudo_arquivo,
+        mapeamento_colunas_usuario,
+        product_type_id,
+    )
+
+
+def _processar_arquivo_csv_sync(
+    conteudo_arquivo: bytes,
+    mapeamento_colunas_usuario: Optional[Dict[str, str]] = None,
+    product_type_id: Optional[int] = None,
+) -> List[Dict[str, Any]]:
     try:
-        # Detectar encoding usando chardet para lidar com diferentes formatos
-        try:
-            import chardet  # Lazy import para evitar dependência desnecessária em outros caminhos
+        return list(
+            iterar_linhas_csv(conteudo_arquivo, mapeamento_colunas_usuario, product_type_id)
+        )
+    except Exception as e:
+        logger.error("Erro ao processar arquivo CSV: %s", e)
+        return [{"erro_processamento_csv": f"Falha ao ler arquivo CSV: {str(e)}"}]
 
-            detection = chardet.detect(conteudo_arquivo)
-            encoding_detectada = (detection.get("encoding") or "utf-8").lower()
-        except Exception:  # Falha na detecção: assume utf-8
-            encoding_detectada = "utf-8"
 
-        if encoding_detectada.startswith("utf-8"):
-            conteudo_str = conteudo_arquivo.decode("utf-8-sig", errors="replace")
-        else:
-            conteudo_str = conteudo_arquivo.decode(encoding_detectada, errors="replace")
+def _detectar_formato_csv(prefixo: bytes) -> tuple:
+    """Detecta encoding e delimitador a partir do início do arquivo."""
+    # Detectar encoding usando chardet para lidar com diferentes formatos
+    try:
+        import chardet  # Lazy import para evitar dependência desnecessária em outros caminhos
+
+        detection = chardet.detect(prefixo)
+        encoding_detectada = (detection.get("encoding") or "utf-8").lower()
+    except Exception:  # Falha na detecção: assume utf-8
+        encoding_detectada = "utf-8"
+
+    # ASCII puro no prefixo não garante ASCII no resto do arquivo
+    if encoding_detectada.startswith("utf-8") or encoding_detectada == "ascii":
+        encoding_detectada = "utf-8-sig"
+
+    # Detectar delimitador usando csv.Sniffer em uma amostra de linhas
+    amostra = prefixo.decode(encoding_detectada, errors="replace")
+    linhas = amostra.splitlines()
+    if len(linhas) > 1 and not amostra.endswith(("\n", "\r")):
+        linhas = linhas[:-1]  # a última linha do prefixo pode estar truncada
+    sample = "\n".join(linhas[:5])
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=[",", ";", "\t", "|"])
+        delimitador_provavel = dialect.delimiter
+    except Exception:
+        delimitador_provavel = ","
+        primeira_linha = linhas[0] if linhas else ""
+        if ";" in primeira_linha:
+            delimitador_provavel = ";"
+        elif "\t" in primeira_linha:
+            delimitador_provavel = "\t"
+    return encoding_detectada, delimitador_provavel
 
-        # Detectar delimitador usando csv.Sniffer em uma amostra de linhas
-        linhas = conteudo_str.splitlines()
-        sample = "\n".join(linhas[:5]) if linhas else conteudo_str
+
+def iterar_linhas_csv(
+    fonte: Union[bytes, str, Path, BinaryIO],
+    mapeamento_colunas_usuario: Optional[Dict[str, str]] = None,
+    product_type_id: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Lê um CSV em streaming e gera os produtos padronizados linha a linha.
+
+    Encoding e delimitador são detectados apenas nos primeiros
+    ``CSV_DETECTION_BYTES`` bytes, então o uso de memória não depende do
+    tamanho do arquivo.
+
+    Parameters
+    ----------
+    fonte: Union[bytes, str, Path, BinaryIO]
+        Conteúdo do arquivo, caminho no disco ou stream binário já aberto.
+    """
+    if isinstance(fonte, (bytes, bytearray)):
+        stream: BinaryIO = io.BytesIO(fonte)
+        stream_proprio = True
+    elif isinstance(fonte, (str, Path)):
+        stream = open(fonte, "rb")
+        stream_proprio = True
+    else:
+        stream = fonte
+        stream_proprio = False
+
+    try:
+        if stream.seekable():
+            inicio = stream.tell()
+            prefixo = stream.read(CSV_DETECTION_BYTES)
+            stream.seek(inicio)
+        else:
+            stream = io.BufferedReader(stream, buffer_size=CSV_DETECTION_BYTES)
+            prefixo = stream.peek(CSV_DETECTION_BYTES)[:CSV_DETECTION_BYTES]
+        encoding, delimitador = _detectar_formato_csv(prefixo)
+        texto = io.TextIOWrapper(stream, encoding=encoding, errors="replace", newline="")
         try:
-            dialect = csv.Sniffer().sniff(sample, delimiters=[",", ";", "\t", "|"])
-            delimitador_provavel = dialect.delimiter
-        except Exception:
-            delimitador_provavel = ","
-            primeira_linha = (
-                conteudo_str.splitlines()[0] if conteudo_str.splitlines() else ""
+            leitor = csv.reader(texto, delimiter=delimitador)
+            cabecalho = next(leitor, None)
+            if cabecalho is None:
+                return
+            total_colunas = len(cabecalho)
+            # Com cabeçalhos repetidos a linha vira dicionário (o último valor
+            # vence), como no csv.DictReader
+            plano = (
+                compilar_plano_mapeamento(cabecalho, mapeamento_colunas_usuario)
+                if len(set(cabecalho)) == total_colunas
+                else None
             )
-            if ";" in primeira_linha:
-                delimitador_provavel = ";"
-            elif "\t" in primeira_linha:
-                delimitador_provavel = "\t"
+            for linha in leitor:
+                if not linha:  # linhas em branco são ignoradas
+                    continue
+                if len(linha) < total_colunas:
+                    linha = linha + [None] * (total_colunas - len(linha))
+                if plano is not None and len(linha) == total_colunas:
+                    produto_padronizado = plano.aplicar(linha)
+                else:
+                    linha_dict_raw = dict(zip(cabecalho, linha))
+                    if len(linha) > total_colunas:
+                        linha_dict_raw[None] = linha[total_colunas:]
+                    produto_padronizado = _processar_linha_padronizada(
+                        linha_dict_raw, mapeamento_colunas_usuario
+                    )
+                if produto_padronizado:
+                    if product_type_id is not None:
+                        produto_padronizado["product_type_id"] = product_type_id
+                    yield produto_padronizado
+        finally:
+            texto.detach()
+    finally:
+        if stream_proprio:
+            stream.close()
 
-        leitor_csv = csv.DictReader(
-            io.StringIO(conteudo_str), delimiter=delimitador_provavel
+
+def iterar_lotes_csv(
+    fonte: Union[bytes, str, Path, BinaryIO],
+    mapeamento_colunas_usuario: Optional[Dict[str, str]] = None,
+    product_type_id: Optional[int] = None,
+    tamanho_lote: Optional[int] = None,
+) -> Iterator[List[Dict[str, Any]]]:
+    """Agrupa :func:`iterar_linhas_csv` em lotes de ``CSV_BATCH_SIZE`` produtos."""
+    tamanho_lote = tamanho_lote or CSV_BATCH_SIZE
+    linhas = iterar_linhas_csv(fonte, mapeamento_colunas_usuario, product_type_id)
+    while True:
+        lote = list(itertools.islice(linhas, tamanho_lote))
+        if not lote:
+            return
+        yield lote
+
+
+def _extrair_produtos_tabelas(
+    page,
+    page_num: int,
+    mapeamento_colunas_usuario: Optional[Dict[str, str]],
+    product_type_id: Optional[int],
+    log_pdf: List[str],
+) -> List[Dict[str, Any]]:
+    """Converte as tabelas de uma página em produtos padronizados."""
+    produtos: List[Dict[str, Any]] = []
+    # Tenta extrair tabelas da página
+    # Configurações para extração de tabela podem ser ajustadas
+    tables = page.extract_tables(
+        table_settings={
+            "vertical_strategy": "lines",  # ou "text"
+            "horizontal_strategy": "lines",  # ou "text"
+        }
+    )
+    if not tables:
+        log_pdf.append(
+            f"Página {page_num}: Nenhuma tabela encontrada com as configurações atuais."
         )
-        for linha_dict_raw in leitor_csv:
+        return produtos
+
+    log_pdf.append(f"Página {page_num}: Encontradas {len(tables)} tabelas.")
+    for table_num, table_data in enumerate(tables):
+        if (
+            not table_data or len(table_data) < 2
+        ):  # Precisa de cabeçalho e pelo menos uma linha de dados
+            log_pdf.append(
+                f"Página {page_num}, Tabela {table_num+1}: Tabela vazia ou sem dados suficientes."
+            )
+            continue
+
+        headers_raw = table_data[0]
+        headers = [
+            _limpar_valor_extraido(h) or f"coluna_vazia_{idx}"
+            for idx, h in enumerate(headers_raw)
+        ]
+
+        for row_idx, row_data in enumerate(table_data[1:]):
+            if len(row_data) != len(headers):
+                log_pdf.append(
+                    f"Página {page_num}, Tabela {table_num+1}, Linha {row_idx+1}: Número de colunas ({len(row_data)}) não corresponde ao cabeçalho ({len(headers)}). Pulando."
+                )
+                continue
+
+            linha_dict_raw = {
+                headers[col_idx]: cell_data
+                for col_idx, cell_data in enumerate(row_data)
+            }
             produto_padronizado = _processar_linha_padronizada(
                 linha_dict_raw, mapeamento_colunas_usuario
             )
             if produto_padronizado:
                 if product_type_id is not None:
                     produto_padronizado["product_type_id"] = product_type_id
-                produtos_extraidos.append(produto_padronizado)
-        return produtos_extraidos
-    except Exception as e:
-        logger.error("Erro ao processar arquivo CSV: %s", e)
-        return [{"erro_processamento_csv": f"Falha ao ler arquivo CSV: {str(e)}"}]
+                produtos.append(produto_padronizado)
+    return produtos
 
 
-async def processar_arquivo_pdf(
-    conteudo_arquivo: bytes,
+def _extrair_pagina_catalogo(
+    session: PdfDocumentSession,
+    pdf_path: Optional[str],
+    page_num: int,
     mapeamento_colunas_usuario: Optional[Dict[str, str]] = None,
-    usar_llm: bool = True,
     product_type_id: Optional[int] = None,
-    pages: Optional[List[int]] = None,
-) -> List[Dict[str, Any]]:
-    produtos_extraidos: List[Dict[str, Any]] = []
+    classes_paginas: Optional[Dict[int, Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    """Extrai os produtos (ou o texto, na falta de tabelas) de uma página.
+
+    O resultado contém apenas tipos simples para poder ser devolvido por um
+    processo da :class:`PdfPageExtractionEngine`. Com ``classes_paginas``
+    (veja :func:`classificar_paginas_pdf`) as páginas sem camada de texto não
+    passam pelo pdfplumber e as sem linhas não passam pela busca de tabelas.
+    """
     log_pdf: List[str] = []
+    texto: Optional[str] = None
+    produtos: List[Dict[str, Any]] = []
+    classe = (classes_paginas or {}).get(page_num)
+    if classe and not classe["has_text_layer"]:
+        log_pdf.append(f"Página {page_num}: Sem camada de texto; extração ignorada.")
+        return {"page": page_num, "produtos": produtos, "texto": texto, "log": log_pdf}
     try:
-        with pdfplumber.open(io.BytesIO(conteudo_arquivo)) as pdf:
-            log_pdf.append(f"PDF com {len(pdf.pages)} páginas.")
-            for i, page in enumerate(pdf.pages):
-                page_num = i + 1
-                if pages and page_num not in pages:
-                    continue
-                # Tenta extrair tabelas da página
-                # Configurações para extração de tabela podem ser ajustadas
-                tables = page.extract_tables(
-                    table_settings={
-                        "vertical_strategy": "lines",  # ou "text"
-                        "horizontal_strategy": "lines",  # ou "text"
-                    }
+        with session.open_page(page_num) as page:
+            if classe is None or classe["has_ruling_lines"]:
+                produtos = _extrair_produtos_tabelas(
+                    page, page_num, mapeamento_colunas_usuario, product_type_id, log_pdf
                 )
-                if tables:
-                    log_pdf.append(f"Página {i+1}: Encontradas {len(tables)} tabelas.")
-                    for table_num, table_data in enumerate(tables):
-                        if (
-                            not table_data or len(table_data) < 2
-                        ):  # Precisa de cabeçalho e pelo menos uma linha de dados
-                            log_pdf.append(
-                                f"Página {i+1}, Tabela {table_num+1}: Tabela vazia ou sem dados suficientes."
-                            )
-                            continue
-
-                        headers_raw = table_data[0]
-                        headers = [
-                            _limpar_valor_extraido(h) or f"coluna_vazia_{idx}"
-                            for idx, h in enumerate(headers_raw)
-                        ]
-
-                        for row_idx, row_data in enumerate(table_data[1:]):
-                            if len(row_data) != len(headers):
-                                log_pdf.append(
-                                    f"Página {i+1}, Tabela {table_num+1}, Linha {row_idx+1}: Número de colunas ({len(row_data)}) não corresponde ao cabeçalho ({len(headers)}). Pulando."
-                                )
-                                continue
-
-                            linha_dict_raw = {
-                                headers[col_idx]: cell_data
-                                for col_idx, cell_data in enumerate(row_data)
-                            }
-                            produto_padronizado = _processar_linha_padronizada(
-                                linha_dict_raw, mapeamento_colunas_usuario
-                            )
-                            if produto_padronizado:
-                                if product_type_id is not None:
-                                    produto_padronizado["product_type_id"] = (
-                                        product_type_id
-                                    )
-                                produtos_extraidos.append(produto_padronizado)
-                else:
-                    log_pdf.append(
-                        f"Página {i+1}: Nenhuma tabela encontrada com as configurações atuais."
+            else:
+                log_pdf.append(f"Página {page_num}: Sem linhas de tabela; usando o texto.")
+            if not produtos:
+                texto = page.extract_text(x_tolerance=2, y_tolerance=2)
+    except Exception as e:
+        logger.error("Erro ao extrair a página %s do PDF: %s", page_num, e)
+        log_pdf.append(f"Página {page_num}: Erro ao extrair dados: {str(e)}")
+        produtos = []
+    return {"page": page_num, "produtos": produtos, "texto": texto, "log": log_pdf}
+
+
+def _extrair_pagina_estruturada(
+    session: PdfDocumentSession,
+    pdf_path: Optional[str],
+    page_num: int,
+    classes_paginas: Optional[Dict[int, Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    """Versão de :func:`extract_data_from_single_page` usada pela engine.
+
+    O OCR fica pendente e é feito para o lote inteiro em
+    :func:`_extrair_paginas_sessao`.
+    """
+    try:
+        result = extract_data_from_single_page(
+            pdf_path,
+            page_num,
+            session=session,
+            ocr=False,
+            classe=(classes_paginas or {}).get(page_num),
+        )
+    except Exception as e:  # pragma: no cover - robustness
+        logger.error("Erro ao extrair dados da pagina %s: %s", page_num, e)
+        result = {"headers": [], "rows": [], "error": str(e)}
+    result["page"] = page_num
+    return result
+
+
+def _extrair_lote_paginas(
+    extrator: Callable[..., Dict[str, Any]],
+    pdf_path: str,
+    page_numbers: List[int],
+    extrator_kwargs: Dict[str, Any],
+) -> List[Dict[str, Any]]:
+    """Ponto de entrada dos processos: abre o PDF uma vez para o lote inteiro."""
+    with PdfDocumentSession(pdf_path) as session:
+        # Os próprios processos de extração já dão o paralelismo; o OCR roda
+        # neles em vez de abrir uma segunda pool por worker.
+        return _extrair_paginas_sessao(
+            extrator, session, pdf_path, page_numbers, extrator_kwargs, ocr_paralelo=False
+        )
+
+
+def _extrair_paginas_sessao(
+    extrator: Callable[..., Dict[str, Any]],
+    session: PdfDocumentSession,
+    pdf_path: Optional[str],
+    page_numbers: List[int],
+    extrator_kwargs: Dict[str, Any],
+    ocr_paralelo: bool = True,
+) -> List[Dict[str, Any]]:
+    resultados = [
+        extrator(session, pdf_path, page_num, **extrator_kwargs)
+        for page_num in page_numbers
+    ]
+    # Páginas sem texto extraível são enviadas juntas para o OCR
+    pendentes = [r for r in resultados if r.pop("ocr_pendente", False)]
+    if pendentes and pdf_path:
+        try:
+            textos = ocr_service.ocr_paginas_pdf(
+                pdf_path, [r["page"] for r in pendentes], paralelo=ocr_paralelo
+            )
+        except Exception as e:  # pragma: no cover - optional dependency might be missing
+            logger.error("Erro ao executar OCR das páginas do PDF: %s", e)
+            textos = {}
+        for resultado in pendentes:
+            ocr_pagina = textos.get(resultado["page"])
+            tabela = _tabela_texto_ocr(ocr_pagina) if ocr_pagina else None
+            if tabela:
+                resultado["headers"], resultado["rows"] = tabela
+    return resultados
+
+
+def _get_extraction_executor(max_workers: int) -> ProcessPoolExecutor:
+    executor = _extraction_executors.get(max_workers)
+    if executor is None:
+        # ``spawn`` evita herdar threads e conexões abertas do processo da API
+        executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        _extraction_executors[max_workers] = executor
+    return executor
+
+
+class PdfPageExtractionEngine:
+    """Distribui a extração de páginas de um PDF entre processos.
+
+    As páginas são divididas em lotes contíguos de ``chunk_size`` páginas;
+    cada lote é processado por um worker que abre o PDF uma única vez. Os
+    resultados são devolvidos página a página, sempre na ordem solicitada,
+    assim que o lote correspondente termina, o que permite atualizar o
+    progresso da importação de forma incremental.
+
+    Parameters
+    ----------
+    max_workers: Optional[int]
+        Número de processos. ``0`` executa a extração sequencialmente no
+        processo atual. Padrão ``PDF_EXTRACTION_WORKERS``.
+    chunk_size: Optional[int]
+        Páginas por lote. Padrão ``PDF_EXTRACTION_CHUNK_SIZE``.
+    """
+
+    def __init__(
+        self, max_workers: Optional[int] = None, chunk_size: Optional[int] = None
+    ):
+        self.max_workers = (
+            MAX_EXTRACTION_WORKERS if max_workers is None else max(0, max_workers)
+        )
+        self.chunk_size = max(1, chunk_size or EXTRACTION_CHUNK_SIZE)
+
+    async def iter_pages(
+        self,
+        pdf_path: str,
+        page_numbers: List[int],
+        extrator: Callable[..., Dict[str, Any]] = _extrair_pagina_catalogo,
+        session: Optional[PdfDocumentSession] = None,
+        **extrator_kwargs: Any,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Gera o resultado de cada página de ``page_numbers`` em ordem.
+
+        ``session`` é reutilizada apenas no modo sequencial; os processos
+        sempre abrem o arquivo a partir de ``pdf_path``.
+        """
+        lotes = [
+            page_numbers[i : i + self.chunk_size]
+            for i in range(0, len(page_numbers), self.chunk_size)
+        ]
+
+        if self.max_workers <= 0:
+            # Mesmo sem processos extras, cada lote roda no executor de parsing
+            # para não bloquear o event loop.
+            pdf_session = session or await executar_em_parser(PdfDocumentSession, pdf_path)
+            try:
+                for lote in lotes:
+                    resultados = await executar_em_parser(
+                        _extrair_paginas_sessao,
+                        extrator,
+                        pdf_session,
+                        pdf_path,
+                        lote,
+                        extrator_kwargs,
                     )
+                    for resultado in resultados:
+                        yield resultado
+            finally:
+                if session is None:
+                    pdf_session.close()
+            return
 
-            if (
-                not produtos_extraidos and len(pdf.pages) > 0
-            ):  # Fallback se nenhuma tabela extraiu dados
-                log_pdf.append(
-                    "Nenhum produto extraído de tabelas. Extraindo texto de todas as páginas."
+        loop = asyncio.get_running_loop()
+        executor = _get_extraction_executor(self.max_workers)
+        lotes_restantes = iter(lotes)
+        pendentes: deque = deque()
+
+        def _enviar_proximo_lote() -> None:
+            lote = next(lotes_restantes, None)
+            if lote:
+                pendentes.append(
+                    loop.run_in_executor(
+                        executor,
+                        _extrair_lote_paginas,
+                        extrator,
+                        pdf_path,
+                        lote,
+                        extrator_kwargs,
+                    )
                 )
-                for i, page in enumerate(pdf.pages):
-                    page_num = i + 1
-                    if pages and page_num not in pages:
-                        continue
-                    page_text = page.extract_text(x_tolerance=2, y_tolerance=2)
-                    if page_text and page_text.strip():
-                        log_pdf.append(f"Página {i+1}: Texto extraído.")
-                        texto_chave = f"texto_completo_pagina_{i+1}"
-                        if usar_llm:
-                            try:
-                                dados_produto = await web_data_extractor_service.extrair_dados_produto_com_llm(
-                                    page_text
-                                )
-                                if isinstance(dados_produto, dict):
-                                    dados_produto["texto_bruto"] = page_text.strip()[
-                                        :20000
-                                    ]
-                                    if product_type_id is not None:
-                                        dados_produto["product_type_id"] = (
-                                            product_type_id
-                                        )
-                                    produtos_extraidos.append(dados_produto)
-                                else:
-                                    item = {
-                                        "nome_base": f"Texto da página {i+1}",
-                                        "dados_brutos_adicionais": {
-                                            texto_chave: page_text.strip()[:20000]
-                                        },
-                                    }
-                                    if product_type_id is not None:
-                                        item["product_type_id"] = product_type_id
-                                    produtos_extraidos.append(item)
-                                log_pdf.append(
-                                    f"Página {i+1}: Texto processado com LLM."
-                                )
-                            except Exception as llm_e:
-                                log_pdf.append(
-                                    f"Página {i+1}: Erro ao extrair dados com LLM: {str(llm_e)}"
-                                )
-                                item = {
-                                    "nome_base": f"Conteúdo Bruto da Página {i+1} do PDF",
-                                    "dados_brutos_adicionais": {
-                                        texto_chave: page_text.strip()[:20000]
-                                    },
-                                }
-                                if product_type_id is not None:
-                                    item["product_type_id"] = product_type_id
-                                produtos_extraidos.append(item)
+
+        # Mantém no máximo dois lotes por worker em andamento para limitar a
+        # memória ocupada por resultados ainda não consumidos.
+        for _ in range(self.max_workers * 2):
+            _enviar_proximo_lote()
+        try:
+            while pendentes:
+                resultados = await pendentes.popleft()
+                _enviar_proximo_lote()
+                for resultado in resultados:
+                    yield resultado
+        finally:
+            for futuro in pendentes:
+                futuro.cancel()
+
+
+async def montar_produtos_pdf(
+    resultados_paginas: List[Dict[str, Any]],
+    usar_llm: bool = True,
+    product_type_id: Optional[int] = None,
+    log_pdf: Optional[List[str]] = None,
+) -> List[Dict[str, Any]]:
+    """Combina os resultados de :func:`_extrair_pagina_catalogo` em produtos.
+
+    Se nenhuma tabela gerou produtos, o texto das páginas é usado como
+    fallback (opcionalmente interpretado pelo LLM).
+    """
+    log_pdf = log_pdf if log_pdf is not None else []
+    produtos_extraidos: List[Dict[str, Any]] = []
+    for resultado in resultados_paginas:
+        log_pdf.extend(resultado["log"])
+        produtos_extraidos.extend(resultado["produtos"])
+
+    if (
+        not produtos_extraidos and resultados_paginas
+    ):  # Fallback se nenhuma tabela extraiu dados
+        log_pdf.append(
+            "Nenhum produto extraído de tabelas. Extraindo texto de todas as páginas."
+        )
+        for resultado in resultados_paginas:
+            page_num = resultado["page"]
+            page_text = resultado["texto"]
+            if page_text and page_text.strip():
+                log_pdf.append(f"Página {page_num}: Texto extraído.")
+                texto_chave = f"texto_completo_pagina_{page_num}"
+                if usar_llm:
+                    try:
+                        dados_produto = await web_data_extractor_service.extrair_dados_produto_com_llm(
+                            page_text
+                        )
+                        if isinstance(dados_produto, dict):
+                            dados_produto["texto_bruto"] = page_text.strip()[:20000]
+                            if product_type_id is not None:
+                                dados_produto["product_type_id"] = product_type_id
+                            produtos_extraidos.append(dados_produto)
                         else:
                             item = {
-                                "nome_base": f"Conteúdo da Página {i+1}",
+                                "nome_base": f"Texto da página {page_num}",
                                 "dados_brutos_adicionais": {
                                     texto_chave: page_text.strip()[:20000]
                                 },
@@ -428,23 +1240,73 @@ async def processar_arquivo_pdf(
                             if product_type_id is not None:
                                 item["product_type_id"] = product_type_id
                             produtos_extraidos.append(item)
-                            log_pdf.append(
-                                f"Página {i+1}: Texto armazenado sem uso do LLM."
-                            )
-                    else:
+                        log_pdf.append(f"Página {page_num}: Texto processado com LLM.")
+                    except Exception as llm_e:
                         log_pdf.append(
-                            f"Página {i+1}: Nenhum texto extraível encontrado."
+                            f"Página {page_num}: Erro ao extrair dados com LLM: {str(llm_e)}"
                         )
-
-            if not produtos_extraidos:  # Se ainda vazio
-                return [
-                    {
-                        "erro_processamento_pdf": "Nenhum dado de produto pôde ser extraído do PDF.",
-                        "log_pdf": log_pdf,
+                        item = {
+                            "nome_base": f"Conteúdo Bruto da Página {page_num} do PDF",
+                            "dados_brutos_adicionais": {
+                                texto_chave: page_text.strip()[:20000]
+                            },
+                        }
+                        if product_type_id is not None:
+                            item["product_type_id"] = product_type_id
+                        produtos_extraidos.append(item)
+                else:
+                    item = {
+                        "nome_base": f"Conteúdo da Página {page_num}",
+                        "dados_brutos_adicionais": {
+                            texto_chave: page_text.strip()[:20000]
+                        },
                     }
-                ]
+                    if product_type_id is not None:
+                        item["product_type_id"] = product_type_id
+                    produtos_extraidos.append(item)
+                    log_pdf.append(f"Página {page_num}: Texto armazenado sem uso do LLM.")
+            else:
+                log_pdf.append(f"Página {page_num}: Nenhum texto extraível encontrado.")
 
-        return produtos_extraidos
+    if not produtos_extraidos:  # Se ainda vazio
+        return [
+            {
+                "erro_processamento_pdf": "Nenhum dado de produto pôde ser extraído do PDF.",
+                "log_pdf": log_pdf,
+            }
+        ]
+
+    return produtos_extraidos
+
+
+async def processar_arquivo_pdf(
+    conteudo_arquivo: bytes,
+    mapeamento_colunas_usuario: Optional[Dict[str, str]] = None,
+    usar_llm: bool = True,
+    product_type_id: Optional[int] = None,
+    pages: Optional[List[int]] = None,
+    session: Optional[PdfDocumentSession] = None,
+) -> List[Dict[str, Any]]:
+    """Extrai produtos das tabelas (ou do texto) de um PDF.
+
+    Quando ``session`` é informada, o documento já parseado é reutilizado e
+    ``conteudo_arquivo`` é ignorado. Isso permite processar um catálogo página
+    a página sem reabrir o PDF inteiro a cada chamada.
+    """
+    log_pdf: List[str] = []
+    try:
+        resultados = await executar_em_parser(
+            _extrair_paginas_pdf,
+            conteudo_arquivo,
+            session,
+            pages,
+            mapeamento_colunas_usuario,
+            product_type_id,
+            log_pdf,
+        )
+        return await montar_produtos_pdf(
+            resultados, usar_llm=usar_llm, product_type_id=product_type_id, log_pdf=log_pdf
+        )
     except Exception as e:
         import traceback
 
@@ -458,20 +1320,72 @@ async def processar_arquivo_pdf(
         ]
 
 
+def _extrair_paginas_pdf(
+    conteudo_arquivo: bytes,
+    session: Optional[PdfDocumentSession],
+    pages: Optional[List[int]],
+    mapeamento_colunas_usuario: Optional[Dict[str, str]],
+    product_type_id: Optional[int],
+    log_pdf: List[str],
+) -> List[Dict[str, Any]]:
+    """Parte síncrona de :func:`processar_arquivo_pdf` (roda no executor)."""
+    sessao_propria = session is None
+    if sessao_propria:
+        session = PdfDocumentSession(conteudo_arquivo)
+    try:
+        num_pages = session.num_pages
+        log_pdf.append(f"PDF com {num_pages} páginas.")
+        if pages:
+            paginas_alvo = sorted(p for p in set(pages) if 1 <= p <= num_pages)
+        else:
+            paginas_alvo = list(range(1, num_pages + 1))
+
+        classes_paginas = {
+            c["page"]: c for c in classificar_paginas_pdf(session.source, paginas_alvo)
+        }
+        return [
+            _extrair_pagina_catalogo(
+                session,
+                None,
+                page_num,
+                mapeamento_colunas_usuario,
+                product_type_id,
+                classes_paginas,
+            )
+            for page_num in paginas_alvo
+        ]
+    finally:
+        if sessao_propria:
+            session.close()
+
+
 async def preview_arquivo_excel(
     conteudo_arquivo: bytes, max_rows: int = 5
 ) -> Dict[str, Any]:
-    """Retorna cabeçalhos e linhas de amostra de um arquivo Excel."""
+    """Retorna cabeçalhos e linhas de amostra de um arquivo Excel.
+
+    Apenas as primeiras ``max_rows`` linhas da primeira aba são lidas.
+    """
     try:
-        df = pd.read_excel(io.BytesIO(conteudo_arquivo), sheet_name=0)
-        headers = [str(col) for col in df.columns]
-        sample_rows = df.head(max_rows).fillna("").to_dict(orient="records")
-        return {"headers": headers, "sample_rows": sample_rows}
+        return await executar_em_parser(
+            _preview_arquivo_excel_sync, conteudo_arquivo, max_rows
+        )
     except Exception as e:
         logger.error("Erro ao gerar preview de arquivo Excel: %s", e)
         return {"error": f"Falha ao ler arquivo Excel: {str(e)}"}
 
 
+def _preview_arquivo_excel_sync(
+    conteudo_arquivo: bytes, max_rows: int
+) -> Dict[str, Any]:
+    blocos = iterar_dataframes_excel(conteudo_arquivo, sheet_name=0, max_linhas=max_rows)
+    df = next(blocos, pd.DataFrame())
+    blocos.close()
+    headers = [str(col) for col in df.columns]
+    sample_rows = df.head(max_rows).fillna("").to_dict(orient="records")
+    return {"headers": headers, "sample_rows": sample_rows}
+
+
 async def preview_arquivo_csv(
     conteudo_arquivo: bytes, max_rows: int = 5
 ) -> Dict[str, Any]:
@@ -509,12 +1423,145 @@ async def preview_arquivo_csv(
         return {"error": f"Falha ao ler arquivo CSV: {str(e)}"}
 
 
+# Miniaturas servidas como arquivos estáticos; o nome deriva do conteúdo do
+# PDF, então a URL nunca muda de conteúdo e pode ser cacheada indefinidamente.
+THUMBNAIL_URL_PREFIX = "/static/previews/thumbs"
+
+
+def diretorio_miniaturas() -> Path:
+    """Diretório das miniaturas (``PREVIEW_DIRECTORY/thumbs``), servido em ``THUMBNAIL_URL_PREFIX``."""
+    directory = Path(settings.PREVIEW_DIRECTORY) / "thumbs"
+    if not directory.is_absolute():
+        directory = Path(__file__).resolve().parent.parent / directory
+    return directory
+
+
+_caches_miniaturas: Dict[Path, PageRenderCache] = {}
+
+
+def cache_miniaturas() -> PageRenderCache:
+    """Cache LRU de :func:`diretorio_miniaturas`, limitado por ``PREVIEW_THUMBNAIL_MAX_MB``.
+
+    O layout de :class:`PageRenderCache` (``hash[:2]/hash_página_dpi.formato``)
+    é o mesmo das URLs das miniaturas, então o diretório é servido diretamente.
+    """
+    directory = diretorio_miniaturas()
+    cache = _caches_miniaturas.get(directory)
+    if cache is None:
+        cache = _caches_miniaturas.setdefault(
+            directory,
+            PageRenderCache(directory, settings.PREVIEW_THUMBNAIL_MAX_MB * 1024 * 1024),
+        )
+    return cache
+
+
+def _formato_imagem(image_bytes: bytes) -> str:
+    return "png" if image_bytes.startswith(b"\x89PNG") else "jpeg"
+
+
+def _codificar_miniatura(image) -> tuple:
+    """Codifica a miniatura uma única vez, no formato mais adequado.
+
+    Páginas com poucas cores (texto, tabelas, desenhos) ficam menores em PNG
+    com paleta; páginas com fotos, em JPEG. A decisão usa o número de cores da
+    imagem em vez de codificar nos dois formatos e comparar os tamanhos.
+    """
+    buf = io.BytesIO()
+    if image.getcolors(maxcolors=256) is not None:
+        image.convert("RGB").quantize(colors=256).save(buf, format="PNG", optimize=True)
+        return buf.getvalue(), "png"
+    image.convert("RGB").save(buf, format="JPEG", optimize=True, quality=70)
+    return buf.getvalue(), "jpeg"
+
+
+def _url_miniatura(file_hash: str, page: int, dpi: int, ext: str) -> str:
+    return f"{THUMBNAIL_URL_PREFIX}/{file_hash[:2]}/{file_hash}_{page}_{dpi}.{ext}"
+
+
+def _miniatura_em_disco(cache: PageRenderCache, file_hash: str, page: int, dpi: int) -> Optional[str]:
+    """URL da miniatura já gravada para a página, se existir."""
+    for ext in ("png", "jpeg"):
+        if cache.contem(file_hash, page, dpi, ext):
+            return _url_miniatura(file_hash, page, dpi, ext)
+    return None
+
+
+def _ler_miniatura(cache: PageRenderCache, file_hash: str, page: int, dpi: int) -> Optional[bytes]:
+    for ext in ("png", "jpeg"):
+        image_bytes = cache.get(file_hash, page, dpi, ext)
+        if image_bytes is not None:
+            return image_bytes
+    return None
+
+
+def _salvar_miniatura(
+    cache: PageRenderCache, file_hash: str, page: int, dpi: int, image_bytes: bytes
+) -> str:
+    """Grava a miniatura no cache de miniaturas e retorna sua URL."""
+    ext = _formato_imagem(image_bytes)
+    cache.put(file_hash, page, dpi, ext, image_bytes)
+    return _url_miniatura(file_hash, page, dpi, ext)
+
+
+def _preview_paginas_pdf(
+    conteudo_arquivo: bytes,
+    pages: Sequence[int],
+    dpi: int,
+    file_hash: str,
+    image_mode: str,
+) -> List[Dict[str, Any]]:
+    """Gera o preview de um intervalo de páginas abrindo o PDF uma única vez.
+
+    Executada no processo da API ou em um worker de
+    :func:`preview_arquivo_pdf`; por isso recebe apenas argumentos simples.
+    """
+    results: List[Dict[str, Any]] = []
+    miniaturas = cache_miniaturas()
+    with PdfDocumentSession(conteudo_arquivo) as session, PdfPageRenderer(
+        conteudo_arquivo
+    ) as renderer:
+        for p in pages:
+            with session.open_page(p) as page:
+                tables = page.extract_tables()
+                text = page.extract_text() or ""
+            result: Dict[str, Any] = {
+                "page": p,
+                "has_table": bool(tables),
+                "snippet": "\n".join(text.splitlines()[:3]),
+            }
+
+            def _render(p: int = p) -> bytes:
+                return _codificar_miniatura(renderer.render(p, dpi))[0]
+
+            # As miniaturas ficam só no cache de miniaturas (servido como
+            # estático); sem ele, o modo url volta às imagens embutidas.
+            if image_mode == "url" and miniaturas.enabled:
+                thumb = _miniatura_em_disco(miniaturas, file_hash, p, dpi)
+                if thumb is None:
+                    thumb = _salvar_miniatura(miniaturas, file_hash, p, dpi, _render())
+                result["preview_image"] = {"page": p, "url": thumb}
+            else:
+                image_bytes = _ler_miniatura(miniaturas, file_hash, p, dpi)
+                if image_bytes is None:
+                    image_bytes = _render()
+                    _salvar_miniatura(miniaturas, file_hash, p, dpi, image_bytes)
+                mime = _formato_imagem(image_bytes)
+                b64 = base64.b64encode(image_bytes).decode()
+                result["preview_image"] = {
+                    "page": p,
+                    "image": f"data:image/{mime};base64,{b64}",
+                }
+            results.append(result)
+    return results
+
+
 async def preview_arquivo_pdf(
     conteudo_arquivo: bytes,
     ext: str,
     start_page: int = 1,
     page_count: int = 1,
     dpi: int = 72,
+    image_mode: str = "inline",
 ) -> Dict[str, Any]:
     """Gera preview de um PDF com miniaturas e extração de texto.
 
@@ -532,11 +1579,16 @@ async def preview_arquivo_pdf(
         identificar tabelas e gerar imagens.
     dpi: int, optional
         Resolução usada ao converter as páginas em imagem. Padrão ``72``.
-
-    As páginas são processadas em paralelo usando ``asyncio`` e a pool de
-    ``ThreadPoolExecutor`` padrão do Python. O número de threads segue o limite
-    ``min(32, os.cpu_count() + 4)`` a menos que outro executor seja
-    configurado.
+    image_mode: str, optional
+        ``"inline"`` (padrão) devolve as miniaturas como data URIs base64.
+        ``"url"`` grava cada miniatura uma única vez em
+        ``/static/previews/thumbs`` e devolve apenas a URL, o que reduz o
+        tamanho da resposta e permite cache no navegador.
+
+    O PDF é aberto uma única vez por lote de páginas (pdfplumber para texto e
+    tabelas, PyMuPDF para as miniaturas). Com ``PDF_PREVIEW_WORKERS`` > 0 o
+    intervalo é dividido em lotes contíguos processados em paralelo por
+    processos; caso contrário, um único lote é processado fora do event loop.
     """
 
     start = time.perf_counter()
@@ -557,75 +1609,34 @@ async def preview_arquivo_pdf(
             "preview_images": [],
         }
 
-        poppler_dir = os.getenv("POPPLER_PATH") or settings.POPPLER_PATH
-        kwargs = {"poppler_path": poppler_dir} if poppler_dir else {}
-
-        def _process_page(p: int) -> Dict[str, Any]:
-            """Extract information for a single page."""
-            with pdf_open(io.BytesIO(conteudo_arquivo)) as r:
-                page = r.pages[p - 1]
-                tables = page.extract_tables()
-                result: Dict[str, Any] = {"page": p, "has_table": bool(tables)}
-
-                text = page.extract_text() or ""
-                image = convert_from_bytes(
-                    conteudo_arquivo,
-                    first_page=p,
-                    last_page=p,
-                    fmt="png",
-                    dpi=dpi,
-                    **kwargs,
-                )[0]
-
-                png_buf = io.BytesIO()
-                image.save(png_buf, format="PNG")
-                png_b64 = base64.b64encode(png_buf.getvalue())
-
-                jpeg_buf = io.BytesIO()
-                image.convert("RGB").save(
-                    jpeg_buf,
-                    format="JPEG",
-                    optimize=True,
-                    quality=70,
-                )
-                jpeg_b64 = base64.b64encode(jpeg_buf.getvalue())
-
-                if len(jpeg_b64) >= len(png_b64):
-                    jpeg_buf = io.BytesIO()
-                    image.convert("RGB").save(
-                        jpeg_buf,
-                        format="JPEG",
-                        optimize=True,
-                        quality=50,
+        # Miniaturas já geradas para este conteúdo vêm do cache de renderização
+        file_hash = hash_conteudo(conteudo_arquivo)
+        pages = list(range(start_page, end_page + 1))
+
+        if MAX_PREVIEW_WORKERS > 0 and len(pages) > 1:
+            # Um intervalo contíguo de páginas por processo
+            n_lotes = min(MAX_PREVIEW_WORKERS, len(pages))
+            tamanho = -(-len(pages) // n_lotes)
+            executor = _get_extraction_executor(MAX_PREVIEW_WORKERS)
+            lotes = await asyncio.gather(
+                *[
+                    loop.run_in_executor(
+                        executor,
+                        _preview_paginas_pdf,
+                        conteudo_arquivo,
+                        pages[i : i + tamanho],
+                        dpi,
+                        file_hash,
+                        image_mode,
                     )
-                    jpeg_b64 = base64.b64encode(jpeg_buf.getvalue())
-
-                if len(jpeg_b64) < len(png_b64):
-                    b64 = jpeg_b64.decode()
-                    mime = "jpeg"
-                else:
-                    b64 = png_b64.decode()
-                    mime = "png"
-
-                snippet = "\n".join(text.splitlines()[:3])
-                result.update(
-                    {
-                        "snippet": snippet,
-                        "preview_image": {
-                            "page": p,
-                            "image": f"data:image/{mime};base64,{b64}",
-                        },
-                    }
-                )
-
-            return result
-
-        executor = _preview_executor
-        tasks = [
-            loop.run_in_executor(executor, _process_page, p)
-            for p in range(start_page, end_page + 1)
-        ]
-        results = await asyncio.gather(*tasks)
+                    for i in range(0, len(pages), tamanho)
+                ]
+            )
+            results = list(itertools.chain.from_iterable(lotes))
+        else:
+            results = await executar_em_parser(
+                _preview_paginas_pdf, conteudo_arquivo, pages, dpi, file_hash, image_mode
+            )
 
         for r in sorted(results, key=lambda x: x["page"]):
             if r.get("has_table"):
@@ -721,20 +1732,33 @@ def pdf_pages_to_images(db: Session, file: UploadFile, fornecedor_id: int, user_
         try:
             poppler_path = settings.POPPLER_PATH if settings.POPPLER_PATH else None
             
-            # USA O CONTEÚDO EM MEMÓRIA PARA CONVERTER AS IMAGENS
-            images = convert_from_bytes(
-                content, # <-- MUDANÇA IMPORTANTE: usa o conteúdo em memória
-                dpi=200,
-                poppler_path=poppler_path,
-                first_page=first_page_to_convert,
-                last_page=last_page_to_convert
+            def _render_pages(pages: List[int]) -> Dict[int, bytes]:
+                # USA O CONTEÚDO EM MEMÓRIA PARA CONVERTER AS IMAGENS (um único
+                # intervalo com todas as páginas que ainda não estão em cache)
+                images = convert_from_bytes(
+                    content,
+                    dpi=200,
+                    poppler_path=poppler_path,
+                    first_page=pages[0],
+                    last_page=pages[-1],
+                )
+                rendered: Dict[int, bytes] = {}
+                for page_number, image in zip(range(pages[0], pages[-1] + 1), images):
+                    if page_number in pages:
+                        buf = io.BytesIO()
+                        image.save(buf, "PNG")
+                        rendered[page_number] = buf.getvalue()
+                return rendered
+
+            page_numbers = list(range(first_page_to_convert, last_page_to_convert + 1))
+            rendered_pages = render_cache.get_or_render_many(
+                hash_conteudo(content), page_numbers, 200, "png", _render_pages
             )
 
-            for i, image in enumerate(images):
-                page_number = offset + i + 1
+            for page_number in page_numbers:
                 image_filename = f"preview_{import_file.id}_{page_number}.png"
                 image_path = previews_dir / image_filename
-                image.save(image_path, "PNG")
+                image_path.write_bytes(rendered_pages[page_number])
                 
                 image_url = f"/static/previews/{image_filename}"
                 image_urls.append(image_url)
@@ -837,20 +1861,35 @@ async def extrair_pagina_pdf(
             bbox = tuple(map(float, region))
             page_to_process = page.crop(bbox)
 
-        image = convert_from_bytes(
-            conteudo_pdf,
-            first_page=page_number,
-            last_page=page_number,
-            dpi=200,
-            fmt="png",
-        )[0]
-
-        buf = io.BytesIO()
-        image.save(buf, format="PNG")
-        image_b64 = base64.b64encode(buf.getvalue()).decode()
+        def _render_page() -> bytes:
+            image = convert_from_bytes(
+                conteudo_pdf,
+                first_page=page_number,
+                last_page=page_number,
+                dpi=200,
+                fmt="png",
+            )[0]
+            buf = io.BytesIO()
+            image.save(buf, format="PNG")
+            return buf.getvalue()
+
+        image_bytes = render_cache.get_or_render(
+            hash_conteudo(conteudo_pdf), page_number, 200, "png", _render_page
+        )
+        image_b64 = base64.b64encode(image_bytes).decode()
 
         text = page_to_process.extract_text() or ""
 
+    if not text.strip() and not region:
+        # Página escaneada: usa o OCR (já em cache se a página foi importada)
+        try:
+            resultado_ocr = await executar_em_parser(
+                ocr_service.ocr_pagina_pdf, conteudo_pdf, page_number
+            )
+            text = resultado_ocr["text"]
+        except Exception as e:  # pragma: no cover - optional dependency might be missing
+            logger.error("Erro ao executar OCR da página do PDF: %s", e)
+
     # Use temporary file path for table extraction
     tmp_path = Path(os.getenv("TMPDIR", "/tmp")) / f"temp_{uuid.uuid4().hex}.pdf"
     tmp_path.write_bytes(conteudo_pdf)
@@ -869,9 +1908,30 @@ async def extrair_pagina_pdf(
 
 
 async def process_pdf_job(
-    job_id: int, pdf_path: str, start_page: int = 1, mapping: Optional[Dict[str, str]] = None
+    job_id: int,
+    pdf_path: str,
+    start_page: int = 1,
+    mapping: Optional[Dict[str, str]] = None,
+    reraise: bool = False,
 ) -> None:
-    """Process remaining pages of a PDF catalog import job."""
+    """Process remaining pages of a PDF catalog import job.
+
+    The PDF is parsed once and the same :class:`PdfDocumentSession` is reused
+    for every page, so the per-page cost does not grow with the page number.
+    With ``PDF_EXTRACTION_WORKERS`` > 0 the pages are extracted by a
+    :class:`PdfPageExtractionEngine` process pool instead.
+
+    Each page's products are checkpointed in ``catalog_import_page_results``
+    in the same transaction that advances ``pages_processed``. Running the job
+    again (see ``POST /fornecedores/import/resume/{job_id}``) skips the pages
+    already stored, so an interrupted import continues where it stopped.
+    ``result_summary`` keeps only ``start_page`` and ``mapping``; the products
+    are read from the checkpoints on demand.
+
+    With ``reraise=True`` (used by the job queue) an error is re-raised after
+    the file is marked ``FAILED``, so the queue retries the job from the last
+    checkpoint.
+    """
 
     db: Optional[Session] = None
     catalog_file: Optional[models.CatalogImportFile] = None
@@ -882,50 +1942,91 @@ async def process_pdf_job(
             logger.error("CatalogImportFile %s not found", job_id)
             return
 
-        with pdfplumber.open(pdf_path) as pdf:
-            total_pages = len(pdf.pages)
-
-        catalog_file.status = "PROCESSING"
-        catalog_file.total_pages = total_pages
-        catalog_file.pages_processed = 0
-        db.commit()
-
-        products: List[Dict[str, Any]] = []
-
-        for page in range(start_page, total_pages + 1):
-            try:
-                raw_rows = extract_data_from_single_page(pdf_path, page)
-            except Exception as e:  # pragma: no cover - robustness
-                logger.error("Erro ao extrair dados da pagina %s: %s", page, e)
-                continue
+        concluidas = crud_fornecedores.get_catalog_import_checkpoints(db, job_id)
+
+        with PdfDocumentSession(pdf_path) as pdf_session:
+            total_pages = pdf_session.num_pages
+            pendentes = [
+                p for p in range(start_page, total_pages + 1) if p not in concluidas
+            ]
+
+            catalog_file.status = "PROCESSING"
+            catalog_file.total_pages = total_pages
+            catalog_file.pages_processed = len(concluidas)
+            # Parâmetros guardados para que o job possa ser retomado
+            catalog_file.result_summary = {"start_page": start_page, "mapping": mapping}
+            if catalog_file.page_classes is None:
+                catalog_file.page_classes = await executar_em_parser(
+                    classificar_paginas_pdf, pdf_path
+                )
+            db.commit()
+            if concluidas:
+                logger.info(
+                    "Retomando job %s: %s página(s) já processada(s)", job_id, len(concluidas)
+                )
 
-            for row in raw_rows:
-                produto = _processar_linha_padronizada(row, mapping)
-                if produto:
-                    products.append(produto)
+            engine = PdfPageExtractionEngine()
+
+            async for page_data in engine.iter_pages(
+                pdf_path,
+                pendentes,
+                extrator=_extrair_pagina_estruturada,
+                session=pdf_session,
+                classes_paginas={c["page"]: c for c in catalog_file.page_classes},
+            ):
+                products: List[Dict[str, Any]] = []
+                headers = page_data.get("headers") or []
+                for values in page_data.get("rows") or []:
+                    row = {
+                        header or f"coluna_vazia_{idx}": value
+                        for idx, (header, value) in enumerate(zip(headers, values))
+                    }
+                    produto = _processar_linha_padronizada(row, mapping)
+                    if produto:
+                        products.append(produto)
 
-            catalog_file.pages_processed += 1
-            if catalog_file.pages_processed % 5 == 0:
-                db.commit()
+                crud_fornecedores.save_catalog_import_page(
+                    db, catalog_file, page_data["page"], products
+                )
 
-        catalog_file.result_summary = {"products": products}
+        # Os produtos ficam só nos checkpoints por página e são servidos
+        # paginados por ``GET /fornecedores/import/products/{job_id}``.
         catalog_file.status = "PENDING_REVIEW"
         db.commit()
     except Exception:
         logger.exception("Erro ao processar job de PDF")
         if db and catalog_file:
+            db.rollback()
             catalog_file.status = "FAILED"
             db.commit()
+        if reraise:
+            raise
     finally:
         if db:
             db.close()
-  
-def extract_data_from_single_page(file_path: str, page_number: int) -> Dict[str, Any]:
+
+
+def _tabela_texto_ocr(resultado_ocr: Dict[str, Any]) -> Optional[tuple]:
+    """Converte o texto do OCR em ``(headers, rows)``, se houver texto."""
+    lines = [l.strip() for l in resultado_ocr["text"].splitlines() if l.strip()]
+    if not lines:
+        return None
+    return lines[0].split(), [ln.split() for ln in lines[1:]]
+
+
+def extract_data_from_single_page(
+    file_path: str,
+    page_number: int,
+    session: Optional[PdfDocumentSession] = None,
+    ocr: bool = True,
+    classe: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
     """Extract structured data from a single PDF page.
 
     The function first tries to parse tables and plain text using
-    :mod:`pdfplumber`. If no data is extracted, the page is rendered
-    with :mod:`PyMuPDF` and OCR is executed via ``pytesseract``.
+    :mod:`pdfplumber`. If no data is extracted, the page goes through the
+    OCR stage of :mod:`Backend.services.ocr_service` (process pool, adaptive
+    DPI and a cache keyed by the page content).
 
     Parameters
     ----------
@@ -933,6 +2034,16 @@ def extract_data_from_single_page(file_path: str, page_number: int) -> Dict[str,
         Absolute path to the PDF file on disk.
     page_number: int
         1-indexed page number to extract.
+    session: Optional[PdfDocumentSession]
+        Already opened document for ``file_path``. When given, the PDF is not
+        parsed again; callers extracting many pages should pass one.
+    ocr: bool
+        When ``False`` the OCR fallback is skipped and the result is flagged
+        with ``ocr_pendente`` so the caller can OCR several pages at once.
+    classe: Optional[Dict[str, Any]]
+        Flags from :func:`classificar_paginas_pdf` for this page. Image-only
+        pages go straight to OCR and pages without ruling lines skip the
+        table detection.
 
     Returns
     -------
@@ -943,63 +2054,50 @@ def extract_data_from_single_page(file_path: str, page_number: int) -> Dict[str,
     headers: List[str] = []
     rows: List[List[str]] = []
 
-    try:
-        with pdfplumber.open(file_path) as pdf:
-            if not (1 <= page_number <= len(pdf.pages)):
-                raise ValueError(
-                    f"Número de página inválido: {page_number}. PDF tem {len(pdf.pages)} páginas."
-                )
+    # Páginas só com imagem vão direto para o OCR
+    if classe is None or classe["has_text_layer"]:
+        pdf_session = session
+        try:
+            if pdf_session is None:
+                pdf_session = PdfDocumentSession(file_path)
+
+            with pdf_session.open_page(page_number) as page:
+                tables = None
+                if classe is None or classe["has_ruling_lines"]:
+                    tables = page.extract_tables(
+                        table_settings={"vertical_strategy": "lines", "horizontal_strategy": "lines"}
+                    )
 
-            page = pdf.pages[page_number - 1]
-            tables = page.extract_tables(
-                table_settings={"vertical_strategy": "lines", "horizontal_strategy": "lines"}
-            )
+                if tables:
+                    for table in tables:
+                        if table and len(table) >= 2:
+                            headers = [str(h or "").strip() for h in table[0]]
+                            rows = [[str(c or "").strip() for c in r] for r in table[1:]]
+                            if any(any(cell for cell in r) for r in rows):
+                                return {"headers": headers, "rows": rows}
 
-            if tables:
-                for table in tables:
-                    if table and len(table) >= 2:
-                        headers = [str(h or "").strip() for h in table[0]]
-                        rows = [[str(c or "").strip() for c in r] for r in table[1:]]
-                        if any(any(cell for cell in r) for r in rows):
-                            return {"headers": headers, "rows": rows}
-
-            text = page.extract_text() or ""
-            lines = [l.strip() for l in text.splitlines() if l.strip()]
-            if len(lines) >= 2:
-                headers = lines[0].split()
-                rows = [ln.split() for ln in lines[1:]]
-                if rows:
-                    return {"headers": headers, "rows": rows}
-    except Exception as e:  # pragma: no cover - runtime logging
-        logger.error("Erro ao extrair com pdfplumber: %s", e)
+                text = page.extract_text() or ""
+                lines = [l.strip() for l in text.splitlines() if l.strip()]
+                if len(lines) >= 2:
+                    headers = lines[0].split()
+                    rows = [ln.split() for ln in lines[1:]]
+                    if rows:
+                        return {"headers": headers, "rows": rows}
+        except Exception as e:  # pragma: no cover - runtime logging
+            logger.error("Erro ao extrair com pdfplumber: %s", e)
+        finally:
+            if session is None and pdf_session is not None:
+                pdf_session.close()
+
+    if not ocr:
+        return {"headers": headers, "rows": rows, "ocr_pendente": True}
 
     try:  # OCR fallback
-        import fitz  # type: ignore
-        import pytesseract  # type: ignore
-        from PIL import Image  # type: ignore
-
-        doc = fitz.open(file_path)
-        if not (1 <= page_number <= doc.page_count):
-            raise ValueError(
-                f"Número de página inválido: {page_number}. PDF tem {doc.page_count} páginas."
-            )
-
-        page = doc.load_page(page_number - 1)
-        pix = page.get_pixmap(dpi=300)
-        img = Image.open(io.BytesIO(pix.tobytes()))
-
-        text = pytesseract.image_to_string(img)
-        lines = [l.strip() for l in text.splitlines() if l.strip()]
-        if lines:
-            headers = lines[0].split()
-            rows = [ln.split() for ln in lines[1:]]
+        tabela = _tabela_texto_ocr(ocr_service.ocr_pagina_pdf(file_path, page_number))
+        if tabela:
+            headers, rows = tabela
     except Exception as e:  # pragma: no cover - optional dependency might be missing
         logger.error("Erro ao executar OCR da página do PDF: %s", e)
-    finally:
-        try:
-            doc.close()  # type: ignore
-        except Exception:
-            pass
 
     return {"headers": headers, "rows": rows}
 
@@ -1031,13 +2129,20 @@ def generate_pdf_page_images(file_path: str, file_id: str) -> List[str]:
 
     urls: List[str] = []
 
+    file_hash = hash_conteudo(file_path)
+
     with fitz.open(file_path) as doc:
         page_count = min(len(doc), 20)
         for i in range(page_count):
-            page = doc.load_page(i)
-            pix = page.get_pixmap(dpi=150)
+            image_bytes = render_cache.get_or_render(
+                file_hash,
+                i + 1,
+                150,
+                "png",
+                lambda i=i: doc.load_page(i).get_pixmap(dpi=150).tobytes("png"),
+            )
             image_path = output_dir / f"page-{i + 1}.png"
-            pix.save(str(image_path))
+            image_path.write_bytes(image_bytes)
             url = f"/static/previews/{file_id}/page-{i + 1}.png"
             urls.append(url)
 
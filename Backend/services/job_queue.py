@@ -0,0 +1,321 @@
+# catalogai_project/Backend/services/job_queue.py
+"""Fila durável de tarefas de fundo.
+
+Importações de catálogo, geração de conteúdo com IA e enriquecimento web são
+enfileirados pela API com :func:`enqueue` e executados por processos worker
+separados (``python -m Backend.worker``), em vez de ``BackgroundTasks`` no
+processo que atende as requisições.
+
+As tarefas são registradas por nome com o decorador :func:`task` e recebem o
+``payload`` do job como argumentos nomeados, mais ``db_session_factory``.
+O backend padrão (``JOB_QUEUE_BACKEND=database``) guarda os jobs na tabela
+``background_jobs``; outros backends podem ser registrados com
+:func:`register_backend`. A escolha do próximo job respeita o escalonamento
+justo entre usuários de :mod:`Backend.services.job_scheduler`.
+"""
+import abc
+import asyncio
+import inspect
+import os
+import socket
+import traceback
+import uuid
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from sqlalchemy.orm import Session
+
+from Backend import crud_background_jobs, models
+from Backend.core.config import settings
+from Backend.core.logging_config import get_logger
+from Backend.services import job_scheduler
+
+logger = get_logger(__name__)
+
+# Prioridades usadas pelas rotas: geração IA é interativa e passa na frente
+# das importações, que podem levar minutos.
+PRIORIDADE_ALTA = 10
+PRIORIDADE_NORMAL = 0
+
+# Módulos que registram tarefas; o worker os importa antes de consumir a fila.
+TASK_MODULES = (
+    "Backend.routers.produtos",
+    "Backend.routers.fornecedores",
+    "Backend.routers.generation",
+    "Backend.routers.web_enrichment",
+)
+
+_tasks: Dict[str, Callable[..., Any]] = {}
+
+
+def task(name: str):
+    """Registra ``func`` como a tarefa ``name`` da fila."""
+
+    def decorator(func):
+        _tasks[name] = func
+        return func
+
+    return decorator
+
+
+def get_task(name: str) -> Optional[Callable[..., Any]]:
+    return _tasks.get(name)
+
+
+class TarefaDesconhecida(Exception):
+    """O job referencia uma tarefa que não está registrada neste processo."""
+
+
+class JobQueueBackend(abc.ABC):
+    """Interface dos backends da fila.
+
+    Todos os métodos recebem uma ``Session``: o backend de banco a usa
+    diretamente e ``enqueue`` grava o job na mesma transação da requisição;
+    backends externos podem ignorá-la.
+    """
+
+    @abc.abstractmethod
+    def enqueue(
+        self,
+        db: Session,
+        task: str,
+        payload: Dict[str, Any],
+        *,
+        queue: str,
+        priority: int,
+        max_attempts: int,
+        user_id: Optional[int],
+    ) -> models.BackgroundJob:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def claim(self, db: Session, queues: Sequence[str], worker_id: str) -> Optional[models.BackgroundJob]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def heartbeat(self, db: Session, job_id: int, worker_id: str) -> bool:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def complete(self, db: Session, job_id: int, worker_id: str, result: Optional[Dict[str, Any]]) -> bool:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def fail(
+        self, db: Session, job_id: int, worker_id: str, error: str, retry: bool = True
+    ) -> Optional[models.BackgroundJob]:
+        raise NotImplementedError
+
+
+class DatabaseJobQueue(JobQueueBackend):
+    """Fila na tabela ``background_jobs`` (SQLite ou PostgreSQL)."""
+
+    def enqueue(self, db, task, payload, *, queue, priority, max_attempts, user_id):
+        return crud_background_jobs.create_job(
+            db,
+            task,
+            payload,
+            queue=queue,
+            priority=priority,
+            max_attempts=max_attempts,
+            user_id=user_id,
+        )
+
+    def claim(self, db, queues, worker_id):
+        tenants = None
+        if settings.JOB_FAIR_SCHEDULING:
+            estados = job_scheduler.estados_por_tenant(
+                crud_background_jobs.get_tenant_states(db, queues)
+            )
+            tenants = job_scheduler.ordem_de_atendimento(estados)
+        return crud_background_jobs.claim_job(
+            db, queues, worker_id, settings.JOB_VISIBILITY_TIMEOUT_SECONDS, tenants=tenants
+        )
+
+    def heartbeat(self, db, job_id, worker_id):
+        return crud_background_jobs.extend_job_lock(
+            db, job_id, worker_id, settings.JOB_VISIBILITY_TIMEOUT_SECONDS
+        )
+
+    def complete(self, db, job_id, worker_id, result):
+        return crud_background_jobs.complete_job(db, job_id, worker_id, result)
+
+    def fail(self, db, job_id, worker_id, error, retry=True):
+        return crud_background_jobs.fail_job(
+            db,
+            job_id,
+            worker_id,
+            error,
+            settings.JOB_RETRY_BACKOFF_SECONDS,
+            settings.JOB_RETRY_BACKOFF_MAX_SECONDS,
+            retry=retry,
+        )
+
+
+_backends: Dict[str, Callable[[], JobQueueBackend]] = {"database": DatabaseJobQueue}
+_backend: Optional[JobQueueBackend] = None
+
+
+def register_backend(name: str, factory: Callable[[], JobQueueBackend]) -> None:
+    """Disponibiliza um backend para ``JOB_QUEUE_BACKEND=<name>``."""
+    global _backend
+    _backends[name] = factory
+    _backend = None
+
+
+def get_backend() -> JobQueueBackend:
+    global _backend
+    if _backend is None:
+        try:
+            factory = _backends[settings.JOB_QUEUE_BACKEND]
+        except KeyError:
+            raise ValueError(f"JOB_QUEUE_BACKEND desconhecido: {settings.JOB_QUEUE_BACKEND}")
+        _backend = factory()
+    return _backend
+
+
+def enqueue(
+    db: Session,
+    task: str,
+    payload: Optional[Dict[str, Any]] = None,
+    *,
+    queue: str = "default",
+    priority: int = PRIORIDADE_NORMAL,
+    max_attempts: Optional[int] = None,
+    user_id: Optional[int] = None,
+) -> models.BackgroundJob:
+    """Enfileira a tarefa ``task``; o ``payload`` precisa ser serializável em JSON.
+
+    Parameters
+    ----------
+    db: Session
+        Sessão da requisição; o job é gravado (e commitado) nela.
+    task: str
+        Nome registrado com :func:`task`.
+    payload: Dict[str, Any], optional
+        Argumentos nomeados passados à tarefa.
+    queue: str, optional
+        Fila do job; cada worker consome as filas de ``JOB_QUEUES``.
+    priority: int, optional
+        Jobs de maior prioridade são reservados primeiro.
+    max_attempts: int, optional
+        Tentativas antes de o job ficar ``FAILED`` (padrão ``JOB_MAX_ATTEMPTS``).
+    user_id: int, optional
+        Dono do job, usado pelos endpoints de status.
+    """
+    return get_backend().enqueue(
+        db,
+        task,
+        payload or {},
+        queue=queue,
+        priority=priority,
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+        user_id=user_id,
+    )
+
+
+def _default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class Worker:
+    """Consome jobs da fila e executa as tarefas registradas.
+
+    Parameters
+    ----------
+    session_factory: Callable[[], Session]
+        Fábrica de sessões usada para a fila e repassada às tarefas como
+        ``db_session_factory``.
+    queues: Sequence[str], optional
+        Filas consumidas; padrão ``JOB_QUEUES``.
+    backend: JobQueueBackend, optional
+        Padrão :func:`get_backend`.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        queues: Optional[Sequence[str]] = None,
+        backend: Optional[JobQueueBackend] = None,
+        worker_id: Optional[str] = None,
+    ):
+        self.session_factory = session_factory
+        self.queues = list(queues or [q.strip() for q in settings.JOB_QUEUES.split(",") if q.strip()])
+        self.backend = backend or get_backend()
+        self.worker_id = worker_id or _default_worker_id()
+
+    def _com_sessao(self, metodo: str, *args, **kwargs):
+        db = self.session_factory()
+        try:
+            return getattr(self.backend, metodo)(db, *args, **kwargs)
+        finally:
+            db.close()
+
+    async def _renovar_reserva(self, job_id: int) -> None:
+        intervalo = max(settings.JOB_VISIBILITY_TIMEOUT_SECONDS / 3, 1)
+        while True:
+            await asyncio.sleep(intervalo)
+            if not self._com_sessao("heartbeat", job_id, self.worker_id):
+                logger.warning("Job %s: reserva perdida pelo worker %s", job_id, self.worker_id)
+                return
+
+    async def run_once(self) -> bool:
+        """Reserva e executa um job; retorna ``False`` se a fila estava vazia."""
+        job = self._com_sessao("claim", self.queues, self.worker_id)
+        if job is None:
+            return False
+
+        job_id, nome, payload, tentativa = job.id, job.task, dict(job.payload or {}), job.attempts
+        logger.info("Job %s (%s): tentativa %s iniciada", job_id, nome, tentativa)
+        heartbeat = asyncio.create_task(self._renovar_reserva(job_id))
+        try:
+            func = get_task(nome)
+            if func is None:
+                raise TarefaDesconhecida(f"Tarefa não registrada: {nome}")
+            resultado = func(db_session_factory=self.session_factory, **payload)
+            if inspect.isawaitable(resultado):
+                resultado = await resultado
+        except Exception as exc:
+            logger.exception("Job %s (%s): falha na tentativa %s", job_id, nome, tentativa)
+            job = self._com_sessao(
+                "fail",
+                job_id,
+                self.worker_id,
+                f"{exc.__class__.__name__}: {exc}\n{traceback.format_exc()}",
+                retry=not isinstance(exc, TarefaDesconhecida),
+            )
+            if job is not None and job.status == models.StatusJobEnum.QUEUED.value:
+                logger.info("Job %s reagendado para %s", job_id, job.run_after)
+        else:
+            self._com_sessao(
+                "complete",
+                job_id,
+                self.worker_id,
+                resultado if isinstance(resultado, dict) else None,
+            )
+            logger.info("Job %s (%s): concluído", job_id, nome)
+        finally:
+            heartbeat.cancel()
+        return True
+
+    async def run_until_empty(self) -> int:
+        """Executa jobs até não haver mais nenhum visível; retorna quantos rodaram."""
+        executados = 0
+        while await self.run_once():
+            executados += 1
+        return executados
+
+    async def run(self, stop: Optional[asyncio.Event] = None) -> None:
+        """Laço principal: executa jobs e espera ``JOB_POLL_INTERVAL_SECONDS`` quando a fila esvazia."""
+        stop = stop or asyncio.Event()
+        logger.info("Worker %s consumindo filas %s", self.worker_id, ",".join(self.queues))
+        while not stop.is_set():
+            try:
+                executou = await self.run_once()
+            except Exception:
+                logger.exception("Worker %s: erro ao acessar a fila", self.worker_id)
+                executou = False
+            if not executou:
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=settings.JOB_POLL_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
@@ -0,0 +1,87 @@
+# catalogai_project/Backend/services/job_scheduler.py
+"""Escalonamento justo da fila de tarefas entre usuários.
+
+Sem esta camada, um único usuário com várias importações grandes e centenas
+de enriquecimentos ocuparia todos os workers. A cada reserva, o worker escolhe
+primeiro *de qual usuário* atender e só depois o job (por prioridade e
+``run_after``) dentro da fila desse usuário:
+
+* cada usuário tem um limite de jobs executando ao mesmo tempo, definido pelo
+  plano (``Plano.limite_jobs_simultaneos``) ou, na falta dele, por
+  ``JOB_TENANT_MAX_CONCURRENT`` / ``JOB_TENANT_MAX_CONCURRENT_PRIORITARIO``
+  para planos com ``suporte_prioritario``;
+* entre os usuários abaixo do limite, é atendido o que tem a menor fração
+  ``jobs executando / peso`` (``Plano.peso_fila`` ou
+  ``JOB_TENANT_WEIGHT_PRIORITARIO``); empates vão para quem espera há mais
+  tempo. Com pesos 2 e 1, dois usuários disputando os workers ficam com 2/3 e
+  1/3 dos slots.
+
+Jobs sem ``user_id`` (tarefas do sistema) formam um tenant próprio, sem limite.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from Backend.core.config import settings
+
+
+@dataclass
+class EstadoTenant:
+    user_id: Optional[int]
+    executando: int
+    prontos: int
+    espera_desde: datetime
+    suporte_prioritario: bool = False
+    limite_plano: Optional[int] = None
+    peso_plano: Optional[int] = None
+
+
+def limite_concorrencia(estado: EstadoTenant) -> Optional[int]:
+    """Jobs simultâneos permitidos ao usuário; ``None`` para sem limite."""
+    if estado.user_id is None:
+        return None
+    if estado.limite_plano is not None:
+        return estado.limite_plano
+    if estado.suporte_prioritario:
+        return settings.JOB_TENANT_MAX_CONCURRENT_PRIORITARIO
+    return settings.JOB_TENANT_MAX_CONCURRENT
+
+
+def peso(estado: EstadoTenant) -> int:
+    if estado.peso_plano:
+        return estado.peso_plano
+    if estado.suporte_prioritario:
+        return settings.JOB_TENANT_WEIGHT_PRIORITARIO
+    return 1
+
+
+def _sem_fuso(valor: datetime) -> datetime:
+    # SQLite devolve datetimes sem fuso; todos os valores da fila estão em UTC.
+    return valor.replace(tzinfo=None)
+
+
+def ordem_de_atendimento(
+    estados: Iterable[EstadoTenant],
+) -> List[Tuple[Optional[int], Optional[int]]]:
+    """Ordena os usuários com jobs prontos pela vez de serem atendidos.
+
+    Returns
+    -------
+    List[Tuple[Optional[int], Optional[int]]]
+        ``(user_id, limite)`` de cada usuário que ainda tem slot livre, do
+        primeiro ao último a ser atendido.
+    """
+    elegiveis = []
+    for estado in estados:
+        if estado.prontos <= 0:
+            continue
+        limite = limite_concorrencia(estado)
+        if limite is not None and estado.executando >= limite:
+            continue
+        elegiveis.append((estado.executando / peso(estado), _sem_fuso(estado.espera_desde), estado, limite))
+    elegiveis.sort(key=lambda item: (item[0], item[1], item[2].user_id or 0))
+    return [(estado.user_id, limite) for _, _, estado, limite in elegiveis]
+
+
+def estados_por_tenant(linhas: Iterable[Dict]) -> List[EstadoTenant]:
+    return [EstadoTenant(**linha) for linha in linhas]
@@ -0,0 +1,198 @@
+# catalogai_project/Backend/services/keyset_pagination.py
+"""Paginação por cursor (keyset) para as listagens grandes.
+
+``offset(skip)`` obriga o banco a ler e descartar ``skip`` linhas, então cada
+página fica mais lenta que a anterior. Aqui a página seguinte começa *depois*
+da última linha da página atual: ``WHERE (chave, id) > (v, i)`` seguindo a
+ordenação, com ``id`` como desempate, e o custo de qualquer página é o de
+uma busca no índice.
+
+O cursor é opaco para o cliente: JSON (ordenação, valor da chave e ``id`` da
+última linha) em base64 url-safe. Um cursor gerado para outra ordenação é
+rejeitado com :class:`CursorInvalidoError`.
+
+``NULL`` na chave é tratado como maior que qualquer valor (``NULLS LAST`` no
+``asc`` e ``NULLS FIRST`` no ``desc``, o padrão do PostgreSQL, que um índice
+comum na coluna atende nos dois sentidos).
+
+No SQLite, datas são texto em formatos variados (com e sem microssegundos),
+então a chave de data é comparada como o texto gravado, na mesma ordem do
+``ORDER BY``.
+"""
+import base64
+import binascii
+import enum
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import Date, DateTime, String, and_, or_, type_coerce
+from sqlalchemy.orm import Query
+from sqlalchemy.sql.elements import ColumnElement
+
+_CHAVE_CURSOR = "_chave_cursor"
+
+
+class CursorInvalidoError(ValueError):
+    """Cursor malformado ou gerado para outra ordenação."""
+
+
+def codificar_cursor(dados: Dict[str, Any]) -> str:
+    bruto = json.dumps(dados, separators=(",", ":"), default=_serializar).encode()
+    return base64.urlsafe_b64encode(bruto).rstrip(b"=").decode()
+
+
+def decodificar_cursor(cursor: str) -> Dict[str, Any]:
+    try:
+        bruto = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        dados = json.loads(bruto)
+    except (binascii.Error, ValueError) as exc:
+        raise CursorInvalidoError("Cursor inválido") from exc
+    if not isinstance(dados, dict) or not isinstance(dados.get("id"), int):
+        raise CursorInvalidoError("Cursor inválido")
+    return dados
+
+
+def _serializar(valor: Any) -> Any:
+    if isinstance(valor, enum.Enum):
+        return valor.name
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, Decimal):
+        return str(valor)
+    raise TypeError(f"Valor não serializável no cursor: {valor!r}")
+
+
+def _desserializar(valor: Any, chave: ColumnElement) -> Any:
+    if valor is None:
+        return None
+    try:
+        tipo = chave.type.python_type
+    except NotImplementedError:
+        return valor
+    try:
+        if issubclass(tipo, enum.Enum):
+            return tipo[valor]
+        if tipo is datetime:
+            return datetime.fromisoformat(valor)
+        if tipo is date:
+            return date.fromisoformat(valor)
+        if tipo in (Decimal, int, float, str, bool):
+            return tipo(valor)
+    except (KeyError, TypeError, ValueError) as exc:
+        raise CursorInvalidoError("Cursor inválido") from exc
+    return valor
+
+
+def _depois_de(
+    chave: Optional[ColumnElement],
+    coluna_id: ColumnElement,
+    valor: Any,
+    ultimo_id: int,
+    descendente: bool,
+    nulos: bool,
+    id_descendente: bool,
+) -> ColumnElement:
+    """Condição das linhas que vêm depois de ``(valor, ultimo_id)``."""
+    id_depois = coluna_id < ultimo_id if id_descendente else coluna_id > ultimo_id
+    if chave is None:
+        return id_depois
+    if valor is None:
+        # NULL é o maior valor: no asc só restam NULLs; no desc, todo o resto.
+        mesmo = and_(chave.is_(None), id_depois)
+        return or_(chave.isnot(None), mesmo) if descendente else mesmo
+    condicoes = [
+        chave < valor if descendente else chave > valor,
+        and_(chave == valor, id_depois),
+    ]
+    if nulos and not descendente:
+        condicoes.append(chave.is_(None))
+    return or_(*condicoes)
+
+
+def paginar(
+    query: Query,
+    coluna_id: ColumnElement,
+    limit: int,
+    cursor: Optional[str] = None,
+    chave: Optional[ColumnElement] = None,
+    descendente: bool = False,
+    ordenacao: str = "id",
+    nulos: Optional[bool] = None,
+    id_descendente: Optional[bool] = None,
+) -> Tuple[List[Any], Optional[str]]:
+    """Executa ``query`` como uma página por cursor.
+
+    Parameters
+    ----------
+    query: Query
+        Consulta de uma entidade, já filtrada e sem ``order_by``.
+    coluna_id: ColumnElement
+        Coluna única usada como desempate (normalmente a chave primária).
+    limit: int
+        Itens por página.
+    cursor: Optional[str]
+        ``next_cursor`` da página anterior; ``None`` para a primeira página.
+    chave: Optional[ColumnElement]
+        Coluna ou expressão de ordenação; ``None`` ordena só por ``coluna_id``.
+    descendente: bool
+        Sentido da ordenação.
+    ordenacao: str
+        Identificador da ordenação, gravado no cursor e conferido na volta.
+    nulos: Optional[bool]
+        Se ``chave`` pode ser ``NULL``; por padrão, o ``nullable`` da coluna.
+    id_descendente: Optional[bool]
+        Sentido do desempate por ``coluna_id``; por padrão, o de ``descendente``.
+
+    Returns
+    -------
+    Tuple[List[Any], Optional[str]]
+        Os itens da página e o cursor da próxima (``None`` na última).
+    """
+    if id_descendente is None:
+        id_descendente = descendente
+    if chave is None:
+        nulos = False
+    elif nulos is None:
+        nulos = getattr(chave, "nullable", True)
+    if (
+        chave is not None
+        and query.session.get_bind().dialect.name == "sqlite"
+        and isinstance(chave.type, (Date, DateTime))
+    ):
+        chave = type_coerce(chave, String)
+    if cursor:
+        dados = decodificar_cursor(cursor)
+        if dados.get("o") != ordenacao:
+            raise CursorInvalidoError("Cursor gerado para outra ordenação")
+        valor = _desserializar(dados.get("k"), chave) if chave is not None else None
+        query = query.filter(
+            _depois_de(chave, coluna_id, valor, dados["id"], descendente, nulos, id_descendente)
+        )
+
+    ordem_id = coluna_id.desc() if id_descendente else coluna_id.asc()
+    if chave is None:
+        linhas = query.order_by(ordem_id).limit(limit + 1).all()
+        valores = [None] * len(linhas)
+    else:
+        ordem = chave.desc() if descendente else chave.asc()
+        if nulos:
+            ordem = ordem.nulls_first() if descendente else ordem.nulls_last()
+        resultado = (
+            query.add_columns(chave.label(_CHAVE_CURSOR))
+            .order_by(ordem, ordem_id)
+            .limit(limit + 1)
+            .all()
+        )
+        linhas = [linha[0] for linha in resultado]
+        valores = [linha[1] for linha in resultado]
+
+    if len(linhas) <= limit:
+        return linhas, None
+    linhas = linhas[:limit]
+    ultimo = linhas[-1]
+    proximo = codificar_cursor(
+        {"o": ordenacao, "k": valores[limit - 1], "id": getattr(ultimo, coluna_id.key)}
+    )
+    return linhas, proximo
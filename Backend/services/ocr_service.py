@@ -0,0 +1,245 @@
+# catalogai_project/Backend/services/ocr_service.py
+"""OCR de páginas de PDF escaneadas.
+
+O OCR roda em uma pool de processos própria (``OCR_WORKERS``), separada da
+extração de páginas, para que catálogos escaneados usem vários núcleos sem
+competir com o parsing do pdfplumber.
+
+Cada página é reconhecida primeiro em baixa resolução (``OCR_LOW_DPI``); só
+quando a confiança média do Tesseract fica abaixo de ``OCR_MIN_CONFIDENCE`` a
+página é rasterizada de novo em ``OCR_HIGH_DPI``. O resultado é gravado em
+disco com a chave do *conteúdo da página* (e não do arquivo) e dos parâmetros
+do OCR, de modo que reimportar um catálogo, ou abrir o preview da mesma página,
+não executa o OCR outra vez, e mudar a configuração não reaproveita resultados
+antigos.
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from Backend.core.config import settings
+from Backend.core.logging_config import get_logger
+from Backend.services.render_cache import PageRenderCache, _resolve_directory
+
+logger = get_logger(__name__)
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+ocr_cache = PageRenderCache(
+    _resolve_directory(settings.OCR_CACHE_DIRECTORY),
+    settings.OCR_CACHE_MAX_MB * 1024 * 1024,
+)
+
+
+def _abrir_documento(fonte: Union[bytes, str, Path]):
+    import fitz  # PyMuPDF
+
+    if isinstance(fonte, (bytes, bytearray)):
+        return fitz.open(stream=bytes(fonte), filetype="pdf")
+    return fitz.open(str(fonte))
+
+
+def hash_pagina(doc, page_number: int) -> str:
+    """SHA-256 do conteúdo de uma página de um documento PyMuPDF aberto.
+
+    Considera o tamanho e a rotação da página, seu fluxo de conteúdo e os
+    recursos que ela desenha, inclusive dentro de Form XObjects: a definição
+    e os dados de cada XObject (formulários e imagens) e de cada fonte, com o
+    arquivo embutido. A mesma página escaneada tem o mesmo hash mesmo em
+    arquivos diferentes; páginas que só diferem em um formulário ou fonte
+    referenciados (``/Fm0 Do``) têm hashes diferentes.
+    """
+    page = doc.load_page(page_number - 1)
+    digest = hashlib.sha256()
+    digest.update(f"{tuple(page.rect)}|{page.rotation}|".encode())
+    digest.update(page.read_contents())
+    xrefs = [x[0] for x in page.get_xobjects()] + [i[0] for i in page.get_images(full=True)]
+    for xref in xrefs:
+        # Os números de xref mudam entre arquivos; só o conteúdo entra no hash.
+        digest.update(b"|xobject|")
+        digest.update(doc.xref_object(xref, compressed=True).encode())
+        digest.update(doc.xref_stream_raw(xref) or b"")
+    for fonte in page.get_fonts(full=True):
+        digest.update(b"|font|")
+        digest.update(doc.xref_object(fonte[0], compressed=True).encode())
+        digest.update(doc.extract_font(fonte[0])[3] or b"")
+    return digest.hexdigest()
+
+
+def _chave_cache(page_hash: str) -> str:
+    """Chave do resultado no cache: o conteúdo da página e os parâmetros do OCR."""
+    parametros = (
+        f"{page_hash}|{settings.OCR_LOW_DPI}|{settings.OCR_HIGH_DPI}"
+        f"|{settings.OCR_MIN_CONFIDENCE}|{settings.OCR_LANGUAGE}"
+    )
+    return hashlib.sha256(parametros.encode()).hexdigest()
+
+
+def _texto_e_confianca(dados: Dict[str, List[Any]]) -> Dict[str, Any]:
+    """Monta o texto linha a linha e a confiança média a partir de ``image_to_data``."""
+    linhas: Dict[tuple, List[str]] = {}
+    confiancas: List[float] = []
+    for i, palavra in enumerate(dados["text"]):
+        palavra = (palavra or "").strip()
+        confianca = float(dados["conf"][i])
+        if not palavra or confianca < 0:
+            continue
+        chave = (dados["block_num"][i], dados["par_num"][i], dados["line_num"][i])
+        linhas.setdefault(chave, []).append(palavra)
+        confiancas.append(confianca)
+    return {
+        "text": "\n".join(" ".join(palavras) for palavras in linhas.values()),
+        "confidence": sum(confiancas) / len(confiancas) if confiancas else 0.0,
+    }
+
+
+def _ocr_pagina(
+    fonte: Union[bytes, str],
+    page_number: int,
+    dpi_baixo: int,
+    dpi_alto: int,
+    confianca_minima: float,
+    idioma: str,
+) -> Dict[str, Any]:
+    """Executa o OCR adaptativo de uma página (ponto de entrada dos processos)."""
+    import pytesseract
+    from PIL import Image
+
+    melhor: Optional[Dict[str, Any]] = None
+    with _abrir_documento(fonte) as doc:
+        page = doc.load_page(page_number - 1)
+        for dpi in (dpi_baixo, dpi_alto):
+            pix = page.get_pixmap(dpi=dpi, alpha=False)
+            image = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+            resultado = _texto_e_confianca(
+                pytesseract.image_to_data(
+                    image, lang=idioma, output_type=pytesseract.Output.DICT
+                )
+            )
+            resultado["dpi"] = dpi
+            if melhor is None or resultado["confidence"] >= melhor["confidence"]:
+                melhor = resultado
+            if resultado["confidence"] >= confianca_minima or dpi_alto <= dpi_baixo:
+                break
+    return melhor
+
+
+def _get_executor() -> Optional[ProcessPoolExecutor]:
+    global _executor
+    if settings.OCR_WORKERS <= 0:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.OCR_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def _ocr_na_pool(
+    executor: ProcessPoolExecutor,
+    fonte: Union[bytes, str],
+    pendentes: Dict[str, int],
+    args: tuple,
+) -> Dict[str, Dict[str, Any]]:
+    """Distribui as páginas pela pool; os workers recebem o caminho do PDF.
+
+    Um PDF em memória é gravado uma única vez em arquivo temporário, em vez de
+    ser serializado para cada página enviada.
+    """
+    caminho_temporario = None
+    if isinstance(fonte, (bytes, bytearray)):
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+            tmp.write(fonte)
+        caminho_temporario = fonte = tmp.name
+    try:
+        futuros = {
+            page_hash: executor.submit(_ocr_pagina, fonte, page_number, *args)
+            for page_hash, page_number in pendentes.items()
+        }
+        return {page_hash: f.result() for page_hash, f in futuros.items()}
+    finally:
+        if caminho_temporario:
+            os.unlink(caminho_temporario)
+
+
+def ocr_paginas_pdf(
+    fonte: Union[bytes, str, Path],
+    page_numbers: Sequence[int],
+    paralelo: bool = True,
+) -> Dict[int, Dict[str, Any]]:
+    """Retorna o OCR de várias páginas, usando o cache sempre que possível.
+
+    Parameters
+    ----------
+    fonte: Union[bytes, str, Path]
+        Conteúdo do PDF em memória ou caminho do arquivo em disco.
+    page_numbers: Sequence[int]
+        Páginas (1-indexadas) a reconhecer.
+    paralelo: bool, optional
+        Distribui as páginas ainda não reconhecidas pela pool de OCR. Use
+        ``False`` quando a chamada já roda dentro de um processo worker.
+
+    Returns
+    -------
+    Dict[int, Dict[str, Any]]
+        Para cada página, ``text``, ``confidence`` (0-100) e o ``dpi`` usado.
+    """
+    if isinstance(fonte, Path):
+        fonte = str(fonte)
+
+    with _abrir_documento(fonte) as doc:
+        hashes: Dict[int, str] = {}
+        for page_number in page_numbers:
+            if not (1 <= page_number <= doc.page_count):
+                raise ValueError(
+                    f"Número de página inválido: {page_number}. PDF tem {doc.page_count} páginas."
+                )
+            hashes[page_number] = hash_pagina(doc, page_number)
+
+    resultados: Dict[int, Dict[str, Any]] = {}
+    # Páginas idênticas dentro do mesmo pedido são reconhecidas uma única vez
+    pendentes: Dict[str, int] = {}
+    for page_number, page_hash in hashes.items():
+        data = ocr_cache.get_chave(_chave_cache(page_hash), "json")
+        if data is not None:
+            resultados[page_number] = json.loads(data)
+        else:
+            pendentes.setdefault(page_hash, page_number)
+
+    if pendentes:
+        args = (
+            settings.OCR_LOW_DPI,
+            settings.OCR_HIGH_DPI,
+            settings.OCR_MIN_CONFIDENCE,
+            settings.OCR_LANGUAGE,
+        )
+        # Uma página só é reconhecida no próprio processo, sem subir a pool.
+        executor = _get_executor() if paralelo and len(pendentes) > 1 else None
+        if executor is not None:
+            reconhecidos = _ocr_na_pool(executor, fonte, pendentes, args)
+        else:
+            reconhecidos = {
+                page_hash: _ocr_pagina(fonte, page_number, *args)
+                for page_hash, page_number in pendentes.items()
+            }
+        for page_hash, resultado in reconhecidos.items():
+            ocr_cache.put_chave(_chave_cache(page_hash), "json", json.dumps(resultado).encode())
+        for page_number, page_hash in hashes.items():
+            if page_number not in resultados:
+                resultados[page_number] = reconhecidos[page_hash]
+
+    return resultados
+
+
+def ocr_pagina_pdf(fonte: Union[bytes, str, Path], page_number: int) -> Dict[str, Any]:
+    """OCR de uma única página; veja :func:`ocr_paginas_pdf`."""
+    return ocr_paginas_pdf(fonte, [page_number])[page_number]
@@ -0,0 +1,210 @@
+# catalogai_project/Backend/services/product_count.py
+"""Total da listagem de produtos sem um segundo ``COUNT`` a cada página.
+
+``GET /produtos/`` devolve ``total_items`` junto com a página. Com buscas e
+filtros pesados, o ``COUNT`` custa tanto quanto a própria página. O modo do
+total é escolhido por requisição (``total_mode``) ou por
+``PRODUTOS_COUNT_MODE``:
+
+* ``exact``: ``COUNT`` a cada página (comportamento original).
+* ``cached``: o ``COUNT`` fica em memória por ``(banco, usuário, filtros)``
+  até uma escrita em produtos do usuário ou ``PRODUTOS_COUNT_CACHE_TTL``
+  segundos. As escritas são detectadas por eventos da ``Session`` (flush de
+  ``Produto`` e ``INSERT``/``UPDATE``/``DELETE`` em lote). O TTL limita o atraso
+  quando outro processo grava.
+* ``estimated``: no PostgreSQL, a estimativa do planejador (``EXPLAIN``), sem
+  ler as linhas; nos outros bancos, o mesmo que ``cached``.
+* ``window``: ``count(*) OVER ()`` no próprio ``SELECT`` da página (uma ida ao
+  banco); resolvido na rota, pois depende da página.
+"""
+import hashlib
+import json
+import threading
+import time
+import weakref
+from typing import Any, Dict, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from Backend import crud_produtos
+from Backend.core.config import settings
+from Backend.models import Produto
+
+MODOS = ("exact", "cached", "estimated", "window")
+
+# Marca, em ``session.info``, os donos de produtos alterados na transação.
+_INFO_ALTERADOS = "produtos_count_alterados"
+# Escrita em lote sem dono conhecido: invalida todos os usuários do banco.
+_TODOS = object()
+
+
+def _chave_filtros(filtros: Dict[str, Any]) -> str:
+    normalizados = {k: v for k, v in sorted(filtros.items()) if v not in (None, "")}
+    bruto = json.dumps(normalizados, default=str, separators=(",", ":"))
+    return hashlib.sha1(bruto.encode()).hexdigest()
+
+
+class ProdutoCountCache:
+    """Cache em memória de ``count_produtos_by_user`` com invalidação por escrita.
+
+    Cada banco (engine) tem um contador de versão por usuário e um geral. Uma
+    entrada só vale enquanto as versões de que depende não mudarem: a do
+    usuário e a de escritas em lote para listagens de um usuário, e a geral
+    para a listagem de admin (todos os usuários).
+
+    Parameters
+    ----------
+    ttl: Optional[float]
+        Segundos de validade de uma entrada (padrão ``PRODUTOS_COUNT_CACHE_TTL``).
+    max_entries: int
+        Entradas por banco; ao passar do limite as mais antigas são removidas.
+    """
+
+    def __init__(self, ttl: Optional[float] = None, max_entries: int = 10_000):
+        self._ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._bancos: "weakref.WeakKeyDictionary[Engine, Dict[str, Any]]" = weakref.WeakKeyDictionary()
+
+    @property
+    def ttl(self) -> float:
+        return settings.PRODUTOS_COUNT_CACHE_TTL if self._ttl is None else self._ttl
+
+    def _banco(self, engine: Engine) -> Dict[str, Any]:
+        banco = self._bancos.get(engine)
+        if banco is None:
+            banco = {"entradas": {}, "versoes": {}, "lote": 0, "geral": 0}
+            self._bancos[engine] = banco
+        return banco
+
+    @staticmethod
+    def _versao(banco: Dict[str, Any], user_id: Optional[int]) -> Tuple[int, ...]:
+        if user_id is None:
+            return (banco["geral"],)
+        return (banco["versoes"].get(user_id, 0), banco["lote"])
+
+    def get(self, engine: Engine, user_id: Optional[int], filtros: Dict[str, Any]) -> Optional[int]:
+        """Total em cache para ``user_id`` (``None`` = todos) e ``filtros``."""
+        chave = (user_id, _chave_filtros(filtros))
+        with self._lock:
+            banco = self._banco(engine)
+            entrada = banco["entradas"].get(chave)
+            if entrada is None:
+                return None
+            total, versao, expira = entrada
+            if versao != self._versao(banco, user_id) or time.monotonic() >= expira:
+                del banco["entradas"][chave]
+                return None
+            return total
+
+    def put(self, engine: Engine, user_id: Optional[int], filtros: Dict[str, Any], total: int, versao: Tuple[int, ...]) -> None:
+        """Guarda ``total`` se nenhuma escrita aconteceu desde ``versao``."""
+        if self.ttl <= 0:
+            return
+        chave = (user_id, _chave_filtros(filtros))
+        with self._lock:
+            banco = self._banco(engine)
+            if versao != self._versao(banco, user_id):
+                return
+            entradas = banco["entradas"]
+            entradas[chave] = (total, versao, time.monotonic() + self.ttl)
+            while len(entradas) > self.max_entries:
+                del entradas[next(iter(entradas))]
+
+    def versao(self, engine: Engine, user_id: Optional[int]) -> Tuple[int, ...]:
+        """Versão atual, lida antes de contar e repassada a :meth:`put`."""
+        with self._lock:
+            return self._versao(self._banco(engine), user_id)
+
+    def invalidar(self, engine: Engine, user_ids: Set[Any]) -> None:
+        """Descarta os totais de ``user_ids`` (``_TODOS`` = todos os usuários)."""
+        if not user_ids:
+            return
+        with self._lock:
+            banco = self._banco(engine)
+            banco["geral"] += 1
+            for user_id in user_ids:
+                if user_id is _TODOS:
+                    banco["lote"] += 1
+                else:
+                    banco["versoes"][user_id] = banco["versoes"].get(user_id, 0) + 1
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._bancos.clear()
+
+
+count_cache = ProdutoCountCache()
+
+
+def total_produtos(
+    db: Session,
+    user_id: Optional[int],
+    is_admin: bool,
+    modo: str = "exact",
+    **filtros: Any,
+) -> Tuple[int, bool]:
+    """Total da listagem no ``modo`` pedido; retorna ``(total, estimado)``.
+
+    ``window`` é resolvido por quem busca a página
+    (``crud_produtos.get_produtos_by_user_com_total``); aqui ele vale como
+    ``cached``, usado quando a página veio vazia.
+    """
+    if not is_admin and user_id is None:
+        return 0, False
+    if modo == "exact":
+        return crud_produtos.count_produtos_by_user(db, user_id=user_id, is_admin=is_admin, **filtros), False
+    if modo == "estimated":
+        estimado = crud_produtos.estimate_produtos_by_user(db, user_id=user_id, is_admin=is_admin, **filtros)
+        if estimado is not None:
+            return estimado, True
+
+    engine = getattr(db.get_bind(), "engine", db.get_bind())
+    dono = None if is_admin else user_id
+    total = count_cache.get(engine, dono, filtros)
+    if total is None:
+        versao = count_cache.versao(engine, dono)
+        total = crud_produtos.count_produtos_by_user(db, user_id=user_id, is_admin=is_admin, **filtros)
+        # Alterações ainda não commitadas nesta sessão não vão para o cache.
+        if not db.info.get(_INFO_ALTERADOS):
+            count_cache.put(engine, dono, filtros, total, versao)
+    return total, False
+
+
+def _marcar(session: Session, user_ids: Set[Any]) -> None:
+    if not user_ids:
+        return
+    session.info.setdefault(_INFO_ALTERADOS, set()).update(user_ids)
+    engine = getattr(session.get_bind(), "engine", session.get_bind())
+    count_cache.invalidar(engine, user_ids)
+
+
+@event.listens_for(Session, "after_flush")
+def _produtos_alterados_no_flush(session: Session, flush_context) -> None:
+    user_ids = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Produto):
+            user_ids.add(obj.user_id if obj.user_id is not None else _TODOS)
+    _marcar(session, user_ids)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _produtos_alterados_em_lote(orm_execute_state) -> None:
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ is Produto:
+        _marcar(orm_execute_state.session, {_TODOS})
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_soft_rollback")
+def _fim_da_transacao(session: Session, *args) -> None:
+    # Invalida de novo: totais contados por outras sessões entre o flush e o
+    # commit (ou rollback) ainda viam o estado anterior.
+    user_ids = session.info.pop(_INFO_ALTERADOS, None)
+    if user_ids:
+        engine = getattr(session.get_bind(), "engine", session.get_bind())
+        count_cache.invalidar(engine, user_ids)
@@ -0,0 +1,168 @@
+# catalogai_project/Backend/services/product_search.py
+"""Busca textual de produtos com índice e ordenação por relevância.
+
+Substitui o ``or_`` de oito ``lower(col) ILIKE '%termo%'``, que nenhum índice
+atende, por estruturas criadas junto com a tabela ``produtos`` (ver
+``models.PRODUTOS_BUSCA_DDL_*`` e a migração correspondente):
+
+* PostgreSQL: coluna gerada ``busca_tsv`` (configuração
+  ``portuguese_unaccent``: stemming em português, sem acentos) com índice GIN,
+  mais índices trigram em ``nome_base``, ``sku`` e ``ean`` para trechos no
+  meio do nome e códigos parciais. A relevância é ``ts_rank_cd``.
+* SQLite: tabela FTS5 ``produtos_fts`` (``unicode61 remove_diacritics``)
+  mantida por triggers; a relevância é o ``bm25`` da FTS5, com os mesmos
+  pesos relativos por coluna.
+
+Cada palavra do termo casa por prefixo (``furad`` encontra "Furadeira") e
+todas precisam aparecer. Em outros bancos, ou se as estruturas ainda não
+existirem, a busca volta aos ``ILIKE``.
+"""
+import re
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import (
+    Column,
+    Integer,
+    MetaData,
+    Table,
+    desc,
+    func,
+    inspect,
+    literal_column,
+    or_,
+    select,
+    text,
+)
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Query, Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from Backend.models import Produto
+
+_TS_CONFIG = literal_column("'portuguese_unaccent'::regconfig")
+_BUSCA_TSV = literal_column("produtos.busca_tsv")
+
+# Tabela virtual criada por DDL; fora do ``Base.metadata`` de propósito.
+_produtos_fts = Table("produtos_fts", MetaData(), Column("rowid", Integer))
+# Pesos por coluna da FTS5 na mesma proporção dos pesos A/B/C do PostgreSQL:
+# nomes, depois descrições (C) e códigos/marca/modelo (B).
+_FTS_BM25 = literal_column("bm25(produtos_fts, 10.0, 10.0, 2.0, 2.0, 5.0, 5.0, 5.0, 5.0)")
+
+_PALAVRA = re.compile(r"\w+", re.UNICODE)
+
+# Engines em que as estruturas de busca já foram encontradas.
+_indices_disponiveis: Dict[Engine, bool] = {}
+
+
+def _palavras(termo: str) -> List[str]:
+    return _PALAVRA.findall(termo.lower())
+
+
+def _modo(db: Session) -> Optional[str]:
+    """``postgresql``/``sqlite`` quando o índice de busca existe, senão ``None``."""
+    bind = db.get_bind()
+    dialeto = bind.dialect.name
+    if dialeto not in ("postgresql", "sqlite"):
+        return None
+    engine = getattr(bind, "engine", bind)
+    if not _indices_disponiveis.get(engine):
+        inspetor = inspect(db.connection())
+        if dialeto == "sqlite":
+            existe = inspetor.has_table("produtos_fts")
+        else:
+            existe = any(c["name"] == "busca_tsv" for c in inspetor.get_columns("produtos"))
+        if not existe:
+            return None
+        _indices_disponiveis[engine] = True
+    return dialeto
+
+
+def _filtro_ilike(termo: str) -> ColumnElement:
+    search_term = f"%{termo.lower()}%"
+    return or_(
+        func.lower(Produto.nome_base).ilike(search_term),
+        func.lower(Produto.nome_chat_api).ilike(search_term),
+        func.lower(Produto.descricao_original).ilike(search_term),
+        func.lower(Produto.descricao_chat_api).ilike(search_term),
+        func.lower(Produto.sku).ilike(search_term),
+        func.lower(Produto.ean).ilike(search_term),
+        func.lower(Produto.marca).ilike(search_term),
+        func.lower(Produto.modelo).ilike(search_term),
+    )
+
+
+def _filtro_trechos(termo: str) -> ColumnElement:
+    # Sem lower(): no PostgreSQL o ILIKE direto na coluna usa o índice trigram.
+    search_term = f"%{termo}%"
+    return or_(
+        Produto.nome_base.ilike(search_term),
+        Produto.sku.ilike(search_term),
+        Produto.ean.ilike(search_term),
+    )
+
+
+def _tsquery(palavras: List[str]):
+    return func.to_tsquery(_TS_CONFIG, " & ".join(f"{p}:*" for p in palavras))
+
+
+def _fts_match(palavras: List[str]):
+    consulta = " ".join(f'"{p}"*' for p in palavras)
+    return (
+        select(_produtos_fts.c.rowid.label("id"), _FTS_BM25.label("rank"))
+        .where(text("produtos_fts MATCH :busca_fts").bindparams(busca_fts=consulta))
+        .subquery("busca_fts")
+    )
+
+
+def filtro_busca(db: Session, termo: str) -> ColumnElement:
+    """Condição ``WHERE`` para os produtos que casam com ``termo``."""
+    modo = _modo(db)
+    palavras = _palavras(termo)
+    if modo is None:
+        return _filtro_ilike(termo)
+    if not palavras:
+        return _filtro_trechos(termo)
+    if modo == "postgresql":
+        return or_(_BUSCA_TSV.op("@@")(_tsquery(palavras)), _filtro_trechos(termo))
+    fts = _fts_match(palavras)
+    return or_(Produto.id.in_(select(fts.c.id)), _filtro_trechos(termo))
+
+
+def aplicar_busca(query: Query, db: Session, termo: str, ordenar: bool = True) -> Query:
+    """Filtra ``query`` (sobre ``Produto``) por ``termo``.
+
+    Com ``ordenar`` os resultados vêm dos mais relevantes para os menos
+    relevantes; chame antes de outros ``order_by`` (que viram desempate).
+    """
+    if not ordenar:
+        return query.filter(filtro_busca(db, termo))
+    query, relevancia = aplicar_busca_ranqueada(query, db, termo)
+    if relevancia is None:
+        return query
+    return query.order_by(desc(relevancia))
+
+
+def aplicar_busca_ranqueada(
+    query: Query, db: Session, termo: str
+) -> Tuple[Query, Optional[ColumnElement]]:
+    """Filtra ``query`` por ``termo`` e devolve a expressão de relevância.
+
+    A relevância nunca é ``NULL`` e maior é mais relevante; é ``None`` quando
+    não há ranking (sem índice ou termo sem palavras). Serve de chave para
+    ordenar ou paginar por cursor.
+    """
+    modo = _modo(db)
+    palavras = _palavras(termo)
+    if modo is None or not palavras:
+        return query.filter(filtro_busca(db, termo)), None
+    if modo == "postgresql":
+        tsquery = _tsquery(palavras)
+        query = query.filter(or_(_BUSCA_TSV.op("@@")(tsquery), _filtro_trechos(termo)))
+        return query, func.ts_rank_cd(_BUSCA_TSV, tsquery)
+    # bm25 da FTS5 é negativo: menor é mais relevante. Quem só casou pelo
+    # trecho (sem linha na FTS) fica depois, com 0.
+    fts = _fts_match(palavras)
+    query = query.outerjoin(fts, fts.c.id == Produto.id).filter(
+        or_(fts.c.id.isnot(None), _filtro_trechos(termo))
+    )
+    return query, -func.coalesce(fts.c.rank, 0.0)
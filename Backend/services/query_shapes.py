@@ -0,0 +1,228 @@
+# catalogai_project/Backend/services/query_shapes.py
+"""Formas de consulta da listagem de produtos e índices sugeridos para elas.
+
+Cada página de ``get_produtos_by_user`` (offset ou cursor) registra a sua
+*forma*: se é restrita a um usuário, quais filtros de igualdade usa (com o
+valor, nos status), se tem busca ou categoria e a ordenação. Os valores de
+ids e textos não são guardados, só a presença do filtro.
+
+:meth:`ProdutoQueryShapes.propor_indices` transforma as formas mais
+frequentes em índices B-tree ``(user_id, filtros de igualdade, coluna de
+ordenação, id)``. Essa ordem atende o ``WHERE``, o ``ORDER BY ... , id`` (e a
+paginação por cursor) e, com ``id`` na chave, o ``COUNT`` da mesma forma só
+com o índice (index-only scan). Quando um valor domina os filtros de um status
+(``fracao_parcial``), o índice sugerido é parcial: ``WHERE status = valor``
+no lugar da coluna na chave. Busca textual e ``categoria`` (``ILIKE``) não
+entram na chave; a busca tem os seus próprios índices.
+
+A contagem fica em memória no processo (``PRODUTOS_QUERY_SHAPES_ENABLED``) e
+é exposta em ``GET /admin/analytics/product-query-shapes``.
+"""
+import hashlib
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from Backend.core.config import settings
+from Backend.models import Produto
+
+# Filtros de igualdade da listagem, na ordem usada na chave dos índices.
+COLUNAS_IGUALDADE = (
+    "fornecedor_id",
+    "product_type_id",
+    "status_enriquecimento_web",
+    "status_titulo_ia",
+    "status_descricao_ia",
+)
+COLUNAS_STATUS = COLUNAS_IGUALDADE[2:]
+_MAX_NOME_INDICE = 63  # limite de identificadores do PostgreSQL
+
+
+@dataclass(frozen=True)
+class FormaConsulta:
+    por_usuario: bool
+    # (coluna, valor) dos filtros de igualdade; valor só nos status.
+    igualdades: Tuple[Tuple[str, Optional[str]], ...]
+    busca: bool
+    categoria: bool
+    ordenacao: str  # coluna, "id" ou "relevancia"
+    descendente: bool
+
+
+@dataclass
+class IndiceProposto:
+    nome: str
+    colunas: Tuple[str, ...]
+    where: Optional[str] = None
+    total_consultas: int = 0
+    fracao: float = 0.0
+    existente: Optional[str] = None  # índice do modelo que já atende
+    formas: List[FormaConsulta] = field(default_factory=list)
+
+    @property
+    def ddl(self) -> str:
+        where = f" WHERE {self.where}" if self.where else ""
+        return (
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {self.nome} "
+            f"ON produtos ({', '.join(self.colunas)}){where}"
+        )
+
+
+def _valor(valor: Any) -> Optional[str]:
+    return getattr(valor, "name", None) or (str(valor) if valor is not None else None)
+
+
+def forma_listagem(
+    por_usuario: bool,
+    sort_by: Optional[str] = None,
+    sort_order: Optional[str] = "asc",
+    search: Optional[str] = None,
+    categoria: Optional[str] = None,
+    **igualdades: Any,
+) -> FormaConsulta:
+    """Forma de uma chamada de ``get_produtos_by_user`` com esses argumentos."""
+    if sort_by and sort_by in Produto.__mapper__.columns:
+        ordenacao = sort_by
+    else:
+        ordenacao = "relevancia" if search and not sort_by else "id"
+    return FormaConsulta(
+        por_usuario=por_usuario,
+        igualdades=tuple(
+            (coluna, _valor(igualdades[coluna]) if coluna in COLUNAS_STATUS else None)
+            for coluna in COLUNAS_IGUALDADE
+            if igualdades.get(coluna) is not None and igualdades.get(coluna) != ""
+        ),
+        busca=bool(search),
+        categoria=bool(categoria),
+        ordenacao=ordenacao,
+        descendente=ordenacao != "relevancia" and (sort_order or "asc").lower() == "desc",
+    )
+
+
+def _nome_indice(colunas: Tuple[str, ...], where: Optional[str]) -> str:
+    nome = "ix_produtos_" + "_".join(colunas)
+    if where:
+        nome += "_" + hashlib.sha1(where.encode()).hexdigest()[:8]
+    if len(nome) > _MAX_NOME_INDICE:
+        sufixo = hashlib.sha1(nome.encode()).hexdigest()[:8]
+        nome = nome[: _MAX_NOME_INDICE - 9] + "_" + sufixo
+    return nome
+
+
+def _indices_existentes(tabela=Produto.__table__) -> List[Tuple[str, Tuple[str, ...], Optional[str]]]:
+    existentes = [("pk_produtos", ("id",), None)]
+    for indice in tabela.indexes:
+        where = indice.dialect_options["postgresql"].get("where")
+        existentes.append(
+            (indice.name, tuple(c.name for c in indice.columns), str(where) if where is not None else None)
+        )
+    for restricao in tabela.constraints:
+        colunas = tuple(c.name for c in getattr(restricao, "columns", ()))
+        if colunas and restricao.name:
+            existentes.append((restricao.name, colunas, None))
+    return existentes
+
+
+def _atende(existente: Tuple[str, ...], proposto: Tuple[str, ...]) -> bool:
+    if existente[: len(proposto)] == proposto:
+        return True
+    # Sem o id final, o banco só ordena os empates (sort incremental).
+    return proposto[-1] == "id" and existente == proposto[:-1]
+
+
+class ProdutoQueryShapes:
+    """Contador, em memória, das formas de consulta da listagem de produtos."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._formas: Counter = Counter()
+
+    def registrar(self, forma: FormaConsulta) -> None:
+        if not settings.PRODUTOS_QUERY_SHAPES_ENABLED:
+            return
+        with self._lock:
+            self._formas[forma] += 1
+
+    def formas(self) -> List[Tuple[FormaConsulta, int]]:
+        """Formas registradas, das mais para as menos frequentes."""
+        with self._lock:
+            return self._formas.most_common()
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._formas.clear()
+
+    def propor_indices(
+        self,
+        formas: Optional[Iterable[Tuple[FormaConsulta, int]]] = None,
+        min_fracao: float = 0.01,
+        fracao_parcial: float = 0.8,
+    ) -> List[IndiceProposto]:
+        """Índices que atendem as formas com pelo menos ``min_fracao`` das consultas.
+
+        Parameters
+        ----------
+        formas: Optional[Iterable[Tuple[FormaConsulta, int]]]
+            Formas e contagens a analisar (padrão: as registradas).
+        min_fracao: float
+            Fração mínima das consultas que um índice precisa atender.
+        fracao_parcial: float
+            Fração dos filtros de um status com o mesmo valor a partir da qual
+            o índice sugerido é parcial nesse valor.
+        """
+        formas = list(self.formas() if formas is None else formas)
+        total = sum(n for _, n in formas)
+        if not total:
+            return []
+
+        # Valor dominante de cada status, para os índices parciais.
+        por_valor: Dict[str, Counter] = {coluna: Counter() for coluna in COLUNAS_STATUS}
+        for forma, n in formas:
+            for coluna, valor in forma.igualdades:
+                if coluna in por_valor:
+                    por_valor[coluna][valor] += n
+        parciais = {}
+        for coluna, valores in por_valor.items():
+            if valores:
+                valor, n = valores.most_common(1)[0]
+                if n / sum(valores.values()) >= fracao_parcial:
+                    parciais[coluna] = valor
+
+        propostas: Dict[Tuple[Tuple[str, ...], Optional[str]], IndiceProposto] = {}
+        for forma, n in formas:
+            colunas = ["user_id"] if forma.por_usuario else []
+            condicoes = []
+            for coluna, valor in forma.igualdades:
+                if coluna in parciais and parciais[coluna] == valor:
+                    condicoes.append(f"{coluna} = '{valor}'")
+                else:
+                    colunas.append(coluna)
+            if forma.ordenacao not in ("id", "relevancia") and forma.ordenacao not in colunas:
+                colunas.append(forma.ordenacao)
+            colunas.append("id")
+            chave = (tuple(colunas), " AND ".join(condicoes) or None)
+            proposta = propostas.setdefault(
+                chave, IndiceProposto(nome=_nome_indice(*chave), colunas=chave[0], where=chave[1])
+            )
+            proposta.total_consultas += n
+            proposta.formas.append(forma)
+
+        # As propostas não são fundidas: todas terminam em ``id`` e um índice com
+        # mais colunas antes dele não entrega ordenadas por id as consultas que
+        # não filtram por essas colunas.
+        existentes = _indices_existentes()
+        resultado = []
+        for proposta in propostas.values():
+            proposta.fracao = proposta.total_consultas / total
+            if proposta.fracao < min_fracao:
+                continue
+            for nome, colunas, where in existentes:
+                if where == proposta.where and _atende(colunas, proposta.colunas):
+                    proposta.existente = nome
+                    break
+            resultado.append(proposta)
+        return sorted(resultado, key=lambda p: -p.total_consultas)
+
+
+query_shapes = ProdutoQueryShapes()
@@ -0,0 +1,202 @@
+# catalogai_project/Backend/services/render_cache.py
+"""Cache em disco das páginas de PDF já rasterizadas.
+
+As imagens são endereçadas pelo conteúdo do arquivo: a chave é
+``(hash do PDF, página, dpi, formato)``, então o mesmo catálogo enviado duas
+vezes (ou aberto em previews diferentes) reaproveita as imagens já geradas.
+Quando o tamanho total passa de ``RENDER_CACHE_MAX_MB`` as entradas usadas há
+mais tempo são removidas (LRU pela data de modificação, atualizada a cada
+acerto).
+"""
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Union
+from uuid import uuid4
+
+from Backend.core.config import settings
+from Backend.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+_HASH_CHUNK = 1024 * 1024
+
+
+def hash_conteudo(fonte: Union[bytes, str, Path]) -> str:
+    """SHA-256 do conteúdo de um PDF em memória ou em disco."""
+    digest = hashlib.sha256()
+    if isinstance(fonte, (bytes, bytearray)):
+        digest.update(fonte)
+    else:
+        with open(fonte, "rb") as f:
+            for bloco in iter(lambda: f.read(_HASH_CHUNK), b""):
+                digest.update(bloco)
+    return digest.hexdigest()
+
+
+class PageRenderCache:
+    """Cache LRU de imagens de páginas, limitado por tamanho.
+
+    Parameters
+    ----------
+    directory: Union[str, Path]
+        Diretório onde as imagens são gravadas.
+    max_bytes: int
+        Tamanho máximo ocupado pelo cache. ``0`` desativa o cache.
+    """
+
+    def __init__(self, directory: Union[str, Path], max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._tamanho_total: Optional[int] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _path_chave(self, chave: str, fmt: str) -> Path:
+        return self.directory / chave[:2] / f"{chave}.{fmt.lower()}"
+
+    def _path(self, file_hash: str, page: int, dpi: int, fmt: str) -> Path:
+        return self._path_chave(f"{file_hash}_{page}_{dpi}", fmt)
+
+    def get(self, file_hash: str, page: int, dpi: int, fmt: str) -> Optional[bytes]:
+        """Retorna a imagem em cache ou ``None``."""
+        return self.get_chave(f"{file_hash}_{page}_{dpi}", fmt)
+
+    def get_chave(self, chave: str, fmt: str) -> Optional[bytes]:
+        """Como :meth:`get`, para entradas que não são páginas renderizadas e
+        já têm a própria chave (por exemplo, um hash dos parâmetros)."""
+        if not self.enabled:
+            return None
+        path = self._path_chave(chave, fmt)
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+        try:
+            os.utime(path)  # marca como usada recentemente
+        except OSError:
+            pass
+        return data
+
+    def contem(self, file_hash: str, page: int, dpi: int, fmt: str) -> bool:
+        """Indica se a imagem está em cache, marcando-a como usada, sem lê-la."""
+        if not self.enabled:
+            return False
+        try:
+            os.utime(self._path(file_hash, page, dpi, fmt))
+        except OSError:
+            return False
+        return True
+
+    def put(self, file_hash: str, page: int, dpi: int, fmt: str, data: bytes) -> None:
+        """Grava a imagem no cache e aplica o limite de tamanho."""
+        self.put_chave(f"{file_hash}_{page}_{dpi}", fmt, data)
+
+    def put_chave(self, chave: str, fmt: str, data: bytes) -> None:
+        """Como :meth:`put`, para entradas endereçadas por ``chave``."""
+        if not self.enabled:
+            return
+        path = self._path_chave(chave, fmt)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            anterior = path.stat().st_size if path.exists() else 0
+            # Grava em arquivo temporário e renomeia para que leitores
+            # concorrentes nunca vejam uma imagem incompleta.
+            tmp = path.with_name(f".{path.name}.{uuid4().hex}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning("Não foi possível gravar %s no cache de renderização: %s", path, e)
+            return
+        with self._lock:
+            if self._tamanho_total is not None:
+                self._tamanho_total += len(data) - anterior
+        self._evict_if_needed()
+
+    def get_or_render(
+        self,
+        file_hash: str,
+        page: int,
+        dpi: int,
+        fmt: str,
+        render: Callable[[], bytes],
+    ) -> bytes:
+        """Retorna a imagem do cache ou a gera com ``render`` e a armazena."""
+        data = self.get(file_hash, page, dpi, fmt)
+        if data is None:
+            data = render()
+            self.put(file_hash, page, dpi, fmt, data)
+        return data
+
+    def get_or_render_many(
+        self,
+        file_hash: str,
+        pages: Iterable[int],
+        dpi: int,
+        fmt: str,
+        render: Callable[[List[int]], Dict[int, bytes]],
+    ) -> Dict[int, bytes]:
+        """Como :meth:`get_or_render`, mas renderiza todas as páginas ausentes
+        em uma única chamada de ``render`` (que recebe a lista de páginas)."""
+        resultado: Dict[int, bytes] = {}
+        faltando: List[int] = []
+        for page in pages:
+            data = self.get(file_hash, page, dpi, fmt)
+            if data is None:
+                faltando.append(page)
+            else:
+                resultado[page] = data
+        if faltando:
+            for page, data in render(faltando).items():
+                self.put(file_hash, page, dpi, fmt, data)
+                resultado[page] = data
+        return resultado
+
+    def _entradas(self) -> List[tuple]:
+        entradas = []
+        for path in self.directory.glob("*/*"):
+            if path.name.startswith("."):
+                continue
+            try:
+                entradas.append((path, path.stat()))
+            except OSError:
+                continue
+        return entradas
+
+    def _evict_if_needed(self) -> None:
+        with self._lock:
+            if self._tamanho_total is None:
+                self._tamanho_total = sum(st.st_size for _, st in self._entradas())
+            if self._tamanho_total <= self.max_bytes:
+                return
+            # Remove as menos usadas até ficar abaixo de 90% do limite, para não
+            # varrer o diretório a cada nova imagem.
+            alvo = int(self.max_bytes * 0.9)
+            entradas = sorted(self._entradas(), key=lambda item: item[1].st_mtime)
+            total = sum(st.st_size for _, st in entradas)
+            for path, st in entradas:
+                if total <= alvo:
+                    break
+                try:
+                    path.unlink()
+                    total -= st.st_size
+                except OSError:
+                    continue
+            self._tamanho_total = total
+
+
+def _resolve_directory(directory: str) -> Path:
+    path = Path(directory)
+    if not path.is_absolute():
+        path = Path(__file__).resolve().parent.parent / path
+    return path
+
+
+render_cache = PageRenderCache(
+    _resolve_directory(settings.RENDER_CACHE_DIRECTORY),
+    settings.RENDER_CACHE_MAX_MB * 1024 * 1024,
+)
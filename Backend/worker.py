@@ -0,0 +1,74 @@
+# catalogai_project/Backend/worker.py
+"""Processo worker da fila de tarefas de fundo.
+
+Uso::
+
+    python -m Backend.worker --queues ia,imports --concurrency 2
+    python -m Backend.worker --drain   # executa o que estiver na fila e sai
+
+Vários processos podem rodar ao mesmo tempo (na mesma máquina ou em outras,
+apontando para o mesmo banco); cada job é reservado por um único worker.
+"""
+import argparse
+import asyncio
+import importlib
+import signal
+
+from Backend.core.config import settings
+from Backend.core.logging_config import get_logger
+from Backend.database import SessionLocal
+from Backend.services import job_queue
+
+logger = get_logger(__name__)
+
+
+def _carregar_tarefas() -> None:
+    for module in job_queue.TASK_MODULES:
+        importlib.import_module(module)
+
+
+async def _main(queues, concurrency: int, drain: bool) -> None:
+    _carregar_tarefas()
+    workers = [job_queue.Worker(SessionLocal, queues=queues) for _ in range(concurrency)]
+
+    if drain:
+        totais = await asyncio.gather(*(w.run_until_empty() for w in workers))
+        logger.info("Fila esvaziada: %s job(s) executado(s)", sum(totais))
+        return
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:  # pragma: no cover - Windows
+            pass
+    # O job em andamento termina antes de o processo sair
+    await asyncio.gather(*(w.run(stop) for w in workers))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Worker da fila de tarefas do CatalogAI")
+    parser.add_argument(
+        "--queues",
+        default=settings.JOB_QUEUES,
+        help="Filas consumidas, separadas por vírgula (padrão: JOB_QUEUES)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=settings.JOB_WORKER_CONCURRENCY,
+        help="Jobs executados ao mesmo tempo neste processo",
+    )
+    parser.add_argument(
+        "--drain",
+        action="store_true",
+        help="Executa os jobs visíveis e termina em vez de aguardar novos",
+    )
+    args = parser.parse_args()
+    queues = [q.strip() for q in args.queues.split(",") if q.strip()]
+    asyncio.run(_main(queues, max(args.concurrency, 1), args.drain))
+
+
+if __name__ == "__main__":
+    main()
@@ -69,6 +69,7 @@ function ProdutosPage() {
         status_descricao_ia: filtroStatusDescricaoIA || undefined,
         fornecedor_id: filtroFornecedor || undefined,
         product_type_id: filtroTipoProduto || undefined,
+        view: 'summary',
       };
       Object.keys(params).forEach(key => params[key] === undefined && delete params[key]);
       const data = await productService.getProdutos(params);
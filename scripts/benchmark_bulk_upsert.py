@@ -0,0 +1,112 @@
+"""Benchmark da gravação em lote de produtos (``create_produtos_bulk``).
+
+Mede linhas/segundo de uma importação nova (só INSERT) e de uma reimportação
+das mesmas linhas (só UPDATE), comparando o upsert nativo em lotes com o
+caminho ORM linha a linha. Os produtos são enviados em blocos de
+``--chunk`` linhas, como fazem as importações de CSV.
+
+Uso::
+
+    python scripts/benchmark_bulk_upsert.py --rows 10000 100000 1000000
+    python scripts/benchmark_bulk_upsert.py --database-url postgresql://... --modes upsert
+
+As tabelas são criadas e removidas a cada execução, por isso ``--database-url``
+precisa apontar para um banco vazio, dedicado ao benchmark; o script se recusa
+a rodar em um banco que já tenha tabelas.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine, inspect  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from Backend import crud_produtos, models, schemas  # noqa: E402
+from Backend.core.config import settings  # noqa: E402
+from Backend.database import Base  # noqa: E402
+
+
+def _blocos(total: int, chunk: int, versao: int):
+    for inicio in range(0, total, chunk):
+        yield [
+            schemas.ProdutoCreate(
+                nome_base=f"Produto {i} v{versao}",
+                sku=f"SKU{i}",
+                ean=f"{7890000000000 + i:013d}",
+                marca="Marca",
+                preco_venda=i * 1.5 + versao,
+                estoque_disponivel=i % 100,
+                dynamic_attributes={"cor": "azul", "versao": versao},
+            )
+            for i in range(inicio, min(inicio + chunk, total))
+        ]
+
+
+def _importar(factory, user_id: int, total: int, chunk: int, batch_size: int, versao: int) -> float:
+    inicio = time.perf_counter()
+    with factory() as db:
+        for bloco in _blocos(total, chunk, versao):
+            crud_produtos.create_produtos_bulk(db, bloco, user_id, batch_size=batch_size)
+            db.expunge_all()
+    return total / (time.perf_counter() - inicio)
+
+
+def _exigir_banco_vazio(engine) -> None:
+    tabelas = sorted(inspect(engine).get_table_names())
+    if tabelas:
+        engine.dispose()
+        nomes = ", ".join(tabelas[:5]) + (", ..." if len(tabelas) > 5 else "")
+        raise SystemExit(
+            f"O banco {engine.url.render_as_string(hide_password=True)} já tem "
+            f"{len(tabelas)} tabela(s) ({nomes}). O benchmark cria e remove as "
+            "tabelas da aplicação: use um banco vazio."
+        )
+
+
+def _rodar(url: str, modo: str, total: int, chunk: int, batch_size: int):
+    engine = create_engine(url)
+    _exigir_banco_vazio(engine)
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        user = models.User(email="benchmark@example.com", hashed_password="x")
+        db.add(user)
+        db.commit()
+        user_id = user.id
+
+    settings.PRODUTOS_BULK_UPSERT = modo == "upsert"
+    try:
+        inserts = _importar(factory, user_id, total, chunk, batch_size, versao=1)
+        updates = _importar(factory, user_id, total, chunk, batch_size, versao=2)
+    finally:
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+    return inserts, updates
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--modes", nargs="+", choices=["upsert", "orm"], default=["upsert", "orm"])
+    parser.add_argument("--chunk", type=int, default=1000, help="linhas por chamada (CSV_BATCH_SIZE)")
+    parser.add_argument("--batch-size", type=int, default=settings.PRODUTOS_UPSERT_BATCH_SIZE)
+    parser.add_argument("--database-url", help="padrão: SQLite em arquivo temporário")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite:///{os.path.join(tmp, 'benchmark.db')}"
+        print(f"banco: {url.split('@')[-1]}  chunk: {args.chunk}  batch: {args.batch_size}")
+        print(f"{'linhas':>10} {'modo':>7} {'insert linhas/s':>16} {'update linhas/s':>16}")
+        for total in args.rows:
+            for modo in args.modes:
+                inserts, updates = _rodar(url, modo, total, args.chunk, args.batch_size)
+                print(f"{total:>10} {modo:>7} {inserts:>16,.0f} {updates:>16,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Micro-benchmark da padronização de linhas de catálogos.
+
+Compara o custo por linha do fluxo antigo (mapeamento montado e cabeçalhos
+normalizados a cada linha, linha como dicionário) com o
+``PlanoMapeamento`` compilado uma vez e aplicado a tuplas.
+
+Uso::
+
+    python scripts/benchmark_mapping_plan.py --rows 1000000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from Backend.services import file_processing_service  # noqa: E402
+from Backend.services.file_processing_service import MAPEAMENTO_COLUNAS_PADRAO  # noqa: E402
+
+CABECALHOS = ["Nome", "SKU", "Marca", "Preço", "Cor", "Tamanho", "Peso", "EAN"]
+MAPEAMENTO_USUARIO = {"Cor": "cor", "Tamanho": "tamanho"}
+
+
+def _limpar_valor_antigo(valor):
+    """Limpeza de valores anterior ao plano (lista de nulos recriada por chamada)."""
+    if valor is None:
+        return None
+    try:
+        s = str(valor).strip()
+        if s.lower() in ["", "nan", "none", "#n/a", "na", "<na>"]:
+            return None
+        return s
+    except Exception:
+        return None
+
+
+def _linha_padronizada_antiga(linha_original, mapeamento_colunas_usuario=None):
+    """Reprodução do fluxo anterior ao plano de mapeamento (custo por linha)."""
+    produto = {}
+    brutos = {}
+    mapeamento_default = dict(MAPEAMENTO_COLUNAS_PADRAO)  # literal recriado por linha
+    mapeamento_final = mapeamento_default.copy()
+    if mapeamento_colunas_usuario:
+        mapeamento_final.update(
+            {str(k).lower().strip(): v for k, v in mapeamento_colunas_usuario.items()}
+        )
+    for nome_coluna, valor in linha_original.items():
+        valor_limpo = _limpar_valor_antigo(valor)
+        if valor_limpo is None:
+            continue
+        destino = mapeamento_final.get(str(nome_coluna).lower().strip())
+        if destino:
+            if destino not in produto:
+                produto[destino] = valor_limpo
+        else:
+            brutos[str(nome_coluna).strip()] = valor_limpo
+    if not produto.get("nome_base") and not produto.get("sku_original"):
+        if brutos:
+            produto["nome_base"] = next(iter(brutos.values()))
+        else:
+            return {"motivo_descarte": "Faltam nome_base e sku_original"}
+    if brutos:
+        produto["dados_brutos_adicionais"] = brutos
+    return produto
+
+
+def _gerar_linhas(total: int):
+    return [
+        (f" Produto {i} ", f"SKU{i}", "Marca", f"{i * 1.5:.2f}", "azul", "", "n/a", None)
+        for i in range(total)
+    ]
+
+
+def _medir_limpeza(linhas, limpar) -> float:
+    inicio = time.perf_counter()
+    for valores in linhas:
+        for valor in valores:
+            limpar(valor)
+    return time.perf_counter() - inicio
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    linhas = _gerar_linhas(args.rows)
+
+    inicio = time.perf_counter()
+    for valores in linhas:
+        _linha_padronizada_antiga(dict(zip(CABECALHOS, valores)), MAPEAMENTO_USUARIO)
+    antigo = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    plano = file_processing_service.compilar_plano_mapeamento(CABECALHOS, MAPEAMENTO_USUARIO)
+    for valores in linhas:
+        plano.aplicar(valores)
+    novo = time.perf_counter() - inicio
+
+    # Overhead por linha = tempo total menos o custo mínimo de limpar os
+    # valores, que é o mesmo para os dois fluxos.
+    limpeza = _medir_limpeza(linhas, file_processing_service._limpar_valor_rapido)
+
+    por_linha = lambda total: total / args.rows * 1e6  # noqa: E731
+    print(f"linhas: {args.rows}")
+    print(f"fluxo antigo:        {por_linha(antigo):7.2f} us/linha")
+    print(f"plano de mapeamento: {por_linha(novo):7.2f} us/linha")
+    print(f"limpeza dos valores: {por_linha(limpeza):7.2f} us/linha")
+    print(
+        "overhead por linha:  "
+        f"{por_linha(antigo - limpeza):.2f} -> {por_linha(novo - limpeza):.2f} us "
+        f"({(antigo - limpeza) / max(novo - limpeza, 1e-9):.1f}x menor)"
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Benchmark da extração página a página de catálogos PDF.
+
+Compara o custo por página de ``extract_data_from_single_page`` quando o PDF
+é reaberto a cada chamada (comportamento antigo) com o uso de uma única
+``PdfDocumentSession`` para o documento inteiro.
+
+Uso::
+
+    python scripts/benchmark_pdf_session.py --pages 400 --sample 20
+"""
+import argparse
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from reportlab.lib import colors  # noqa: E402
+from reportlab.lib.pagesizes import letter  # noqa: E402
+from reportlab.platypus import PageBreak, SimpleDocTemplate, Table, TableStyle  # noqa: E402
+
+from Backend.services import file_processing_service  # noqa: E402
+
+
+def _build_pdf(pages: int) -> bytes:
+    buf = io.BytesIO()
+    doc = SimpleDocTemplate(buf, pagesize=letter)
+    story = []
+    for i in range(pages):
+        rows = [["nome", "sku", "marca"]] + [
+            [f"Produto {i}-{j}", f"SKU{i}-{j}", "Marca"] for j in range(20)
+        ]
+        table = Table(rows)
+        table.setStyle(TableStyle([("GRID", (0, 0), (-1, -1), 0.5, colors.black)]))
+        story.extend([table, PageBreak()])
+    doc.build(story[:-1])
+    return buf.getvalue()
+
+
+def _per_page_ms(pdf_path: str, page_numbers, session=None) -> float:
+    start = time.perf_counter()
+    for page in page_numbers:
+        file_processing_service.extract_data_from_single_page(
+            pdf_path, page, session=session
+        )
+    return (time.perf_counter() - start) * 1000 / len(page_numbers)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=400)
+    parser.add_argument("--sample", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = str(Path(tmp) / "catalogo.pdf")
+        Path(pdf_path).write_bytes(_build_pdf(args.pages))
+
+        windows = {
+            "inicio": list(range(1, args.sample + 1)),
+            "meio": list(range(args.pages // 2, args.pages // 2 + args.sample)),
+            "fim": list(range(args.pages - args.sample + 1, args.pages + 1)),
+        }
+
+        print(f"PDF com {args.pages} páginas, amostra de {args.sample} páginas por janela")
+        print(f"{'janela':<8}{'reabrindo (ms/pág)':>22}{'sessão (ms/pág)':>20}")
+        with file_processing_service.PdfDocumentSession(pdf_path) as session:
+            for name, page_numbers in windows.items():
+                reopen = _per_page_ms(pdf_path, page_numbers)
+                shared = _per_page_ms(pdf_path, page_numbers, session=session)
+                print(f"{name:<8}{reopen:>22.2f}{shared:>20.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,23 +8,74 @@ os.environ.setdefault("ADMIN_PASSWORD", "password")
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
 
+
 @pytest.fixture()
-def db_session():
+def engine():
+    """Banco em memória com todas as tabelas, numa única conexão (``StaticPool``)."""
     from sqlalchemy import create_engine
-    from sqlalchemy.orm import sessionmaker
-    from Backend.database import Base
-    import Backend.crud as crud
-    import Backend.schemas as schemas
-
     from sqlalchemy.pool import StaticPool
+    from Backend.database import Base
 
     engine = create_engine(
         SQLALCHEMY_DATABASE_URL,
         connect_args={"check_same_thread": False},
         poolclass=StaticPool,
     )
-    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     Base.metadata.create_all(bind=engine)
+    yield engine
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture()
+def db(engine):
+    """Sessão com um usuário cadastrado, sem role nem plano.
+
+    Módulos que precisam de mais dados sobrescrevem ``db`` recebendo este
+    fixture como parâmetro.
+    """
+    from sqlalchemy.orm import sessionmaker
+    from Backend import models
+
+    with sessionmaker(bind=engine)() as session:
+        session.add(models.User(email="teste@example.com", hashed_password="x"))
+        session.commit()
+        yield session
+
+
+@pytest.fixture()
+def contar_sql(engine):
+    """Registra os comandos SQL enviados ao banco.
+
+    ``contar_sql("SELECT")`` devolve uma lista preenchida, a partir desse
+    momento, com cada comando que começa com o prefixo (sem prefixo, todos).
+    """
+    from sqlalchemy import event
+
+    ouvintes = []
+
+    def iniciar(prefixo: str = ""):
+        executados = []
+
+        def registrar(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith(prefixo.upper()):
+                executados.append(statement)
+
+        event.listen(engine, "before_cursor_execute", registrar)
+        ouvintes.append(registrar)
+        return executados
+
+    yield iniciar
+    for registrar in ouvintes:
+        event.remove(engine, "before_cursor_execute", registrar)
+
+
+@pytest.fixture()
+def db_session(engine):
+    from sqlalchemy.orm import sessionmaker
+    import Backend.crud as crud
+    import Backend.schemas as schemas
+
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     db = TestingSessionLocal()
 
     # Create default role and plan needed for user creation
@@ -46,4 +97,17 @@ def db_session():
     yield db
 
     db.close()
-    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(autouse=True)
+def historico_sincrono(monkeypatch):
+    """Grava o histórico dentro da requisição para que os testes o leiam em seguida.
+
+    Os bancos em memória dos testes compartilham uma única conexão
+    (``StaticPool``), que não pode ser usada pela thread de
+    ``services.audit_log`` ao mesmo tempo que pela requisição.
+    ``tests/test_audit_log.py`` liga o modo assíncrono explicitamente.
+    """
+    from Backend.core.config import settings
+
+    monkeypatch.setattr(settings, "AUDIT_LOG_ASYNC", False)
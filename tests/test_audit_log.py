@@ -0,0 +1,181 @@
+import pytest
+pytest.importorskip("httpx")
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from Backend import models, schemas
+from Backend.core.config import settings
+from Backend.database import Base, get_db
+from Backend.main import app
+from Backend.routers import auth_utils
+from Backend.services import audit_log
+
+
+@pytest.fixture()
+def engine(tmp_path):
+    # Banco em arquivo: a thread do histórico usa a sua própria conexão.
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'audit.db'}", connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture()
+def session_factory(engine):
+    return sessionmaker(bind=engine)
+
+
+@pytest.fixture()
+def client(session_factory, monkeypatch):
+    # Encerra uma thread de testes anteriores, que usaria o intervalo antigo.
+    audit_log.pipeline.shutdown()
+    monkeypatch.setattr(settings, "AUDIT_LOG_ASYNC", True)
+    # Nada é gravado pelo intervalo ou pelo tamanho do lote: só o shutdown grava.
+    monkeypatch.setattr(audit_log.pipeline, "flush_interval", 60.0)
+    monkeypatch.setattr(audit_log.pipeline, "batch_size", 10_000)
+    monkeypatch.setattr(app.router, "on_startup", [])
+
+    with session_factory() as db:
+        user = models.User(email="audit@example.com", hashed_password="x", is_active=True)
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        db.expunge(user)
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setitem(app.dependency_overrides, get_db, override_get_db)
+    monkeypatch.setitem(
+        app.dependency_overrides, auth_utils.get_current_active_user, lambda: user
+    )
+    return TestClient(app)
+
+
+def _historico(session_factory, acao=None):
+    with session_factory() as db:
+        query = db.query(models.RegistroHistorico)
+        if acao is not None:
+            query = query.filter(models.RegistroHistorico.acao == acao)
+        return query.count()
+
+
+def test_history_is_written_off_request_and_flushed_on_shutdown(client, session_factory):
+    with client:
+        ids = []
+        for i in range(25):
+            resp = client.post("/api/v1/fornecedores/", json={"nome": f"Fornecedor {i}"})
+            assert resp.status_code == 201
+            ids.append(resp.json()["id"])
+        for fornecedor_id in ids[:10]:
+            resp = client.put(f"/api/v1/fornecedores/{fornecedor_id}", json={"nome": f"Novo {fornecedor_id}"})
+            assert resp.status_code == 200
+        for fornecedor_id in ids[10:15]:
+            assert client.delete(f"/api/v1/fornecedores/{fornecedor_id}").status_code == 200
+
+        # As requisições terminaram sem gravar o histórico.
+        assert _historico(session_factory) == 0
+        assert audit_log.pipeline.pendentes() == 40
+
+    # O shutdown da aplicação grava tudo o que estava na fila.
+    assert audit_log.pipeline.pendentes() == 0
+    assert _historico(session_factory, models.TipoAcaoSistemaEnum.CRIACAO) == 25
+    assert _historico(session_factory, models.TipoAcaoSistemaEnum.ATUALIZACAO) == 10
+    assert _historico(session_factory, models.TipoAcaoSistemaEnum.DELECAO) == 5
+
+
+def test_outbox_entries_survive_until_recovered(engine, session_factory, monkeypatch):
+    monkeypatch.setattr(settings, "AUDIT_LOG_ASYNC", True)
+    monkeypatch.setattr(settings, "AUDIT_OUTBOX_ENABLED", True)
+    pipeline = audit_log.AuditLogPipeline(flush_interval=60.0)
+    try:
+        with session_factory() as db:
+            for i in range(3):
+                pipeline.registrar(
+                    db,
+                    schemas.RegistroHistoricoCreate(
+                        entidade="Produto", acao=models.TipoAcaoSistemaEnum.CRIACAO, entity_id=i
+                    ),
+                )
+            db.commit()
+        with session_factory() as db:
+            assert db.query(models.AuditOutbox).count() == 3
+        assert _historico(session_factory) == 0
+
+        # Outro processo (ex.: após uma queda) recupera o outbox na subida.
+        assert audit_log.AuditLogPipeline().recuperar_outbox(engine) == 3
+    finally:
+        pipeline.shutdown()
+
+    with session_factory() as db:
+        assert db.query(models.AuditOutbox).count() == 0
+        assert sorted(r.entity_id for r in db.query(models.RegistroHistorico)) == [0, 1, 2]
+
+
+def test_outbox_entry_commits_and_rolls_back_with_the_write(client, session_factory, monkeypatch):
+    monkeypatch.setattr(settings, "AUDIT_OUTBOX_ENABLED", True)
+    with client:
+        resp = client.post("/api/v1/fornecedores/", json={"nome": "Fornecedor"})
+        assert resp.status_code == 201
+        with session_factory() as db:
+            assert db.get(models.Fornecedor, resp.json()["id"]) is not None
+            assert db.query(models.AuditOutbox).count() == 1
+
+            # Uma escrita desfeita leva junto o seu registro no outbox.
+            audit_log.registrar(
+                db,
+                schemas.RegistroHistoricoCreate(
+                    entidade="Fornecedor",
+                    acao=models.TipoAcaoSistemaEnum.DELECAO,
+                    entity_id=resp.json()["id"],
+                ),
+            )
+            db.delete(db.get(models.Fornecedor, resp.json()["id"]))
+            db.rollback()
+            assert db.query(models.AuditOutbox).count() == 1
+
+    assert _historico(session_factory, models.TipoAcaoSistemaEnum.CRIACAO) == 1
+    assert _historico(session_factory, models.TipoAcaoSistemaEnum.DELECAO) == 0
+
+
+def test_queued_entry_is_dropped_when_the_write_rolls_back(engine, session_factory, monkeypatch):
+    monkeypatch.setattr(settings, "AUDIT_LOG_ASYNC", True)
+    monkeypatch.setattr(settings, "AUDIT_OUTBOX_ENABLED", False)
+    pipeline = audit_log.AuditLogPipeline(flush_interval=60.0)
+    try:
+        with session_factory() as db:
+            pipeline.registrar(
+                db,
+                schemas.RegistroHistoricoCreate(
+                    entidade="Produto", acao=models.TipoAcaoSistemaEnum.DELECAO, entity_id=999
+                ),
+            )
+            db.rollback()
+            # Um commit posterior, sem relação com o registro, não o grava.
+            db.add(models.User(email="outro@example.com", hashed_password="x"))
+            db.commit()
+            assert pipeline.pendentes() == 0
+
+            pipeline.registrar(
+                db,
+                schemas.RegistroHistoricoCreate(
+                    entidade="Produto", acao=models.TipoAcaoSistemaEnum.CRIACAO, entity_id=1
+                ),
+            )
+            assert pipeline.pendentes() == 0
+            db.commit()
+            assert pipeline.pendentes() == 1
+    finally:
+        pipeline.shutdown()
+
+    with session_factory() as db:
+        assert [(r.acao, r.entity_id) for r in db.query(models.RegistroHistorico)] == [
+            (models.TipoAcaoSistemaEnum.CRIACAO, 1)
+        ]
@@ -0,0 +1,63 @@
+from Backend import models, schemas
+from Backend.services import audit_writer
+
+
+def _historico(user_id, entity_id):
+    return schemas.RegistroHistoricoCreate(
+        user_id=user_id,
+        entidade="Produto",
+        acao=models.TipoAcaoSistemaEnum.CRIACAO,
+        entity_id=entity_id,
+    )
+
+
+def _uso(user_id):
+    return schemas.RegistroUsoIACreate(
+        user_id=user_id,
+        tipo_acao=models.TipoAcaoEnum.CRIACAO_PRODUTO,
+        creditos_consumidos=0,
+    )
+
+
+def test_writer_flushes_with_one_insert_per_table(db, contar_sql):
+    user_id = db.query(models.User.id).scalar()
+    inserts = contar_sql("INSERT")
+
+    with audit_writer.BufferedAuditWriter(db, batch_size=1000, flush_interval=0) as audit:
+        for i in range(100):
+            audit.registrar_historico(_historico(user_id, i))
+            audit.registrar_uso_ia(_uso(user_id))
+        assert len(audit) == 200
+        assert db.query(models.RegistroHistorico).count() == 0
+    db.commit()
+
+    assert len(inserts) == 2
+    assert db.query(models.RegistroHistorico).count() == 100
+    assert db.query(models.RegistroUsoIA).count() == 100
+    assert db.query(models.RegistroHistorico.created_at).first()[0] is not None
+
+
+def test_writer_flushes_automatically_at_batch_size(db):
+    user_id = db.query(models.User.id).scalar()
+    audit = audit_writer.BufferedAuditWriter(db, batch_size=3, flush_interval=0)
+    for i in range(7):
+        audit.registrar_historico(_historico(user_id, i))
+
+    assert len(audit) == 1
+    assert db.query(models.RegistroHistorico).count() == 6
+    assert audit.flush() == 1
+
+
+def test_writer_flushes_after_interval(db, monkeypatch):
+    user_id = db.query(models.User.id).scalar()
+    agora = [100.0]
+    monkeypatch.setattr(audit_writer.time, "monotonic", lambda: agora[0])
+    audit = audit_writer.BufferedAuditWriter(db, batch_size=1000, flush_interval=5)
+
+    audit.registrar_historico(_historico(user_id, 1))
+    assert len(audit) == 1
+    agora[0] += 6
+    audit.registrar_historico(_historico(user_id, 2))
+
+    assert len(audit) == 0
+    assert db.query(models.RegistroHistorico).count() == 2
@@ -0,0 +1,143 @@
+import pytest
+
+from Backend import crud_produtos, models, schemas
+from Backend.core.config import settings
+
+
+def _user_id(db):
+    return db.query(models.User.id).scalar()
+
+
+def _produtos(*linhas):
+    return [schemas.ProdutoCreate(**linha) for linha in linhas]
+
+
+@pytest.mark.parametrize("upsert", [True, False])
+def test_bulk_creates_updates_and_discards_duplicates(db, monkeypatch, upsert):
+    monkeypatch.setattr(settings, "PRODUTOS_BULK_UPSERT", upsert)
+    user_id = _user_id(db)
+    existente_sku, existente_ean = crud_produtos.create_produtos_bulk(
+        db,
+        _produtos(
+            {"nome_base": "Antigo SKU", "sku": "A1", "preco_venda": 1.0},
+            {"nome_base": "Antigo EAN", "ean": "7890000000001"},
+        ),
+        user_id,
+    )[0]
+
+    created, updated, erros = crud_produtos.create_produtos_bulk(
+        db,
+        _produtos(
+            {"nome_base": "Novo", "sku": "B1", "marca": "X"},
+            {"nome_base": "Atualizado", "sku": "A1", "preco_venda": 2.5},
+            {"nome_base": "Por EAN", "sku": "C1", "ean": "7890000000001"},
+            {"nome_base": "Repetido", "sku": "B1"},
+            {"nome_base": "Sem chave"},
+        ),
+        user_id,
+        batch_size=2,
+    )
+
+    assert [p.nome_base for p in created] == ["Novo", "Sem chave"]
+    assert all(p.id and p.user_id == user_id for p in created)
+    assert [p.id for p in updated] == [existente_sku.id, existente_ean.id]
+    assert updated[0].preco_venda == 2.5 and updated[0].nome_base == "Atualizado"
+    assert updated[1].sku == "C1"
+    assert created[0].status_titulo_ia == models.StatusGeracaoIAEnum.NAO_INICIADO
+    assert [e["linha_original"]["nome_base"] for e in erros] == ["Repetido"]
+    assert erros[0]["duplicado"] is True
+    assert db.query(models.Produto).count() == 4
+
+
+def test_upsert_avoids_per_row_refresh(db, contar_sql, monkeypatch):
+    monkeypatch.setattr(settings, "PRODUTOS_BULK_UPSERT", True)
+    user_id = _user_id(db)
+    statements = contar_sql()
+
+    created, _, _ = crud_produtos.create_produtos_bulk(
+        db,
+        _produtos(*({"nome_base": f"P{i}", "sku": f"S{i}"} for i in range(50))),
+        user_id,
+        batch_size=25,
+    )
+
+    assert len(created) == 50
+    inserts = [s for s in statements if s.lstrip().upper().startswith("INSERT")]
+    assert len(inserts) == 2
+    assert all("ON CONFLICT" in s and "RETURNING" in s for s in inserts)
+    assert len(statements) < 15
+
+
+def test_upsert_turns_conflicting_insert_into_update(db, monkeypatch):
+    monkeypatch.setattr(settings, "PRODUTOS_BULK_UPSERT", True)
+    user_id = _user_id(db)
+    produto = models.Produto(nome_base="Concorrente", sku="Z1", user_id=user_id)
+    db.add(produto)
+    db.commit()
+    # Simula outra transação gravando o SKU depois da consulta de existentes
+    monkeypatch.setattr(crud_produtos, "_filtro_chaves", lambda produtos, user_id: None)
+
+    created, _, _ = crud_produtos.create_produtos_bulk(
+        db, _produtos({"nome_base": "Importado", "sku": "Z1"}), user_id
+    )
+
+    assert [p.id for p in created] == [produto.id]
+    assert db.query(models.Produto).one().nome_base == "Importado"
+
+
+def test_merge_duplicados_uses_one_select_and_chains_diffs(db, contar_sql):
+    user_id = _user_id(db)
+    a, b = crud_produtos.create_produtos_bulk(
+        db,
+        _produtos(
+            {"nome_base": "A", "sku": "A1", "preco_venda": 1.0},
+            {"nome_base": "B", "ean": "7890000000002"},
+        ),
+        user_id,
+    )[0]
+    linhas = [
+        {"nome_base": "A v2", "sku": "A1", "preco_venda": 2.0},
+        {"nome_base": "B v2", "ean": "7890000000002"},
+        {"nome_base": "A v3", "sku": "A1"},
+        {"nome_base": "Sem produto", "sku": "NAO"},
+    ]
+    selects = contar_sql("SELECT")
+    diffs = crud_produtos.merge_produtos_duplicados(db, linhas, user_id)
+    db.commit()
+
+    assert diffs[3] is None
+    assert diffs[0]["before"]["nome_base"] == "A"
+    assert diffs[0]["after"]["preco_venda"] == 2.0
+    assert diffs[2]["before"] == diffs[0]["after"]
+    assert diffs[2]["after"]["nome_base"] == "A v3"
+    assert diffs[1]["before"]["id"] == b.id and diffs[1]["after"]["nome_base"] == "B v2"
+    assert len(selects) <= 3  # produtos + selectinload dos relacionamentos
+    db.expire_all()
+    assert db.get(models.Produto, a.id).nome_base == "A v3"
+    assert db.get(models.Produto, a.id).preco_venda == 2.0
+
+
+def test_imported_page_reports_only_unmerged_duplicates(db):
+    from Backend.routers import produtos as produtos_router
+
+    erros, created, updated = [], [], []
+    produtos_router._gravar_lote_importado(
+        db,
+        [
+            {"nome_base": "Novo", "sku_original": "B1"},
+            {"nome_base": "Repetido", "sku_original": "B1"},
+        ],
+        models.CatalogImportFile(fornecedor_id=None),
+        _user_id(db),
+        None,
+        erros,
+        created,
+        updated,
+    )
+
+    # O duplicado da página vira atualização do produto criado, sem erro
+    assert [p.sku for p in created] == ["B1"]
+    assert [(d["before"]["nome_base"], d["after"]["nome_base"]) for d in updated] == [
+        ("Novo", "Repetido")
+    ]
+    assert erros == []
@@ -1,3 +1,4 @@
+import asyncio
 import io
 from pathlib import Path
 import pytest
@@ -14,6 +15,7 @@ from Backend.main import app
 from Backend.database import Base, get_db
 from Backend import crud, crud_produtos, schemas, models
 from Backend.core.config import settings
+from Backend.services import job_queue
 
 # ensure reportlab for PDF generation
 try:
@@ -44,6 +46,19 @@ def override_get_db():
 app.dependency_overrides[get_db] = override_get_db
 client = TestClient(app)
 
+
+def _run_jobs():
+    """Executa os jobs enfileirados, como faria o processo worker.
+
+    Usa o banco da dependência ``get_db`` ativa, que outros módulos de teste
+    também sobrescrevem.
+    """
+    gen = app.dependency_overrides[get_db]()
+    db = next(gen)
+    factory = sessionmaker(bind=db.get_bind())
+    gen.close()
+    asyncio.run(job_queue.Worker(factory).run_until_empty())
+
 with TestingSessionLocal() as db:
     crud.create_initial_data(db)
 
@@ -142,6 +157,7 @@ def test_finalize_updates_status():
         headers=headers,
         json={"product_type_id": pt_id, "fornecedor_id": fornec_id},
     )
+    _run_jobs()
     assert resp.status_code == 202
     assert resp.json()["status"] == "PROCESSING"
     assert resp.json()["status"] == "PROCESSING"
@@ -186,6 +202,7 @@ def test_finalize_processes_full_file():
         headers=headers,
         json={"product_type_id": pt_id, "fornecedor_id": fornec_id},
     )
+    _run_jobs()
     assert resp.status_code == 202
     with TestingSessionLocal() as db:
         produtos = db.query(models.Produto).all()
@@ -218,6 +235,7 @@ def test_import_updates_existing_product():
         headers=headers,
         json={"product_type_id": pt_id, "fornecedor_id": fornec_id},
     )
+    _run_jobs()
     assert resp.status_code == 202
 
     result_resp = client.get(
@@ -326,6 +344,7 @@ def test_status_endpoint_returns_progress():
         headers=headers,
         json={"product_type_id": pt_id, "fornecedor_id": fornec_id},
     )
+    _run_jobs()
 
     status_resp = client.get(
         f"/api/v1/produtos/importar-catalogo-status/{file_id}/",
@@ -363,6 +382,7 @@ def test_preview_pdf_respects_page_count():
         headers=headers,
         json={"product_type_id": pt_id, "fornecedor_id": fornec_id},
     )
+    _run_jobs()
     status_resp = client.get(
         f"/api/v1/produtos/importar-catalogo-status/{file_id}/",
         headers=headers,
@@ -458,6 +478,7 @@ def test_reprocess_catalog_import_file_creates_again():
         headers=headers,
         json={"product_type_id": pt_id, "fornecedor_id": fornec_id},
     )
+    _run_jobs()
     with TestingSessionLocal() as db:
         initial_count = db.query(models.Produto).count()
 
@@ -466,6 +487,7 @@ def test_reprocess_catalog_import_file_creates_again():
         headers=headers,
         json={"product_type_id": pt_id, "fornecedor_id": fornec_id},
     )
+    _run_jobs()
     assert resp.status_code == 202
     with TestingSessionLocal() as db:
         assert db.query(models.Produto).count() >= initial_count
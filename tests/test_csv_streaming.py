@@ -0,0 +1,114 @@
+import asyncio
+import types
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from Backend import crud, crud_produtos, models
+from Backend.database import Base
+from Backend.core.config import settings
+from Backend.routers import produtos as produtos_router
+from Backend.services import file_processing_service
+
+
+def _write_csv(path, linhas: int, encoding="utf-8", delimitador=","):
+    conteudo = [f"nome{delimitador}sku{delimitador}marca"]
+    conteudo += [
+        f"Produto ção {i}{delimitador}SKU{i}{delimitador}Marca" for i in range(linhas)
+    ]
+    path.write_bytes("\n".join(conteudo).encode(encoding))
+
+
+def test_iterar_linhas_csv_is_lazy_generator(tmp_path):
+    csv_path = tmp_path / "feed.csv"
+    _write_csv(csv_path, 10, encoding="latin-1", delimitador=";")
+
+    linhas = file_processing_service.iterar_linhas_csv(csv_path)
+
+    assert isinstance(linhas, types.GeneratorType)
+    primeira = next(linhas)
+    assert primeira["nome_base"] == "Produto ção 0"
+    assert primeira["sku_original"] == "SKU0"
+    assert len(list(linhas)) == 9
+
+
+def test_csv_detection_reads_bounded_prefix(tmp_path, monkeypatch):
+    import chardet
+
+    csv_path = tmp_path / "feed.csv"
+    _write_csv(csv_path, 20000)
+    tamanhos = []
+    original_detect = chardet.detect
+
+    def spy_detect(data, *args, **kwargs):
+        tamanhos.append(len(data))
+        return original_detect(data, *args, **kwargs)
+
+    monkeypatch.setattr(chardet, "detect", spy_detect)
+    monkeypatch.setattr(file_processing_service, "CSV_DETECTION_BYTES", 4096)
+
+    total = sum(1 for _ in file_processing_service.iterar_linhas_csv(csv_path))
+
+    assert total == 20000
+    assert tamanhos == [4096]
+
+
+def test_iterar_lotes_csv_fixed_size_batches(tmp_path):
+    csv_path = tmp_path / "feed.csv"
+    _write_csv(csv_path, 7)
+
+    lotes = list(file_processing_service.iterar_lotes_csv(csv_path, tamanho_lote=3))
+
+    assert [len(lote) for lote in lotes] == [3, 3, 1]
+
+
+def test_csv_import_writes_products_in_batches(tmp_path, monkeypatch):
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    TestingSessionLocal = sessionmaker(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with TestingSessionLocal() as db:
+        crud.create_initial_data(db)
+        user = crud.get_user_by_email(db, settings.FIRST_SUPERUSER_EMAIL)
+        user_id = user.id
+        existentes = db.query(models.Produto).filter_by(user_id=user_id).count()
+
+    monkeypatch.setattr(settings, "UPLOAD_DIRECTORY", str(tmp_path))
+    (tmp_path / "catalogs").mkdir()
+    _write_csv(tmp_path / "catalogs" / "feed.csv", 25)
+    with TestingSessionLocal() as db:
+        catalog_file = models.CatalogImportFile(
+            user_id=user_id,
+            original_filename="feed.csv",
+            stored_filename="feed.csv",
+            status="UPLOADED",
+        )
+        db.add(catalog_file)
+        db.commit()
+        file_id = catalog_file.id
+
+    lotes = []
+    original_bulk = crud_produtos.create_produtos_bulk
+
+    def spy_bulk(db, produtos, user_id):
+        lotes.append(len(produtos))
+        return original_bulk(db, produtos, user_id=user_id)
+
+    monkeypatch.setattr(crud_produtos, "create_produtos_bulk", spy_bulk)
+    monkeypatch.setattr(file_processing_service, "CSV_BATCH_SIZE", 10)
+
+    asyncio.run(
+        produtos_router._tarefa_processar_catalogo(
+            TestingSessionLocal, file_id, user_id, None, None
+        )
+    )
+
+    assert lotes == [10, 10, 5]
+    with TestingSessionLocal() as db:
+        assert db.query(models.Produto).filter_by(user_id=user_id).count() == existentes + 25
+        assert db.get(models.CatalogImportFile, file_id).status == "IMPORTED"
@@ -23,3 +23,78 @@ def test_processar_apenas_uma_aba():
     content = create_excel_bytes()
     res = asyncio.run(call_process(content, sheet="Segunda"))
     assert len(res) == 1
+
+
+def test_normalizar_dataframe_matches_row_by_row():
+    df = pd.DataFrame(
+        {
+            "Nome ": ["  Produto A", None, "N/A", "Produto D", None],
+            "Produto": [None, "Produto B", None, None, None],
+            "SKU": ["A1", "B1", None, 4.0, None],
+            "Preço": [10.5, float("nan"), 3, None, None],
+            "Cor": ["azul", " ", "verde", None, None],
+            "Extra": [None, None, None, None, "nan"],
+            "Cadastro": pd.to_datetime(["2024-01-01", "2024-02-03", None, "2024-03-04", None]),
+            "Atualizado": pd.to_datetime(["2024-01-01 10:30", None, None, None, None]),
+            "Estoque": pd.array([1, 2, 3, 4, None], dtype="Int64"),
+            "Peso": [0.5, float("nan"), 2.0, 1.25, float("nan")],
+        }
+    )
+    mapping = {"Cor": "cor"}
+
+    esperado = []
+    for _, linha in df.iterrows():
+        linha_dict = {c: v if pd.notna(v) else None for c, v in linha.to_dict().items()}
+        produto = file_processing_service._processar_linha_padronizada(linha_dict, mapping)
+        produto["product_type_id"] = 7
+        esperado.append(produto)
+
+    resultado = file_processing_service.normalizar_dataframe(df, mapping, product_type_id=7)
+    assert resultado == esperado
+    assert resultado[1]["nome_base"] == "Produto B"
+    assert resultado[2]["cor"] == "verde"
+    assert "motivo_descarte" in resultado[4]
+    extras = resultado[0]["dados_brutos_adicionais"]
+    assert extras["Cadastro"] == "2024-01-01 00:00:00"
+    assert extras["Atualizado"] == "2024-01-01 10:30:00"
+    assert extras["Estoque"] == "1"
+    assert "Peso" not in resultado[1]["dados_brutos_adicionais"]
+
+
+def _create_large_excel_bytes(linhas: int):
+    output = io.BytesIO()
+    df = pd.DataFrame(
+        {"nome": [f"P{i}" for i in range(linhas)], "sku": [f"S{i}" for i in range(linhas)]}
+    )
+    with pd.ExcelWriter(output, engine="openpyxl") as writer:
+        df.to_excel(writer, index=False, sheet_name="Itens")
+    return output.getvalue()
+
+
+def test_iterar_dataframes_excel_streams_chunks():
+    content = _create_large_excel_bytes(1000)
+
+    blocos = list(file_processing_service.iterar_dataframes_excel(content, tamanho_lote=400))
+
+    assert [len(df) for df in blocos] == [400, 400, 200]
+    assert list(blocos[0].columns) == ["nome", "sku"]
+    assert blocos[2].iloc[-1]["sku"] == "S999"
+
+
+def test_preview_excel_reads_only_requested_rows(monkeypatch):
+    content = _create_large_excel_bytes(1000)
+    lidos = []
+    original = file_processing_service.iterar_dataframes_excel
+
+    def spy(*args, **kwargs):
+        for df in original(*args, **kwargs):
+            lidos.append(len(df))
+            yield df
+
+    monkeypatch.setattr(file_processing_service, "iterar_dataframes_excel", spy)
+
+    preview = asyncio.run(file_processing_service.preview_arquivo_excel(content, max_rows=5))
+
+    assert preview["headers"] == ["nome", "sku"]
+    assert [row["sku"] for row in preview["sample_rows"]] == [f"S{i}" for i in range(5)]
+    assert lidos == [5]
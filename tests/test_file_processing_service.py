@@ -63,3 +63,29 @@ async def test_preview_arquivo_pdf_returns_page_info():
     assert res.get("table_pages") == []
     assert len(res["preview_images"]) == 1
     assert 1 in res["sample_rows"]
+
+
+def test_plano_mapeamento_matches_previous_row_output():
+    cabecalhos = ["Nome", " Produto ", "SKU", "Cor", "Obs"]
+    mapping = {" cor ": "cor"}
+    linhas = [
+        (" Item A ", "Outro", "A1", "azul", "NA"),
+        (None, "Item B", "", "", "extra"),
+        ("", None, "nan", None, "  solto "),
+        (None, None, "<NA>", None, None),
+    ]
+    plano = file_processing_service.compilar_plano_mapeamento(cabecalhos, mapping)
+
+    resultados = [plano.aplicar(linha) for linha in linhas]
+
+    # Saídas da implementação linha a linha anterior ao plano compilado
+    assert resultados == [
+        {"nome_base": "Item A", "sku_original": "A1", "cor": "azul"},
+        {"nome_base": "Item B", "dados_brutos_adicionais": {"Obs": "extra"}},
+        {"nome_base": "solto", "dados_brutos_adicionais": {"Obs": "solto"}},
+        {
+            "motivo_descarte": "Faltam nome_base e sku_original",
+            "linha_original": {"Nome": None, " Produto ": None, "SKU": "<NA>", "Cor": None, "Obs": None},
+        },
+    ]
+    assert file_processing_service.compilar_plano_mapeamento(cabecalhos, mapping) is plano
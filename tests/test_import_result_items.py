@@ -0,0 +1,159 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from Backend import crud, crud_fornecedores, models
+from Backend.core.config import settings
+from Backend.database import Base, get_db
+from Backend.main import app
+from Backend.routers import auth_utils
+from Backend.routers import produtos as produtos_router
+from Backend.services import file_processing_service
+
+app.router.on_startup.clear()
+
+
+@pytest.fixture()
+def imported_csv(tmp_path, monkeypatch):
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    TestingSessionLocal = sessionmaker(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with TestingSessionLocal() as db:
+        crud.create_initial_data(db)
+        user = crud.get_user_by_email(db, settings.FIRST_SUPERUSER_EMAIL)
+        db.expunge(user)
+
+    monkeypatch.setattr(settings, "UPLOAD_DIRECTORY", str(tmp_path))
+    (tmp_path / "catalogs").mkdir()
+    linhas = ["nome,sku"] + [f"Produto {i},SKU{i}" for i in range(25)] + [",", ",SKU0"]
+    (tmp_path / "catalogs" / "feed.csv").write_text("\n".join(linhas))
+    with TestingSessionLocal() as db:
+        catalog_file = models.CatalogImportFile(
+            user_id=user.id,
+            original_filename="feed.csv",
+            stored_filename="feed.csv",
+            status="UPLOADED",
+        )
+        db.add(catalog_file)
+        db.commit()
+        file_id = catalog_file.id
+
+    lotes = []
+    original_append = crud_fornecedores.append_catalog_import_results
+
+    def spy_append(db, catalog_file_id, kind, items):
+        if kind == "created":
+            lotes.append(len(items))
+        return original_append(db, catalog_file_id, kind, items)
+
+    monkeypatch.setattr(crud_fornecedores, "append_catalog_import_results", spy_append)
+    monkeypatch.setattr(file_processing_service, "CSV_BATCH_SIZE", 10)
+
+    asyncio.run(
+        produtos_router._tarefa_processar_catalogo(TestingSessionLocal, file_id, user.id, None, None)
+    )
+
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    overrides = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[auth_utils.get_current_active_user] = lambda: user
+    yield TestingSessionLocal, file_id, lotes
+    app.dependency_overrides.clear()
+    app.dependency_overrides.update(overrides)
+
+
+def test_results_are_appended_per_batch(imported_csv):
+    TestingSessionLocal, file_id, lotes = imported_csv
+
+    assert lotes == [10, 10, 5]
+    with TestingSessionLocal() as db:
+        record = db.get(models.CatalogImportFile, file_id)
+        assert record.status == "IMPORTED"
+        # O JSON da importação guarda só as contagens
+        assert record.result_summary["counts"]["created"] == 25
+        assert "created" not in record.result_summary
+        assert db.query(models.CatalogImportResultItem).filter_by(kind="created").count() == 25
+
+
+def test_paged_result_endpoint(imported_csv):
+    TestingSessionLocal, file_id, _ = imported_csv
+    client = TestClient(app)
+
+    resp = client.get(
+        f"/api/v1/produtos/importar-catalogo-result/{file_id}/itens/",
+        params={"kind": "created", "skip": 20, "limit": 10},
+    )
+
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["total_items"] == 25
+    assert body["page"] == 3
+    assert [item["sku"] for item in body["items"]] == [f"SKU{i}" for i in range(20, 25)]
+
+    erros = client.get(
+        f"/api/v1/produtos/importar-catalogo-result/{file_id}/itens/",
+        params={"kind": "errors"},
+    ).json()
+    assert erros["total_items"] >= 1
+    assert any("motivo_descarte" in item for item in erros["items"])
+
+    assert client.get(
+        f"/api/v1/produtos/importar-catalogo-result/{file_id}/itens/", params={"kind": "outro"}
+    ).status_code == 422
+
+
+def test_legacy_result_summary_is_still_served(imported_csv):
+    TestingSessionLocal, _, _ = imported_csv
+    with TestingSessionLocal() as db:
+        user_id = db.query(models.User.id).scalar()
+        # Importação concluída antes da tabela catalog_import_result_items
+        legado = models.CatalogImportFile(
+            user_id=user_id,
+            original_filename="antigo.csv",
+            stored_filename="antigo.csv",
+            status="IMPORTED",
+            result_summary={
+                "created": [
+                    {
+                        "id": 1000 + i,
+                        "user_id": user_id,
+                        "nome_base": f"Antigo {i}",
+                        "created_at": "2025-01-01T00:00:00",
+                        "updated_at": "2025-01-01T00:00:00",
+                    }
+                    for i in range(3)
+                ],
+                "updated": [],
+                "errors": [{"motivo_descarte": "sem nome"}],
+            },
+        )
+        db.add(legado)
+        db.commit()
+        legado_id = legado.id
+    client = TestClient(app)
+
+    completo = client.get(f"/api/v1/produtos/importar-catalogo-result/{legado_id}/")
+    assert completo.status_code == 200
+    assert [p["nome_base"] for p in completo.json()["created"]] == ["Antigo 0", "Antigo 1", "Antigo 2"]
+    assert len(completo.json()["errors"]) == 1
+
+    pagina = client.get(
+        f"/api/v1/produtos/importar-catalogo-result/{legado_id}/itens/",
+        params={"kind": "created", "skip": 1, "limit": 1},
+    ).json()
+    assert pagina["total_items"] == 3
+    assert [p["nome_base"] for p in pagina["items"]] == ["Antigo 1"]
@@ -0,0 +1,259 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from Backend import crud, crud_background_jobs, crud_fornecedores, models
+from Backend.core.config import settings
+from Backend.database import Base, get_db
+from Backend.main import app
+from Backend.routers import auth_utils
+from Backend.routers import produtos as produtos_router  # noqa: F401 - registra as tarefas
+from Backend.services import job_queue
+
+app.router.on_startup.clear()
+
+
+@pytest.fixture()
+def session_factory():
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(bind=engine)
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture()
+def registered_tasks(monkeypatch):
+    tasks = dict(job_queue._tasks)
+    monkeypatch.setattr(job_queue, "_tasks", tasks)
+    return tasks
+
+
+def _enqueue(factory, task="teste.noop", **kwargs):
+    with factory() as db:
+        return job_queue.enqueue(db, task, kwargs.pop("payload", {}), **kwargs).id
+
+
+def _expirar_reserva(factory, job_id):
+    with factory() as db:
+        job = db.get(models.BackgroundJob, job_id)
+        job.locked_until = datetime.now(timezone.utc) - timedelta(seconds=1)
+        db.commit()
+
+
+def test_claim_respects_priority_and_is_exclusive(session_factory):
+    baixa = _enqueue(session_factory, queue="imports")
+    alta = _enqueue(session_factory, queue="imports", priority=job_queue.PRIORIDADE_ALTA)
+    _enqueue(session_factory, queue="outra")
+
+    with session_factory() as db:
+        primeiro = crud_background_jobs.claim_job(db, ["imports"], "w1", 60)
+        assert (primeiro.id, primeiro.locked_by) == (alta, "w1")
+        assert primeiro.status == "RUNNING" and primeiro.attempts == 1
+        segundo = crud_background_jobs.claim_job(db, ["imports"], "w2", 60)
+        assert (segundo.id, segundo.locked_by) == (baixa, "w2")
+        assert crud_background_jobs.claim_job(db, ["imports"], "w3", 60) is None
+
+
+def test_expired_visibility_timeout_makes_job_visible_again(session_factory):
+    job_id = _enqueue(session_factory)
+
+    with session_factory() as db:
+        assert crud_background_jobs.claim_job(db, ["default"], "morto", 60).id == job_id
+        assert crud_background_jobs.claim_job(db, ["default"], "w2", 60) is None
+
+    _expirar_reserva(session_factory, job_id)
+
+    with session_factory() as db:
+        job = crud_background_jobs.claim_job(db, ["default"], "w2", 60)
+        assert (job.id, job.locked_by, job.attempts) == (job_id, "w2", 2)
+        # O worker antigo perdeu a reserva e não consegue concluir o job
+        assert crud_background_jobs.complete_job(db, job_id, "morto") is False
+        assert crud_background_jobs.complete_job(db, job_id, "w2", {"ok": True}) is True
+        assert db.get(models.BackgroundJob, job_id).status == "SUCCEEDED"
+
+
+def test_expired_lock_on_last_attempt_fails_job(session_factory):
+    job_id = _enqueue(session_factory, max_attempts=1)
+    with session_factory() as db:
+        crud_background_jobs.claim_job(db, ["default"], "morto", 60)
+    _expirar_reserva(session_factory, job_id)
+
+    with session_factory() as db:
+        assert crud_background_jobs.claim_job(db, ["default"], "w2", 60) is None
+        job = db.get(models.BackgroundJob, job_id)
+        assert job.status == "FAILED"
+        assert "Timeout" in job.last_error
+
+
+def test_worker_retries_with_backoff_until_max_attempts(session_factory, registered_tasks, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_RETRY_BACKOFF_SECONDS", 10)
+    chamadas = []
+
+    async def falha(db_session_factory, valor):
+        chamadas.append(valor)
+        raise RuntimeError("API indisponível")
+
+    registered_tasks["teste.falha"] = falha
+    job_id = _enqueue(session_factory, "teste.falha", payload={"valor": 7}, max_attempts=2)
+    worker = job_queue.Worker(session_factory, queues=["default"], worker_id="w1")
+
+    antes = datetime.now(timezone.utc).replace(tzinfo=None)
+    assert asyncio.run(worker.run_once()) is True
+    with session_factory() as db:
+        job = db.get(models.BackgroundJob, job_id)
+        assert job.status == "QUEUED"
+        assert job.attempts == 1
+        assert "API indisponível" in job.last_error
+        run_after = job.run_after.replace(tzinfo=None)
+        assert run_after >= antes + timedelta(seconds=10)
+        # Ainda no backoff: nada a executar
+        assert asyncio.run(worker.run_once()) is False
+        job.run_after = datetime.now(timezone.utc) - timedelta(seconds=1)
+        db.commit()
+
+    assert asyncio.run(worker.run_once()) is True
+    assert chamadas == [7, 7]
+    with session_factory() as db:
+        job = db.get(models.BackgroundJob, job_id)
+        assert job.status == "FAILED"
+        assert job.attempts == 2
+        assert job.finished_at is not None
+
+
+def test_worker_runs_task_with_session_factory(session_factory, registered_tasks):
+    recebido = {}
+
+    def soma(db_session_factory, a, b):
+        recebido["factory"] = db_session_factory
+        return {"total": a + b}
+
+    registered_tasks["teste.soma"] = soma
+    job_id = _enqueue(session_factory, "teste.soma", payload={"a": 2, "b": 3})
+    worker = job_queue.Worker(session_factory, queues=["default"])
+
+    assert asyncio.run(worker.run_until_empty()) == 1
+    assert recebido["factory"] is session_factory
+    with session_factory() as db:
+        job = db.get(models.BackgroundJob, job_id)
+        assert (job.status, job.result, job.locked_until) == ("SUCCEEDED", {"total": 5}, None)
+
+
+def test_unknown_task_fails_without_retry(session_factory, registered_tasks):
+    job_id = _enqueue(session_factory, "teste.inexistente", max_attempts=5)
+    worker = job_queue.Worker(session_factory, queues=["default"])
+
+    assert asyncio.run(worker.run_until_empty()) == 1
+    with session_factory() as db:
+        job = db.get(models.BackgroundJob, job_id)
+        assert (job.status, job.attempts) == ("FAILED", 1)
+        assert "Tarefa não registrada" in job.last_error
+
+
+def test_failed_catalog_import_is_retried_with_backoff(
+    session_factory, registered_tasks, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(settings, "JOB_RETRY_BACKOFF_SECONDS", 10)
+    monkeypatch.setattr(settings, "UPLOAD_DIRECTORY", str(tmp_path))
+    (tmp_path / "catalogs").mkdir()
+    (tmp_path / "catalogs" / "feed.csv").write_text("nome,sku\nProduto,SKU1")
+    with session_factory() as db:
+        crud.create_initial_data(db)
+        user_id = crud.get_user_by_email(db, settings.FIRST_SUPERUSER_EMAIL).id
+        catalog_file = models.CatalogImportFile(
+            user_id=user_id,
+            original_filename="feed.csv",
+            stored_filename="feed.csv",
+            status="UPLOADED",
+        )
+        db.add(catalog_file)
+        db.commit()
+        file_id = catalog_file.id
+
+    def banco_indisponivel(db, catalog_file_id):
+        raise RuntimeError("banco indisponível")
+
+    monkeypatch.setattr(crud_fornecedores, "clear_catalog_import_results", banco_indisponivel)
+    job_id = _enqueue(
+        session_factory,
+        "catalogo.processar",
+        payload={"file_id": file_id, "user_id": user_id, "product_type_id": None, "fornecedor_id": None},
+        queue="imports",
+    )
+    worker = job_queue.Worker(session_factory, queues=["imports"], worker_id="w1")
+
+    antes = datetime.now(timezone.utc).replace(tzinfo=None)
+    assert asyncio.run(worker.run_once()) is True
+    with session_factory() as db:
+        assert db.get(models.CatalogImportFile, file_id).status == "FAILED"
+        job = db.get(models.BackgroundJob, job_id)
+        assert (job.status, job.attempts) == ("QUEUED", 1)
+        assert "banco indisponível" in job.last_error
+        assert job.run_after.replace(tzinfo=None) >= antes + timedelta(seconds=10)
+
+
+def test_backend_must_implement_every_operation():
+    class SemFail(job_queue.JobQueueBackend):
+        def enqueue(self, db, task, payload, *, queue, priority, max_attempts, user_id):
+            pass
+
+        def claim(self, db, queues, worker_id):
+            pass
+
+        def heartbeat(self, db, job_id, worker_id):
+            pass
+
+        def complete(self, db, job_id, worker_id, result):
+            pass
+
+    with pytest.raises(TypeError):
+        SemFail()
+
+
+def test_job_status_endpoints_are_scoped_to_owner(session_factory):
+    with session_factory() as db:
+        crud.create_initial_data(db)
+        user = crud.get_user_by_email(db, settings.FIRST_SUPERUSER_EMAIL)
+        outro = models.User(email="outro@example.com", hashed_password="x", is_active=True)
+        db.add(outro)
+        db.commit()
+        db.refresh(user)
+        outro_id = outro.id
+        db.expunge(user)
+
+    meu = _enqueue(session_factory, queue="imports", user_id=user.id)
+    alheio = _enqueue(session_factory, user_id=outro_id)
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    overrides = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db] = override_get_db
+    user.is_superuser = False
+    app.dependency_overrides[auth_utils.get_current_active_user] = lambda: user
+    try:
+        client = TestClient(app)
+        response = client.get(f"/api/v1/jobs/{meu}")
+        assert response.status_code == 200
+        assert response.json()["status"] == "QUEUED"
+        assert response.json()["queue"] == "imports"
+        assert client.get(f"/api/v1/jobs/{alheio}").status_code == 404
+
+        pagina = client.get("/api/v1/jobs/", params={"status": "QUEUED"}).json()
+        assert [j["id"] for j in pagina["items"]] == [meu]
+        assert pagina["total_items"] == 1
+    finally:
+        app.dependency_overrides.clear()
+        app.dependency_overrides.update(overrides)
@@ -0,0 +1,167 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from Backend import crud_background_jobs, models
+from Backend.core.config import settings
+from Backend.database import Base
+from Backend.services import job_queue, job_scheduler
+
+
+@pytest.fixture()
+def session_factory(monkeypatch):
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(settings, "JOB_FAIR_SCHEDULING", True)
+    monkeypatch.setattr(settings, "JOB_TENANT_MAX_CONCURRENT", 2)
+    monkeypatch.setattr(settings, "JOB_TENANT_MAX_CONCURRENT_PRIORITARIO", 4)
+    monkeypatch.setattr(settings, "JOB_TENANT_WEIGHT_PRIORITARIO", 2)
+    yield sessionmaker(bind=engine)
+    Base.metadata.drop_all(bind=engine)
+
+
+def _user(db, email, prioritario=False, **plano):
+    plano = models.Plano(
+        nome=f"Plano {email}", preco_mensal=0, suporte_prioritario=prioritario, **plano
+    )
+    user = models.User(email=email, hashed_password="x", plano=plano)
+    db.add(user)
+    db.commit()
+    return user.id
+
+
+def _enqueue(factory, user_id, quantidade=1, queue="imports"):
+    with factory() as db:
+        for _ in range(quantidade):
+            job_queue.enqueue(db, "teste.noop", queue=queue, user_id=user_id)
+
+
+def _claim(factory, worker="w"):
+    with factory() as db:
+        job = job_queue.DatabaseJobQueue().claim(db, ["imports", "ia"], worker)
+        return job.user_id if job else None
+
+
+def _estado(user_id, executando, prontos=1, segundos=0, **kwargs):
+    return job_scheduler.EstadoTenant(
+        user_id=user_id,
+        executando=executando,
+        prontos=prontos,
+        espera_desde=datetime(2025, 1, 1) + timedelta(seconds=segundos),
+        **kwargs,
+    )
+
+
+def test_order_uses_weighted_share_caps_and_wait_time(monkeypatch):
+    monkeypatch.setattr(settings, "JOB_TENANT_MAX_CONCURRENT", 2)
+    monkeypatch.setattr(settings, "JOB_TENANT_WEIGHT_PRIORITARIO", 2)
+    estados = [
+        _estado(1, executando=1, segundos=0),
+        _estado(2, executando=1, segundos=5, suporte_prioritario=True),  # 1/2 < 1/1
+        _estado(3, executando=0, segundos=10),
+        _estado(4, executando=0, segundos=1),  # espera há mais tempo que o 3
+        _estado(5, executando=2),  # no limite
+        _estado(6, executando=0, prontos=0),  # nada pronto
+        _estado(None, executando=50, segundos=99),  # sistema, sem limite
+    ]
+
+    ordem = job_scheduler.ordem_de_atendimento(estados)
+
+    assert ordem == [(4, 2), (3, 2), (2, 4), (1, 2), (None, None)]
+
+
+def test_plan_overrides_limit_and_weight():
+    estado = _estado(1, executando=0, suporte_prioritario=True, limite_plano=7, peso_plano=5)
+    assert job_scheduler.limite_concorrencia(estado) == 7
+    assert job_scheduler.peso(estado) == 5
+
+
+def test_heavy_tenant_cannot_monopolize_workers(session_factory):
+    with session_factory() as db:
+        pesado = _user(db, "pesado@example.com")
+        leve = _user(db, "leve@example.com")
+    _enqueue(session_factory, pesado, 5)
+    _enqueue(session_factory, leve, 1, queue="ia")
+
+    atendidos = [_claim(session_factory, f"w{i}") for i in range(4)]
+
+    # O usuário leve é atendido logo no segundo slot e o pesado para no limite de 2
+    assert atendidos == [pesado, leve, pesado, None]
+    with session_factory() as db:
+        assert (
+            db.query(models.BackgroundJob)
+            .filter_by(user_id=pesado, status="QUEUED")
+            .count()
+            == 3
+        )
+
+
+def test_priority_plan_gets_more_slots(session_factory):
+    with session_factory() as db:
+        premium = _user(db, "premium@example.com", prioritario=True)
+        limitado = _user(db, "limitado@example.com", limite_jobs_simultaneos=1)
+    _enqueue(session_factory, premium, 6)
+    _enqueue(session_factory, limitado, 3)
+
+    atendidos = [_claim(session_factory, f"w{i}") for i in range(6)]
+
+    assert atendidos.count(premium) == 4
+    assert atendidos.count(limitado) == 1
+    assert atendidos[-1] is None
+
+
+def test_tenant_locked_by_another_worker_is_skipped(session_factory, monkeypatch):
+    with session_factory() as db:
+        ocupado = _user(db, "ocupado@example.com")
+        livre = _user(db, "livre@example.com")
+    _enqueue(session_factory, ocupado, 2)
+    _enqueue(session_factory, livre, 1)
+    # Outro worker está reservando um job do primeiro usuário
+    monkeypatch.setattr(
+        crud_background_jobs, "_travar_tenant", lambda db, user_id: user_id != ocupado
+    )
+
+    assert _claim(session_factory) == livre
+
+
+def test_fair_scheduling_can_be_disabled(session_factory, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_FAIR_SCHEDULING", False)
+    with session_factory() as db:
+        pesado = _user(db, "pesado@example.com")
+    _enqueue(session_factory, pesado, 3)
+
+    assert [_claim(session_factory, f"w{i}") for i in range(3)] == [pesado] * 3
+
+
+def test_queue_metrics_per_tenant(session_factory):
+    with session_factory() as db:
+        a = _user(db, "a@example.com")
+        b = _user(db, "b@example.com")
+    _enqueue(session_factory, a, 3)
+    _enqueue(session_factory, b, 1)
+    with session_factory() as db:
+        # Um job de "a" entrou na fila há um minuto e outro ainda está em backoff
+        jobs = db.query(models.BackgroundJob).filter_by(user_id=a).order_by("id").all()
+        jobs[0].created_at = datetime.now(timezone.utc) - timedelta(seconds=60)
+        jobs[2].run_after = datetime.now(timezone.utc) + timedelta(seconds=600)
+        db.commit()
+
+    assert _claim(session_factory) == a
+
+    with session_factory() as db:
+        metricas = {m["user_id"]: m for m in crud_background_jobs.get_queue_metrics(db)}
+        so_b = crud_background_jobs.get_queue_metrics(db, user_id=b)
+
+    assert (metricas[a]["queued"], metricas[a]["ready"], metricas[a]["running"]) == (2, 1, 1)
+    assert metricas[a]["started_in_window"] == 1
+    assert metricas[a]["avg_wait_seconds"] >= 59
+    assert (metricas[b]["queued"], metricas[b]["ready"], metricas[b]["running"]) == (1, 1, 0)
+    assert metricas[b]["avg_wait_seconds"] is None
+    assert [m["user_id"] for m in so_b] == [b]
@@ -0,0 +1,171 @@
+from datetime import datetime
+
+import pytest
+
+from Backend import crud_historico, crud_produtos, crud_registros_uso_ia, models, schemas
+from Backend.database import get_db
+from Backend.main import app
+from Backend.routers import auth_utils
+from Backend.services import keyset_pagination
+
+
+def _user_id(db):
+    return db.query(models.User.id).scalar()
+
+
+def _paginas(buscar, limit):
+    """Percorre todas as páginas seguindo ``next_cursor``."""
+    vistos, cursor = [], None
+    while True:
+        itens, cursor = buscar(limit=limit, cursor=cursor)
+        assert len(itens) <= limit
+        vistos.extend(item.id for item in itens)
+        if cursor is None:
+            return vistos
+
+
+def _criar_produtos(db, user_id):
+    marcas = ["Bosch", None, "Makita", "Bosch", None, "Dewalt", "Makita", "Bosch", None]
+    for i, marca in enumerate(marcas):
+        crud_produtos.create_produto(
+            db,
+            schemas.ProdutoCreate(nome_base=f"Furadeira {i}", marca=marca, preco_venda=float(i % 3)),
+            user_id=user_id,
+        )
+
+
+@pytest.mark.parametrize(
+    "sort_by,sort_order",
+    [(None, "asc"), ("id", "desc"), ("marca", "asc"), ("marca", "desc"), ("preco_venda", "desc")],
+)
+def test_cursor_pages_match_offset_listing(db, sort_by, sort_order):
+    user_id = _user_id(db)
+    _criar_produtos(db, user_id)
+
+    def buscar(limit, cursor):
+        return crud_produtos.get_produtos_by_user_cursor(
+            db, user_id=user_id, is_admin=False, limit=limit, cursor=cursor,
+            sort_by=sort_by, sort_order=sort_order,
+        )
+
+    vistos = _paginas(buscar, limit=2)
+    todos, _ = buscar(limit=100, cursor=None)
+
+    assert vistos == [p.id for p in todos]
+    assert sorted(vistos) == sorted(p.id for p in db.query(models.Produto))
+    if sort_by == "marca":
+        # NULL fica no fim do asc e no começo do desc, com o id como desempate.
+        marcas = [p.marca for p in todos]
+        nulos = [m for m in marcas if m is None]
+        assert marcas == (
+            sorted(m for m in marcas if m) + nulos
+            if sort_order == "asc"
+            else nulos + sorted((m for m in marcas if m), reverse=True)
+        )
+
+
+def test_cursor_keeps_filters_and_relevance_order(db):
+    user_id = _user_id(db)
+    _criar_produtos(db, user_id)
+    crud_produtos.create_produto(
+        db, schemas.ProdutoCreate(nome_base="Serra", marca="Bosch"), user_id=user_id
+    )
+
+    def buscar(limit, cursor):
+        return crud_produtos.get_produtos_by_user_cursor(
+            db, user_id=user_id, is_admin=False, limit=limit, cursor=cursor, search="furadeira bosch",
+        )
+
+    esperado = crud_produtos.get_produtos_by_user(
+        db, user_id=user_id, is_admin=False, limit=100, search="furadeira bosch"
+    )
+    assert len(esperado) == 3
+    assert _paginas(buscar, limit=1) == [p.id for p in esperado]
+
+
+def test_history_cursor_handles_equal_timestamps(db):
+    user_id = _user_id(db)
+    # O server_default grava vários registros no mesmo segundo.
+    for i in range(7):
+        crud_historico.create_registro_historico(
+            db,
+            schemas.RegistroHistoricoCreate(
+                user_id=user_id, entidade="Produto", acao=models.TipoAcaoSistemaEnum.CRIACAO, entity_id=i
+            ),
+        )
+
+    def buscar(limit, cursor):
+        return crud_historico.get_registros_historico_cursor(db, user_id=user_id, limit=limit, cursor=cursor)
+
+    assert _paginas(buscar, limit=3) == sorted(
+        (r.id for r in db.query(models.RegistroHistorico)), reverse=True
+    )
+
+
+def test_usage_cursor_orders_by_created_at(db):
+    user_id = _user_id(db)
+    datas = [datetime(2024, 1, d, 12) for d in (3, 1, 2, 2, 5)]
+    for data in datas:
+        db.add(
+            models.RegistroUsoIA(
+                user_id=user_id, tipo_acao=models.TipoAcaoEnum.CRIACAO_TITULO_PRODUTO, created_at=data
+            )
+        )
+    db.commit()
+
+    def buscar(limit, cursor):
+        return crud_registros_uso_ia.get_registros_uso_ia_cursor(
+            db, user_id=user_id, limit=limit, cursor=cursor, data_inicio=datetime(2024, 1, 2)
+        )
+
+    vistos = _paginas(buscar, limit=2)
+    registros = {r.id: r.created_at for r in db.query(models.RegistroUsoIA)}
+
+    assert [registros[i].day for i in vistos] == [5, 3, 2, 2]
+
+
+def test_invalid_or_foreign_cursor_is_rejected(db):
+    user_id = _user_id(db)
+    _criar_produtos(db, user_id)
+    _, cursor = crud_produtos.get_produtos_by_user_cursor(
+        db, user_id=user_id, is_admin=False, limit=2, sort_by="marca"
+    )
+
+    with pytest.raises(keyset_pagination.CursorInvalidoError):
+        crud_produtos.get_produtos_by_user_cursor(
+            db, user_id=user_id, is_admin=False, limit=2, cursor=cursor, sort_by="nome_base"
+        )
+    with pytest.raises(keyset_pagination.CursorInvalidoError):
+        crud_produtos.get_produtos_by_user_cursor(
+            db, user_id=user_id, is_admin=False, limit=2, cursor="nao-e-um-cursor"
+        )
+
+
+def test_product_endpoint_cursor_mode(db, monkeypatch):
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+
+    user_id = _user_id(db)
+    _criar_produtos(db, user_id)
+    user = db.get(models.User, user_id)
+    monkeypatch.setitem(app.dependency_overrides, get_db, lambda: db)
+    monkeypatch.setitem(app.dependency_overrides, auth_utils.get_current_active_user, lambda: user)
+    client = TestClient(app)
+
+    ids, params = [], {"pagination": "cursor", "limit": 4, "sort_by": "marca", "sort_order": "desc"}
+    while True:
+        resp = client.get("/api/v1/produtos/", params=params)
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["page"] is None and data["total_items"] == 9
+        ids.extend(item["id"] for item in data["items"])
+        if data["next_cursor"] is None:
+            break
+        params = {**params, "cursor": data["next_cursor"]}
+    assert sorted(ids) == sorted(p.id for p in db.query(models.Produto))
+
+    resp = client.get("/api/v1/produtos/", params={"cursor": params["cursor"]})
+    assert resp.status_code == 400
+
+    resp = client.get("/api/v1/produtos/", params={"skip": 4, "limit": 4})
+    assert resp.json()["page"] == 2 and resp.json()["next_cursor"] is None
@@ -0,0 +1,183 @@
+import io
+import os
+
+import pytest
+from PIL import Image, ImageDraw
+
+from Backend.core.config import settings
+from Backend.services import file_processing_service, ocr_service
+from Backend.services.render_cache import PageRenderCache
+
+fitz = pytest.importorskip("fitz")
+pytesseract = pytest.importorskip("pytesseract")
+
+
+def _scan(texto: str) -> bytes:
+    image = Image.new("RGB", (400, 200), "white")
+    ImageDraw.Draw(image).text((20, 20), texto, fill="black")
+    buf = io.BytesIO()
+    image.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def _scanned_pdf(*scans: bytes) -> bytes:
+    doc = fitz.open()
+    for scan in scans:
+        page = doc.new_page()
+        page.insert_image(page.rect, stream=scan)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+@pytest.fixture()
+def fake_tesseract(monkeypatch, tmp_path):
+    """Tesseract falso: confiança baixa abaixo de 300 dpi."""
+    chamadas = []
+
+    def image_to_data(image, lang=None, output_type=None):
+        dpi = round(image.width * 72 / 595)  # páginas A4
+        chamadas.append(dpi)
+        confianca = 90 if dpi >= 300 else 40
+        return {
+            "text": ["", "Nome", "Preco", "Caneta", "2,50"],
+            "conf": ["-1", confianca, confianca, confianca, confianca],
+            "block_num": [0, 1, 1, 1, 1],
+            "par_num": [0, 1, 1, 1, 1],
+            "line_num": [0, 1, 1, 2, 2],
+        }
+
+    monkeypatch.setattr(pytesseract, "image_to_data", image_to_data)
+    monkeypatch.setattr(settings, "OCR_WORKERS", 0)
+    monkeypatch.setattr(settings, "OCR_LOW_DPI", 150)
+    monkeypatch.setattr(settings, "OCR_HIGH_DPI", 300)
+    monkeypatch.setattr(settings, "OCR_MIN_CONFIDENCE", 70)
+    monkeypatch.setattr(settings, "OCR_LANGUAGE", "eng")
+    monkeypatch.setattr(ocr_service, "ocr_cache", PageRenderCache(tmp_path / "ocr", 1024 * 1024))
+    return chamadas
+
+
+def test_ocr_retries_high_dpi_only_when_confidence_is_low(fake_tesseract, monkeypatch):
+    pdf = _scanned_pdf(_scan("Nome Preco"))
+
+    resultado = ocr_service.ocr_pagina_pdf(pdf, 1)
+
+    assert fake_tesseract == [150, 300]
+    assert resultado == {"text": "Nome Preco\nCaneta 2,50", "confidence": 90.0, "dpi": 300}
+
+    fake_tesseract.clear()
+    monkeypatch.setattr(settings, "OCR_MIN_CONFIDENCE", 30)
+    outro = _scanned_pdf(_scan("Outra pagina"))
+    assert ocr_service.ocr_pagina_pdf(outro, 1)["dpi"] == 150
+    assert fake_tesseract == [150]
+
+
+def test_ocr_cache_is_keyed_by_page_content(fake_tesseract, tmp_path):
+    pagina = _scan("Nome Preco")
+    primeiro = _scanned_pdf(pagina)
+    segundo = _scanned_pdf(_scan("Capa"), pagina)
+    caminho = tmp_path / "catalogo.pdf"
+    caminho.write_bytes(primeiro)
+
+    ocr_service.ocr_pagina_pdf(str(caminho), 1)
+    chamadas = len(fake_tesseract)
+
+    # Mesmo arquivo de novo e a mesma página dentro de outro PDF: sem novo OCR
+    ocr_service.ocr_pagina_pdf(str(caminho), 1)
+    resultados = ocr_service.ocr_paginas_pdf(segundo, [1, 2])
+
+    assert len(fake_tesseract) == chamadas * 2  # apenas a capa foi reconhecida
+    assert resultados[2]["text"] == "Nome Preco\nCaneta 2,50"
+
+
+def test_ocr_cache_key_includes_ocr_settings(fake_tesseract, monkeypatch):
+    pdf = _scanned_pdf(_scan("Nome Preco"))
+    ocr_service.ocr_pagina_pdf(pdf, 1)
+    chamadas = len(fake_tesseract)
+
+    ocr_service.ocr_pagina_pdf(pdf, 1)
+    assert len(fake_tesseract) == chamadas
+
+    for nome, valor in (("OCR_LANGUAGE", "por"), ("OCR_HIGH_DPI", 200), ("OCR_MIN_CONFIDENCE", 30)):
+        monkeypatch.setattr(settings, nome, valor)
+        antes = len(fake_tesseract)
+        ocr_service.ocr_pagina_pdf(pdf, 1)
+        assert len(fake_tesseract) > antes, nome
+
+
+def test_page_hash_covers_form_xobjects():
+    def pdf_com_formulario(texto: str) -> bytes:
+        origem = fitz.open()
+        origem.new_page().insert_text((72, 72), texto)
+        doc = fitz.open()
+        # A página só contém "/Fm0 Do"; o texto fica dentro do Form XObject.
+        doc.new_page().show_pdf_page(doc[0].rect, origem, 0)
+        return doc.tobytes()
+
+    hashes = []
+    for texto in ("Caneta azul", "Lapis preto"):
+        with fitz.open(stream=pdf_com_formulario(texto), filetype="pdf") as doc:
+            hashes.append(ocr_service.hash_pagina(doc, 1))
+    with fitz.open(stream=pdf_com_formulario("Caneta azul"), filetype="pdf") as doc:
+        hashes.append(ocr_service.hash_pagina(doc, 1))
+
+    assert hashes[0] != hashes[1]
+    assert hashes[0] == hashes[2]
+
+
+def test_single_pending_page_runs_without_the_pool(fake_tesseract, monkeypatch):
+    monkeypatch.setattr(settings, "OCR_WORKERS", 2)
+    monkeypatch.setattr(ocr_service, "_get_executor", lambda: pytest.fail("pool para uma página"))
+
+    resultado = ocr_service.ocr_pagina_pdf(_scanned_pdf(_scan("Nome Preco")), 1)
+
+    assert resultado["text"] == "Nome Preco\nCaneta 2,50"
+
+
+def test_pool_receives_a_file_path_instead_of_pdf_bytes(fake_tesseract, monkeypatch):
+    enviados = []
+
+    class Executor:
+        def submit(self, fn, fonte, *args):
+            enviados.append(fonte)
+            resultado = fn(fonte, *args)
+            futuro = type("Futuro", (), {"result": lambda self: resultado})()
+            return futuro
+
+    monkeypatch.setattr(ocr_service, "_get_executor", lambda: Executor())
+    pdf = _scanned_pdf(_scan("A"), _scan("B"))
+
+    resultados = ocr_service.ocr_paginas_pdf(pdf, [1, 2])
+
+    assert sorted(resultados) == [1, 2]
+    assert len(enviados) == 2 and len(set(enviados)) == 1
+    assert isinstance(enviados[0], str) and enviados[0].endswith(".pdf")
+    assert not os.path.exists(enviados[0])
+
+
+def test_structured_extraction_ocrs_pending_pages_in_one_batch(fake_tesseract, monkeypatch, tmp_path):
+    caminho = tmp_path / "escaneado.pdf"
+    caminho.write_bytes(_scanned_pdf(_scan("A"), _scan("B"), _scan("C")))
+    lotes = []
+    original = ocr_service.ocr_paginas_pdf
+
+    def spy(fonte, page_numbers, paralelo=True):
+        lotes.append(list(page_numbers))
+        return original(fonte, page_numbers, paralelo=paralelo)
+
+    monkeypatch.setattr(ocr_service, "ocr_paginas_pdf", spy)
+
+    with file_processing_service.PdfDocumentSession(str(caminho)) as session:
+        resultados = file_processing_service._extrair_paginas_sessao(
+            file_processing_service._extrair_pagina_estruturada,
+            session,
+            str(caminho),
+            [1, 2, 3],
+            {},
+        )
+
+    assert lotes == [[1, 2, 3]]
+    assert [r["page"] for r in resultados] == [1, 2, 3]
+    assert all(r["headers"] == ["Nome", "Preco"] for r in resultados)
+    assert resultados[0]["rows"] == [["Caneta", "2,50"]]
+    assert "ocr_pendente" not in resultados[0]
@@ -0,0 +1,141 @@
+import asyncio
+import io
+
+import pdfplumber
+import pytest
+from PIL import Image
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from Backend import crud, models
+from Backend.core.config import settings
+from Backend.database import Base
+from Backend.services import file_processing_service, ocr_service
+
+fitz = pytest.importorskip("fitz")
+
+
+def _mixed_pdf() -> bytes:
+    """Página 1: só texto; página 2: tabela com grade; página 3: escaneada."""
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((72, 72), "Nome Preco")
+    page.insert_text((72, 90), "Caneta 2,50")
+
+    page = doc.new_page()
+    linhas = [["Nome", "Preco"], ["Caneta", "2,50"], ["Lapis", "1,00"]]
+    for i, linha in enumerate(linhas):
+        for j, celula in enumerate(linha):
+            page.insert_text((80 + j * 100, 90 + i * 20), celula)
+    for i in range(len(linhas) + 1):
+        page.draw_line((72, 75 + i * 20), (272, 75 + i * 20))
+    for j in range(3):
+        page.draw_line((72 + j * 100, 75), (72 + j * 100, 135))
+
+    page = doc.new_page()
+    buf = io.BytesIO()
+    Image.new("RGB", (300, 200), "white").save(buf, format="PNG")
+    page.insert_image(page.rect, stream=buf.getvalue())
+
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+@pytest.fixture()
+def extract_tables_calls(monkeypatch):
+    paginas = []
+    original = pdfplumber.page.Page.extract_tables
+
+    def spy(self, *args, **kwargs):
+        paginas.append(self.page_number)
+        return original(self, *args, **kwargs)
+
+    monkeypatch.setattr(pdfplumber.page.Page, "extract_tables", spy)
+    return paginas
+
+
+def test_classificar_paginas_pdf_flags():
+    classes = file_processing_service.classificar_paginas_pdf(_mixed_pdf())
+
+    assert [(c["page"], c["has_text_layer"], c["has_ruling_lines"], c["image_only"]) for c in classes] == [
+        (1, True, False, False),
+        (2, True, True, False),
+        (3, False, False, True),
+    ]
+    assert file_processing_service.classificar_paginas_pdf(_mixed_pdf(), [3])[0]["page"] == 3
+
+
+def test_processar_arquivo_pdf_routes_pages_by_class(extract_tables_calls):
+    produtos = asyncio.run(
+        file_processing_service.processar_arquivo_pdf(_mixed_pdf(), usar_llm=False)
+    )
+
+    # Apenas a página com linhas passa pela detecção de tabelas
+    assert extract_tables_calls == [2]
+    assert {p["nome_base"] for p in produtos} == {"Caneta", "Lapis"}
+
+
+def test_image_only_page_goes_straight_to_ocr(extract_tables_calls, monkeypatch, tmp_path):
+    caminho = tmp_path / "catalogo.pdf"
+    caminho.write_bytes(_mixed_pdf())
+    classe = file_processing_service.classificar_paginas_pdf(str(caminho), [3])[0]
+    monkeypatch.setattr(
+        pdfplumber.page.Page,
+        "extract_text",
+        lambda self, *a, **k: pytest.fail("página escaneada não deve passar pelo pdfplumber"),
+    )
+    monkeypatch.setattr(
+        ocr_service,
+        "ocr_pagina_pdf",
+        lambda fonte, page_number: {"text": "Nome Preco\nCaneta 2,50", "confidence": 95.0, "dpi": 150},
+    )
+
+    resultado = file_processing_service.extract_data_from_single_page(
+        str(caminho), 3, classe=classe
+    )
+
+    assert resultado == {"headers": ["Nome", "Preco"], "rows": [["Caneta", "2,50"]]}
+    assert extract_tables_calls == []
+
+
+def test_process_pdf_job_records_page_classes(monkeypatch, tmp_path):
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    TestingSessionLocal = sessionmaker(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    caminho = tmp_path / "catalogo.pdf"
+    caminho.write_bytes(_mixed_pdf())
+    with TestingSessionLocal() as db:
+        crud.create_initial_data(db)
+        user = crud.get_user_by_email(db, settings.FIRST_SUPERUSER_EMAIL)
+        catalog_file = models.CatalogImportFile(
+            user_id=user.id,
+            original_filename="catalogo.pdf",
+            stored_filename="catalogo.pdf",
+            status="UPLOADED",
+        )
+        db.add(catalog_file)
+        db.commit()
+        job_id = catalog_file.id
+
+    monkeypatch.setattr(file_processing_service, "SessionLocal", TestingSessionLocal)
+    monkeypatch.setattr(
+        ocr_service,
+        "ocr_paginas_pdf",
+        lambda fonte, page_numbers, paralelo=True: {
+            p: {"text": "", "confidence": 0.0, "dpi": 150} for p in page_numbers
+        },
+    )
+
+    asyncio.run(file_processing_service.process_pdf_job(job_id, str(caminho)))
+
+    with TestingSessionLocal() as db:
+        job = db.get(models.CatalogImportFile, job_id)
+        assert job.status == "PENDING_REVIEW"
+        assert [c["image_only"] for c in job.page_classes] == [False, False, True]
+        assert job.pages_processed == 3
@@ -0,0 +1,84 @@
+import asyncio
+import io
+import subprocess
+import sys
+
+import pytest
+
+try:
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, PageBreak
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import letter
+except ImportError:  # pragma: no cover - install at runtime
+    subprocess.check_call([sys.executable, "-m", "pip", "install", "reportlab"])
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, PageBreak
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import letter
+
+from Backend.services import file_processing_service
+
+
+def _create_pdf_with_tables(pages: int) -> bytes:
+    buf = io.BytesIO()
+    doc = SimpleDocTemplate(buf, pagesize=letter)
+    story = []
+    for i in range(pages):
+        table = Table([["nome", "sku"], [f"Produto {i + 1}", f"SKU{i + 1}"]])
+        table.setStyle(TableStyle([("GRID", (0, 0), (-1, -1), 1, colors.black)]))
+        story.append(table)
+        if i < pages - 1:
+            story.append(PageBreak())
+    doc.build(story)
+    return buf.getvalue()
+
+
+def test_session_reuses_parsed_document(monkeypatch):
+    pdf_bytes = _create_pdf_with_tables(4)
+    opened = []
+    original_open = file_processing_service.pdfplumber.open
+
+    def counting_open(*args, **kwargs):
+        opened.append(1)
+        return original_open(*args, **kwargs)
+
+    monkeypatch.setattr(file_processing_service.pdfplumber, "open", counting_open)
+
+    with file_processing_service.PdfDocumentSession(pdf_bytes) as session:
+        assert session.num_pages == 4
+        results = [
+            asyncio.run(
+                file_processing_service.processar_arquivo_pdf(
+                    pdf_bytes, usar_llm=False, pages=[page], session=session
+                )
+            )
+            for page in range(1, 5)
+        ]
+
+    assert len(opened) == 1
+    assert [r[0]["sku_original"] for r in results] == ["SKU1", "SKU2", "SKU3", "SKU4"]
+
+
+def test_session_releases_page_layout():
+    pdf_bytes = _create_pdf_with_tables(2)
+    with file_processing_service.PdfDocumentSession(pdf_bytes) as session:
+        with session.open_page(1) as page:
+            page.extract_tables()
+            assert hasattr(page, "_objects")
+        assert not hasattr(page, "_objects")
+
+        with pytest.raises(ValueError):
+            session.page(3)
+
+
+def test_extract_single_page_with_session(tmp_path):
+    pdf_path = tmp_path / "catalogo.pdf"
+    pdf_path.write_bytes(_create_pdf_with_tables(3))
+
+    with file_processing_service.PdfDocumentSession(str(pdf_path)) as session:
+        with_session = file_processing_service.extract_data_from_single_page(
+            str(pdf_path), 2, session=session
+        )
+    standalone = file_processing_service.extract_data_from_single_page(str(pdf_path), 2)
+
+    assert with_session == standalone
+    assert with_session["rows"] == [["Produto 2", "SKU2"]]
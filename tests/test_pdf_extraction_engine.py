@@ -0,0 +1,62 @@
+import asyncio
+import io
+import subprocess
+import sys
+
+import pytest
+
+try:
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, PageBreak
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import letter
+except ImportError:  # pragma: no cover - install at runtime
+    subprocess.check_call([sys.executable, "-m", "pip", "install", "reportlab"])
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, PageBreak
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import letter
+
+from Backend.services import file_processing_service
+
+
+def _write_pdf_with_tables(path, pages: int) -> None:
+    buf = io.BytesIO()
+    doc = SimpleDocTemplate(buf, pagesize=letter)
+    story = []
+    for i in range(pages):
+        table = Table([["nome", "sku"], [f"Produto {i + 1}", f"SKU{i + 1}"]])
+        table.setStyle(TableStyle([("GRID", (0, 0), (-1, -1), 1, colors.black)]))
+        story.append(table)
+        if i < pages - 1:
+            story.append(PageBreak())
+    doc.build(story)
+    path.write_bytes(buf.getvalue())
+
+
+async def _collect(engine, pdf_path, pages):
+    return [r async for r in engine.iter_pages(str(pdf_path), pages)]
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_engine_yields_pages_in_order(tmp_path, workers):
+    pdf_path = tmp_path / "catalogo.pdf"
+    _write_pdf_with_tables(pdf_path, 7)
+    engine = file_processing_service.PdfPageExtractionEngine(
+        max_workers=workers, chunk_size=2
+    )
+
+    results = asyncio.run(_collect(engine, pdf_path, list(range(1, 8))))
+
+    assert [r["page"] for r in results] == list(range(1, 8))
+    assert [r["produtos"][0]["sku_original"] for r in results] == [
+        f"SKU{i}" for i in range(1, 8)
+    ]
+
+
+def test_montar_produtos_pdf_reports_empty_pages():
+    resultados = [{"page": 1, "produtos": [], "texto": None, "log": []}]
+
+    produtos = asyncio.run(
+        file_processing_service.montar_produtos_pdf(resultados, usar_llm=False)
+    )
+
+    assert "erro_processamento_pdf" in produtos[0]
@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from Backend.core.config import settings
+from Backend.services import file_processing_service
+from Backend.services.render_cache import PageRenderCache
+
+fitz = pytest.importorskip("fitz")
+
+
+def _create_pdf(pages: int) -> bytes:
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Pagina {i + 1}")
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+@pytest.fixture()
+def isolated_cache(monkeypatch, tmp_path):
+    """Cache de renderização e miniaturas em tmp_path, também nos workers.
+
+    Os workers são processos ``spawn``: leem a configuração do ambiente, e um
+    executor novo garante que herdem as variáveis abaixo.
+    """
+    monkeypatch.setenv("RENDER_CACHE_DIRECTORY", str(tmp_path / "cache"))
+    monkeypatch.setenv("PREVIEW_DIRECTORY", str(tmp_path / "previews"))
+    monkeypatch.setattr(settings, "PREVIEW_DIRECTORY", str(tmp_path / "previews"))
+    monkeypatch.setattr(
+        file_processing_service, "render_cache", PageRenderCache(tmp_path / "cache", 10 * 1024 * 1024)
+    )
+    executores = {}
+    monkeypatch.setattr(file_processing_service, "_extraction_executors", executores)
+    yield tmp_path
+    for executor in executores.values():
+        executor.shutdown()
+
+
+def test_preview_opens_pdf_once_per_batch(monkeypatch, isolated_cache):
+    pdf = _create_pdf(20)
+    aberturas = {"pdfplumber": 0, "fitz": 0}
+    session_init = file_processing_service.PdfDocumentSession.__init__
+    renderer_init = file_processing_service.PdfPageRenderer.__init__
+
+    def counting_session(self, source):
+        aberturas["pdfplumber"] += 1
+        session_init(self, source)
+
+    def counting_renderer(self, source):
+        aberturas["fitz"] += 1
+        renderer_init(self, source)
+
+    monkeypatch.setattr(file_processing_service.PdfDocumentSession, "__init__", counting_session)
+    monkeypatch.setattr(file_processing_service.PdfPageRenderer, "__init__", counting_renderer)
+    monkeypatch.setattr(
+        file_processing_service,
+        "convert_from_bytes",
+        lambda *a, **k: pytest.fail("o preview não deve chamar o poppler"),
+    )
+
+    preview = asyncio.run(file_processing_service.preview_arquivo_pdf(pdf, ".pdf", 1, 20))
+
+    assert aberturas == {"pdfplumber": 1, "fitz": 1}
+    assert [img["page"] for img in preview["preview_images"]] == list(range(1, 21))
+    assert preview["sample_rows"][20] == "Pagina 20"
+
+
+def test_preview_splits_pages_between_processes(monkeypatch, isolated_cache):
+    pdf = _create_pdf(7)
+    monkeypatch.setattr(file_processing_service, "MAX_PREVIEW_WORKERS", 2)
+
+    preview = asyncio.run(
+        file_processing_service.preview_arquivo_pdf(pdf, ".pdf", 2, 6, image_mode="url")
+    )
+
+    assert preview["num_pages"] == 7
+    assert [img["page"] for img in preview["preview_images"]] == [2, 3, 4, 5, 6, 7]
+    assert sorted(preview["sample_rows"]) == [2, 3, 4, 5, 6, 7]
+    assert preview["sample_rows"][4] == "Pagina 4"
+    assert len(list((isolated_cache / "previews" / "thumbs").rglob("*.*"))) == 6
+    # As miniaturas não são duplicadas no cache de renderização
+    assert not any((isolated_cache / "cache").rglob("*.*"))
@@ -0,0 +1,129 @@
+import asyncio
+import io
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image, ImageDraw
+
+from Backend.core.config import settings
+from Backend.main import app
+from Backend.services import file_processing_service
+from Backend.services.render_cache import PageRenderCache
+
+fitz = pytest.importorskip("fitz")
+
+app.router.on_startup.clear()
+
+
+def _create_pdf(pages: int) -> bytes:
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Pagina {i + 1}")
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+@pytest.fixture()
+def diretorio_previews(monkeypatch, tmp_path):
+    """Grava as miniaturas em tmp_path e serve esse diretório no mount de miniaturas."""
+    monkeypatch.setattr(settings, "PREVIEW_DIRECTORY", str(tmp_path / "previews"))
+    miniaturas = file_processing_service.diretorio_miniaturas()
+    miniaturas.mkdir(parents=True)
+    mount = next(r for r in app.routes if getattr(r, "name", None) == "preview_thumbnails")
+    monkeypatch.setattr(mount.app, "all_directories", [miniaturas])
+    return miniaturas
+
+
+@pytest.fixture()
+def fitz_renderer(monkeypatch, tmp_path, diretorio_previews):
+    """Conta as páginas renderizadas e isola o cache e o diretório das miniaturas."""
+    renders = []
+    original = file_processing_service.PdfPageRenderer.render
+
+    def counting_render(self, page_number, dpi):
+        renders.append(page_number)
+        return original(self, page_number, dpi)
+
+    monkeypatch.setattr(file_processing_service.PdfPageRenderer, "render", counting_render)
+    monkeypatch.setattr(
+        file_processing_service, "render_cache", PageRenderCache(tmp_path / "cache", 10 * 1024 * 1024)
+    )
+    return renders
+
+
+def test_preview_url_mode_returns_static_urls(fitz_renderer, diretorio_previews):
+    pdf = _create_pdf(3)
+
+    inline = asyncio.run(file_processing_service.preview_arquivo_pdf(pdf, ".pdf", 1, 3))
+    preview = asyncio.run(
+        file_processing_service.preview_arquivo_pdf(pdf, ".pdf", 1, 3, image_mode="url")
+    )
+
+    urls = [img["url"] for img in preview["preview_images"]]
+    assert [img["page"] for img in preview["preview_images"]] == [1, 2, 3]
+    assert all(url.startswith("/static/previews/thumbs/") for url in urls)
+    assert "image" not in preview["preview_images"][0]
+    assert len(str(preview)) * 5 < len(str(inline))
+    # As miniaturas já renderizadas no modo inline foram reaproveitadas
+    assert sorted(fitz_renderer) == [1, 2, 3]
+    assert len(list(diretorio_previews.rglob("*.*"))) == 3
+
+    client = TestClient(app)
+    response = client.get(urls[0])
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+    assert response.headers["content-type"] in ("image/png", "image/jpeg")
+
+
+def test_thumbnails_are_capped_and_not_duplicated_in_render_cache(
+    fitz_renderer, diretorio_previews, monkeypatch, tmp_path
+):
+    pdf = _create_pdf(6)
+    primeira = asyncio.run(
+        file_processing_service.preview_arquivo_pdf(pdf, ".pdf", 1, 1, image_mode="url")
+    )
+    tamanho = next(diretorio_previews.rglob("*.*")).stat().st_size
+    # Cabem só três miniaturas: as usadas há mais tempo são removidas.
+    monkeypatch.setitem(
+        file_processing_service._caches_miniaturas,
+        diretorio_previews,
+        PageRenderCache(diretorio_previews, int(tamanho * 3.5)),
+    )
+
+    asyncio.run(file_processing_service.preview_arquivo_pdf(pdf, ".pdf", 2, 6, image_mode="url"))
+
+    assert len(list(diretorio_previews.rglob("*.*"))) <= 3
+    assert primeira["preview_images"][0]["url"].rsplit("/", 1)[1] not in {
+        p.name for p in diretorio_previews.rglob("*.*")
+    }
+    assert not (tmp_path / "cache").exists() or not list((tmp_path / "cache").rglob("*.*"))
+
+
+def test_disabled_thumbnail_cache_falls_back_to_inline_images(fitz_renderer, diretorio_previews, monkeypatch):
+    monkeypatch.setitem(
+        file_processing_service._caches_miniaturas, diretorio_previews, PageRenderCache(diretorio_previews, 0)
+    )
+
+    preview = asyncio.run(
+        file_processing_service.preview_arquivo_pdf(_create_pdf(2), ".pdf", 1, 2, image_mode="url")
+    )
+
+    assert all(img["image"].startswith("data:image/") for img in preview["preview_images"])
+    assert list(diretorio_previews.rglob("*.*")) == []
+
+
+def test_codificar_miniatura_chooses_format_in_one_pass():
+    texto = Image.new("RGB", (200, 200), "white")
+    ImageDraw.Draw(texto).text((10, 10), "Tabela de produtos", fill="black")
+    rng = random.Random(0)
+    foto = Image.new("RGB", (200, 200))
+    foto.putdata([(rng.randrange(256), rng.randrange(256), rng.randrange(256)) for _ in range(200 * 200)])
+
+    dados_texto, formato_texto = file_processing_service._codificar_miniatura(texto)
+    dados_foto, formato_foto = file_processing_service._codificar_miniatura(foto)
+
+    assert formato_texto == "png" and dados_texto.startswith(b"\x89PNG")
+    assert formato_foto == "jpeg" and dados_foto.startswith(b"\xff\xd8")
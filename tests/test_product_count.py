@@ -0,0 +1,115 @@
+import pytest
+
+from Backend import crud_produtos, models, schemas
+from Backend.services import product_count
+
+
+@pytest.fixture()
+def db(db):
+    db.add(models.User(email="outro@example.com", hashed_password="x"))
+    db.commit()
+    return db
+
+
+@pytest.fixture()
+def contagens(contar_sql):
+    """Quantos ``SELECT count(...)`` chegaram ao banco."""
+    return contar_sql("SELECT COUNT(")
+
+
+def _user_ids(db):
+    return [u.id for u in db.query(models.User).order_by(models.User.id)]
+
+
+def _criar(db, user_id, **campos):
+    return crud_produtos.create_produto(db, schemas.ProdutoCreate(**campos), user_id=user_id)
+
+
+def _total(db, user_id, modo="cached", **filtros):
+    return product_count.total_produtos(db, user_id=user_id, is_admin=False, modo=modo, **filtros)
+
+
+def test_cached_total_is_reused_until_a_product_write(db, contagens):
+    user_id, outro_id = _user_ids(db)
+    for i in range(3):
+        _criar(db, user_id, nome_base=f"Martelo {i}")
+
+    assert _total(db, user_id) == (3, False)
+    assert _total(db, user_id) == (3, False)
+    assert _total(db, user_id, search="martelo 1") == (1, False)
+    assert len(contagens) == 2
+
+    # Produto de outro usuário não invalida o total deste.
+    _criar(db, outro_id, nome_base="Martelo alheio")
+    assert _total(db, user_id) == (3, False)
+    assert len(contagens) == 2
+
+    produto = _criar(db, user_id, nome_base="Martelo 3")
+    assert _total(db, user_id) == (4, False)
+    crud_produtos.delete_produto(db, produto)
+    assert _total(db, user_id) == (3, False)
+    assert _total(db, user_id, modo="exact") == (3, False)
+    assert len(contagens) == 5
+
+
+def test_bulk_writes_invalidate_cached_totals(db):
+    user_id, _ = _user_ids(db)
+    _criar(db, user_id, nome_base="Chave", sku="A1")
+    assert _total(db, user_id) == (1, False)
+
+    crud_produtos.create_produtos_bulk(
+        db,
+        [schemas.ProdutoCreate(nome_base="Chave", sku="A1"), schemas.ProdutoCreate(nome_base="Alicate", sku="B2")],
+        user_id=user_id,
+    )
+    db.commit()
+
+    assert _total(db, user_id) == (2, False)
+
+
+def test_estimated_falls_back_to_cached_count_outside_postgresql(db):
+    user_id, _ = _user_ids(db)
+    _criar(db, user_id, nome_base="Trena")
+
+    assert _total(db, user_id, modo="estimated") == (1, False)
+
+
+def test_window_total_comes_with_the_page(db, contagens):
+    user_id, _ = _user_ids(db)
+    for i in range(5):
+        _criar(db, user_id, nome_base=f"Serrote {i}")
+
+    produtos, total = crud_produtos.get_produtos_by_user_com_total(
+        db, user_id=user_id, is_admin=False, skip=2, limit=2, search="serrote"
+    )
+    assert [p.nome_base for p in produtos] == ["Serrote 2", "Serrote 3"]
+    assert total == 5
+    assert contagens == []
+
+    assert crud_produtos.get_produtos_by_user_com_total(
+        db, user_id=user_id, is_admin=False, skip=10, limit=2
+    ) == ([], None)
+
+
+@pytest.mark.parametrize("modo", ["exact", "cached", "estimated", "window"])
+def test_endpoint_total_modes(db, monkeypatch, modo):
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+
+    from Backend.database import get_db
+    from Backend.main import app
+    from Backend.routers import auth_utils
+
+    user_id, _ = _user_ids(db)
+    for i in range(3):
+        _criar(db, user_id, nome_base=f"Lima {i}")
+    user = db.get(models.User, user_id)
+    monkeypatch.setitem(app.dependency_overrides, get_db, lambda: db)
+    monkeypatch.setitem(app.dependency_overrides, auth_utils.get_current_active_user, lambda: user)
+    client = TestClient(app)
+
+    for skip in (0, 10):
+        resp = client.get("/api/v1/produtos/", params={"limit": 2, "skip": skip, "total_mode": modo})
+        assert resp.status_code == 200
+        assert resp.json()["total_items"] == 3
+        assert resp.json()["total_estimated"] is False
@@ -0,0 +1,76 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from Backend import crud_produtos, models, schemas
+from Backend.services import product_search
+
+
+@pytest.fixture()
+def db(db):
+    db.add(models.User(email="outro@example.com", hashed_password="x"))
+    db.commit()
+    return db
+
+
+def _user_ids(db):
+    return [u.id for u in db.query(models.User).order_by(models.User.id)]
+
+
+def _criar(db, user_id, **campos):
+    return crud_produtos.create_produto(db, schemas.ProdutoCreate(**campos), user_id=user_id)
+
+
+def _buscar(db, user_id, termo, **kwargs):
+    return crud_produtos.get_produtos_by_user(
+        db, user_id=user_id, is_admin=False, search=termo, limit=50, **kwargs
+    )
+
+
+def test_search_is_accent_insensitive_prefix_and_ranked(db):
+    user_id, outro_id = _user_ids(db)
+    descricao = _criar(
+        db, user_id, nome_base="Kit de brocas", descricao_original="Acessório para furadeira elétrica"
+    )
+    nome = _criar(db, user_id, nome_base="Furadeira Elétrica 500W", marca="Bosch")
+    _criar(db, user_id, nome_base="Serra circular")
+    _criar(db, outro_id, nome_base="Furadeira elétrica de outro usuário")
+
+    encontrados = _buscar(db, user_id, "furad eletrica")
+
+    assert [p.id for p in encontrados] == [nome.id, descricao.id]
+    assert crud_produtos.count_produtos_by_user(
+        db, user_id=user_id, is_admin=False, search="furad eletrica"
+    ) == 2
+
+
+def test_search_matches_code_fragments_and_follows_updates(db):
+    user_id, _ = _user_ids(db)
+    produto = _criar(db, user_id, nome_base="Parafuso", sku="ABC-12345", ean="7891234567890")
+
+    assert [p.id for p in _buscar(db, user_id, "2345")] == [produto.id]
+    assert [p.id for p in _buscar(db, user_id, "456789")] == [produto.id]
+
+    crud_produtos.update_produto(db, produto, schemas.ProdutoUpdate(nome_base="Porca sextavada"))
+    assert _buscar(db, user_id, "parafuso") == []
+    assert [p.id for p in _buscar(db, user_id, "sextavad")] == [produto.id]
+
+
+def test_explicit_sort_overrides_relevance(db):
+    user_id, _ = _user_ids(db)
+    b = _criar(db, user_id, nome_base="Lixa B", descricao_original="lixa lixa lixa")
+    a = _criar(db, user_id, nome_base="Lixa A")
+
+    encontrados = _buscar(db, user_id, "lixa", sort_by="nome_base", sort_order="asc")
+
+    assert [p.id for p in encontrados] == [a.id, b.id]
+
+
+def test_postgresql_query_uses_tsvector_column(db, monkeypatch):
+    monkeypatch.setattr(product_search, "_modo", lambda db: "postgresql")
+    query = product_search.aplicar_busca(db.query(models.Produto), db, "furadeira elétrica")
+
+    sql = str(query.statement.compile(dialect=postgresql.dialect()))
+
+    assert "produtos.busca_tsv @@ to_tsquery('portuguese_unaccent'::regconfig" in sql
+    assert "ts_rank_cd(produtos.busca_tsv" in sql
+    assert "lower(" not in sql
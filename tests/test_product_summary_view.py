@@ -0,0 +1,88 @@
+import pytest
+
+from Backend import crud_produtos, models, schemas
+from Backend.database import get_db
+from Backend.main import app
+from Backend.routers import auth_utils
+
+COLUNAS_PESADAS = (
+    "descricao_original",
+    "descricao_chat_api",
+    "dados_brutos_web",
+    "dynamic_attributes",
+    "log_enriquecimento_web",
+    "log_processamento",
+)
+
+
+@pytest.fixture()
+def db(db):
+    user_id = db.query(models.User.id).scalar()
+    for i in range(5):
+        crud_produtos.create_produto(
+            db,
+            schemas.ProdutoCreate(
+                nome_base=f"Parafusadeira {i}",
+                sku=f"PF-{i}",
+                descricao_original="Descrição longa. " * 200,
+                dados_brutos_web={"html": "<p>texto</p>" * 200},
+                log_processamento=[{"evento": "importado", "detalhe": "x" * 500}],
+            ),
+            user_id=user_id,
+        )
+    db.expunge_all()
+    return db
+
+
+@pytest.fixture()
+def selects(contar_sql):
+    return contar_sql("SELECT")
+
+
+def _user_id(db):
+    return db.query(models.User.id).scalar()
+
+
+@pytest.mark.parametrize("paginacao", ["offset", "window", "cursor"])
+def test_summary_listing_skips_heavy_columns_and_relationships(db, selects, paginacao):
+    user_id = _user_id(db)
+    selects.clear()
+    args = dict(user_id=user_id, is_admin=False, limit=3, search="parafusadeira", resumo=True)
+    if paginacao == "offset":
+        produtos = crud_produtos.get_produtos_by_user(db, **args)
+    elif paginacao == "window":
+        produtos, _ = crud_produtos.get_produtos_by_user_com_total(db, **args)
+    else:
+        produtos, _ = crud_produtos.get_produtos_by_user_cursor(db, **args)
+
+    assert len(produtos) == 3
+    assert len(selects) == 1  # sem selectinload de fornecedor/product_type
+    assert not [coluna for coluna in COLUNAS_PESADAS if f"produtos.{coluna}" in selects[0]]
+    resumo = schemas.ProdutoResumoResponse.model_validate(produtos[0])
+    assert resumo.nome_base.startswith("Parafusadeira")
+    assert len(selects) == 1
+
+
+def test_endpoint_summary_view(db, monkeypatch):
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+
+    user = db.get(models.User, _user_id(db))
+    monkeypatch.setitem(app.dependency_overrides, get_db, lambda: db)
+    monkeypatch.setitem(app.dependency_overrides, auth_utils.get_current_active_user, lambda: user)
+    client = TestClient(app)
+
+    completo = client.get("/api/v1/produtos/", params={"limit": 5})
+    resumo = client.get("/api/v1/produtos/", params={"limit": 5, "view": "summary"})
+
+    assert completo.status_code == resumo.status_code == 200
+    assert completo.json()["view"] == "full" and resumo.json()["view"] == "summary"
+    assert resumo.json()["total_items"] == 5
+    item = resumo.json()["items"][0]
+    assert set(item) == set(schemas.ProdutoResumoResponse.model_fields)
+    assert item["sku"] == "PF-0"
+    assert "dados_brutos_web" in completo.json()["items"][0]
+    assert len(resumo.content) * 10 < len(completo.content)
+
+    cursor = client.get("/api/v1/produtos/", params={"limit": 2, "view": "summary", "pagination": "cursor"})
+    assert cursor.json()["next_cursor"] and "log_processamento" not in cursor.json()["items"][0]
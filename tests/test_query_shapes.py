@@ -0,0 +1,99 @@
+import pytest
+from sqlalchemy import func
+
+from Backend import crud_produtos, models, schemas
+from Backend.services import query_shapes
+
+# Combinações de filtro e ordenação que a tela de produtos envia.
+FORMAS_LISTAGEM = [
+    dict(sort_by="id", sort_order="desc"),
+    dict(sort_by="nome_base", sort_order="asc"),
+    dict(sort_by="sku", sort_order="desc"),
+    dict(sort_by="id", sort_order="desc", fornecedor_id=1),
+    dict(sort_by="id", sort_order="desc", product_type_id=1),
+    dict(sort_by="id", sort_order="desc", status_enriquecimento_web=models.StatusEnriquecimentoEnum.PENDENTE),
+    dict(sort_by="id", sort_order="desc", status_titulo_ia=models.StatusGeracaoIAEnum.CONCLUIDO),
+    dict(sort_by="id", sort_order="desc", status_descricao_ia=models.StatusGeracaoIAEnum.FALHA),
+]
+_FILTROS = ("fornecedor_id", "product_type_id", "status_enriquecimento_web", "status_titulo_ia", "status_descricao_ia")
+
+
+@pytest.fixture()
+def registro():
+    query_shapes.query_shapes.limpar()
+    yield query_shapes.query_shapes
+    query_shapes.query_shapes.limpar()
+
+
+def _plano(db, query):
+    sql = str(query.statement.compile(db.get_bind(), compile_kwargs={"literal_binds": True}))
+    return [linha[3] for linha in db.connection().exec_driver_sql("EXPLAIN QUERY PLAN " + sql)]
+
+
+def test_listing_records_its_shape(db, registro):
+    user_id = db.query(models.User.id).scalar()
+    crud_produtos.create_produto(db, schemas.ProdutoCreate(nome_base="Alicate"), user_id=user_id)
+
+    for _ in range(2):
+        crud_produtos.get_produtos_by_user(db, user_id=user_id, is_admin=False, sort_by="id", sort_order="desc")
+    crud_produtos.get_produtos_by_user_cursor(
+        db, user_id=user_id, is_admin=False, limit=10, search="alicate", fornecedor_id=7
+    )
+
+    assert registro.formas() == [
+        (query_shapes.FormaConsulta(True, (), False, False, "id", True), 2),
+        (query_shapes.FormaConsulta(True, (("fornecedor_id", None),), True, False, "relevancia", False), 1),
+    ]
+
+
+def test_proposals_for_listing_shapes_are_already_indexed(registro):
+    for i, forma in enumerate(FORMAS_LISTAGEM):
+        for _ in range(10 - i):
+            registro.registrar(query_shapes.forma_listagem(True, **forma))
+    # O filtro de status da tela alterna entre os valores.
+    for valor in models.StatusGeracaoIAEnum:
+        registro.registrar(query_shapes.forma_listagem(True, sort_by="id", sort_order="desc", status_titulo_ia=valor))
+        registro.registrar(query_shapes.forma_listagem(True, sort_by="id", sort_order="desc", status_descricao_ia=valor))
+    for valor in models.StatusEnriquecimentoEnum:
+        registro.registrar(
+            query_shapes.forma_listagem(True, sort_by="id", sort_order="desc", status_enriquecimento_web=valor)
+        )
+    registro.registrar(query_shapes.forma_listagem(False, sort_by="id", sort_order="desc"))
+
+    propostas = registro.propor_indices()
+
+    assert propostas
+    assert [p.nome for p in propostas if p.existente is None] == []
+    assert all(p.where is None for p in propostas)
+
+
+def test_dominant_status_value_gets_a_partial_index(registro):
+    for _ in range(9):
+        registro.registrar(
+            query_shapes.forma_listagem(True, status_titulo_ia=models.StatusGeracaoIAEnum.PENDENTE)
+        )
+    registro.registrar(query_shapes.forma_listagem(True, status_titulo_ia=models.StatusGeracaoIAEnum.FALHA))
+
+    proposta, minoria = registro.propor_indices()
+
+    assert minoria.colunas == ("user_id", "status_titulo_ia", "id")
+    assert minoria.existente == "ix_produtos_user_id_status_titulo_ia_id"
+    assert proposta.colunas == ("user_id", "id")
+    assert proposta.where == "status_titulo_ia = 'PENDENTE'"
+    assert proposta.existente is None
+    assert "WHERE status_titulo_ia = 'PENDENTE'" in proposta.ddl
+    assert len(proposta.nome) <= 63
+
+
+@pytest.mark.parametrize("forma", FORMAS_LISTAGEM)
+def test_listing_shapes_use_an_index_without_sorting(db, forma):
+    filtros = {k: v for k, v in forma.items() if k in _FILTROS}
+    pagina = crud_produtos._query_listagem_produtos(db, user_id=1, is_admin=False, **forma).limit(50)
+    contagem = crud_produtos._query_contagem_produtos(db, user_id=1, is_admin=False, **filtros)
+
+    plano_pagina = _plano(db, pagina)
+    plano_contagem = _plano(db, contagem.with_entities(func.count(models.Produto.id)))
+
+    assert len(plano_pagina) == 1 and plano_pagina[0].startswith("SEARCH produtos USING INDEX ix_produtos_user_id_")
+    assert not any("TEMP B-TREE" in passo for passo in plano_pagina)
+    assert plano_contagem[0].startswith("SEARCH produtos USING COVERING INDEX ")
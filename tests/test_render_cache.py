@@ -0,0 +1,101 @@
+import io
+import os
+
+import pytest
+
+from Backend.services import file_processing_service
+from Backend.services.render_cache import PageRenderCache, hash_conteudo
+
+fitz = pytest.importorskip("fitz")
+
+
+def _create_pdf(pages: int) -> bytes:
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Pagina {i + 1}")
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def test_cache_roundtrip_and_key(tmp_path):
+    cache = PageRenderCache(tmp_path, 1024 * 1024)
+    file_hash = hash_conteudo(b"%PDF-conteudo")
+
+    assert cache.get(file_hash, 1, 72, "png") is None
+    cache.put(file_hash, 1, 72, "png", b"imagem")
+
+    assert cache.get(file_hash, 1, 72, "png") == b"imagem"
+    assert cache.get(file_hash, 1, 150, "png") is None
+    assert cache.get(file_hash, 2, 72, "png") is None
+    assert cache.get(file_hash, 1, 72, "jpeg") is None
+
+
+def test_cache_entries_by_plain_key(tmp_path):
+    cache = PageRenderCache(tmp_path, 1024 * 1024)
+    chave = hash_conteudo(b"parametros")
+
+    assert cache.get_chave(chave, "json") is None
+    cache.put_chave(chave, "json", b"{}")
+
+    assert cache.get_chave(chave, "json") == b"{}"
+    assert (tmp_path / chave[:2] / f"{chave}.json").exists()
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = PageRenderCache(tmp_path, 250)
+    file_hash = hash_conteudo(b"pdf")
+    for page in (1, 2):
+        cache.put(file_hash, page, 72, "png", b"x" * 100)
+    # Página 1 fica mais antiga; o acerto em get() a torna a mais recente
+    antigo = os.path.getmtime(cache._path(file_hash, 2, 72, "png")) - 60
+    os.utime(cache._path(file_hash, 1, 72, "png"), (antigo, antigo))
+    os.utime(cache._path(file_hash, 2, 72, "png"), (antigo + 1, antigo + 1))
+    assert cache.get(file_hash, 1, 72, "png") is not None
+
+    cache.put(file_hash, 3, 72, "png", b"x" * 100)
+
+    assert cache.get(file_hash, 2, 72, "png") is None
+    assert cache.get(file_hash, 1, 72, "png") is not None
+    assert cache.get(file_hash, 3, 72, "png") is not None
+
+
+def test_get_or_render_many_renders_only_missing_pages(tmp_path):
+    cache = PageRenderCache(tmp_path, 1024 * 1024)
+    chamadas = []
+
+    def render(pages):
+        chamadas.append(list(pages))
+        return {p: f"pagina {p}".encode() for p in pages}
+
+    cache.get_or_render_many("abc123", [1, 2], 200, "png", render)
+    resultado = cache.get_or_render_many("abc123", [1, 2, 3], 200, "png", render)
+
+    assert chamadas == [[1, 2], [3]]
+    assert resultado[3] == b"pagina 3"
+
+
+def test_generate_pdf_page_images_reuses_cached_renders(tmp_path, monkeypatch):
+    pdf_path = tmp_path / "catalogo.pdf"
+    pdf_path.write_bytes(_create_pdf(3))
+    monkeypatch.setattr(
+        file_processing_service, "render_cache", PageRenderCache(tmp_path / "cache", 10 * 1024 * 1024)
+    )
+    renders = []
+    original = fitz.Page.get_pixmap
+
+    def counting_get_pixmap(self, *args, **kwargs):
+        renders.append(self.number)
+        return original(self, *args, **kwargs)
+
+    monkeypatch.setattr(fitz.Page, "get_pixmap", counting_get_pixmap)
+    # As imagens vão para Backend/static/previews relativo ao diretório atual.
+    monkeypatch.chdir(tmp_path)
+
+    primeira = file_processing_service.generate_pdf_page_images(str(pdf_path), "cache-test")
+    segunda = file_processing_service.generate_pdf_page_images(str(pdf_path), "cache-test")
+
+    assert primeira == segunda
+    assert len(renders) == 3
+    assert (tmp_path / "Backend" / "static" / "previews" / "cache-test" / "page-3.png").exists()
@@ -0,0 +1,164 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from Backend import crud, crud_fornecedores, models
+from Backend.core.config import settings
+from Backend.database import Base, get_db
+from Backend.main import app
+from Backend.routers import auth_utils
+from Backend.services import file_processing_service, job_queue
+
+fitz = pytest.importorskip("fitz")
+
+app.router.on_startup.clear()
+
+
+def _write_pdf(path, pages: int) -> None:
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), "Nome Preco")
+        page.insert_text((72, 90), f"Item{i + 1} {i + 1},00")
+    doc.save(str(path))
+    doc.close()
+
+
+@pytest.fixture()
+def job_env(tmp_path, monkeypatch):
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    TestingSessionLocal = sessionmaker(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with TestingSessionLocal() as db:
+        crud.create_initial_data(db)
+        user = crud.get_user_by_email(db, settings.FIRST_SUPERUSER_EMAIL)
+        db.expunge(user)
+
+    monkeypatch.setattr(settings, "UPLOAD_DIRECTORY", str(tmp_path))
+    (tmp_path / "catalogs").mkdir()
+    _write_pdf(tmp_path / "catalogs" / "catalogo.pdf", 5)
+    with TestingSessionLocal() as db:
+        job = models.CatalogImportFile(
+            user_id=user.id,
+            original_filename="catalogo.pdf",
+            stored_filename="catalogo.pdf",
+            status="UPLOADED",
+        )
+        db.add(job)
+        db.commit()
+        job_id = job.id
+
+    monkeypatch.setattr(file_processing_service, "SessionLocal", TestingSessionLocal)
+    # Um lote por página, para que cada página seja gravada assim que extraída
+    monkeypatch.setattr(file_processing_service, "EXTRACTION_CHUNK_SIZE", 1)
+
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    overrides = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[auth_utils.get_current_active_user] = lambda: user
+    yield TestingSessionLocal, job_id, tmp_path / "catalogs" / "catalogo.pdf"
+    app.dependency_overrides.clear()
+    app.dependency_overrides.update(overrides)
+
+
+def test_interrupted_job_resumes_from_last_checkpoint(job_env, monkeypatch):
+    TestingSessionLocal, job_id, pdf_path = job_env
+    original = file_processing_service._extrair_pagina_estruturada
+    extraidas = []
+
+    def crash_on_page_4(session, path, page_num, **kwargs):
+        if page_num == 4:
+            raise RuntimeError("worker reiniciado")
+        extraidas.append(page_num)
+        return original(session, path, page_num, **kwargs)
+
+    monkeypatch.setattr(file_processing_service, "_extrair_pagina_estruturada", crash_on_page_4)
+    asyncio.run(file_processing_service.process_pdf_job(job_id, str(pdf_path), mapping={"Preco": "preco"}))
+
+    with TestingSessionLocal() as db:
+        job = db.get(models.CatalogImportFile, job_id)
+        assert job.status == "FAILED"
+        assert job.pages_processed == 3
+        assert db.query(models.CatalogImportPageResult).filter_by(catalog_file_id=job_id).count() == 3
+
+    def spy(session, path, page_num, **kwargs):
+        extraidas.append(page_num)
+        return original(session, path, page_num, **kwargs)
+
+    monkeypatch.setattr(file_processing_service, "_extrair_pagina_estruturada", spy)
+    extraidas.clear()
+    client = TestClient(app)
+
+    response = client.post(f"/api/v1/fornecedores/import/resume/{job_id}")
+
+    assert response.status_code == 202
+    assert response.json()["resume_from"] == 4
+    # Enquanto o job de fundo não terminou, uma nova retomada é recusada
+    repetida = client.post(f"/api/v1/fornecedores/import/resume/{job_id}")
+    assert repetida.status_code == 409
+    assert str(response.json()["background_job_id"]) in repetida.json()["detail"]
+    # A retomada só é enfileirada; quem executa é o worker
+    assert extraidas == []
+    worker = job_queue.Worker(TestingSessionLocal, queues=["imports"])
+    assert asyncio.run(worker.run_until_empty()) == 1
+    assert extraidas == [4, 5]
+    with TestingSessionLocal() as db:
+        job = db.get(models.CatalogImportFile, job_id)
+        assert job.status == "PENDING_REVIEW"
+        assert job.pages_processed == 5
+        assert job.result_summary == {"start_page": 1, "mapping": {"Preco": "preco"}}
+    pagina = client.get(f"/api/v1/fornecedores/import/products/{job_id}", params={"skip": 1, "limit": 3})
+    assert pagina.status_code == 200
+    assert pagina.json()["total_items"] == 5
+    assert [p["nome_base"] for p in pagina.json()["items"]] == ["Item2", "Item3", "Item4"]
+
+    # Retomar um job concluído não processa nada de novo
+    extraidas.clear()
+    response = client.post(f"/api/v1/fornecedores/import/resume/{job_id}")
+    assert response.json()["status"] == "PENDING_REVIEW"
+    assert extraidas == []
+
+
+def test_checkpoint_is_idempotent(job_env):
+    TestingSessionLocal, job_id, _ = job_env
+
+    with TestingSessionLocal() as db:
+        job = db.get(models.CatalogImportFile, job_id)
+        assert crud_fornecedores.save_catalog_import_page(db, job, 1, [{"nome_base": "A"}])
+        assert not crud_fornecedores.save_catalog_import_page(db, job, 1, [{"nome_base": "B"}])
+        assert crud_fornecedores.get_catalog_import_products(db, job_id) == ([{"nome_base": "A"}], 1)
+        assert db.get(models.CatalogImportFile, job_id).pages_processed == 1
+
+
+def test_products_are_paged_across_checkpoints(job_env):
+    TestingSessionLocal, job_id, _ = job_env
+
+    with TestingSessionLocal() as db:
+        job = db.get(models.CatalogImportFile, job_id)
+        crud_fornecedores.save_catalog_import_page(db, job, 2, [{"n": 3}, {"n": 4}, {"n": 5}])
+        crud_fornecedores.save_catalog_import_page(db, job, 1, [{"n": 1}, {"n": 2}])
+        crud_fornecedores.save_catalog_import_page(db, job, 3, [])
+        crud_fornecedores.save_catalog_import_page(db, job, 4, [{"n": 6}])
+
+        def pagina(skip, limit):
+            items, total = crud_fornecedores.get_catalog_import_products(db, job_id, skip, limit)
+            return [p["n"] for p in items], total
+
+        assert pagina(0, 2) == ([1, 2], 6)
+        assert pagina(1, 3) == ([2, 3, 4], 6)
+        assert pagina(4, 10) == ([5, 6], 6)
+        assert pagina(6, 10) == ([], 6)